@@ -3,7 +3,8 @@
 Reads the fabric profile (twi_raster, template_raster, hru_gpkg/layer, id_feature,
 vpu) and the depstor rasters under {data_root}/{fabric}/depstor_rasters/, then runs
 gfv2_params.threshold_sweep.build_artifact and saves a .npz the sweep notebook
-loads. Heavy (full template grid) -> sbatch for large fabrics.
+loads. Streams the template in row strips (bounded memory), but a full pass
+over a large fabric's grid is still long -> sbatch for large fabrics.
 
   pixi run --as-is python scripts/build_carea_twi_artifact.py --fabric oregon
 """
@@ -2,11 +2,16 @@
 
 Resolves the fabric geopackage + id_feature from the base_config.yml profile and
 writes one per-HRU per-day NetCDF per calendar year. Fabric-agnostic.
+
+Several ``--source`` names on the same grid are aggregated together
+(``aggregate_sources``): one fabric preparation, one weight matrix named after
+the first source, one pass per year, and per-source outputs as before.
 """
 
 from __future__ import annotations
 
 import argparse
+import dataclasses
 import re
 from pathlib import Path
 
@@ -14,10 +19,18 @@ import geopandas as gpd
 import pandas as pd
 import pyproj
 
-from gfv2_params.aggregate import aggregate_source
+from gfv2_params.aggregate import SourceRun, aggregate_source, aggregate_sources
+from gfv2_params.aggregate.driver import SOURCE_FINGERPRINT_ATTR, WEIGHTS_FINGERPRINT_ATTR
 from gfv2_params.aggregate.snodas import SNODAS_ADAPTER
+from gfv2_params.aggregate.store import pack_hru_store, store_path
 from gfv2_params.config import load_config, require_config_key
 from gfv2_params.log import configure_logging
+from gfv2_params.weight_store import (
+    WEIGHTS_SUFFIX,
+    export_weights_csv,
+    read_weights,
+    write_weights,
+)
 
 ADAPTERS = {"snodas": SNODAS_ADAPTER}
 
@@ -46,12 +59,26 @@ def _resolve(value, repl: dict):
     return value
 
 
+def _output_dir(cfg: dict, src: dict) -> Path:
+    """A source entry's `output_dir`, else the top-level one (SNODAS)."""
+    return Path(src.get("output_dir", cfg["output_dir"]))
+
+
+def _adapter(src: dict):
+    """A source entry's adapter, with the entry's `agg_backend` (if set) applied."""
+    adapter = ADAPTERS[src["name"]]
+    if src.get("agg_backend"):
+        adapter = dataclasses.replace(adapter, agg_backend=src["agg_backend"])
+    return adapter
+
+
 def run_merge(
     output_dir: Path,
     output_prefix: str,
     id_feature: str,
     logger,
     expected_hru_count: int | None = None,
+    incremental: bool = False,
 ) -> list[Path]:
     """Concatenate per-batch per-year NetCDFs into the final per-year files.
 
@@ -69,6 +96,12 @@ def run_merge(
     warns. ``data_vars="minimal"`` keeps variables lacking the concat dim
     (e.g. the scalar CF ``crs`` grid-mapping var) as-is instead of broadcasting
     them to length ``n_hru``.
+
+    ``incremental=True`` leaves a year's merged file alone when it is newer
+    than every one of that year's batch parts, so an incremental Stage 1 run
+    re-merges only the years it re-aggregated (and Stage 2's season cache,
+    keyed on the merged files, stays valid for the rest). The per-batch
+    fingerprint attrs are dropped from merged files: they describe one batch.
     """
     import numpy as np
     import xarray as xr
@@ -92,6 +125,13 @@ def run_merge(
     written: list[Path] = []
     for year in sorted({_year(p) for p in parts}):
         yparts = sorted(batches_dir.glob(f"{output_prefix}_batch*_agg_{year}.nc"))
+        out = output_dir / f"{output_prefix}_agg_{year}.nc"
+        if incremental and out.exists() and out.stat().st_mtime_ns >= max(
+            p.stat().st_mtime_ns for p in yparts
+        ):
+            logger.info("%d: %s is newer than its %d batch parts; kept", year, out.name, len(yparts))
+            written.append(out)
+            continue
         dss = [xr.open_dataset(p) for p in yparts]
         try:
             merged = xr.concat(dss, dim=id_feature, data_vars="minimal").sortby(id_feature)
@@ -110,7 +150,8 @@ def run_merge(
                     "(incomplete batch set?).",
                     len(ids), expected_hru_count, year, expected_hru_count - len(ids),
                 )
-            out = output_dir / f"{output_prefix}_agg_{year}.nc"
+            for attr in (SOURCE_FINGERPRINT_ATTR, WEIGHTS_FINGERPRINT_ATTR):
+                merged.attrs.pop(attr, None)
             merged.to_netcdf(out)
         finally:
             for d in dss:
@@ -128,11 +169,11 @@ def consolidate_weights(
     logger,
     expected_hru_count: int | None = None,
 ) -> Path:
-    """Concat per-batch weight CSVs into the single canonical weight file.
+    """Concat per-batch weight tables into the single canonical weight file.
 
     Batched aggregation (``--batch_id``) caches gdptools weights per batch as
-    ``{source}_weights_{fabric}_batch{NNNN}.csv``, but Stage 2's
-    ``cells_from_weights`` reads a single ``{source}_weights_{fabric}.csv``.
+    ``{source}_weights_{fabric}_batch{NNNN}.parquet``, but Stage 2's
+    ``cells_from_weights`` reads a single ``{source}_weights_{fabric}.parquet``.
     Batches cover disjoint HRUs, so a plain row-concat of the per-batch tables
     reproduces the whole-fabric weight table (identical per-HRU cell counts).
     Run as part of ``--mode merge`` so the canonical file exists before Stage 2.
@@ -143,14 +184,12 @@ def consolidate_weights(
     warns.
     """
     weight_dir = Path(weight_dir)
-    canonical = weight_dir / f"{source}_weights_{fabric}.csv"
-    parts = sorted(weight_dir.glob(f"{source}_weights_{fabric}_batch*.csv"))
+    canonical = weight_dir / f"{source}_weights_{fabric}{WEIGHTS_SUFFIX}"
+    pattern = f"{source}_weights_{fabric}_batch*{WEIGHTS_SUFFIX}"
+    parts = sorted(weight_dir.glob(pattern))
     if not parts:
-        raise FileNotFoundError(
-            f"No per-batch weight CSVs in {weight_dir} matching "
-            f"{source}_weights_{fabric}_batch*.csv"
-        )
-    frames = [pd.read_csv(p) for p in parts]
+        raise FileNotFoundError(f"No per-batch weight files in {weight_dir} matching {pattern}")
+    frames = [read_weights(p, id_feature) for p in parts]
     seen: dict[object, str] = {}
     for path, frame in zip(parts, frames):
         for hid in frame[id_feature].unique():
@@ -166,8 +205,7 @@ def consolidate_weights(
             "(incomplete batch set?).",
             len(seen), expected_hru_count, expected_hru_count - len(seen),
         )
-    combined = pd.concat(frames, ignore_index=True)
-    combined.to_csv(canonical, index=False)
+    write_weights(pd.concat(frames, ignore_index=True), canonical, id_feature)
     logger.info(
         "Consolidated %d per-batch weight files (%d HRUs) -> %s",
         len(parts), len(seen), canonical.name,
@@ -177,14 +215,27 @@ def consolidate_weights(
 
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--source", required=True, choices=sorted(ADAPTERS))
+    ap.add_argument("--source", required=True, nargs="+", choices=sorted(ADAPTERS),
+                    help="One source, or several sharing a grid (aggregated in one pass; "
+                         "weights are named after the first)")
     ap.add_argument("--fabric", required=True)
     ap.add_argument("--years", nargs="*", type=int, default=None)
     ap.add_argument("--config", default="configs/aggregate/aggregate_sources.yml")
     ap.add_argument("--base_config", default="configs/base_config.yml")
-    ap.add_argument("--mode", choices=["aggregate", "merge"], default="aggregate")
+    ap.add_argument("--mode", choices=["aggregate", "merge", "pack"], default="aggregate",
+                    help="pack: rewrite the final per-year files as one HRU-chunked store "
+                         "(aggregate/store.py) for Stage 2 --layout store")
     ap.add_argument("--batch_id", type=int, default=None,
                      help="Spatial batch index (aggregate mode only); omit to run whole-fabric.")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Year files aggregated in parallel (aggregate mode; 1 = serial)")
+    ap.add_argument("--memory_gb", type=float, default=None,
+                    help="Memory budget capping --workers by the per-year grid estimate")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Skip years whose outputs are current (input/weights unchanged; "
+                         "merge mode: merged file newer than its batch parts)")
+    ap.add_argument("--export_csv", action="store_true",
+                    help="Merge mode: also write a CSV copy of the consolidated weights")
     args = ap.parse_args()
     logger = configure_logging("derive_aggregate")
 
@@ -208,7 +259,8 @@ def main() -> None:
     repl = {"data_root": cfg["data_root"], "fabric": cfg["fabric"]}
     cfg = {k: _resolve(v, repl) for k, v in cfg.items()}
 
-    src = next(s for s in cfg["sources"] if s["name"] == args.source)
+    srcs = [next(s for s in cfg["sources"] if s["name"] == name) for name in args.source]
+    weight_source = args.source[0]
     id_feature = require_config_key(cfg, "id_feature", "derive_aggregate")
 
     batch_note = f" batch={args.batch_id}" if args.batch_id is not None else ""
@@ -217,44 +269,77 @@ def main() -> None:
 
     expected = cfg.get("expected_max_hru_id")
 
+    if args.mode == "pack":
+        for src in srcs:
+            out_dir = _output_dir(cfg, src)
+            years = sorted(out_dir.glob(f"{src['output_prefix']}_agg_*.nc"))
+            logger.info("Packing %d %s per-year files into one HRU-chunked store ...",
+                        len(years), src["name"])
+            pack_hru_store(years, store_path(out_dir, src["output_prefix"]), id_feature)
+        return
+
     if args.mode == "merge":
         logger.info("Merging per-batch NetCDFs + consolidating weights ...")
-        out = run_merge(Path(cfg["output_dir"]), src["output_prefix"], id_feature, logger,
-                        expected_hru_count=expected)
-        logger.info("Wrote %d merged per-year files to %s", len(out), cfg["output_dir"])
-        consolidate_weights(Path(cfg["weight_dir"]), args.source, args.fabric, id_feature,
-                            logger, expected_hru_count=expected)
+        for src in srcs:
+            out_dir = _output_dir(cfg, src)
+            out = run_merge(out_dir, src["output_prefix"], id_feature, logger,
+                            expected_hru_count=expected, incremental=args.incremental)
+            logger.info("Wrote %d merged %s per-year files to %s", len(out), src["name"], out_dir)
+        weights = consolidate_weights(Path(cfg["weight_dir"]), weight_source, args.fabric,
+                                      id_feature, logger, expected_hru_count=expected)
+        if args.export_csv:
+            logger.info("Exported weights CSV -> %s", export_weights_csv(weights, id_feature))
         return
 
-    # snodas_dir may be overridden in the profile; fall back to the source entry.
-    snodas_dir = _resolve(cfg.get("snodas_dir", src["snodas_dir"]), repl)
     hru_layer = cfg.get("hru_layer", "nhru")
 
     if args.batch_id is not None:
         batch_gpkg = Path(cfg["batch_dir"]) / f"batch_{args.batch_id:04d}.gpkg"
         fabric_gdf = gpd.read_file(batch_gpkg, layer=hru_layer)
-        out_dir = Path(cfg["output_dir"]) / "_batches"
-        prefix = f"{src['output_prefix']}_batch{args.batch_id:04d}"
-        wfile = Path(cfg["weight_dir"]) / f"{args.source}_weights_{args.fabric}_batch{args.batch_id:04d}.csv"
+        batch_tag = f"_batch{args.batch_id:04d}"
+        wfile = (Path(cfg["weight_dir"])
+                 / f"{weight_source}_weights_{args.fabric}{batch_tag}{WEIGHTS_SUFFIX}")
         logger.info("Fabric %s batch %04d: %d HRUs (id=%s)",
                     args.fabric, args.batch_id, len(fabric_gdf), id_feature)
     else:
         hru_gpkg = require_config_key(cfg, "hru_gpkg", "derive_aggregate")
         fabric_gdf = gpd.read_file(hru_gpkg, layer=hru_layer)
-        out_dir = Path(cfg["output_dir"])
-        prefix = src["output_prefix"]
-        wfile = Path(cfg["weight_dir"]) / f"{args.source}_weights_{args.fabric}.csv"
+        batch_tag = ""
+        wfile = Path(cfg["weight_dir"]) / f"{weight_source}_weights_{args.fabric}{WEIGHTS_SUFFIX}"
         logger.info("Fabric %s: %d HRUs (id=%s)", args.fabric, len(fabric_gdf), id_feature)
 
-    out = aggregate_source(
-        ADAPTERS[args.source], fabric_gdf, id_feature,
-        input_dir=Path(snodas_dir),
-        output_dir=out_dir,
-        weight_file=wfile,
-        output_prefix=prefix,
-        years=args.years,
+    runs = [
+        SourceRun(
+            adapter=_adapter(src),
+            # <name>_dir may be overridden in the profile; fall back to the source entry.
+            input_dir=Path(_resolve(cfg.get(f"{src['name']}_dir", src[f"{src['name']}_dir"]), repl)),
+            output_dir=_output_dir(cfg, src) / "_batches" if batch_tag else _output_dir(cfg, src),
+            output_prefix=f"{src['output_prefix']}{batch_tag}",
+        )
+        for src in srcs
+    ]
+    if len(runs) == 1:
+        run = runs[0]
+        out = aggregate_source(
+            run.adapter, fabric_gdf, id_feature,
+            input_dir=run.input_dir,
+            output_dir=run.output_dir,
+            weight_file=wfile,
+            output_prefix=run.output_prefix,
+            years=args.years,
+            workers=args.workers,
+            memory_gb=args.memory_gb,
+            incremental=args.incremental,
+        )
+        logger.info("Wrote %d per-year files to %s", len(out), run.output_dir)
+        return
+    outs = aggregate_sources(
+        runs, fabric_gdf, id_feature, weight_file=wfile, years=args.years,
+        workers=args.workers, memory_gb=args.memory_gb, incremental=args.incremental,
     )
-    logger.info("Wrote %d per-year files to %s", len(out), out_dir)
+    for run in runs:
+        logger.info("Wrote %d %s per-year files to %s",
+                    len(outs[run.adapter.source_key]), run.adapter.source_key, run.output_dir)
 
 
 if __name__ == "__main__":
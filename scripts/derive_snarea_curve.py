@@ -15,6 +15,7 @@ from __future__ import annotations
 import argparse
 import logging
 import time
+from collections.abc import Iterator
 from pathlib import Path
 
 import numpy as np
@@ -24,9 +25,23 @@ import xarray as xr
 from gfv2_params.config import load_config, require_config_key
 from gfv2_params.log import configure_logging
 from gfv2_params.snarea import DEFAULT_SNAREA_CURVE, build_snarea_curve, validate_default_curve
+from gfv2_params.snarea.season_batch import water_year
+from gfv2_params.snarea.season_cache import (
+    build_from_summaries,
+    concat_summaries,
+    load_summary,
+    save_summary,
+    source_id,
+    summarize_water_years,
+    water_year_keys,
+)
 from gfv2_params.snarea.selection import SelectionParams
+from gfv2_params.weight_store import read_weights
 
 __all__ = [
+    "iter_daily_blocks",
+    "iter_daily_chunks",
+    "season_summaries",
     "read_daily_by_hru",
     "cells_from_weights",
     "validate_default_curve",
@@ -34,56 +49,161 @@ __all__ = [
 ]
 
 
-def read_daily_by_hru(
-    nc_dir: Path, id_dim: str, logger: logging.Logger | None = None
-) -> dict[int, pd.DataFrame]:
-    """Concatenate per-year NCs into one daily DataFrame per HRU (index=date).
+# HRUs per Stage 2 chunk. A chunk holds (days x chunk) float64 for three
+# variables: ~20 years x 365 days x 20k HRUs x 3 x 8 B ~= 3.5 GB, plus the
+# per-HRU frames built from it.
+DEFAULT_CHUNK_HRUS = 20_000
+
+_VARS = ("swe", "scov", "swe_std")
+
+
+def iter_daily_blocks(
+    files: list[Path], id_dim: str, chunk_size: int = DEFAULT_CHUNK_HRUS,
+    logger: logging.Logger | None = None,
+) -> Iterator[tuple[np.ndarray, pd.DatetimeIndex, dict[str, np.ndarray]]]:
+    """Yield ``(ids, time_index, {var: (days, hru) array})`` one HRU chunk at a time.
+
+    Each per-year NC in `files` is opened lazily (no dask); a chunk is one
+    contiguous ``(time, hru)`` slice of `swe`/`scov`/`swe_std` per file,
+    concatenated along time (sorted) into NumPy arrays. Chunks come in file
+    HRU order; every file must carry the same HRU coordinate.
+    """
+    if not files:
+        raise FileNotFoundError("No aggregated NCs to read")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+    datasets = [xr.open_dataset(f) for f in files]
+    try:
+        nc_dir = Path(files[0]).parent
+        missing = sorted({v for ds in datasets for v in _VARS if v not in ds.data_vars})
+        if missing:
+            raise ValueError(
+                f"Aggregated NetCDFs in {nc_dir} are missing {missing}. Re-run Stage 1 "
+                "(scripts/derive_aggregate.py) — the SNODAS adapter now emits swe_std "
+                "(std_variables=('swe',)) — before running Stage 2."
+            )
+        ids = datasets[0][id_dim].values
+        for f, ds in zip(files[1:], datasets[1:]):
+            if not np.array_equal(ds[id_dim].values, ids):
+                raise ValueError(f"{Path(f).name}: {id_dim} coordinate differs from {Path(files[0]).name}")
+        times = np.concatenate([ds["time"].values for ds in datasets])
+        t_order = np.argsort(times, kind="stable")
+        time_index = pd.DatetimeIndex(times[t_order], name="time")
+        n_hru = ids.size
+        n_chunks = -(-n_hru // chunk_size)
+        if logger:
+            logger.info("Streaming %d HRUs x %d days from %d per-year NCs in %d chunk(s) of <=%d HRUs",
+                        n_hru, time_index.size, len(files), n_chunks, chunk_size)
+        for k, start in enumerate(range(0, n_hru, chunk_size), start=1):
+            t0 = time.perf_counter()
+            sl = slice(start, min(start + chunk_size, n_hru))
+            block = {
+                v: np.concatenate([
+                    ds[v].isel({id_dim: sl}).transpose("time", id_dim).values for ds in datasets
+                ])[t_order]
+                for v in _VARS
+            }
+            if logger:
+                logger.info("  chunk %d/%d: %d HRUs read in %.1fs", k, n_chunks, sl.stop - sl.start,
+                            time.perf_counter() - t0)
+            yield ids[sl], time_index, block
+    finally:
+        for ds in datasets:
+            ds.close()
+
+
+def iter_daily_chunks(
+    nc_dir: Path, id_dim: str, chunk_size: int = DEFAULT_CHUNK_HRUS,
+    logger: logging.Logger | None = None, files: list[Path] | None = None,
+) -> Iterator[dict[int, pd.DataFrame]]:
+    """Yield ``{hru_id: daily DataFrame}`` (index=date) one HRU chunk at a time.
 
     The aggregated NC's HRU dimension is named ``id_dim`` (Stage 1 aggregates
     with `target_id = id_feature`, so the NC id-dim equals the fabric's
     `id_feature` directly).
 
-    Pass ``logger`` to trace the load phases: at CONUS scale the
-    ``to_dataframe()`` materializes ~2.8B rows (years x HRUs x days) and can take
-    tens of minutes, which is silent (and looks like a hang) without this.
+    Reads through `iter_daily_blocks`, so peak memory scales with `chunk_size`,
+    not with CONUS x years (the previous ``to_dataframe()`` materialized ~2.8B
+    rows). Within a chunk, HRUs come in ascending id.
+
+    `files` overrides the ``*_agg_*.nc`` glob of `nc_dir` — e.g. ``[store]``
+    for the HRU-chunked store of `gfv2_params.aggregate.store`, whose chunks
+    hold the full record of a block of HRUs.
+    """
+    if files is None:
+        files = sorted(Path(nc_dir).glob("*_agg_*.nc"))
+    if not files:
+        raise FileNotFoundError(f"No aggregated NCs in {nc_dir}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+    for chunk_ids, time_index, block in iter_daily_blocks(files, id_dim, chunk_size, logger):
+        out: dict[int, pd.DataFrame] = {}
+        for j in np.argsort(chunk_ids, kind="stable"):
+            out[int(chunk_ids[j])] = pd.DataFrame(
+                {"swe": block["swe"][:, j], "sca": block["scov"][:, j],
+                 "swe_std": block["swe_std"][:, j]},
+                index=time_index,
+            )
+        yield out
+
+
+def season_summaries(
+    nc_dir: Path, id_dim: str, cache_dir: Path, chunk_size: int = DEFAULT_CHUNK_HRUS,
+    logger: logging.Logger | None = None,
+) -> tuple[np.ndarray, dict[int, dict]]:
+    """``(ids, {water_year: summary})`` for every water year in `nc_dir`, via the cache.
+
+    Water years whose `season_cache` key still matches are loaded from
+    `cache_dir`; only the rest are read back from the NCs contributing to
+    them, summarized chunk by chunk and saved. ``ids`` are ascending.
     """
     files = sorted(Path(nc_dir).glob("*_agg_*.nc"))
     if not files:
         raise FileNotFoundError(f"No aggregated NCs in {nc_dir}")
-    t0 = time.perf_counter()
-    if logger:
-        logger.info("Opening %d per-year NCs (lazy) ...", len(files))
-    ds = xr.open_mfdataset(files, combine="by_coords", data_vars="minimal")
-    if logger:
-        logger.info(
-            "Materializing daily frame for %d HRUs x %d days "
-            "(the slow/large step at CONUS scale) ...",
-            ds.sizes.get(id_dim, 0), ds.sizes.get("time", 0),
-        )
-    missing = [v for v in ("swe", "scov", "swe_std") if v not in ds.data_vars]
-    if missing:
-        raise ValueError(
-            f"Aggregated NetCDFs in {nc_dir} are missing {missing}. Re-run Stage 1 "
-            "(scripts/derive_aggregate.py) — the SNODAS adapter now emits swe_std "
-            "(std_variables=('swe',)) — before running Stage 2."
-        )
-    df = ds[["swe", "scov", "swe_std"]].to_dataframe().reset_index()
-    df = df.rename(columns={"scov": "sca"})
+    file_days, ids = {}, None
+    for f in files:
+        with xr.open_dataset(f) as ds:
+            file_days[f] = pd.DatetimeIndex(ds["time"].values)
+            if ids is None:
+                ids = np.sort(ds[id_dim].values)
+    keys = water_year_keys({source_id(f): days for f, days in file_days.items()})
+    summaries = {wy: load_summary(cache_dir, wy, key, ids) for wy, key in keys.items()}
+    stale = sorted(wy for wy, summ in summaries.items() if summ is None)
     if logger:
-        logger.info("  materialized %d rows in %.0fs; grouping into per-HRU series ...",
-                    len(df), time.perf_counter() - t0)
+        logger.info("Season cache %s: %d of %d water year(s) cached, %d to summarize %s",
+                    cache_dir, len(keys) - len(stale), len(keys), len(stale), stale)
+    if stale:
+        needed = [f for f, days in file_days.items() if set(water_year(days).tolist()) & set(stale)]
+        parts: dict[int, list[dict]] = {wy: [] for wy in stale}
+        chunk_ids = []
+        for cids, time_index, block in iter_daily_blocks(needed, id_dim, chunk_size, logger):
+            chunk_ids.append(cids)
+            got = summarize_water_years(block["swe"].T, block["scov"].T, block["swe_std"].T,
+                                        time_index, years=set(stale))
+            for wy in stale:
+                parts[wy].append(got[wy])
+        order = np.argsort(np.concatenate(chunk_ids), kind="stable")
+        for wy in stale:
+            whole = concat_summaries(parts[wy])
+            summaries[wy] = {f: v[order] for f, v in whole.items()}
+            save_summary(cache_dir, wy, keys[wy], ids, summaries[wy])
+    return ids, summaries
+
+
+def read_daily_by_hru(
+    nc_dir: Path, id_dim: str, logger: logging.Logger | None = None
+) -> dict[int, pd.DataFrame]:
+    """All HRUs' daily series in one dict (small fabrics / tests; CONUS should stream
+    `iter_daily_chunks` instead)."""
     out: dict[int, pd.DataFrame] = {}
-    for hru_id, grp in df.groupby(id_dim):
-        s = grp.set_index("time")[["swe", "sca", "swe_std"]].sort_index()
-        out[int(hru_id)] = s
-    if logger:
-        logger.info("  built %d per-HRU series in %.0fs total", len(out), time.perf_counter() - t0)
+    for chunk in iter_daily_chunks(nc_dir, id_dim, logger=logger):
+        out.update(chunk)
     return out
 
 
 def cells_from_weights(weight_file: Path, id_col: str) -> dict[int, int]:
     """Per-HRU contributing SNODAS cell count from the gdptools weight table."""
-    w = pd.read_csv(weight_file)
+    w = read_weights(weight_file, id_col, columns=[id_col])
     return w.groupby(id_col).size().astype(int).to_dict()
 
 
@@ -94,6 +214,15 @@ def main() -> None:
     ap.add_argument("--base_config", default="configs/base_config.yml")
     ap.add_argument("--water_csv", default=None,
                      help="Optional CSV with columns <id_feature>,water_frac")
+    ap.add_argument("--chunk_hrus", type=int, default=DEFAULT_CHUNK_HRUS,
+                    help="HRUs per streamed chunk; peak memory scales with this")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Worker processes per chunk (1 = serial); output is identical")
+    ap.add_argument("--layout", choices=["years", "store"], default="years",
+                    help="Read the per-year NCs or the packed HRU-chunked store (hru_store)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Summarize only water years missing from season_cache_dir, then "
+                         "re-run selection over all cached years (output is identical)")
     args = ap.parse_args()
     logger = configure_logging("derive_snarea_curve")
 
@@ -110,9 +239,7 @@ def main() -> None:
     default_curve = np.asarray(cfg.get("default_curve", DEFAULT_SNAREA_CURVE), dtype=float)
     validate_default_curve(default_curve)
 
-    logger.info("Reading aggregated daily SWE/SCA from %s ...", nc_dir)
-    daily = read_daily_by_hru(nc_dir, id_feature, logger=logger)
-    logger.info("Loaded daily series for %d HRUs; reading SNODAS cell counts ...", len(daily))
+    logger.info("Reading SNODAS cell counts ...")
     cells = cells_from_weights(weight_file, id_feature)
     water: dict[int, float] = {}
     if args.water_csv:
@@ -120,8 +247,29 @@ def main() -> None:
         water = dict(zip(wdf[id_feature], wdf["water_frac"]))
         logger.info("Loaded water fraction for %d HRUs from %s", len(water), args.water_csv)
 
-    logger.info("Deriving representative snarea_curve for %d HRUs ...", len(daily))
-    table = build_snarea_curve(daily, cells, water, id_feature, sel, default_curve, logger=logger)
+    if args.workers < 1:
+        raise ValueError(f"--workers must be >= 1, got {args.workers}")
+    if args.incremental and args.layout == "store":
+        raise ValueError("--incremental reads the per-year NCs; it cannot use --layout store")
+    if args.incremental:
+        cache_dir = Path(require_config_key(cfg, "season_cache_dir", "derive_snarea_curve"))
+        logger.info("Deriving representative snarea_curve from %s via the season cache ...", nc_dir)
+        ids, summaries = season_summaries(nc_dir, id_feature, cache_dir, args.chunk_hrus, logger=logger)
+        table = build_from_summaries(ids, summaries, cells, water, id_feature, sel, default_curve,
+                                     log=logger)
+    else:
+        files = None
+        if args.layout == "store":
+            files = [Path(require_config_key(cfg, "hru_store", "derive_snarea_curve"))]
+            nc_dir = files[0]
+        logger.info("Deriving representative snarea_curve from %s, streamed by HRU chunk (%d worker(s)) ...",
+                    nc_dir, args.workers)
+        tables = [
+            build_snarea_curve(daily, cells, water, id_feature, sel, default_curve, logger=logger,
+                               workers=args.workers)
+            for daily in iter_daily_chunks(nc_dir, id_feature, args.chunk_hrus, logger=logger, files=files)
+        ]
+        table = pd.concat(tables, ignore_index=True).sort_values(id_feature, ignore_index=True)
     out = out_dir / cfg["merged_file"]
     table.to_csv(out, index=False)
     logger.info("Wrote %d HRU curves -> %s", len(table), out)
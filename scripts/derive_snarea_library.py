@@ -50,7 +50,11 @@ def main() -> None:
         "Building CV/lognormal library (ndepl_cv=%d, calibrate=%s) for %d HRUs ...",
         ndepl_cv, calibrate, len(derived),
     )
-    library, params, report = build_from_derived(derived, id_feature, ndepl_cv, default_curve, calibrate, bias_tol)
+    matrix_file = cfg.get("library_matrix_file")
+    library, params, report = build_from_derived(
+        derived, id_feature, ndepl_cv, default_curve, calibrate, bias_tol,
+        library_matrix_file=Path(matrix_file) if matrix_file else None,
+    )
 
     write_library_csv(library, out_dir / cfg["library_file"])
     write_params_csv(params, out_dir / cfg["params_file"])
@@ -1,11 +1,16 @@
 """Drive every Part 2 zonal-pass param from configs/zonal/zonal_params.yml.
 
-Three modes:
+Four modes:
   --mode zonal --param <name> --batch_id <N>
         Array task: run the per-batch zonal/soils/lulc/ssflux work for one
         param over one HRU batch. Dispatches on the entry's `script:` tag
         (zonal / soils / lulc / ssflux) into the matching
         gfv2_params.zonal_runners.run_*_batch function.
+        Add --batch_id_end <M> to run batches N..M (inclusive) in one
+        process ("multi-batch worker"): the geo stack is imported once and
+        source rasters stay open across batches in an LRU cache of
+        --raster_cache_size handles. Per-batch CSVs are identical to
+        one-task-per-batch runs, so merge is unchanged.
   --mode merge --param <name>
         Combine per-batch CSVs for one param into the merged CSV.
         Same gfv2_params.zonal_runners.run_merge function that drove the
@@ -13,12 +18,19 @@ Three modes:
   --mode build_weights
         Compute the CONUS-wide P2P weight matrix that ssflux consumes.
         Honours --force.
+  --mode build_cell_weights [--batch_id <N> [--batch_id_end <M>]]
+        Persist per-batch HRU x cell coverage fractions for every distinct
+        raster lattice among the continuous `script: zonal` params
+        (elevation/slope/aspect share one) under `cell_weight_dir`. run_zonal_batch then
+        aggregates from these by sparse mat-vec instead of exactextract.
+        Without --batch_id, every batch_*.gpkg in batch_dir. Honours --force.
 
 The slurm wrapper slurm_batch/submit_zonal_params.sh carries a hardcoded PARAMS
 bash array mirroring configs/zonal/zonal_params.yml's `params:` list (it does NOT
 read the YAML; tests/test_submit_wrapper_param_lists.py guards the pair) and chains
-all three modes into a per-param afterok DAG (with build_weights submitted first for entries that
-carry `depends_on: build_weights`).
+the zonal, merge and build_weights modes into a per-param afterok DAG (with build_weights submitted
+first for entries that carry `depends_on: build_weights`). It does not submit build_cell_weights:
+run that beforehand, or the zonal tasks fall back to exactextract.
 
 Pattern mirrors scripts/derive_depstor_params.py (PR #72).
 """
@@ -27,9 +39,23 @@ import argparse
 import re
 from pathlib import Path
 
+import geopandas as gpd
+import rasterio
+
 from gfv2_params.config import load_config, require_config_key
 from gfv2_params.log import configure_logging
-from gfv2_params.zonal_runners import BATCH_RUNNERS, run_build_weights, run_merge
+from gfv2_params.zonal_runners import (
+    BATCH_RUNNERS,
+    clear_raster_cache,
+    run_build_weights,
+    run_merge,
+    set_raster_cache_size,
+)
+from gfv2_params.zonal_runners.cell_weights import build_cell_weights, lattice_key, weights_match_ids, weights_path
+
+# Open rasters kept across batches in multi-batch mode. The LULC runners touch
+# up to four per batch (lulc, canopy, keep, radtrn); lulc_prederived up to six.
+DEFAULT_RASTER_CACHE_SIZE = 8
 
 
 def _resolve_nested(value, replacements: dict):
@@ -122,7 +148,13 @@ def _build_param_cfg(config: dict, entry: dict) -> dict:
 
 
 def run_zonal(args, logger) -> None:
-    """Dispatch one batch to the right run_*_batch function based on `script:` tag."""
+    """Dispatch one batch (or a batch range) to the run_*_batch function for its `script:` tag.
+
+    With ``args.batch_id_end`` set, batches ``batch_id..batch_id_end`` run in
+    this process with the raster cache on. A failing batch is logged and the
+    rest still run; the task then fails listing every failed batch, so the
+    afterok merge is held back exactly as if those array tasks had failed.
+    """
     config = _load_resolved_config(args)
     entry = _find_param(config, args.param)
     script_tag = entry.get("script")
@@ -132,9 +164,34 @@ def run_zonal(args, logger) -> None:
             f"Available: {sorted(BATCH_RUNNERS)}"
         )
     param_cfg = _build_param_cfg(config, entry)
-    logger.info("=== zonal: param=%s script=%s batch=%d ===",
-                args.param, script_tag, args.batch_id)
-    BATCH_RUNNERS[script_tag](param_cfg, args.batch_id, logger)
+    runner = BATCH_RUNNERS[script_tag]
+
+    if args.batch_id_end is None:
+        logger.info("=== zonal: param=%s script=%s batch=%d ===",
+                    args.param, script_tag, args.batch_id)
+        runner(param_cfg, args.batch_id, logger)
+        return
+
+    batch_ids = range(args.batch_id, args.batch_id_end + 1)
+    logger.info("=== zonal: param=%s script=%s batches=%d-%d (%d, raster cache %d) ===",
+                args.param, script_tag, args.batch_id, args.batch_id_end,
+                len(batch_ids), args.raster_cache_size)
+    set_raster_cache_size(args.raster_cache_size)
+    failed = []
+    try:
+        for batch_id in batch_ids:
+            logger.info("--- batch %d ---", batch_id)
+            try:
+                runner(param_cfg, batch_id, logger)
+            except Exception:
+                logger.exception("batch %d failed", batch_id)
+                failed.append(batch_id)
+    finally:
+        clear_raster_cache()
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)}/{len(batch_ids)} batches failed for param '{args.param}': {failed}"
+        )
 
 
 def run_merge_mode(args, logger) -> None:
@@ -176,21 +233,94 @@ def run_build_weights_mode(args, logger) -> None:
     run_build_weights(param_cfg, logger, force=args.force)
 
 
+def run_build_cell_weights_mode(args, logger) -> None:
+    """Build per-batch coverage-fraction weights for each continuous `script: zonal` lattice."""
+    config = _load_resolved_config(args)
+    entries = [s for s in config["params"] if s.get("script") == "zonal"]
+    # run_zonal_batch never reads weights for categorical entries.
+    param_cfgs = [cfg for cfg in (_build_param_cfg(config, e) for e in entries) if not cfg.get("categorical", False)]
+    if not param_cfgs:
+        raise ValueError("No continuous `script: zonal` param entries; nothing to do for --mode build_cell_weights.")
+    cell_weight_dir = param_cfgs[0].get("cell_weight_dir")
+    if not cell_weight_dir:
+        raise ValueError("--mode build_cell_weights needs `cell_weight_dir` in the config defaults.")
+
+    # One representative raster per lattice: params on the same grid share weights.
+    lattices = {}
+    for cfg in param_cfgs:
+        with rasterio.open(cfg["source_raster"]) as ds:
+            key = lattice_key(ds)
+        lattices.setdefault(key, cfg)
+        logger.info("param %s -> lattice %s", cfg["source_type"], key)
+
+    batch_dir = Path(param_cfgs[0]["batch_dir"])
+    if args.batch_id is None:
+        batch_ids = sorted(int(p.stem.split("_")[1]) for p in batch_dir.glob("batch_*.gpkg"))
+    else:
+        end = args.batch_id if args.batch_id_end is None else args.batch_id_end
+        batch_ids = list(range(args.batch_id, end + 1))
+    logger.info("=== build_cell_weights: %d lattice(s) x %d batch(es) -> %s ===",
+                len(lattices), len(batch_ids), cell_weight_dir)
+
+    for batch_id in batch_ids:
+        batch_gpkg = batch_dir / f"batch_{batch_id:04d}.gpkg"
+        if not batch_gpkg.exists():
+            raise FileNotFoundError(f"Batch GPKG not found: {batch_gpkg}")
+        hru_ids = None
+        todo = {}
+        for k, c in lattices.items():
+            wfile = weights_path(cell_weight_dir, k, batch_id)
+            if args.force or not wfile.exists():
+                todo[k] = c
+                continue
+            if hru_ids is None:
+                hru_ids = gpd.read_file(batch_gpkg, layer=c["target_layer"], columns=[c["id_feature"]],
+                                           ignore_geometry=True)[c["id_feature"]]
+            if not weights_match_ids(wfile, hru_ids):
+                logger.warning("batch %d lattice %s: %s holds a different HRU batch — rebuilding",
+                               batch_id, k, wfile)
+                todo[k] = c
+        if not todo:
+            logger.info("batch %d: weights exist for every lattice — skipping (pass --force)", batch_id)
+            continue
+        nhru_gdf = None
+        for key, cfg in todo.items():
+            if nhru_gdf is None:
+                nhru_gdf = gpd.read_file(batch_gpkg, layer=cfg["target_layer"])
+            out = weights_path(cell_weight_dir, key, batch_id)
+            n_pairs = build_cell_weights(cfg["source_raster"], nhru_gdf, cfg["id_feature"], out)
+            logger.info("batch %d lattice %s: %d HRUs, %d cell weights -> %s",
+                        batch_id, key, len(nhru_gdf), n_pairs, out)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Drive zonal-pass parameter derivation.")
     parser.add_argument("--config", required=True, help="Path to configs/zonal/zonal_params.yml")
     parser.add_argument("--base_config", default=None, help="Path to configs/base_config.yml")
     parser.add_argument("--fabric", default=None, help="Fabric name (overrides FABRIC env / default_fabric)")
-    parser.add_argument("--mode", required=True, choices=["zonal", "merge", "build_weights"])
+    parser.add_argument("--mode", required=True, choices=["zonal", "merge", "build_weights", "build_cell_weights"])
     parser.add_argument("--param", default=None, help="Param name (required for zonal/merge)")
-    parser.add_argument("--batch_id", type=int, default=None, help="Batch ID (zonal mode only)")
-    parser.add_argument("--force", action="store_true", help="build_weights only: overwrite existing weight file")
+    parser.add_argument("--batch_id", type=int, default=None,
+                        help="Batch ID (zonal; optional first batch for build_cell_weights)")
+    parser.add_argument("--batch_id_end", type=int, default=None,
+                        help="zonal/build_cell_weights: last batch ID (inclusive) of a range from --batch_id")
+    parser.add_argument("--raster_cache_size", type=int, default=DEFAULT_RASTER_CACHE_SIZE,
+                        help="zonal multi-batch only: open source rasters kept across batches")
+    parser.add_argument("--force", action="store_true",
+                        help="build_weights / build_cell_weights: overwrite existing weight files")
     args = parser.parse_args()
 
     if args.mode in {"zonal", "merge"} and not args.param:
         parser.error(f"--param is required for --mode {args.mode}")
     if args.mode == "zonal" and args.batch_id is None:
         parser.error("--batch_id is required for --mode zonal")
+    if args.batch_id_end is not None:
+        if args.mode not in {"zonal", "build_cell_weights"} or args.batch_id is None:
+            parser.error("--batch_id_end needs --batch_id and --mode zonal or build_cell_weights")
+        if args.batch_id_end < args.batch_id:
+            parser.error("--batch_id_end must be >= --batch_id")
+    if args.raster_cache_size < 0:
+        parser.error("--raster_cache_size must be >= 0")
 
     logger = configure_logging(f"derive_zonal_params:{args.mode}")
     if args.mode == "zonal":
@@ -199,6 +329,8 @@ def main():
         run_merge_mode(args, logger)
     elif args.mode == "build_weights":
         run_build_weights_mode(args, logger)
+    elif args.mode == "build_cell_weights":
+        run_build_cell_weights_mode(args, logger)
     else:
         # argparse already constrained choices; defensive
         parser.error(f"Unknown mode: {args.mode}")
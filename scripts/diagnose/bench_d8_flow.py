@@ -0,0 +1,153 @@
+"""Benchmark in-process D8 pointer + flow accumulation against the WBT path.
+
+Times the two `compute_dem_derivatives` FDR/FAC engines on a synthetic
+VPU-sized filled DEM (default 20,000 x 20,000 = 4e8 cells; VPU 01 is ~1e9,
+VPU 10 ~3.6e9) and diffs their outputs:
+
+  wbt   : WhiteboxTools D8Pointer --esri_pntr -> D8FlowAccumulation
+          --out_type=cells, each a subprocess reading/writing GeoTIFF
+          (the `d8_engine: wbt` path, `_wbt_fdr_fac`).
+  numba : read the DEM once, `d8_flow.d8_pointer` + `d8_flow_accumulation`
+          in memory, write FDR/FAC (`_write_fdr_fac`) — the `d8_engine: numba`
+          path minus the TWI it fuses in.
+
+Both are timed end to end, GeoTIFF I/O included, since removing the
+intermediate round trip is the point. The diff reports pointer disagreements
+over cells both engines consider valid, and the FAC difference (WBT - numba)
+over those cells: all-zero means the same exclusive-of-self convention, a
+constant 1 would mean WBT counts the cell itself.
+
+The synthetic DEM is a south-east tilted plane with uniform noise (no fill
+is run, so noise-born pits stay as code-0 termini in both engines). If the WBT
+binary cannot be found (or `--skip-wbt`) only the numba engine is timed.
+
+    pixi run --as-is python scripts/diagnose/bench_d8_flow.py --out-dir /caldera/.../bench_d8
+    pixi run --as-is python scripts/diagnose/bench_d8_flow.py --out-dir /tmp/bench --size 4000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import numba
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from gfv2_params.d8_flow import FDR_NODATA, d8_flow_accumulation, d8_pointer
+from gfv2_params.shared_rasters.compute_dem_derivatives import (
+    DEM_NODATA,
+    _wbt_fdr_fac,
+    _write_fdr_fac,
+)
+
+STRIP_ROWS = 1024
+CELL = 30.0
+
+
+def write_synthetic_dem(path: Path, size: int, seed: int) -> None:
+    """float64 tilted-plane + noise DEM, LZW without predictor (WBT-safe)."""
+    rng = np.random.default_rng(seed)
+    profile = {
+        "driver": "GTiff", "dtype": "float64", "nodata": DEM_NODATA,
+        "width": size, "height": size, "count": 1, "crs": "EPSG:5070",
+        "transform": from_origin(0.0, size * CELL, CELL, CELL),
+        "compress": "lzw", "tiled": True, "blockxsize": 512, "blockysize": 512,
+        "BIGTIFF": "YES",
+    }
+    cols = np.arange(size, dtype=np.float64)
+    with rasterio.open(path, "w", **profile) as dst:
+        for r0 in range(0, size, STRIP_ROWS):
+            r1 = min(r0 + STRIP_ROWS, size)
+            rows = np.arange(r0, r1, dtype=np.float64)[:, None]
+            strip = 0.5 * (size - rows) + 0.2 * (size - cols) + rng.random((r1 - r0, size)) * 2.0
+            dst.write(strip, 1, window=rasterio.windows.Window(0, r0, size, r1 - r0))
+
+
+def run_numba(dem_path: Path, fdr_out: Path, fac_out: Path, logger) -> dict[str, float]:
+    t = {}
+    t0 = time.perf_counter()
+    with rasterio.open(dem_path) as src:
+        dem = src.read(1)
+        profile = src.profile
+        cell_x, cell_y = abs(src.transform.a), abs(src.transform.e)
+    t["read"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fdr = d8_pointer(dem, DEM_NODATA, cell_x, cell_y)
+    t["pointer"] = time.perf_counter() - t0
+    del dem
+    t0 = time.perf_counter()
+    fac = d8_flow_accumulation(fdr)
+    t["accumulation"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    _write_fdr_fac(fdr, fac, profile, fdr_out, fac_out, logger)
+    t["write"] = time.perf_counter() - t0
+    return t
+
+
+def compare(wbt_fdr: Path, wbt_fac: Path, fdr_out: Path, fac_out: Path) -> None:
+    with rasterio.open(wbt_fdr) as a, rasterio.open(fdr_out) as b:
+        fw, fw_nd = a.read(1), a.nodata
+        fn = b.read(1)
+    valid = fn != FDR_NODATA
+    if fw_nd is not None:
+        valid &= fw != fw_nd
+    n_ptr = int((fw[valid].astype(np.int64) != fn[valid]).sum())
+    print(f"  FDR : {n_ptr:,} pointer disagreements over {int(valid.sum()):,} valid cells")
+    with rasterio.open(wbt_fac) as a, rasterio.open(fac_out) as b:
+        dw = a.read(1).astype(np.float64)[valid] - b.read(1).astype(np.float64)[valid]
+    vals, counts = np.unique(dw, return_counts=True)
+    top = ", ".join(f"{v:g}: {c:,}" for v, c in sorted(zip(vals, counts), key=lambda x: -x[1])[:5])
+    print(f"  FAC : wbt - numba over valid cells -> {top}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out-dir", required=True, type=Path, help="scratch dir for the DEM and outputs")
+    ap.add_argument("--size", type=int, default=20_000, help="grid side in cells (default 20000)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--skip-wbt", action="store_true")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger = logging.getLogger("bench_d8_flow")
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    dem_path = args.out_dir / "dem_synthetic.tif"
+    n_cells = args.size * args.size
+
+    print(f"grid {args.size} x {args.size} = {n_cells:,} cells, numba threads = {numba.get_num_threads()}")
+    if not dem_path.exists():
+        write_synthetic_dem(dem_path, args.size, args.seed)
+
+    # Compile outside the timed region.
+    warm = np.random.default_rng(0).random((64, 64))
+    d8_flow_accumulation(d8_pointer(warm, DEM_NODATA, CELL, CELL))
+
+    fdr_out, fac_out = args.out_dir / "fdr_numba.tif", args.out_dir / "fac_numba.tif"
+    t = run_numba(dem_path, fdr_out, fac_out, logger)
+    total = sum(t.values())
+    print(f"  numba {total:8.1f} s  {n_cells / total:14,.0f} cells/s  ("
+          + ", ".join(f"{k} {v:.1f}s" for k, v in t.items()) + ")")
+
+    if args.skip_wbt:
+        return 0
+    try:
+        from gfv2_params.wbt import find_whitebox_tools_binary
+        runner = find_whitebox_tools_binary()
+    except Exception as exc:  # noqa: BLE001 — any failure means "no WBT here"
+        print(f"  wbt   skipped: {exc}")
+        return 0
+    wbt_fdr, wbt_fac = args.out_dir / "fdr_wbt.tif", args.out_dir / "fac_wbt.tif"
+    t0 = time.perf_counter()
+    _wbt_fdr_fac("bench", dem_path, wbt_fdr, wbt_fac, runner, True, logger)
+    dt = time.perf_counter() - t0
+    print(f"  wbt   {dt:8.1f} s  {n_cells / dt:14,.0f} cells/s  (D8Pointer + D8FlowAccumulation)")
+    compare(wbt_fdr, wbt_fac, fdr_out, fac_out)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""Benchmark Stage 2 read throughput: per-year NetCDFs vs the packed HRU store.
+
+Writes synthetic Stage 1 output (one contiguous ``(time, hru)`` NetCDF per year
+of float32 `swe`/`scov`/`swe_std`, as gdptools writes it), packs it with
+`aggregate.store.pack_hru_store`, then reads both layouts the way Stage 2's
+`iter_daily_blocks` does — the full record of one block of HRUs at a time,
+through `xr.open_dataset(...).isel(...)` — and reports uncompressed MB/s:
+
+  years : one strided slice per variable per year file (the default
+          ``--layout years``).
+  store : one slice per variable out of the HRU-chunked, zlib-compressed
+          store (``--layout store``).
+
+Run it on the filesystem Stage 2 reads from (caldera/Lustre, not /tmp) and
+drop the page cache between layouts if you can; the second pass over a file
+set otherwise measures RAM.
+
+    pixi run --as-is python scripts/diagnose/bench_hru_store.py --out-dir /caldera/.../bench_store
+    pixi run --as-is python scripts/diagnose/bench_hru_store.py --out-dir /tmp/bench --hrus 20000 --years 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from gfv2_params.aggregate.store import pack_hru_store, store_path
+
+VARS = ("swe", "scov", "swe_std")
+ID_DIM = "nat_hru_id"
+
+
+def write_synthetic_years(out_dir: Path, n_hru: int, years: list[int], seed: int) -> list[Path]:
+    """One float32 ``(time, nat_hru_id)`` NetCDF per calendar year."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_hru + 1)
+    files = []
+    for year in years:
+        path = out_dir / f"snodas_agg_{year}.nc"
+        files.append(path)
+        if path.exists():
+            continue
+        idx = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+        doy = np.asarray(idx.dayofyear, dtype="float32")[:, None]
+        swe = np.clip(60 * np.cos((doy - 45) / 365 * 2 * np.pi)
+                      + rng.normal(0, 8, (idx.size, n_hru)).astype("float32"), 0, None).astype("float32")
+        xr.Dataset(
+            {"swe": (("time", ID_DIM), swe),
+             "scov": (("time", ID_DIM), np.clip(swe / 40, 0, 1).astype("float32")),
+             "swe_std": (("time", ID_DIM), (swe * 0.4).astype("float32"))},
+            coords={"time": idx, ID_DIM: ids},
+        ).to_netcdf(path)
+    return files
+
+
+def read_blocks(files: list[Path], chunk_hrus: int) -> tuple[float, int]:
+    """Read every HRU block of `files` as Stage 2 does -> (seconds, bytes)."""
+    t0 = time.perf_counter()
+    n_bytes = 0
+    datasets = [xr.open_dataset(f) for f in files]
+    try:
+        n_hru = datasets[0].sizes[ID_DIM]
+        for start in range(0, n_hru, chunk_hrus):
+            sl = slice(start, min(start + chunk_hrus, n_hru))
+            for v in VARS:
+                block = np.concatenate([
+                    ds[v].isel({ID_DIM: sl}).transpose("time", ID_DIM).values for ds in datasets
+                ])
+                n_bytes += block.nbytes
+    finally:
+        for ds in datasets:
+            ds.close()
+    return time.perf_counter() - t0, n_bytes
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out-dir", required=True, type=Path, help="scratch dir for the synthetic NCs")
+    ap.add_argument("--hrus", type=int, default=100_000, help="HRUs per file (default 100000)")
+    ap.add_argument("--years", type=int, default=10, help="calendar years to write (default 10)")
+    ap.add_argument("--chunk-hrus", type=int, default=5000,
+                    help="HRUs per Stage 2 read block (derive_snarea_curve --chunk_hrus)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    years = list(range(2004, 2004 + args.years))
+    files = write_synthetic_years(args.out_dir, args.hrus, years, args.seed)
+    store = store_path(args.out_dir, "snodas")
+
+    t0 = time.perf_counter()
+    pack_hru_store(files, store, ID_DIM)
+    t_pack = time.perf_counter() - t0
+    size_years = sum(f.stat().st_size for f in files)
+    print(f"{args.hrus:,} HRUs x {args.years} years, blocks of {args.chunk_hrus:,} HRUs")
+    print(f"  pack  {t_pack:8.1f} s  years {size_years / 1e6:,.0f} MB -> store "
+          f"{store.stat().st_size / 1e6:,.0f} MB")
+
+    for name, layout in (("years", files), ("store", [store])):
+        dt, n_bytes = read_blocks(layout, args.chunk_hrus)
+        print(f"  {name} {dt:8.1f} s  {n_bytes / 1e6 / dt:10,.1f} MB/s  ({n_bytes / 1e6:,.0f} MB decoded)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
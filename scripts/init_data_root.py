@@ -111,7 +111,7 @@ _TREE = [
                               radtrn_<source>.tif, cnpy_resampled_<source>.tif)
           conus/borders/      Copernicus border-DEM fill (Canada/Mexico)
           conus/weights/      Polygon-to-polygon weight tables built by
-                              build_weights.py (lith_weights_<fabric>.csv)
+                              build_weights.py (lith_weights_<fabric>.parquet)
         """,
     ),
     ("shared/source", None),
@@ -17,7 +17,8 @@ calls Task 4's `compute.run_batch` for this task's batch only, writing one
 per-batch parquet directly into `{output_dir}/dprst_depth_batches/`
 (`depstor_builders/dprst_depth.py::_compute_depths` glob-loads every
 `*.parquet` there on the next `build_depstor_rasters.py --step dprst_depth`
-run).
+run). Per-tile read/compute seconds go to `_timings/batch_NNNN.parquet`
+alongside, for the next plan's cost model (`tiling.fit_cost_model`).
 
 Usage (normally invoked once per SLURM array task by
 slurm_batch/run_dprst_depth_batch.batch, which exports FABRIC/BASE_CONFIG
@@ -52,6 +53,7 @@ import geopandas as gpd  # noqa: E402
 
 from gfv2_params.config import load_config  # noqa: E402
 from gfv2_params.dprst_depth.compute import run_batch  # noqa: E402
+from gfv2_params.dprst_depth.tile_cache import tile_cache_from_config  # noqa: E402
 from gfv2_params.log import configure_logging  # noqa: E402
 
 print(f"[startup] base imports complete in {time.time() - _t_imports:.1f}s", flush=True)
@@ -116,7 +118,16 @@ def main():
         "=== run_dprst_depth_batch: batch %d/%d (%d tile keys, %d dprst polygons total) ===",
         batch_id, len(all_batches), len(tile_keys), len(dprst_gdf),
     )
-    run_batch(dprst_gdf, tile_keys, wesm_gdf, out_parquet, logger)
+    tile_cache = tile_cache_from_config(config)
+    if tile_cache is not None:
+        logger.info("DEM tiles via cache=%s mirror=%s remote=%s",
+                    tile_cache.cache_dir, tile_cache.mirror_dir, tile_cache.remote)
+    run_batch(
+        dprst_gdf, tile_keys, wesm_gdf, out_parquet, logger, tile_cache=tile_cache,
+        prefetch_tiles=int(config.get("dprst_prefetch_tiles", 0)),
+        prefetch_mb=float(config.get("dprst_prefetch_mb", 2048)),
+        timings_parquet=batches_dir / "_timings" / f"batch_{batch_id:04d}.parquet",
+    )
 
 
 if __name__ == "__main__":
@@ -51,7 +51,11 @@
 #
 # It prints the per-batch cost-load balance (estimated DEM-window-read cost,
 # not raw polygon count) and the same core-hour -> wall-clock projection as
-# above, flagging if the projection exceeds 5 hr.
+# above, flagging if the projection exceeds 5 hr. Once a previous run has
+# left per-tile timings in dprst_depth_batches/_timings/, the plan also fits
+# a cost model to them, packs batches by predicted seconds, and prints the
+# batch count that meets --target-hours (default 5) -- use that as
+# N_TILE_BATCHES next time.
 # -----------------------------------------------------------------------------
 
 set -euo pipefail
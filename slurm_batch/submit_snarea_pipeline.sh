@@ -8,8 +8,8 @@
 #   1. Stage 1 aggregate  (derive_snodas_aggregate.batch, ARRAY over spatial
 #      batches sized from the fabric manifest: oregon N=2, gfv2 N=64)
 #   2. merge              (merge_snodas_aggregate.batch, --mode merge)
-#   3. Stage 2 derive     (derive_snarea_curve.batch; --mem parameterized —
-#      384G CONUS default, smaller for oregon)
+#   3. Stage 2 derive     (derive_snarea_curve.batch; streamed by HRU chunk,
+#      32G for every fabric)
 #   4. Stage 3 library    (derive_snarea_library.batch, CV/lognormal library)
 #
 # Because every job is afterok on the prior one, a failed Stage-1 array task
@@ -28,7 +28,7 @@
 # wipe {data_root}/{fabric}/snodas/_batches/ first if you want to be extra safe.
 #
 # Env overrides:
-#   STAGE2_MEM   Stage 2 --mem   (default: 64G for oregon, 384G otherwise)
+#   STAGE2_MEM   Stage 2 --mem   (default: 32G)
 #   STAGE2_TIME  Stage 2 --time  (default: 02:00:00 for oregon, batch default otherwise)
 #   MAX_CONCURRENT  Stage-1 array %K throttle (default: 8; 0/off disables) —
 #                   guards the pixi/GDAL/PROJ import storm on the shared FS.
@@ -88,13 +88,12 @@ case "$MAX_CONCURRENT" in
         ;;
 esac
 
-# Stage-2 memory/time: sized for CONUS by default, overridable down for small
-# fabrics. Oregon (~17k HRUs) fits in far less than the 384G CONUS default.
+# Stage-2 memory/time: Stage 2 streams HRU chunks, so memory no longer scales
+# with the fabric (32G covers CONUS); only the wall time does.
+STAGE2_MEM="${STAGE2_MEM:-32G}"
 if [ "$FABRIC" = "oregon" ]; then
-    STAGE2_MEM="${STAGE2_MEM:-64G}"
     STAGE2_TIME="${STAGE2_TIME:-02:00:00}"
 else
-    STAGE2_MEM="${STAGE2_MEM:-384G}"
     STAGE2_TIME="${STAGE2_TIME:-}"   # empty => use the batch's #SBATCH --time
 fi
 STAGE2_TIME_ARG=()
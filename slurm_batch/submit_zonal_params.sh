@@ -16,6 +16,10 @@
 # The 10 params are listed in configs/zonal/zonal_params.yml — if you add or remove
 # entries there, also update PARAMS below.
 #
+# Export BATCHES_PER_TASK=K (default 1) to run K consecutive batches per array
+# task (multi-batch worker: one geo-stack import and one set of open source
+# rasters per K batches). The array shrinks to ceil(n_batches / K) tasks.
+#
 # This is the "run wholesale" path. To run the same work one parameter at a
 # time (submit + inspect each in turn), see slurm_batch/RUNME.md Stage 4A —
 # this wrapper just loops those per-parameter array + merge steps.
@@ -48,7 +52,13 @@ if [ -z "$N_BATCHES" ] || [ "$N_BATCHES" -le 0 ] 2>/dev/null; then
     echo "Error: could not parse n_batches from $MANIFEST (got: '$N_BATCHES')"
     exit 1
 fi
-LAST_IDX=$((N_BATCHES - 1))
+BATCHES_PER_TASK="${BATCHES_PER_TASK:-1}"
+if ! [ "$BATCHES_PER_TASK" -ge 1 ] 2>/dev/null; then
+    echo "Error: BATCHES_PER_TASK must be a positive integer (got: '$BATCHES_PER_TASK')"
+    exit 1
+fi
+N_TASKS=$(( (N_BATCHES + BATCHES_PER_TASK - 1) / BATCHES_PER_TASK ))
+LAST_IDX=$((N_TASKS - 1))
 
 case "$MAX_CONCURRENT" in
     0|off|OFF|none|NONE|"")
@@ -102,7 +112,7 @@ declare -A NEEDS_MERGE_OF=(
     [ssflux]=slope
 )
 
-echo "Submitting ${#PARAMS[@]} Part 2 params x $N_BATCHES batches each ($THROTTLE_NOTE), FABRIC=$FABRIC"
+echo "Submitting ${#PARAMS[@]} Part 2 params x $N_BATCHES batches each ($N_TASKS tasks of $BATCHES_PER_TASK; $THROTTLE_NOTE), FABRIC=$FABRIC"
 
 WEIGHTS_JOB_ID=""
 
@@ -154,7 +164,7 @@ for PARAM in "${PARAMS[@]}"; do
     # dependency. The word-splitting is the mechanism, not an oversight.
     ARRAY_JOB_ID=$(sbatch --array="$ARRAY_SPEC" \
                          $DEP_ARG \
-                         --export=ALL,BASE_CONFIG="$BASE_CONFIG",FABRIC="$FABRIC",PARAM="$PARAM" \
+                         --export=ALL,BASE_CONFIG="$BASE_CONFIG",FABRIC="$FABRIC",PARAM="$PARAM",BATCHES_PER_TASK="$BATCHES_PER_TASK",N_BATCHES="$N_BATCHES" \
                          slurm_batch/derive_zonal_params.batch | awk '{print $NF}')
     echo "  zonal  array: $ARRAY_JOB_ID${DEP_ARG:+ ($DEP_ARG)}"
 
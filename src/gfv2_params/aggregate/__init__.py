@@ -8,6 +8,6 @@ can be area-weighted to an HRU fabric via a declarative SourceAdapter.
 from __future__ import annotations
 
 from .adapter import SourceAdapter
-from .driver import aggregate_source
+from .driver import SourceRun, aggregate_source, aggregate_sources
 
-__all__ = ["SourceAdapter", "aggregate_source"]
+__all__ = ["SourceAdapter", "SourceRun", "aggregate_source", "aggregate_sources"]
@@ -19,6 +19,8 @@ _ALLOWED_STAT_METHODS = {
     "count", "masked_count",
 }
 
+_AGG_BACKENDS = ("gdptools", "sparse")
+
 
 @dataclass(frozen=True)
 class SourceAdapter:
@@ -33,6 +35,9 @@ class SourceAdapter:
     pre_aggregate_hook: Callable[[xr.Dataset], xr.Dataset] | None = field(default=None)
     grid_variable: str | None = None
     std_variables: tuple[str, ...] = field(default=())
+    # "gdptools" (AggGen) or "sparse" (aggregate/sparse_engine.py: one CSR
+    # weight matrix, mean + std fused; mean/masked_mean only).
+    agg_backend: str = "gdptools"
 
     def __post_init__(self) -> None:
         object.__setattr__(self, "variables", tuple(self.variables))
@@ -49,6 +54,14 @@ class SourceAdapter:
             raise ValueError(
                 f"grid_variable {self.grid_variable!r} must be one of {self.variables}"
             )
+        if self.agg_backend not in _AGG_BACKENDS:
+            raise ValueError(
+                f"SourceAdapter.agg_backend={self.agg_backend!r}; expected one of {_AGG_BACKENDS}"
+            )
+        if self.agg_backend == "sparse" and self.stat_method not in ("mean", "masked_mean"):
+            raise ValueError(
+                f"agg_backend='sparse' supports stat_method mean|masked_mean, got {self.stat_method!r}"
+            )
         object.__setattr__(self, "std_variables", tuple(self.std_variables))
         missing = [v for v in self.std_variables if v not in self.variables]
         if missing:
@@ -4,25 +4,55 @@ Ports the aggregation core of nhf-spatial-targets' aggregate/_driver.py, trimmed
 to gfv2-params (no manifest/lineage/release). Weights depend only on grid∩fabric
 geometry, so they are computed once (from the first year's grid) and reused for
 every year; all adapter variables are aggregated in a single AggGen call.
+
+With the weights in hand the years are independent, so ``aggregate_source``
+can fan them out to a process pool (``workers > 1``): each worker receives the
+weights once at start-up and writes its own ``{prefix}_agg_{year}.nc``.
+
+``aggregate_sources`` runs several adapters on the same grid (SNODAS plus
+daily climate products, say) against ONE fabric preparation and ONE weight
+matrix, aggregating each year's variables of all of them in a single pass.
+
+Every output is stamped with fingerprints of the year file and the weight file
+it was built from, so ``incremental=True`` re-aggregates only the years whose
+input (or the weights) changed since — an annual SNODAS refresh touches the
+new year (and a re-delivered one), not the whole record.
 """
 
 from __future__ import annotations
 
 import logging
+import math
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyproj
 import xarray as xr
 from gdptools import AggGen, UserCatData, WeightGen
 
+from ..weight_store import read_weights, weights_exist, write_weights
 from .adapter import SourceAdapter
+from .sparse_engine import aggregate_sparse
 
 logger = logging.getLogger(__name__)
 
 WEIGHT_GEN_CRS = 5070  # NAD83 / CONUS Albers (equal-area)
 
+# Peak bytes of one year in flight, per (time x y x x) float64 value of each
+# aggregated variable: the in-memory subset, the hook's derived copies and
+# gdptools' per-pass working arrays.
+_YEAR_MEMORY_FACTOR = 3.0
+
+# Global attrs naming the inputs an output year was built from (see `is_up_to_date`).
+SOURCE_FINGERPRINT_ATTR = "source_fingerprint"
+WEIGHTS_FINGERPRINT_ATTR = "weights_fingerprint"
+
 
 def _period_bounds(ds: xr.Dataset, time_coord: str) -> tuple[str, str]:
     t = pd.to_datetime(ds[time_coord].values)
@@ -37,10 +67,14 @@ def compute_or_load_weights(
     period: tuple[str, str],
     weight_file: Path,
 ) -> pd.DataFrame:
-    """Return grid→polygon weights, computing and caching them if absent."""
-    if weight_file.exists():
+    """Return grid→polygon weights, computing and caching them if absent.
+
+    The cache is id-sorted parquet (see ``gfv2_params.weight_store``); a
+    ``.csv`` `weight_file` is still read and written as CSV.
+    """
+    if weights_exist(weight_file, id_col):
         logger.info("Loading cached weights: %s", weight_file)
-        return pd.read_csv(weight_file)
+        return read_weights(weight_file, id_col)
 
     user_data = UserCatData(
         source_ds=sample_ds,
@@ -64,8 +98,7 @@ def compute_or_load_weights(
         raise RuntimeError(
             "WeightGen returned no weights — check grid/fabric spatial overlap."
         )
-    weight_file.parent.mkdir(parents=True, exist_ok=True)
-    weights.to_csv(weight_file, index=False)
+    write_weights(weights, weight_file, id_col)
     logger.info("Weights computed: %d rows -> %s", len(weights), weight_file)
     return weights
 
@@ -92,7 +125,12 @@ def aggregate_variables(
     An OPTIONAL second ``masked_std`` AggGen pass runs when
     ``adapter.std_variables`` is non-empty, emitting ``{var}_std`` for each
     named variable and reusing the same cached weights.
+
+    Adapters with ``agg_backend="sparse"`` go to `sparse_engine.aggregate_sparse`
+    instead (same output, mean and std fused into one pass).
     """
+    if adapter.agg_backend == "sparse":
+        return aggregate_sparse(adapter, source_ds, fabric_gdf, id_col, weights, period)
     logger.info("    aggregating %s (%s)...", list(adapter.variables), adapter.stat_method)
     user_data = UserCatData(
         source_ds=source_ds,
@@ -161,6 +199,36 @@ def _year_of(path: Path) -> int:
     return int(m.group(1))
 
 
+def file_fingerprint(path: Path) -> str:
+    """``name|size|mtime_ns`` of `path` — changes whenever the file is rewritten.
+
+    Cheap by design: hashing a multi-GB year file would cost as much as
+    re-aggregating it.
+    """
+    st = Path(path).stat()
+    return f"{Path(path).name}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def _write_year(hru_ds: xr.Dataset, out: Path, source: Path, weights_fp: str) -> Path:
+    hru_ds.attrs[SOURCE_FINGERPRINT_ATTR] = file_fingerprint(source)
+    hru_ds.attrs[WEIGHTS_FINGERPRINT_ATTR] = weights_fp
+    hru_ds.to_netcdf(out)
+    return out
+
+
+def is_up_to_date(out: Path, source: Path, weight_file: Path) -> bool:
+    """True if `out` exists and was built from the current `source` and `weight_file`."""
+    if not out.exists() or not Path(weight_file).exists():
+        return False
+    try:
+        with xr.open_dataset(out) as ds:
+            attrs = dict(ds.attrs)
+    except (OSError, ValueError):
+        return False   # unreadable (e.g. truncated by a killed job): rebuild it
+    return (attrs.get(SOURCE_FINGERPRINT_ATTR) == file_fingerprint(source)
+            and attrs.get(WEIGHTS_FINGERPRINT_ATTR) == file_fingerprint(weight_file))
+
+
 def subset_to_gdf_bounds(
     ds: xr.Dataset,
     gdf: gpd.GeoDataFrame,
@@ -168,6 +236,7 @@ def subset_to_gdf_bounds(
     x_coord: str,
     y_coord: str,
     margin_m: float = 2000.0,
+    bounds: tuple[float, float, float, float] | None = None,
 ) -> xr.Dataset:
     """Clip the source grid to the target polygons' bounding box (+ margin).
 
@@ -185,8 +254,11 @@ def subset_to_gdf_bounds(
     way gdptools sees an already-small source, so its ``.load()`` does no
     repeated chunk reads/decompression — measurably faster than handing gdptools
     a lazy full-grid source and letting it subset per variable.
+
+    `bounds` (the polygons' total bounds already in `source_crs`, see
+    `PreparedFabric.bounds`) skips the per-call reprojection.
     """
-    minx, miny, maxx, maxy = gdf.to_crs(source_crs).total_bounds
+    minx, miny, maxx, maxy = bounds if bounds is not None else gdf.to_crs(source_crs).total_bounds
     x = ds[x_coord]
     y = ds[y_coord]
     xsel = x[(x >= minx - margin_m) & (x <= maxx + margin_m)]
@@ -199,6 +271,63 @@ def subset_to_gdf_bounds(
     return ds.sel({x_coord: xsel, y_coord: ysel})
 
 
+def _open_year(adapter: SourceAdapter, fabric_gdf: gpd.GeoDataFrame, path: Path,
+               bounds: tuple[float, float, float, float] | None = None) -> xr.Dataset:
+    """Open one year file clipped to the fabric extent, with the adapter hook applied.
+
+    The clip happens BEFORE the hook (lazy .sel index on a plain open_dataset),
+    so only the target extent is ever materialized as in-memory numpy — neither
+    the hook (if any) nor gdptools touches the full source grid, and gdptools'
+    per-variable .load() reuses in-memory data instead of re-reading chunks.
+    """
+    ds = xr.open_dataset(path)
+    ds = subset_to_gdf_bounds(
+        ds, fabric_gdf, adapter.source_crs, adapter.x_coord, adapter.y_coord, bounds=bounds
+    )
+    if adapter.pre_aggregate_hook is not None:
+        ds = adapter.pre_aggregate_hook(ds)
+    return ds
+
+
+def estimate_year_bytes(adapter: SourceAdapter, subset: xr.Dataset, n_vars: int | None = None) -> int:
+    """Rough peak memory of aggregating one year of the clipped `subset` grid
+    (`n_vars` output variables; default the adapter's own)."""
+    cells = math.prod(subset[adapter.grid_variable].shape)
+    if n_vars is None:
+        n_vars = len(adapter.variables) + len(adapter.std_variables)
+    return int(cells * n_vars * 8 * _YEAR_MEMORY_FACTOR)
+
+
+def plan_workers(requested: int, n_years: int, year_bytes: int, memory_gb: float | None) -> int:
+    """Worker count: `requested`, capped by the year count and (if given) by
+    how many `year_bytes` fit in `memory_gb`; never below 1."""
+    n = min(requested, n_years)
+    if memory_gb is not None and year_bytes > 0:
+        n = min(n, int(memory_gb * 1024**3 // year_bytes))
+    return max(n, 1)
+
+
+# Per-process state of a year worker (set once by _init_year_worker).
+_YEAR_WORKER: dict = {}
+
+
+def _init_year_worker(adapter, fabric_gdf, id_col, weights, weights_fp, proj_network: bool) -> None:
+    # Spawned workers do not run the driver script's main(), so carry over its
+    # PROJ network setting (see scripts/derive_aggregate.py).
+    pyproj.network.set_network_enabled(proj_network)
+    _YEAR_WORKER.update(adapter=adapter, fabric_gdf=fabric_gdf, id_col=id_col, weights=weights,
+                        weights_fp=weights_fp)
+
+
+def _aggregate_year_job(path: Path, out: Path) -> Path:
+    """Pool-side: aggregate one year file with the worker's shared weights."""
+    w = _YEAR_WORKER
+    ds = _open_year(w["adapter"], w["fabric_gdf"], path)
+    period = _period_bounds(ds, w["adapter"].time_coord)
+    hru_ds = aggregate_variables(w["adapter"], ds, w["fabric_gdf"], w["id_col"], w["weights"], period)
+    return _write_year(hru_ds, out, path, w["weights_fp"])
+
+
 def aggregate_source(
     adapter: SourceAdapter,
     fabric_gdf: gpd.GeoDataFrame,
@@ -208,15 +337,31 @@ def aggregate_source(
     weight_file: Path,
     output_prefix: str,
     years: list[int] | None = None,
+    workers: int = 1,
+    memory_gb: float | None = None,
+    incremental: bool = False,
 ) -> list[Path]:
     """Aggregate every per-year file matching the adapter glob to the fabric.
 
     Writes one NetCDF per calendar year: ``{output_prefix}_agg_{year}.nc`` with
     dims (time, <id_col>) and one data var per adapter variable.
+
+    ``workers > 1`` first computes (or loads) the weights from the first year,
+    then aggregates the years in a spawn ProcessPoolExecutor whose workers
+    each receive the weights once. The pool is capped by `memory_gb` over
+    `estimate_year_bytes` of the clipped grid. The adapter (including its
+    ``pre_aggregate_hook``) must be picklable. Output files are identical to
+    the serial run; the returned list is in year order either way.
+
+    ``incremental=True`` skips every year whose output `is_up_to_date` (same
+    year-file and weight-file fingerprints); the returned list still names
+    every year's output.
     """
     input_dir = Path(input_dir)
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
 
     files = sorted(input_dir.glob(adapter.files_glob))
     if years is not None:
@@ -229,33 +374,312 @@ def aggregate_source(
         adapter.source_key, len(fabric_gdf), len(files),
         list(adapter.variables), adapter.stat_method, output_dir,
     )
+    outputs = [output_dir / f"{output_prefix}_agg_{_year_of(f)}.nc" for f in files]
+    all_outputs = outputs
+    if incremental:
+        stale = [k for k, (f, out) in enumerate(zip(files, outputs))
+                 if not is_up_to_date(out, f, weight_file)]
+        logger.info("Incremental: %d of %d year(s) up to date, %d to aggregate",
+                    len(files) - len(stale), len(files), len(stale))
+        if not stale:
+            return all_outputs
+        files = [files[k] for k in stale]
+        outputs = [outputs[k] for k in stale]
+
+    if workers > 1 and len(files) > 1:
+        first = _open_year(adapter, fabric_gdf, files[0])
+        weights = compute_or_load_weights(
+            adapter, first, fabric_gdf, id_col,
+            _period_bounds(first, adapter.time_coord), weight_file,
+        )
+        year_bytes = estimate_year_bytes(adapter, first)
+        del first
+        n_workers = plan_workers(workers, len(files), year_bytes, memory_gb)
+        logger.info("Fanning %d year(s) over %d worker(s) (~%.1f GB per year in flight)",
+                    len(files), n_workers, year_bytes / 1024**3)
+        if n_workers > 1:
+            _aggregate_parallel(adapter, fabric_gdf, id_col, weights, file_fingerprint(weight_file),
+                                files, outputs, n_workers)
+            logger.info("Done: %d per-year file(s) -> %s", len(outputs), output_dir)
+            return all_outputs
 
-    written: list[Path] = []
     weights: pd.DataFrame | None = None
-    for i, f in enumerate(files, start=1):
+    for i, (f, out) in enumerate(zip(files, outputs), start=1):
         year = _year_of(f)
-        # Clip the source grid to the target extent BEFORE the hook (lazy .sel
-        # index on a plain open_dataset), so only the target extent is ever
-        # materialized as in-memory numpy — neither the hook (if any) nor
-        # gdptools touches the full source grid, and gdptools' per-variable
-        # .load() reuses in-memory data instead of re-reading chunks.
-        ds = xr.open_dataset(f)
-        ds = subset_to_gdf_bounds(
-            ds, fabric_gdf, adapter.source_crs, adapter.x_coord, adapter.y_coord
-        )
-        if adapter.pre_aggregate_hook is not None:
-            ds = adapter.pre_aggregate_hook(ds)
+        ds = _open_year(adapter, fabric_gdf, f)
         period = _period_bounds(ds, adapter.time_coord)
         if weights is None:
             weights = compute_or_load_weights(
                 adapter, ds, fabric_gdf, id_col, period, weight_file
             )
+            weights_fp = file_fingerprint(weight_file)
         logger.info("[%d/%d] year %d: aggregating %s ...",
                     i, len(files), year, list(adapter.variables))
         hru_ds = aggregate_variables(adapter, ds, fabric_gdf, id_col, weights, period)
-        out = output_dir / f"{output_prefix}_agg_{year}.nc"
-        hru_ds.to_netcdf(out)
-        written.append(out)
+        _write_year(hru_ds, out, f, weights_fp)
         logger.info("[%d/%d] year %d: wrote %s", i, len(files), year, out.name)
-    logger.info("Done: %d per-year file(s) -> %s", len(written), output_dir)
+    logger.info("Done: %d per-year file(s) -> %s", len(outputs), output_dir)
+    return all_outputs
+
+
+def _aggregate_parallel(adapter, fabric_gdf, id_col, weights, weights_fp, files, outputs,
+                        n_workers) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=ctx, initializer=_init_year_worker,
+        initargs=(adapter, fabric_gdf, id_col, weights, weights_fp,
+                  pyproj.network.is_network_enabled()),
+    ) as pool:
+        futures = {pool.submit(_aggregate_year_job, f, out): f for f, out in zip(files, outputs)}
+        try:
+            for done, fut in enumerate(as_completed(futures), start=1):
+                out = fut.result()
+                logger.info("[%d/%d] year %d: wrote %s",
+                            done, len(files), _year_of(futures[fut]), out.name)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+
+
+@dataclass
+class PreparedFabric:
+    """A fabric readied once for every source of an `aggregate_sources` run:
+    one row per input polygon sorted by id, in `WEIGHT_GEN_CRS` (so gdptools'
+    own reprojection is a no-op), with its bounds cached per source CRS."""
+
+    gdf: gpd.GeoDataFrame
+    id_col: str
+    _bounds: dict = field(default_factory=dict, repr=False)
+
+    def bounds(self, source_crs) -> tuple[float, float, float, float]:
+        key = pyproj.CRS.from_user_input(source_crs).to_string()
+        if key not in self._bounds:
+            self._bounds[key] = tuple(self.gdf.to_crs(source_crs).total_bounds)
+        return self._bounds[key]
+
+
+def prepare_fabric(fabric_gdf: gpd.GeoDataFrame, id_col: str) -> PreparedFabric:
+    gdf = fabric_gdf.to_crs(WEIGHT_GEN_CRS).sort_values(id_col, kind="stable").reset_index(drop=True)
+    return PreparedFabric(gdf=gdf, id_col=id_col)
+
+
+@dataclass(frozen=True)
+class SourceRun:
+    """One adapter's input directory and outputs within `aggregate_sources`."""
+
+    adapter: SourceAdapter
+    input_dir: Path
+    output_dir: Path
+    output_prefix: str
+
+
+def _output_vars(adapter: SourceAdapter) -> list[str]:
+    return list(adapter.variables) + [f"{v}_std" for v in adapter.std_variables]
+
+
+def _check_shared_grid(runs: list[SourceRun]) -> None:
+    """Fail before any work if the adapters cannot share one weight matrix."""
+    first = runs[0].adapter
+    seen: dict[str, str] = {}
+    for run in runs:
+        a = run.adapter
+        if (a.source_crs, a.x_coord, a.y_coord, a.time_coord) != (
+            first.source_crs, first.x_coord, first.y_coord, first.time_coord
+        ):
+            raise ValueError(
+                f"{a.source_key!r} does not share {first.source_key!r}'s grid definition "
+                "(source_crs/x/y/time coords); aggregate it with its own aggregate_source call"
+            )
+        for v in _output_vars(a):
+            if v in seen:
+                raise ValueError(f"Variable {v!r} is produced by both {seen[v]!r} and {a.source_key!r}")
+            seen[v] = a.source_key
+
+
+def _pass_groups(adapters: dict[str, SourceAdapter], opened: dict[str, xr.Dataset]) -> list[list[str]]:
+    """Sources whose year subsets go through one `aggregate_variables` call:
+    same stat method and backend, and the same days."""
+    groups: list[list[str]] = []
+    for key, ds in opened.items():
+        a = adapters[key]
+        for g in groups:
+            b = adapters[g[0]]
+            if ((a.stat_method, a.agg_backend) == (b.stat_method, b.agg_backend)
+                    and ds[a.time_coord].equals(opened[g[0]][b.time_coord])):
+                g.append(key)
+                break
+        else:
+            groups.append([key])
+    return groups
+
+
+def _combined_adapter(adapters: list[SourceAdapter]) -> SourceAdapter:
+    """One adapter over the union of `adapters`' variables (hooks already applied)."""
+    return replace(
+        adapters[0],
+        source_key="+".join(a.source_key for a in adapters),
+        variables=tuple(v for a in adapters for v in a.variables),
+        std_variables=tuple(v for a in adapters for v in a.std_variables),
+        pre_aggregate_hook=None,
+    )
+
+
+def _aggregate_year_multi(
+    adapters: dict[str, SourceAdapter],
+    fabric: PreparedFabric,
+    weights: pd.DataFrame,
+    weights_fp: str,
+    jobs: dict[str, tuple[Path, Path]],
+) -> list[Path]:
+    """Aggregate one year of every source in `jobs` (``{key: (year file, output)}``)."""
+    opened: dict[str, xr.Dataset] = {}
+    ref = None
+    for key, (path, _out) in jobs.items():
+        a = adapters[key]
+        ds = _open_year(a, fabric.gdf, path, bounds=fabric.bounds(a.source_crs))[list(a.variables)]
+        if ref is None:
+            ref = (key, ds[a.x_coord].values, ds[a.y_coord].values)
+        elif not (np.array_equal(ds[a.x_coord].values, ref[1])
+                  and np.array_equal(ds[a.y_coord].values, ref[2])):
+            raise ValueError(f"{path.name}: grid differs from {ref[0]!r}'s; the shared weights do not apply")
+        opened[key] = ds
+
+    written = []
+    for keys in _pass_groups(adapters, opened):
+        if len(keys) == 1:
+            adapter, ds = adapters[keys[0]], opened[keys[0]]
+        else:
+            adapter = _combined_adapter([adapters[k] for k in keys])
+            ds = xr.merge([opened[k] for k in keys], join="exact", compat="override",
+                          combine_attrs="drop_conflicts")
+        period = _period_bounds(ds, adapter.time_coord)
+        hru_ds = aggregate_variables(adapter, ds, fabric.gdf, fabric.id_col, weights, period)
+        for k in keys:
+            others = [v for o in keys if o != k for v in _output_vars(adapters[o])]
+            out_ds = hru_ds.drop_vars(others)
+            out_ds.attrs = dict(hru_ds.attrs)
+            written.append(_write_year(out_ds, jobs[k][1], jobs[k][0], weights_fp))
     return written
+
+
+def _init_multi_worker(adapters, fabric, weights, weights_fp, proj_network: bool) -> None:
+    pyproj.network.set_network_enabled(proj_network)
+    _YEAR_WORKER.update(adapters=adapters, fabric=fabric, weights=weights, weights_fp=weights_fp)
+
+
+def _aggregate_multi_year_job(jobs: dict[str, tuple[Path, Path]]) -> list[Path]:
+    w = _YEAR_WORKER
+    return _aggregate_year_multi(w["adapters"], w["fabric"], w["weights"], w["weights_fp"], jobs)
+
+
+def aggregate_sources(
+    runs: list[SourceRun],
+    fabric_gdf: gpd.GeoDataFrame,
+    id_col: str,
+    weight_file: Path,
+    years: list[int] | None = None,
+    workers: int = 1,
+    memory_gb: float | None = None,
+    incremental: bool = False,
+) -> dict[str, list[Path]]:
+    """`aggregate_source` for several adapters sharing one grid definition.
+
+    The fabric is prepared once (`prepare_fabric`) and one weight matrix,
+    computed from the first source's first year, serves every source. Per
+    year, each source's file is opened and clipped; sources with the same
+    stat method, backend and days are merged into one Dataset and aggregated
+    in a single `aggregate_variables` pass, then split back so each source
+    still writes its own ``{output_prefix}_agg_{year}.nc`` (same layout and
+    fingerprint attrs as `aggregate_source`). A source missing a year is
+    skipped for that year.
+
+    The adapters must agree on source CRS and x/y/time coordinate names and
+    must not produce the same variable; each year's clipped x/y coordinates
+    are checked against the first source's, so a source on a different grid
+    fails instead of being aggregated with the wrong weights.
+
+    `workers`, `memory_gb` and `incremental` behave as in `aggregate_source`,
+    with years (all their sources together) as the unit of work. Returns
+    ``{source_key: outputs}`` in year order.
+    """
+    if not runs:
+        raise ValueError("aggregate_sources needs at least one SourceRun")
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    keys = [r.adapter.source_key for r in runs]
+    if len(set(keys)) != len(keys):
+        raise ValueError(f"Duplicate source_key in {keys}")
+    _check_shared_grid(runs)
+    adapters = {r.adapter.source_key: r.adapter for r in runs}
+    fabric = prepare_fabric(fabric_gdf, id_col)
+
+    by_year: dict[int, dict[str, tuple[Path, Path]]] = {}
+    all_outputs: dict[str, list[Path]] = {}
+    for run in runs:
+        run_dir = Path(run.output_dir)
+        run_dir.mkdir(parents=True, exist_ok=True)
+        files = sorted(Path(run.input_dir).glob(run.adapter.files_glob))
+        if years is not None:
+            files = [f for f in files if _year_of(f) in years]
+        if not files:
+            raise FileNotFoundError(f"No files match {Path(run.input_dir) / run.adapter.files_glob}")
+        all_outputs[run.adapter.source_key] = []
+        for f in files:
+            out = run_dir / f"{run.output_prefix}_agg_{_year_of(f)}.nc"
+            all_outputs[run.adapter.source_key].append(out)
+            by_year.setdefault(_year_of(f), {})[run.adapter.source_key] = (f, out)
+    n_jobs = sum(len(j) for j in by_year.values())
+    logger.info("Aggregating %s: %d HRUs, %d year(s), %d source-year file(s)",
+                keys, len(fabric.gdf), len(by_year), n_jobs)
+
+    if incremental:
+        by_year = {
+            year: stale for year, jobs in by_year.items()
+            if (stale := {k: (f, out) for k, (f, out) in jobs.items()
+                          if not is_up_to_date(out, f, weight_file)})
+        }
+        n_stale = sum(len(j) for j in by_year.values())
+        logger.info("Incremental: %d of %d source-year file(s) up to date, %d to aggregate",
+                    n_jobs - n_stale, n_jobs, n_stale)
+        if not by_year:
+            return all_outputs
+
+    order = sorted(by_year)
+    first_key, (first_file, _) = next(iter(by_year[order[0]].items()))
+    first_adapter = adapters[first_key]
+    first = _open_year(first_adapter, fabric.gdf, first_file, bounds=fabric.bounds(first_adapter.source_crs))
+    weights = compute_or_load_weights(
+        first_adapter, first, fabric.gdf, id_col,
+        _period_bounds(first, first_adapter.time_coord), weight_file,
+    )
+    year_bytes = estimate_year_bytes(
+        first_adapter, first, n_vars=sum(len(_output_vars(adapters[k])) for k in by_year[order[0]]),
+    )
+    del first
+    weights_fp = file_fingerprint(weight_file)
+
+    n_workers = plan_workers(workers, len(order), year_bytes, memory_gb)
+    if n_workers > 1:
+        logger.info("Fanning %d year(s) over %d worker(s) (~%.1f GB per year in flight)",
+                    len(order), n_workers, year_bytes / 1024**3)
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=ctx, initializer=_init_multi_worker,
+            initargs=(adapters, fabric, weights, weights_fp, pyproj.network.is_network_enabled()),
+        ) as pool:
+            futures = {pool.submit(_aggregate_multi_year_job, by_year[y]): y for y in order}
+            try:
+                for done, fut in enumerate(as_completed(futures), start=1):
+                    outs = fut.result()
+                    logger.info("[%d/%d] year %d: wrote %s",
+                                done, len(order), futures[fut], [o.name for o in outs])
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    else:
+        for i, year in enumerate(order, start=1):
+            logger.info("[%d/%d] year %d: aggregating %s ...", i, len(order), year, list(by_year[year]))
+            outs = _aggregate_year_multi(adapters, fabric, weights, weights_fp, by_year[year])
+            logger.info("[%d/%d] year %d: wrote %s", i, len(order), year, [o.name for o in outs])
+    logger.info("Done: %d source-year file(s)", sum(len(j) for j in by_year.values()))
+    return all_outputs
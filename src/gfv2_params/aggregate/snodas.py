@@ -5,6 +5,9 @@ non-CONUS / Great Lakes. The hook re-asserts that fill as NaN and derives a
 binary snow-cover field `scov = (swe > 0)` that *carries the NaN mask* (fill
 pixels stay NaN, not 0), so under masked_mean the HRU `scov` is the
 area-weighted fraction of finite pixels with snow — the Driscoll et al. SCA.
+Aggregated with gdptools by default; an ``agg_backend: sparse`` source entry in
+configs/aggregate/aggregate_sources.yml opts into the sparse engine (swe/scov
+means and the swe_std sidecar in one pass over the weights).
 """
 
 from __future__ import annotations
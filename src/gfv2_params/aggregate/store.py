@@ -0,0 +1,132 @@
+"""Pack a source's per-year aggregated NetCDFs into one HRU-chunked store.
+
+Stage 1 writes one ``(time, <id>)`` NetCDF per year, contiguous and
+uncompressed: a year is laid out day after day, so Stage 2 — which wants the
+full record of a block of HRUs — reads a thin strided slice out of every day
+of every year file. ``pack_hru_store`` rewrites the set as a single NetCDF4
+file whose data variables are chunked ``(all days, hru_chunk HRUs)`` and
+zlib-compressed (with byte shuffle). A block of HRUs is then a run of whole
+chunks, each one contiguous compressed read.
+
+The store keeps the Stage 1 layout otherwise — the same dims, coords
+(``time``, ``<id>``, centroid ``lat``/``lon``), variable attrs and scalar CF
+``crs`` — so any reader of the per-year files reads it unchanged, and
+``xr.open_dataset`` slices it lazily by year or HRU from the header's
+coordinate index. NetCDF4 rather than Zarr: netCDF4 already ships with the
+environment (gdptools' writer), the store is one file instead of a directory
+of ~10^5 chunk objects on the parallel filesystem, and the header plays the
+part of Zarr's consolidated metadata.
+
+The per-year files stay the Stage 1 product (incremental re-aggregation and
+Stage 2's season cache key on them); the store is derived and is repacked
+after each merge.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import netCDF4
+import numpy as np
+import xarray as xr
+
+from .driver import SOURCE_FINGERPRINT_ATTR, WEIGHTS_FINGERPRINT_ATTR
+
+logger = logging.getLogger(__name__)
+
+STORE_SUFFIX = "_hru_store.nc"  # deliberately not matching Stage 2's *_agg_*.nc glob
+
+# Target uncompressed bytes per chunk: a chunk holds the full record of a few
+# hundred HRUs (20 years of float32 days ~= 29 kB per HRU).
+_CHUNK_BYTES = 8 * 1024**2
+
+# HRUs read from the year files per write pass (rounded to whole chunks).
+_PACK_HRUS = 20_000
+
+
+def store_path(output_dir, output_prefix: str) -> Path:
+    return Path(output_dir) / f"{output_prefix}{STORE_SUFFIX}"
+
+
+def hru_chunk(n_time: int, itemsize: int, chunk_bytes: int = _CHUNK_BYTES) -> int:
+    """HRUs per chunk so one full-depth chunk is about `chunk_bytes`."""
+    return max(1, chunk_bytes // max(1, n_time * itemsize))
+
+
+def pack_hru_store(
+    files: list[Path],
+    out_path: Path,
+    id_dim: str,
+    complevel: int = 4,
+    chunk_bytes: int = _CHUNK_BYTES,
+) -> Path:
+    """Pack per-year ``(time, id_dim)`` NetCDFs into one HRU-chunked NetCDF4 store.
+
+    Days are concatenated in date order; every file must carry the same
+    `id_dim` coordinate. Written to a temp name and renamed, so a killed job
+    never leaves a partial store under the final name.
+    """
+    files = sorted(Path(f) for f in files)
+    if not files:
+        raise FileNotFoundError("No per-year NetCDFs to pack")
+    out_path = Path(out_path)
+    tmp = out_path.with_name(out_path.stem + ".tmp.nc")
+    datasets = [xr.open_dataset(f) for f in files]
+    try:
+        first = datasets[0]
+        ids = first[id_dim].values
+        for f, ds in zip(files[1:], datasets[1:]):
+            if not np.array_equal(ds[id_dim].values, ids):
+                raise ValueError(f"{f.name}: {id_dim} coordinate differs from {files[0].name}")
+        times = np.concatenate([ds["time"].values for ds in datasets])
+        t_order = np.argsort(times, kind="stable")
+        if np.unique(times).size != times.size:
+            raise ValueError(f"Overlapping days across {[f.name for f in files]}")
+        series = [v for v, da in first.data_vars.items() if set(da.dims) == {"time", id_dim}]
+
+        # Skeleton (coords, scalar vars, attrs) through xarray so time encoding
+        # and CF attrs match the per-year files; the big variables follow.
+        skeleton = first.drop_vars(series).drop_dims("time", errors="ignore").assign_coords(
+            time=("time", times[t_order], first["time"].attrs)
+        )
+        for attr in (SOURCE_FINGERPRINT_ATTR, WEIGHTS_FINGERPRINT_ATTR):
+            skeleton.attrs.pop(attr, None)
+        time_enc = {k: v for k, v in first["time"].encoding.items() if k in ("units", "calendar", "dtype")}
+        skeleton.to_netcdf(tmp, format="NETCDF4", encoding={"time": time_enc})
+
+        n_time, n_hru = times.size, ids.size
+        with netCDF4.Dataset(tmp, "a") as nc:
+            out_vars = {}
+            for v in series:
+                da = first[v]
+                dtype = da.dtype
+                chunk = min(n_hru, hru_chunk(n_time, dtype.itemsize, chunk_bytes))
+                # Values are written decoded, so floats take NaN, never a packed fill.
+                fill = np.nan if np.issubdtype(dtype, np.floating) else da.encoding.get("_FillValue")
+                var = nc.createVariable(
+                    v, dtype, ("time", id_dim), zlib=True, complevel=complevel, shuffle=True,
+                    chunksizes=(n_time, chunk), fill_value=fill,
+                )
+                var.set_auto_maskandscale(False)
+                attrs = {k: val for k, val in da.attrs.items() if k != "_FillValue"}
+                if "coordinates" in da.encoding:
+                    attrs["coordinates"] = da.encoding["coordinates"]
+                var.setncatts(attrs)
+                out_vars[v] = (var, chunk)
+            step = max(chunk for _, chunk in out_vars.values()) if out_vars else 1
+            block = -(-_PACK_HRUS // step) * step
+            for lo in range(0, n_hru, block):
+                sl = slice(lo, min(lo + block, n_hru))
+                for v, (var, _chunk) in out_vars.items():
+                    var[:, sl] = np.concatenate([
+                        ds[v].isel({id_dim: sl}).transpose("time", id_dim).values for ds in datasets
+                    ])[t_order]
+                logger.info("  packed HRUs %d-%d of %d", sl.start, sl.stop, n_hru)
+    finally:
+        for ds in datasets:
+            ds.close()
+    tmp.replace(out_path)
+    logger.info("Packed %d year file(s) (%d HRUs x %d days, vars=%s) -> %s",
+                len(files), ids.size, times.size, series, out_path)
+    return out_path
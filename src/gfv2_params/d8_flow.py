@@ -0,0 +1,248 @@
+"""In-process D8 pointer + flow accumulation + TWI for compute_dem_derivatives.
+
+Replaces the WhiteboxTools ``D8Pointer`` -> ``D8FlowAccumulation`` subprocess
+pair, which on a 2-3.6B-cell VPU writes the pointer to a multi-GB GeoTIFF only
+for the next tool to read it straight back, then writes FAC for the TWI step to
+read back again. Here the filled DEM is loaded once and FDR, FAC and TWI are
+computed in memory (`d8_fdr_fac_twi`); the GeoTIFFs are written as outputs,
+never re-read.
+
+Conventions match the WBT path it replaces, so downstream consumers see the
+same rasters:
+
+- `d8_pointer` is WBT ``D8Pointer --esri_pntr``: steepest strictly-downhill
+  neighbour by drop / distance (diagonals at the true diagonal length from the
+  cell size), ties to the first neighbour in WBT's scan order (NE, E, SE, S,
+  SW, W, NW, N); nodata neighbours (and the grid edge) are never targets; a
+  cell with no lower neighbour gets code 0 (a terminus — `d8_routing` treats 0
+  as one). ESRI encoding 1=E 2=SE 4=S 8=SW 16=W 32=NW 64=N 128=NE; DEM nodata
+  cells get `FDR_NODATA` (255, the uint8 FDR nodata used across the package).
+- `d8_flow_accumulation` counts upslope cells EXCLUSIVE of the cell itself
+  (headwater = 0), the ``--out_type=cells`` convention the TWI formula's
+  ``(fac + 1)`` term assumes. Nodata cells are -1.
+- `twi_from_fac` is the ``_compute_twi`` formula,
+  ``log((fac + 1) * 10 / (tan(min(slope, cap)) + 0.01))``, in float64,
+  stored float32.
+
+Cell addressing is int64 throughout (richdem's int32 linear index is what
+overflowed at 2^31 cells on VPUs 03/10). The pointer and TWI passes are
+row-parallel (`prange`); the accumulation is an O(N) serial walk that follows
+each headwater downstream only while the next cell has no other pending
+inflow, so it needs no queue — 18 B/cell peak (float64 DEM, uint8 FDR and
+in-degree, int64 FAC) versus WBT's per-tool full-grid buffers plus disk.
+
+Like `d8_routing.py`, this module keeps numba out of the widely-imported
+modules; only compute_dem_derivatives imports it.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from numba import njit, prange
+
+FDR_NODATA = 255
+
+# WBT D8Pointer's neighbour scan order (NE, E, SE, S, SW, W, NW, N) and the
+# ESRI code it writes for each; tie-breaking depends on this order.
+_DR = np.array([-1, 0, 1, 1, 1, 0, -1, -1], dtype=np.int64)
+_DC = np.array([1, 1, 1, 0, -1, -1, -1, 0], dtype=np.int64)
+_ESRI = np.array([128, 1, 2, 4, 8, 16, 32, 64], dtype=np.uint8)
+
+# In-degree marker for a cell the accumulation walk has already passed through.
+_DONE = 255
+
+
+def _code_to_index() -> np.ndarray:
+    """int8[256] lookup: ESRI code -> index into _DR/_DC, else -1 (terminus)."""
+    lut = np.full(256, -1, dtype=np.int8)
+    for i, code in enumerate(_ESRI):
+        lut[code] = i
+    return lut
+
+
+_CODE_TO_INDEX = _code_to_index()
+
+
+@njit(cache=True, parallel=True)
+def _d8_pointer(dem, nodata, lengths, dr_tab, dc_tab, esri, fdr):
+    ny, nx = dem.shape
+    for r in prange(ny):
+        for c in range(nx):
+            z = dem[r, c]
+            if z == nodata or math.isnan(z):
+                fdr[r, c] = FDR_NODATA
+                continue
+            code = 0
+            max_slope = 0.0
+            for i in range(8):
+                rn = r + dr_tab[i]
+                cn = c + dc_tab[i]
+                if rn < 0 or rn >= ny or cn < 0 or cn >= nx:
+                    continue
+                zn = dem[rn, cn]
+                if zn == nodata or math.isnan(zn):
+                    continue
+                slope = (z - zn) / lengths[i]
+                if slope > max_slope:
+                    max_slope = slope
+                    code = esri[i]
+            fdr[r, c] = code
+
+
+@njit(cache=True)
+def _target(fdr, lut, dr_tab, dc_tab, r, c):
+    """(row, col) of (r, c)'s receiver, or (-1, -1) for a terminus."""
+    ny, nx = fdr.shape
+    i = lut[fdr[r, c]]
+    if i < 0:
+        return -1, -1
+    rt = r + dr_tab[i]
+    ct = c + dc_tab[i]
+    if rt < 0 or rt >= ny or ct < 0 or ct >= nx or fdr[rt, ct] == FDR_NODATA:
+        return -1, -1
+    return rt, ct
+
+
+@njit(cache=True, parallel=True)
+def _in_degree(fdr, lut, dr_tab, dc_tab, indeg, fac):
+    # Pull form (count the neighbours pointing here) so rows never race.
+    ny, nx = fdr.shape
+    for r in prange(ny):
+        for c in range(nx):
+            if fdr[r, c] == FDR_NODATA:
+                fac[r, c] = -1
+                indeg[r, c] = _DONE
+                continue
+            fac[r, c] = 0
+            k = 0
+            for i in range(8):
+                rn = r - dr_tab[i]
+                cn = c - dc_tab[i]
+                if rn < 0 or rn >= ny or cn < 0 or cn >= nx:
+                    continue
+                if lut[fdr[rn, cn]] == i:
+                    k += 1
+            indeg[r, c] = k
+
+
+@njit(cache=True)
+def _accumulate(fdr, lut, dr_tab, dc_tab, indeg, fac):
+    ny, nx = fdr.shape
+    for r in range(ny):
+        for c in range(nx):
+            if indeg[r, c] != 0:
+                continue
+            # A headwater (or a cell whose inflows are all resolved): push its
+            # count downstream for as long as the receiver has nothing else
+            # pending. Cycle cells never reach in-degree 0, so never start.
+            cr = r
+            cc = c
+            while True:
+                indeg[cr, cc] = _DONE
+                rt, ct = _target(fdr, lut, dr_tab, dc_tab, cr, cc)
+                if rt < 0:
+                    break
+                fac[rt, ct] += fac[cr, cc] + 1
+                indeg[rt, ct] -= 1
+                if indeg[rt, ct] != 0:
+                    break
+                cr = rt
+                cc = ct
+
+
+@njit(cache=True, parallel=True)
+def _twi(fac, fac_nodata, slope, slope_nodata, land_valid, cap_deg, twi_nodata, twi):
+    ny, nx = fac.shape
+    n_valid = 0
+    n_capped = 0
+    for r in prange(ny):
+        for c in range(nx):
+            f = np.float64(fac[r, c])
+            s = np.float64(slope[r, c])
+            if (not land_valid[r, c] or f == fac_nodata or s == slope_nodata
+                    or not math.isfinite(f) or not math.isfinite(s)):
+                twi[r, c] = twi_nodata
+                continue
+            n_valid += 1
+            if s > cap_deg:
+                n_capped += 1
+                s = cap_deg
+            twi[r, c] = math.log(((f + 1.0) * 10.0) / (math.tan(s * (math.pi / 180.0)) + 0.01))
+    return n_valid, n_capped
+
+
+def d8_pointer(dem, nodata, cell_x: float, cell_y: float) -> np.ndarray:
+    """ESRI-D8 pointer (uint8) of a filled DEM, matching WBT ``D8Pointer --esri_pntr``.
+
+    0 = no strictly lower neighbour; `FDR_NODATA` where `dem` is `nodata`/NaN.
+    `cell_x`/`cell_y` are the (positive) cell sizes; diagonal drops are divided
+    by ``hypot(cell_x, cell_y)``.
+    """
+    dem = np.ascontiguousarray(dem)
+    if dem.ndim != 2:
+        raise ValueError(f"dem must be 2-D, got shape {dem.shape}")
+    diag = math.hypot(cell_x, cell_y)
+    lengths = np.array([diag, cell_x, diag, cell_y, diag, cell_x, diag, cell_y], dtype=np.float64)
+    fdr = np.empty(dem.shape, dtype=np.uint8)
+    _d8_pointer(dem, dem.dtype.type(nodata), lengths, _DR, _DC, _ESRI, fdr)
+    return fdr
+
+
+def d8_flow_accumulation(fdr) -> np.ndarray:
+    """Upslope cell count (int64, exclusive of self) of an ESRI-D8 pointer grid.
+
+    Codes outside the eight directions (0, or anything but `FDR_NODATA`) are
+    termini; flow into a `FDR_NODATA` cell or off the grid is dropped, and
+    `FDR_NODATA` cells are -1. Cells on a flow cycle (impossible from
+    `d8_pointer`, which only points strictly downhill) keep the count of their
+    acyclic inflows.
+    """
+    fdr = np.ascontiguousarray(fdr, dtype=np.uint8)
+    if fdr.ndim != 2:
+        raise ValueError(f"fdr must be 2-D, got shape {fdr.shape}")
+    indeg = np.empty(fdr.shape, dtype=np.uint8)
+    fac = np.empty(fdr.shape, dtype=np.int64)
+    _in_degree(fdr, _CODE_TO_INDEX, _DR, _DC, indeg, fac)
+    _accumulate(fdr, _CODE_TO_INDEX, _DR, _DC, indeg, fac)
+    return fac
+
+
+def twi_from_fac(fac, slope_deg, land_valid, *, fac_nodata, slope_nodata,
+                 slope_cap_deg: float, twi_nodata: float) -> tuple[np.ndarray, int, int]:
+    """TWI = log((fac + 1) * 10 / (tan(min(slope, cap)) + 0.01)), float32.
+
+    `twi_nodata` wherever `land_valid` is False or fac/slope is nodata or
+    non-finite. Returns ``(twi, n_valid, n_capped)`` — the counts feed the
+    caller's log line.
+    """
+    fac = np.ascontiguousarray(fac)
+    slope = np.ascontiguousarray(slope_deg)
+    land = np.ascontiguousarray(land_valid, dtype=np.bool_)
+    if not (fac.shape == slope.shape == land.shape):
+        raise ValueError(
+            f"fac/slope/land_valid shapes must match: {fac.shape}, {slope.shape}, {land.shape}"
+        )
+    twi = np.empty(fac.shape, dtype=np.float32)
+    n_valid, n_capped = _twi(
+        fac, np.float64(fac_nodata), slope, np.float64(slope_nodata), land,
+        np.float64(slope_cap_deg), np.float32(twi_nodata), twi,
+    )
+    return twi, int(n_valid), int(n_capped)
+
+
+def d8_fdr_fac_twi(dem, nodata, cell_x: float, cell_y: float, slope_deg, land_valid, *,
+                   slope_nodata, slope_cap_deg: float, twi_nodata: float):
+    """FDR, FAC and TWI from one in-memory filled DEM — no GeoTIFF round trip.
+
+    Returns ``(fdr_uint8, fac_int64, twi_float32, n_valid, n_capped)``; see
+    `d8_pointer`, `d8_flow_accumulation` and `twi_from_fac`.
+    """
+    fdr = d8_pointer(dem, nodata, cell_x, cell_y)
+    fac = d8_flow_accumulation(fdr)
+    twi, n_valid, n_capped = twi_from_fac(
+        fac, slope_deg, land_valid, fac_nodata=-1, slope_nodata=slope_nodata,
+        slope_cap_deg=slope_cap_deg, twi_nodata=twi_nodata,
+    )
+    return fdr, fac, twi, n_valid, n_capped
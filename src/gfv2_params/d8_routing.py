@@ -21,8 +21,27 @@ enabling per-depression contributing-area counts. It takes the same barrier
 treatment as `drains_to_dprst_kernel` (barrier seeds as a non-draining
 terminus; labels win any overlap with a barrier).
 
-This is the ONLY numba user in the package; it is deliberately isolated here so
-the widely-imported `depstor.py` stays numba-free.
+`drains_to_dprst_packed_kernel` is the out-of-core variant used by the
+streaming `routing` mode: the masked FDR and the pour/barrier seeds are packed
+into ONE uint8 per cell (`pack_d8_window`, filled strip by strip), and the
+traversal state is resolved in place in that same byte. Same visiting order,
+same seeding precedence, same cycle counting as `drains_to_dprst_kernel`, so the
+result is bit-identical at 1 byte/cell instead of ~8.
+
+`parallel=True` on `drains_to_dprst_kernel` / `drains_to_dprst_labeled_kernel`
+selects the multi-threaded variant (`_resolve_topo`). Instead of walking each
+cell downstream, it propagates seed states UPstream in topological order: every
+seed and every terminus (sink, nodata, off-window pointer) is a root, and each
+frontier level claims the in-flowing neighbours of the previous one with
+`numba.prange` over frontier chunks. A cell has exactly one downstream, so it
+is claimed by exactly one frontier cell and the writes never race. Whatever no
+root reaches lies on or upslope of a flow cycle; Kahn-peeling that residue by
+in-degree leaves the cycle cells themselves (non-zero in-degree), and each
+cycle is counted once — the same cells, labels and `n_cycles` as the serial
+walk, which also counts every cycle exactly once.
+
+numba is deliberately isolated here (and in `d8_flow.py`, the DEM-side D8
+engine) so the widely-imported `depstor.py` stays numba-free.
 
 ESRI D8 encoding (value -> downstream neighbour):
     1=E  2=SE  4=S  8=SW  16=W  32=NW  64=N  128=NE
@@ -32,13 +51,27 @@ Any other value (notably nodata 255, or 0) is treated as a sink/terminus.
 from __future__ import annotations
 
 import numpy as np
-from numba import njit
+from numba import njit, prange
 
 # State coloring used during traversal.
 _UNKNOWN = 0
 _DRAINS = 1
 _NOT = 2
 _ACTIVE = 3  # currently on the path being walked (detects cycles)
+# _resolve_topo only: unreached after propagation; st - _PENDING = in-degree.
+_PENDING = 4
+
+# Packed layout (drains_to_dprst_packed_kernel): low nibble = D8 direction
+# index into _DR/_DC (0..7, ESRI code order) or _SINK; bits 4-5 = state above.
+_SINK = 8
+_DIR_MASK = 0x0F
+_STATE_SHIFT = 4
+_DR = np.array([0, 1, 1, 1, 0, -1, -1, -1], dtype=np.int64)
+_DC = np.array([1, 1, 0, -1, -1, -1, 0, 1], dtype=np.int64)
+
+# Frontier levels smaller than this are claimed serially: a prange launch costs
+# more than the work on the long single-cell tails of a mainstem.
+_PAR_MIN_FRONTIER = 4096
 
 
 @njit(cache=True)
@@ -271,7 +304,302 @@ def _resolve_labeled(fdr, label, barrier, fdr_nodata):
     return out, n_cycles
 
 
-def drains_to_dprst_kernel(fdr_win, pour_win, barrier_win, fdr_nodata=255):
+@njit(cache=True)
+def _resolve_packed(packed, dr_tab, dc_tab):
+    ny, nx = packed.shape
+    cap = 1 << 20
+    stack_r = np.empty(cap, dtype=np.int64)
+    stack_c = np.empty(cap, dtype=np.int64)
+    n_cycles = 0
+
+    # Seeds (pour -> _DRAINS, barrier -> _NOT, pour wins) are already in the
+    # state bits; see pack_d8_window. Visiting order matches _resolve.
+    for sr in range(ny):
+        for sc in range(nx):
+            if (packed[sr, sc] >> _STATE_SHIFT) != _UNKNOWN:
+                continue
+            n = 0
+            cr = sr
+            cc = sc
+            result = _NOT
+            while True:
+                v = packed[cr, cc]
+                s = v >> _STATE_SHIFT
+                if s == _DRAINS:
+                    result = _DRAINS
+                    break
+                if s == _NOT:
+                    result = _NOT
+                    break
+                if s == _ACTIVE:
+                    n_cycles += 1
+                    result = _NOT
+                    break
+
+                d = v & _DIR_MASK
+                packed[cr, cc] = d | (_ACTIVE << _STATE_SHIFT)
+                if n >= cap:
+                    new_cap = cap * 2
+                    nr_ = np.empty(new_cap, dtype=np.int64)
+                    nc_ = np.empty(new_cap, dtype=np.int64)
+                    nr_[:cap] = stack_r
+                    nc_[:cap] = stack_c
+                    stack_r = nr_
+                    stack_c = nc_
+                    cap = new_cap
+                stack_r[n] = cr
+                stack_c[n] = cc
+                n += 1
+
+                if d >= _SINK:
+                    result = _NOT
+                    break
+                nr2 = cr + dr_tab[d]
+                nc2 = cc + dc_tab[d]
+                if nr2 < 0 or nr2 >= ny or nc2 < 0 or nc2 >= nx:
+                    result = _NOT
+                    break
+                cr = nr2
+                cc = nc2
+
+            for i in range(n):
+                rr = stack_r[i]
+                ric = stack_c[i]
+                packed[rr, ric] = (packed[rr, ric] & _DIR_MASK) | (result << _STATE_SHIFT)
+    return n_cycles
+
+
+@njit(cache=True)
+def _exclusive_cumsum(a):
+    out = np.empty(a.shape[0], dtype=np.int64)
+    t = 0
+    for i in range(a.shape[0]):
+        out[i] = t
+        t += a[i]
+    return out, t
+
+
+@njit(cache=True)
+def _downstream(fdr, lut, dr_tab, dc_tab, r, c):
+    """Flat index of (r, c)'s D8 target, or -1 for a sink / off-window pointer."""
+    ny, nx = fdr.shape
+    d = lut[fdr[r, c]]
+    if d >= _SINK:
+        return -1
+    r2 = r + dr_tab[d]
+    c2 = c + dc_tab[d]
+    if r2 < 0 or r2 >= ny or c2 < 0 or c2 >= nx:
+        return -1
+    return r2 * nx + c2
+
+
+@njit(cache=True)
+def _claim_upstream(f, fdr, st, lab, labeled, lut, dr_tab, dc_tab, nxt, off, write):
+    """Count (and with `write`, claim into `nxt[off:]`) f's unresolved inflows."""
+    ny, nx = fdr.shape
+    r = f // nx
+    c = f - r * nx
+    m = 0
+    for d in range(8):
+        # The neighbour one step AGAINST direction d flows into f iff it points d.
+        rj = r - dr_tab[d]
+        cj = c - dc_tab[d]
+        if rj < 0 or rj >= ny or cj < 0 or cj >= nx:
+            continue
+        if st[rj, cj] != _UNKNOWN or lut[fdr[rj, cj]] != d:
+            continue
+        if write:
+            st[rj, cj] = st[r, c]
+            if labeled:
+                lab[rj, cj] = lab[r, c]
+            nxt[off + m] = rj * nx + cj
+        m += 1
+    return m
+
+
+@njit(cache=True, parallel=True)
+def _resolve_topo(fdr, seed, barrier, lut, dr_tab, dc_tab, labeled):
+    ny, nx = fdr.shape
+    st = np.zeros((ny, nx), dtype=np.uint8)
+    lab = np.zeros((ny, nx) if labeled else (1, 1), dtype=np.int32)
+
+    # Roots, with _resolve's precedence: seeds (pour / label) -> _DRAINS, then
+    # barriers -> _NOT, then every terminus (sink code, nodata, pointer off the
+    # window) -> _NOT. Everything else starts _UNKNOWN with exactly one out-edge.
+    row_roots = np.zeros(ny, dtype=np.int64)
+    for r in prange(ny):
+        k = 0
+        for c in range(nx):
+            if (labeled and seed[r, c] > 0) or (not labeled and seed[r, c] == 1):
+                st[r, c] = _DRAINS
+                if labeled:
+                    lab[r, c] = seed[r, c]
+                k += 1
+            elif barrier[r, c] == 1 or _downstream(fdr, lut, dr_tab, dc_tab, r, c) < 0:
+                st[r, c] = _NOT
+                k += 1
+        row_roots[r] = k
+    row_off, n_roots = _exclusive_cumsum(row_roots)
+    frontier = np.empty(n_roots, dtype=np.int64)
+    for r in prange(ny):
+        k = row_off[r]
+        for c in range(nx):
+            if st[r, c] != _UNKNOWN:
+                frontier[k] = r * nx + c
+                k += 1
+
+    # Propagate upstream level by level: count each frontier cell's unresolved
+    # inflows, prefix-sum them into the next frontier, then claim. An inflow
+    # has one downstream, so only one frontier cell ever claims it.
+    empty = np.empty(0, dtype=np.int64)
+    nf = frontier.shape[0]
+    while nf > 0:
+        cnt = np.empty(nf, dtype=np.int64)
+        if nf >= _PAR_MIN_FRONTIER:
+            for k in prange(nf):
+                cnt[k] = _claim_upstream(frontier[k], fdr, st, lab, labeled, lut, dr_tab, dc_tab,
+                                         empty, 0, False)
+        else:
+            for k in range(nf):
+                cnt[k] = _claim_upstream(frontier[k], fdr, st, lab, labeled, lut, dr_tab, dc_tab,
+                                         empty, 0, False)
+        off, total = _exclusive_cumsum(cnt)
+        nxt = np.empty(total, dtype=np.int64)
+        if nf >= _PAR_MIN_FRONTIER:
+            for k in prange(nf):
+                _claim_upstream(frontier[k], fdr, st, lab, labeled, lut, dr_tab, dc_tab,
+                                nxt, off[k], True)
+        else:
+            for k in range(nf):
+                _claim_upstream(frontier[k], fdr, st, lab, labeled, lut, dr_tab, dc_tab,
+                                nxt, off[k], True)
+        frontier = nxt
+        nf = total
+
+    # The unreached residue is flow cycles plus their upslope trees (rare: a
+    # data defect). Kahn-peel it by in-degree; cells left with a non-zero
+    # in-degree lie on a cycle. Walk each cycle once to count it.
+    n_left = 0
+    for r in prange(ny):
+        for c in range(nx):
+            if st[r, c] == _UNKNOWN:
+                n_left += 1
+    n_cycles = 0
+    if n_left > 0:
+        flat = st.reshape(ny * nx)
+        left = np.empty(n_left, dtype=np.int64)
+        k = 0
+        for r in range(ny):
+            for c in range(nx):
+                if st[r, c] == _UNKNOWN:
+                    left[k] = r * nx + c
+                    k += 1
+        for k in range(n_left):
+            flat[left[k]] = _PENDING
+        for k in range(n_left):
+            j = left[k]
+            down = _downstream(fdr, lut, dr_tab, dc_tab, j // nx, j % nx)
+            flat[down] += 1
+        queue = np.empty(n_left, dtype=np.int64)
+        qn = 0
+        for k in range(n_left):
+            if flat[left[k]] == _PENDING:
+                queue[qn] = left[k]
+                qn += 1
+        qi = 0
+        while qi < qn:
+            j = queue[qi]
+            qi += 1
+            flat[j] = _NOT
+            down = _downstream(fdr, lut, dr_tab, dc_tab, j // nx, j % nx)
+            flat[down] -= 1
+            if flat[down] == _PENDING:
+                queue[qn] = down
+                qn += 1
+        for k in range(n_left):
+            j = left[k]
+            if flat[j] > _PENDING:
+                n_cycles += 1
+                while flat[j] > _PENDING:
+                    flat[j] = _NOT
+                    j = _downstream(fdr, lut, dr_tab, dc_tab, j // nx, j % nx)
+
+    # Binary result in place: st becomes the 0/1 drains mask.
+    for r in prange(ny):
+        for c in range(nx):
+            st[r, c] = 1 if st[r, c] == _DRAINS else 0
+    return st, lab, n_cycles
+
+
+def _d8_index_lut(fdr_nodata) -> np.ndarray:
+    """uint8[256] lookup: ESRI-D8 code -> direction index 0..7, else _SINK."""
+    lut = np.full(256, _SINK, dtype=np.uint8)
+    for i, code in enumerate((1, 2, 4, 8, 16, 32, 64, 128)):
+        lut[code] = i
+    # Mirrors _resolve: the nodata test runs before the direction decode, so a
+    # nodata value that collides with a direction code is still a sink.
+    lut[int(fdr_nodata)] = _SINK
+    return lut
+
+
+def pack_d8_window(fdr_win, pour_win, barrier_win, fdr_nodata=255) -> np.ndarray:
+    """Pack an FDR window + pour/barrier seeds into one uint8 per cell.
+
+    The input for `drains_to_dprst_packed_kernel`. Row-wise independent, so a
+    caller may fill a large packed window strip by strip (the streaming
+    `routing` mode never holds the FDR, pour and barrier windows at once).
+    Seeding precedence matches `drains_to_dprst_kernel`: pour cells seed
+    `_DRAINS`, barrier cells seed `_NOT`, pour wins any overlap.
+    """
+    if not (fdr_win.shape == pour_win.shape == barrier_win.shape):
+        raise ValueError(
+            f"fdr/pour/barrier shapes must match: {fdr_win.shape}, "
+            f"{pour_win.shape}, {barrier_win.shape}"
+        )
+    packed = _d8_index_lut(fdr_nodata)[np.asarray(fdr_win, dtype=np.uint8)]
+    packed[barrier_win == 1] |= np.uint8(_NOT << _STATE_SHIFT)
+    pour = pour_win == 1
+    packed[pour] = (packed[pour] & _DIR_MASK) | np.uint8(_DRAINS << _STATE_SHIFT)
+    return packed
+
+
+def packed_drains(packed) -> np.ndarray:
+    """Boolean mask of resolved-draining cells in a packed window (or strip)."""
+    return (packed >> _STATE_SHIFT) == _DRAINS
+
+
+@njit(cache=True)
+def _unpack_drains_inplace(packed):
+    ny, nx = packed.shape
+    for r in range(ny):
+        for c in range(nx):
+            packed[r, c] = 1 if (packed[r, c] >> _STATE_SHIFT) == _DRAINS else 0
+
+
+def unpack_drains_inplace(packed) -> np.ndarray:
+    """Overwrite a resolved packed window with its 0/1 drains mask; returns it.
+
+    The same 1 byte/cell as `packed_drains`, without the second window-sized
+    array — for callers that hand the whole window on (e.g. as a pool tile).
+    """
+    _unpack_drains_inplace(packed)
+    return packed
+
+
+def drains_to_dprst_packed_kernel(packed) -> int:
+    """Resolve a `pack_d8_window` array in place; returns ``n_cycles``.
+
+    Identical traversal to `drains_to_dprst_kernel` (same visiting order, so the
+    same cells and the same cycle count), but the state lives in the packed
+    byte itself — 1 byte/cell of working memory for the whole window. Read the
+    result with `packed_drains`.
+    """
+    if packed.dtype != np.uint8 or packed.ndim != 2 or not packed.flags.c_contiguous:
+        raise ValueError("packed must be a C-contiguous 2-D uint8 array from pack_d8_window")
+    return int(_resolve_packed(packed, _DR, _DC))
+
+
+def drains_to_dprst_kernel(fdr_win, pour_win, barrier_win, fdr_nodata=255, parallel=False):
     """Mark cells whose ESRI-D8 path reaches a depression pour-point.
 
     Pour-point (dprst) cells seed as draining (`_DRAINS`); barrier cells
@@ -294,6 +622,9 @@ def drains_to_dprst_kernel(fdr_win, pour_win, barrier_win, fdr_nodata=255):
         (on-stream waterbody), 0 = background. Required.
     fdr_nodata : int, default 255
         FDR nodata value (treated as a sink).
+    parallel : bool, default False
+        Use the multi-threaded topological kernel (`_resolve_topo`) instead of
+        the serial downstream walk. Same output and the same `n_cycles`.
 
     Returns
     -------
@@ -316,10 +647,13 @@ def drains_to_dprst_kernel(fdr_win, pour_win, barrier_win, fdr_nodata=255):
     fdr = np.ascontiguousarray(fdr_win, dtype=np.uint8)
     pour = np.ascontiguousarray(pour_win, dtype=np.uint8)
     barrier = np.ascontiguousarray(barrier_win, dtype=np.uint8)
+    if parallel:
+        out, _, n_cycles = _resolve_topo(fdr, pour, barrier, _d8_index_lut(fdr_nodata), _DR, _DC, False)
+        return out, n_cycles
     return _resolve(fdr, pour, barrier, np.uint8(fdr_nodata))
 
 
-def drains_to_dprst_labeled_kernel(fdr_win, label_win, barrier_win, fdr_nodata=255):
+def drains_to_dprst_labeled_kernel(fdr_win, label_win, barrier_win, fdr_nodata=255, parallel=False):
     """Per-cell label of the depression its ESRI-D8 path reaches (0 = none).
 
     Like ``drains_to_dprst_kernel`` but attributes each draining cell to a
@@ -334,6 +668,9 @@ def drains_to_dprst_labeled_kernel(fdr_win, label_win, barrier_win, fdr_nodata=2
     the flow path wins. Labels win any (impossible-by-construction) overlap
     with a barrier.
 
+    ``parallel=True`` selects the multi-threaded topological kernel, as for
+    ``drains_to_dprst_kernel``.
+
     Returns ``(out_int32, n_cycles)``.
     """
     # numba runs with bounds-checking off; a smaller label/barrier than fdr
@@ -347,4 +684,7 @@ def drains_to_dprst_labeled_kernel(fdr_win, label_win, barrier_win, fdr_nodata=2
     fdr = np.ascontiguousarray(fdr_win, dtype=np.uint8)
     label = np.ascontiguousarray(label_win, dtype=np.int32)
     barrier = np.ascontiguousarray(barrier_win, dtype=np.uint8)
+    if parallel:
+        _, out, n_cycles = _resolve_topo(fdr, label, barrier, _d8_index_lut(fdr_nodata), _DR, _DC, True)
+        return out, n_cycles
     return _resolve_labeled(fdr, label, barrier, np.uint8(fdr_nodata))
@@ -17,6 +17,8 @@ All raster outputs use the conventions:
   WhiteboxTools only reads PACKBITS/LZW/DEFLATE)
 """
 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
@@ -482,6 +484,39 @@ def vpu_bbox(vpu_id: np.ndarray, code: int) -> tuple[int, int, int, int] | None:
     return int(r[0]), int(r[-1]) + 1, int(c[0]), int(c[-1]) + 1
 
 
+def scan_vpu_bboxes(vpu_id_path: Path, info: RasterInfo, strip_rows: int = 1024,
+                    nodata: int = 0) -> dict[int, tuple[int, int, int, int]]:
+    """Per-code `vpu_bbox` tuples from a strip-wise read of vpu_id.tif.
+
+    Streaming counterpart of `vpu_codes_present` + `vpu_bbox`: never holds more
+    than one `strip_rows`-high strip of the CONUS partition. Returns
+    ``{code: (row_start, row_stop, col_start, col_stop)}`` (stops exclusive)
+    keyed in ascending code order; `nodata` is excluded.
+    """
+    bboxes: dict[int, list[int]] = {}
+    with rasterio.open(vpu_id_path) as src:
+        assert_raster_aligned(src, info, "vpu_id")
+        for row_off in range(0, info.height, strip_rows):
+            h = min(strip_rows, info.height - row_off)
+            strip = src.read(1, window=((row_off, row_off + h), (0, info.width)))
+            for code in np.unique(strip):
+                code = int(code)
+                if code == nodata:
+                    continue
+                hit = strip == code
+                r = np.flatnonzero(hit.any(axis=1))
+                c = np.flatnonzero(hit.any(axis=0))
+                r0, r1 = row_off + int(r[0]), row_off + int(r[-1]) + 1
+                c0, c1 = int(c[0]), int(c[-1]) + 1
+                if code not in bboxes:
+                    bboxes[code] = [r0, r1, c0, c1]
+                else:
+                    b = bboxes[code]
+                    b[0], b[1] = min(b[0], r0), max(b[1], r1)
+                    b[2], b[3] = min(b[2], c0), max(b[3], c1)
+    return {code: tuple(bboxes[code]) for code in sorted(bboxes)}
+
+
 def mask_fdr_to_vpu(fdr_win: np.ndarray, vpu_win: np.ndarray, code: int,
                     nodata: int = 255) -> np.ndarray:
     """FDR restricted to one VPU: cells where vpu != code become `nodata`.
@@ -523,3 +558,72 @@ def assign_vpu_drains(drains: np.ndarray, vpu_id: np.ndarray, code: int,
         labelled = watershed_win != ws_nodata
     sel = (vpu_id[r0:r1, c0:c1] == code) & labelled
     drains[r0:r1, c0:c1][sel] = 1
+
+
+def vpus_largest_first(bboxes: dict[int, tuple[int, int, int, int]]) -> list[int]:
+    """VPU codes ordered by bbox cell count, largest first (ties: ascending code).
+
+    Longest-processing-time-first scheduling for the routing pool: VPU 10 / 03
+    dominate, so starting them first keeps the pool's wall-clock near the
+    largest single VPU instead of leaving it as the tail.
+    """
+    def cells(code):
+        r0, r1, c0, c1 = bboxes[code]
+        return (r1 - r0) * (c1 - c0)
+
+    return sorted(bboxes, key=lambda code: (-cells(code), code))
+
+
+def _vpu_tile_job(job, code: int, bbox, tile_path: Path):
+    """Pool-side wrapper: run `job`, park its window in a .npy tile, return the path."""
+    win, stats = job(code, bbox)
+    tile = np.lib.format.open_memmap(tile_path, mode="w+", dtype=win.dtype, shape=win.shape)
+    tile[:] = win
+    tile.flush()
+    del tile
+    return tile_path, stats
+
+
+def map_vpu_windows(job, bboxes: dict[int, tuple[int, int, int, int]],
+                    workers: int = 1, tile_dir: Path | None = None):
+    """Run ``job(code, bbox) -> (window, stats)`` for every VPU; yield results.
+
+    Yields ``(code, bbox, window, stats)``. With ``workers <= 1`` this is a plain
+    loop in ascending code order. Otherwise VPUs run concurrently in a
+    ProcessPoolExecutor, submitted largest-bbox-first (`vpus_largest_first`) and
+    yielded as they complete. Workers never pickle their window back: each one
+    writes it to a memory-mapped ``.npy`` tile under `tile_dir` and the parent
+    mosaics from the mapped tile, which is deleted once the consumer moves on.
+    Callers must therefore mosaic each window before advancing the generator,
+    and own `tile_dir` cleanup on failure.
+
+    `job` must be picklable (a module-level function, or a functools.partial of
+    one). Workers use the spawn start method: the parent may hold GDAL/numba
+    thread state that is not fork-safe.
+    """
+    if workers <= 1:
+        for code, bbox in bboxes.items():
+            win, stats = job(code, bbox)
+            yield code, bbox, win, stats
+        return
+    if tile_dir is None:
+        raise ValueError("map_vpu_windows needs a tile_dir when workers > 1")
+    tile_dir = Path(tile_dir)
+    tile_dir.mkdir(parents=True, exist_ok=True)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(bboxes)) or 1, mp_context=ctx) as pool:
+        futures = {
+            pool.submit(_vpu_tile_job, job, code, bboxes[code], tile_dir / f"vpu_{code:02d}.npy"): code
+            for code in vpus_largest_first(bboxes)
+        }
+        try:
+            for fut in as_completed(futures):
+                code = futures[fut]
+                tile_path, stats = fut.result()
+                win = np.load(tile_path, mmap_mode="r")
+                yield code, bboxes[code], win, stats
+                del win
+                tile_path.unlink()
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
@@ -17,26 +17,57 @@ pre-barrier raster (coverage can only decrease).
 
 NHDPlus VPU boundaries follow drainage divides, so each VPU's contributing area
 is local: we route each VPU in isolation (FDR masked to the VPU via vpu_id) and
-mosaic the per-VPU results into the CONUS grid. Memory note: this keeps the
-whole-CONUS `vpu_id` + `drains` arrays in RAM (~34 GB); the file-based
-~6-9 GB workstation variant is tracked in issue #129.
+mosaic the per-VPU results into the CONUS grid.
+
+Two IO modes share that tiling, picked by the step's `max_memory_gb` knob
+(`routing_mode`):
+
+- **in-RAM** (default; `max_memory_gb` unset or large enough): whole-CONUS
+  `vpu_id` + `drains` arrays held in RAM (~34 GB) plus the largest VPU window's
+  working copies — ~77 GiB measured on gfv2 CONUS.
+- **streaming** (issue #129): `vpu_id.tif` is bbox-scanned strip by strip, each
+  VPU's masked FDR + pour/barrier seeds are packed into one byte per cell from
+  strip reads of `fdr_aligned.tif` (`d8_routing.pack_d8_window`), resolved in
+  place by `drains_to_dprst_packed_kernel`, and read-modify-written into
+  `drains_to_dprst.tif` strip by strip with the land mask applied per strip.
+  Peak RAM ≈ the largest VPU window at 1 byte/cell (Missouri ≈ 3.1 GB). Same
+  traversal and same visiting order, so the output is bit-identical.
+
+Either mode can route VPUs concurrently (`workers` > 1): `depstor.map_vpu_windows`
+runs the per-VPU `_route_vpu` in a process pool, largest VPU first, and each
+worker hands its window back as a memory-mapped tile that the parent mosaics
+exactly as the serial loop does. Wall-clock drops toward the largest single VPU;
+RAM grows by one VPU window per concurrent worker. `parallel_kernel` instead
+threads the traversal WITHIN a VPU (in-RAM mode; `d8_routing._resolve_topo`),
+which also shortens the largest-VPU critical path.
 """
 
 from __future__ import annotations
 
+import shutil
+from functools import partial
+
 import numpy as np
 import rasterio
 from rasterio.windows import Window
 
-from ..d8_routing import drains_to_dprst_kernel
+from ..d8_routing import (
+    drains_to_dprst_kernel,
+    drains_to_dprst_packed_kernel,
+    pack_d8_window,
+    unpack_drains_inplace,
+)
 from ..depstor import (
     RasterInfo,
     align_fdr_to_dprst_grid,
     assert_raster_aligned,
     assign_vpu_drains,
+    map_vpu_windows,
     mask_fdr_to_vpu,
     read_aligned_uint8,
     read_land_mask,
+    scan_vpu_bboxes,
+    uint8_binary_profile,
     vpu_bbox,
     vpu_codes_present,
     vpu_pour_points,
@@ -48,6 +79,173 @@ from .context import BuildContext
 # FDR is unexpected and is silently treated as a sink by the kernel — surface it.
 _VALID_FDR_VALUES = frozenset({1, 2, 4, 8, 16, 32, 64, 128, 255})
 
+STRIP_ROWS = 1024
+
+# Peak-RAM model behind `max_memory_gb`. In-RAM: two whole-grid uint8 arrays
+# (vpu_id + drains) plus ~14 B/cell of the largest VPU window (fdr/dprst/onstream
+# reads, masked copies, kernel state + output) — 34 GB + 3.1 B cells x 14 B ≈ the
+# 77 GiB measured on gfv2 CONUS. Streaming: the packed window only (1 B/cell).
+_IN_RAM_GRID_BYTES_PER_CELL = 2
+_IN_RAM_WINDOW_BYTES_PER_CELL = 14
+_STREAM_WINDOW_BYTES_PER_CELL = 1
+
+
+def _bbox_cells(bbox: tuple[int, int, int, int]) -> int:
+    r0, r1, c0, c1 = bbox
+    return (r1 - r0) * (c1 - c0)
+
+
+def routing_mode(max_memory_gb, n_grid_cells: int, max_window_cells: int) -> str:
+    """`"in_ram"` or `"streaming"` for a peak-RAM budget in GB.
+
+    `max_memory_gb` None keeps the in-RAM full-array mosaic (the historical
+    behaviour). Otherwise in-RAM is chosen only while its estimated peak fits
+    the budget — it is the faster path (one whole-grid write, no strip RMW).
+    """
+    if max_memory_gb is None:
+        return "in_ram"
+    in_ram_bytes = (n_grid_cells * _IN_RAM_GRID_BYTES_PER_CELL
+                    + max_window_cells * _IN_RAM_WINDOW_BYTES_PER_CELL)
+    return "in_ram" if in_ram_bytes <= float(max_memory_gb) * 1e9 else "streaming"
+
+
+def _log_vpu(logger, code: int, unexpected, n_cycles: int, n_barrier: int, n_vpu: int) -> None:
+    if unexpected:
+        logger.warning(
+            "  VPU %d: FDR window has unexpected code(s) %s — treated "
+            "as sinks; check FDR encoding / nodata.", code, sorted(unexpected),
+        )
+    if n_cycles:
+        logger.warning(
+            "  VPU %d: %d flow cycle(s) in FDR — those cells marked "
+            "non-draining (hydro-conditioned-DEM defect).", code, n_cycles,
+        )
+    if n_barrier:
+        logger.info("  VPU %d: %d on-stream barrier cell(s)", code, n_barrier)
+    if n_vpu == 0:
+        logger.warning(
+            "  VPU %d: 0 cells drain to dprst (%d on-stream barrier "
+            "cell(s)) — expected for a VPU with no depressions or where "
+            "barriers intercept every path, else check "
+            "dprst/vpu_id/onstream alignment.", code, n_barrier,
+        )
+    else:
+        logger.info("  VPU %d: %d cells drain to dprst", code, n_vpu)
+
+
+def _route_vpu(code: int, bbox, *, fdr_path, vpu_id_path, dprst_path, onstream_path,
+               packed: bool, strip_rows: int, parallel_kernel: bool = False):
+    """Route one VPU from its bbox window on disk.
+
+    Returns ``(drained, (unexpected, n_cycles, n_barrier))`` where `drained` is a
+    uint8 bbox window, 1 where a cell of THIS VPU drains to a pour-point, else 0:
+    every other cell in the bbox is masked to an FDR sink with no pour seed, so
+    it can never resolve draining. `packed=True` fills the 1 byte/cell packed
+    window from `strip_rows` strip reads (streaming mode); otherwise the whole
+    window is read at once and routed by `drains_to_dprst_kernel` (its
+    multi-threaded variant with `parallel_kernel`). Module-level so
+    `map_vpu_windows` can run it in a worker process.
+    """
+    r0, r1, c0, c1 = bbox
+    with rasterio.open(fdr_path) as fdr_src, \
+            rasterio.open(vpu_id_path) as vpu_src, \
+            rasterio.open(dprst_path) as dprst_src, \
+            rasterio.open(onstream_path) as onstream_src:
+        if not packed:
+            window = Window(c0, r0, c1 - c0, r1 - r0)
+            vpu_win = vpu_src.read(1, window=window)
+            fdr_masked = mask_fdr_to_vpu(fdr_src.read(1, window=window), vpu_win, code, nodata=255)
+            pour = vpu_pour_points(dprst_src.read(1, window=window), vpu_win, code)
+            # On-stream waterbodies of THIS vpu are traversal barriers, so
+            # land captured by an on-stream lake is not attributed to a
+            # downstream dprst. vpu_pour_points is the generic mask∩VPU op.
+            barrier = vpu_pour_points(onstream_src.read(1, window=window), vpu_win, code)
+            unexpected = set(np.unique(fdr_masked).tolist()) - _VALID_FDR_VALUES
+            # In-process D8 traversal (replaces WBT Watershed). Output is 1
+            # where the cell drains to a pour-point, else 0. Barrier cells
+            # (on-stream waterbodies) stop the traversal before it reaches a pour.
+            drained, n_cycles = drains_to_dprst_kernel(
+                fdr_masked, pour, barrier, fdr_nodata=255, parallel=parallel_kernel,
+            )
+            return drained, (sorted(unexpected), n_cycles, int((barrier == 1).sum()))
+
+        win = np.empty((r1 - r0, c1 - c0), dtype=np.uint8)
+        seen = np.zeros(256, dtype=bool)
+        n_barrier = 0
+        for s0 in range(r0, r1, strip_rows):
+            s1 = min(s0 + strip_rows, r1)
+            window = Window(c0, s0, c1 - c0, s1 - s0)
+            vpu_win = vpu_src.read(1, window=window)
+            fdr_masked = mask_fdr_to_vpu(fdr_src.read(1, window=window), vpu_win, code, nodata=255)
+            pour = vpu_pour_points(dprst_src.read(1, window=window), vpu_win, code)
+            barrier = vpu_pour_points(onstream_src.read(1, window=window), vpu_win, code)
+            seen |= np.bincount(fdr_masked.ravel(), minlength=256) > 0
+            n_barrier += int(barrier.sum())
+            win[s0 - r0:s1 - r0] = pack_d8_window(fdr_masked, pour, barrier, fdr_nodata=255)
+    unexpected = set(np.flatnonzero(seen).tolist()) - _VALID_FDR_VALUES
+    n_cycles = drains_to_dprst_packed_kernel(win)
+    return unpack_drains_inplace(win), (sorted(unexpected), n_cycles, n_barrier)
+
+
+def _route_in_ram(info, job, workers, tile_dir, vpu_id_path, landmask_path,
+                  logger) -> tuple[np.ndarray, int]:
+    """Full-array mosaic: returns the land-masked CONUS `drains` + VPU count."""
+    # read_aligned_uint8 asserts vpu_id is on the exact template grid;
+    # a mismatch would silently mosaic into the wrong CONUS region.
+    vpu_id = read_aligned_uint8(vpu_id_path, info)
+    codes = vpu_codes_present(vpu_id)
+    bboxes = {code: vpu_bbox(vpu_id, code) for code in codes}
+    logger.info("  Tiling routing over %d VPU(s): %s", len(codes), codes)
+
+    drains = np.full((info.height, info.width), np.uint8(255), dtype=np.uint8)
+    for code, bbox, ws_win, stats in map_vpu_windows(job, bboxes, workers, tile_dir):
+        r0, r1, c0, c1 = bbox
+        assign_vpu_drains(drains, vpu_id, code, bbox, ws_win, ws_nodata=0)
+        n_vpu = int((drains[r0:r1, c0:c1][vpu_id[r0:r1, c0:c1] == code] == 1).sum())
+        _log_vpu(logger, code, *stats, n_vpu)
+
+    del vpu_id  # free the CONUS uint8 partition before the final mask
+
+    drains[~read_land_mask(landmask_path)] = 255  # drop off-land (ocean) cells
+    return drains, len(codes)
+
+
+def _route_streaming(info, bboxes, job, workers, tile_dir, landmask_path, output_path,
+                     logger) -> tuple[int, int]:
+    """File-based mosaic (issue #129): returns (n drain cells written, VPU count).
+
+    `drains_to_dprst.tif` on disk is the accumulator: created all-nodata, then
+    per VPU read-modify-written strip by strip (VPU bboxes overlap at corners,
+    so a blind window write would clobber a neighbour's cells). Only the packed
+    VPU window(s) and one strip of each input are resident at a time.
+    """
+    codes = list(bboxes)
+    logger.info("  Tiling routing over %d VPU(s): %s", len(codes), codes)
+    n_in = 0
+    with rasterio.open(output_path, "w+", **uint8_binary_profile(info)) as dst, \
+            rasterio.open(landmask_path) as land_src:
+        assert_raster_aligned(land_src, info, "landmask")
+        for row_off in range(0, info.height, STRIP_ROWS):
+            h = min(STRIP_ROWS, info.height - row_off)
+            dst.write(np.full((h, info.width), np.uint8(255), dtype=np.uint8), 1,
+                      window=Window(0, row_off, info.width, h))
+
+        for code, (r0, r1, c0, c1), drained, stats in map_vpu_windows(job, bboxes, workers, tile_dir):
+            n_vpu = 0
+            for s0 in range(r0, r1, STRIP_ROWS):
+                s1 = min(s0 + STRIP_ROWS, r1)
+                window = Window(c0, s0, c1 - c0, s1 - s0)
+                strip = drained[s0 - r0:s1 - r0] == 1
+                n_vpu += int(strip.sum())
+                sel = strip & (land_src.read(1, window=window) == 1)
+                existing = dst.read(1, window=window)
+                existing[sel] = 1
+                dst.write(existing, 1, window=window)
+                n_in += int(sel.sum())
+            del drained
+            _log_vpu(logger, code, *stats, n_vpu)
+    return n_in, len(codes)
+
 
 def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
     if ctx.fdr_raster is None:
@@ -58,6 +256,9 @@ def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
     onstream_path = ctx.require("onstream")
     vpu_id_path = ctx.require("vpu_id")
     keep_intermediates = bool(step_cfg.get("keep_intermediates", False))
+    max_memory_gb = step_cfg.get("max_memory_gb")
+    workers = int(step_cfg.get("workers", 1))
+    parallel_kernel = bool(step_cfg.get("parallel_kernel", False))
 
     if not ctx.fdr_raster.exists():
         raise FileNotFoundError(f"FDR raster not found: {ctx.fdr_raster}")
@@ -74,87 +275,69 @@ def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
     info = RasterInfo.from_path(ctx.template_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     fdr_aligned = output_path.parent / "fdr_aligned.tif"
+    tile_dir = output_path.parent / f"{output_path.stem}_vpu_tiles"
+
+    # dprst/onstream are windowed by vpu_id's grid; a same-shape but
+    # differently-georeferenced raster would be read at the wrong origin
+    # silently. Assert both are on the template grid (as carea_map does).
+    with rasterio.open(dprst_path) as dprst_src, rasterio.open(onstream_path) as onstream_src:
+        assert_raster_aligned(dprst_src, info, "dprst")
+        assert_raster_aligned(onstream_src, info, "onstream")
+
+    mode = "in_ram"
+    bboxes = None
+    if max_memory_gb is not None:
+        # The bbox scan is a strip-wise pass over vpu_id.tif; only pay it when a
+        # budget is set and the window term of the estimate is needed. With a
+        # pool, the `workers` largest windows can be resident at once.
+        bboxes = scan_vpu_bboxes(vpu_id_path, info, STRIP_ROWS)
+        cells = sorted((_bbox_cells(b) for b in bboxes.values()), reverse=True)
+        max_window = sum(cells[:max(workers, 1)])
+        mode = routing_mode(max_memory_gb, info.height * info.width, max_window)
+        logger.info(
+            "  Mode   : %s (max_memory_gb=%s; %d worker(s); resident VPU windows %d cells)",
+            mode, max_memory_gb, max(workers, 1), max_window,
+        )
+        stream_gb = max_window * _STREAM_WINDOW_BYTES_PER_CELL / 1e9
+        if mode == "streaming" and stream_gb > float(max_memory_gb):
+            logger.warning(
+                "  Resident VPU window(s) need ~%.1f GB packed, above max_memory_gb=%s — "
+                "streaming is the smallest routing footprint; lower `workers` or expect "
+                "to exceed the budget.",
+                stream_gb, max_memory_gb,
+            )
 
+    if workers > 1:
+        logger.info("  Routing VPUs in a %d-process pool, largest VPU first", workers)
+    job = partial(
+        _route_vpu, fdr_path=fdr_aligned, vpu_id_path=vpu_id_path, dprst_path=dprst_path,
+        onstream_path=onstream_path, packed=(mode == "streaming"), strip_rows=STRIP_ROWS,
+        parallel_kernel=parallel_kernel,
+    )
     try:
         align_fdr_to_dprst_grid(ctx.fdr_raster, dprst_path, fdr_aligned, logger)
-
-        # read_aligned_uint8 asserts vpu_id is on the exact template grid;
-        # a mismatch would silently mosaic into the wrong CONUS region.
-        vpu_id = read_aligned_uint8(vpu_id_path, info)
-        codes = vpu_codes_present(vpu_id)
-        logger.info("  Tiling routing over %d VPU(s): %s", len(codes), codes)
-
-        drains = np.full((info.height, info.width), np.uint8(255), dtype=np.uint8)
-
-        with rasterio.open(fdr_aligned) as fdr_src, \
-                rasterio.open(dprst_path) as dprst_src, \
-                rasterio.open(onstream_path) as onstream_src:
-            # dprst/onstream are windowed by vpu_id's grid; a same-shape but
-            # differently-georeferenced raster would be read at the wrong origin
-            # silently. Assert both are on the template grid (as carea_map does).
-            assert_raster_aligned(dprst_src, info, "dprst")
-            assert_raster_aligned(onstream_src, info, "onstream")
-            for code in codes:
-                bbox = vpu_bbox(vpu_id, code)
-                r0, r1, c0, c1 = bbox
-                window = Window(c0, r0, c1 - c0, r1 - r0)
-                vpu_win = vpu_id[r0:r1, c0:c1]
-                fdr_win = fdr_src.read(1, window=window)
-                dprst_win = dprst_src.read(1, window=window)
-                onstream_win = onstream_src.read(1, window=window)
-
-                fdr_masked = mask_fdr_to_vpu(fdr_win, vpu_win, code, nodata=255)
-                pour = vpu_pour_points(dprst_win, vpu_win, code)
-                # On-stream waterbodies of THIS vpu are traversal barriers, so
-                # land captured by an on-stream lake is not attributed to a
-                # downstream dprst. vpu_pour_points is the generic mask∩VPU op.
-                barrier = vpu_pour_points(onstream_win, vpu_win, code)
-
-                unexpected = set(np.unique(fdr_masked).tolist()) - _VALID_FDR_VALUES
-                if unexpected:
-                    logger.warning(
-                        "  VPU %d: FDR window has unexpected code(s) %s — treated "
-                        "as sinks; check FDR encoding / nodata.", code, sorted(unexpected),
-                    )
-
-                # In-process D8 traversal (replaces WBT Watershed). Output is
-                # 1 where the cell drains to a pour-point, else 0, so
-                # assign_vpu_drains treats 0 as nodata. Barrier cells (on-stream
-                # waterbodies) stop the traversal before it reaches a pour.
-                ws_win, n_cycles = drains_to_dprst_kernel(
-                    fdr_masked, pour, barrier, fdr_nodata=255
-                )
-                if n_cycles:
-                    logger.warning(
-                        "  VPU %d: %d flow cycle(s) in FDR — those cells marked "
-                        "non-draining (hydro-conditioned-DEM defect).", code, n_cycles,
-                    )
-                assign_vpu_drains(drains, vpu_id, code, bbox, ws_win, ws_nodata=0)
-                n_vpu = int((drains[r0:r1, c0:c1][vpu_win == code] == 1).sum())
-                n_barrier = int((barrier == 1).sum())
-                if n_barrier:
-                    logger.info("  VPU %d: %d on-stream barrier cell(s)", code, n_barrier)
-                if n_vpu == 0:
-                    logger.warning(
-                        "  VPU %d: 0 cells drain to dprst (%d on-stream barrier "
-                        "cell(s)) — expected for a VPU with no depressions or where "
-                        "barriers intercept every path, else check "
-                        "dprst/vpu_id/onstream alignment.", code, n_barrier,
-                    )
-                else:
-                    logger.info("  VPU %d: %d cells drain to dprst", code, n_vpu)
+        if mode == "streaming":
+            n_in, n_codes = _route_streaming(
+                info, bboxes, job, workers, tile_dir, landmask_path, output_path, logger,
+            )
+        else:
+            drains, n_codes = _route_in_ram(
+                info, job, workers, tile_dir, vpu_id_path, landmask_path, logger,
+            )
+            n_in = int((drains == 1).sum())
     finally:
         if not keep_intermediates and fdr_aligned.exists():
             fdr_aligned.unlink()
+        shutil.rmtree(tile_dir, ignore_errors=True)
 
-    del vpu_id  # free the CONUS uint8 partition before the final mask
-
-    drains[~read_land_mask(landmask_path)] = 255  # drop off-land (ocean) cells
-    n_in = int((drains == 1).sum())
-    pct = 100 * n_in / drains.size
+    pct = 100 * n_in / (info.height * info.width)
     if n_in == 0:
+        if mode == "streaming":
+            # Already written strip by strip; don't leave a product that a
+            # rerun without --force would skip over.
+            output_path.unlink()
         raise RuntimeError(
-            f"drains_to_dprst is all-nodata after routing {len(codes)} VPU(s) — "
+            f"drains_to_dprst is all-nodata after routing {n_codes} VPU(s) — "
             "an all-empty mask is never a valid product. Check that dprst, vpu_id, "
             "and the FDR are aligned to the same template grid."
         )
@@ -164,7 +347,8 @@ def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
             "Check the pour-point mask (kernel background=0), FDR, and vpu_id "
             "alignment.", pct,
         )
-    write_uint8_binary(drains, info, output_path)
+    if mode == "in_ram":
+        write_uint8_binary(drains, info, output_path)
     logger.info(
         "  Drains-to-dprst mask written: %s (%d cells, %.4f%% of grid)",
         output_path, n_in, pct,
@@ -4,10 +4,15 @@ Same per-VPU D8 tiling as `routing`, but each depression cell is labelled by its
 HRU id (hru_id.tif) and the labeled kernel attributes every draining cell to the
 HRU of the depression it reaches. On-stream waterbodies are barriers. Written
 per-VPU windowed: the int32 output is ~4x the binary drains, so it is never held
-whole-CONUS.
+whole-CONUS. `workers` > 1 routes VPUs concurrently in a process pool (largest
+VPU first; see `depstor.map_vpu_windows`), with the same windowed mosaic;
+`parallel_kernel` threads the labeled traversal within each VPU.
 """
 from __future__ import annotations
 
+import shutil
+from functools import partial
+
 import numpy as np
 import rasterio
 from rasterio.windows import Window
@@ -17,14 +22,50 @@ from ..depstor import (
     RasterInfo,
     align_fdr_to_dprst_grid,
     assert_raster_aligned,
+    map_vpu_windows,
     mask_fdr_to_vpu,
-    read_aligned_uint8,
-    vpu_bbox,
-    vpu_codes_present,
+    scan_vpu_bboxes,
     vpu_pour_points,
 )
 from .context import BuildContext
 
+STRIP_ROWS = 1024
+
+
+def _route_vpu_labeled(code: int, bbox, *, fdr_path, vpu_id_path, dprst_path, onstream_path,
+                       hru_id_path, landmask_path, parallel_kernel: bool = False):
+    """Route one VPU window; returns ``(labels, n_cycles)``.
+
+    `labels` is the int32 bbox window holding the reached depression's HRU id at
+    this VPU's on-land drain cells and 0 elsewhere. Module-level so
+    `map_vpu_windows` can run it in a worker process.
+    """
+    r0, r1, c0, c1 = bbox
+    window = Window(c0, r0, c1 - c0, r1 - r0)
+    with rasterio.open(fdr_path) as fdr_src, \
+            rasterio.open(vpu_id_path) as vpu_src, \
+            rasterio.open(dprst_path) as dprst_src, \
+            rasterio.open(onstream_path) as onstream_src, \
+            rasterio.open(hru_id_path) as hru_src, \
+            rasterio.open(landmask_path) as land_src:
+        vpu_win = vpu_src.read(1, window=window)
+        fdr_win = fdr_src.read(1, window=window)
+        dprst_win = dprst_src.read(1, window=window)
+        onstream_win = onstream_src.read(1, window=window)
+        hru_win = hru_src.read(1, window=window)
+        land_win = land_src.read(1, window=window)
+
+    fdr_masked = mask_fdr_to_vpu(fdr_win, vpu_win, code, nodata=255)
+    label = np.where((dprst_win == 1) & (vpu_win == code), hru_win, 0).astype(np.int32)
+    barrier = vpu_pour_points(onstream_win, vpu_win, code)
+    out, n_cycles = drains_to_dprst_labeled_kernel(
+        fdr_masked, label, barrier, fdr_nodata=255, parallel=parallel_kernel,
+    )
+    # Only this VPU's cells, and only where land_mask.tif confirms the cell is
+    # land (never use FDR/hydro-DEM nodata as a land mask — see CLAUDE.md).
+    sel = (vpu_win == code) & (out > 0) & (land_win == 1)
+    return np.where(sel, out, 0).astype(np.int32), n_cycles
+
 
 def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
     if ctx.fdr_raster is None or not ctx.fdr_raster.exists():
@@ -36,6 +77,8 @@ def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
     vpu_id_path = ctx.require("vpu_id")
     hru_id_path = ctx.require("hru_id")
     keep_intermediates = bool(step_cfg.get("keep_intermediates", False))
+    workers = int(step_cfg.get("workers", 1))
+    parallel_kernel = bool(step_cfg.get("parallel_kernel", False))
 
     logger.info("--- routing_hru (per-VPU labeled) ---")
     if output_path.exists() and not ctx.force:
@@ -45,11 +88,31 @@ def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
     info = RasterInfo.from_path(ctx.template_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     fdr_aligned = output_path.parent / "fdr_aligned_hru.tif"
+    tile_dir = output_path.parent / f"{output_path.stem}_vpu_tiles"
+
+    # dprst/onstream/hru_id/landmask are windowed by vpu_id's grid; a
+    # same-shape but differently-georeferenced raster would be read at
+    # the wrong origin silently. Assert all are on the template grid
+    # (as routing.py does for dprst/onstream).
+    for key, path in (("dprst", dprst_path), ("onstream", onstream_path),
+                      ("hru_id", hru_id_path), ("landmask", landmask_path)):
+        with rasterio.open(path) as src:
+            assert_raster_aligned(src, info, key)
 
     try:
         align_fdr_to_dprst_grid(ctx.fdr_raster, dprst_path, fdr_aligned, logger)
-        vpu_id = read_aligned_uint8(vpu_id_path, info)
-        codes = vpu_codes_present(vpu_id)
+        # Strip-wise bbox scan (also asserts vpu_id is on the template grid):
+        # no whole-CONUS vpu_id array.
+        bboxes = scan_vpu_bboxes(vpu_id_path, info, STRIP_ROWS)
+        codes = list(bboxes)
+        if workers > 1:
+            logger.info("  Routing %d VPU(s) in a %d-process pool, largest VPU first",
+                        len(codes), workers)
+        job = partial(
+            _route_vpu_labeled, fdr_path=fdr_aligned, vpu_id_path=vpu_id_path,
+            dprst_path=dprst_path, onstream_path=onstream_path, hru_id_path=hru_id_path,
+            landmask_path=landmask_path, parallel_kernel=parallel_kernel,
+        )
 
         profile = dict(
             driver="GTiff", height=info.height, width=info.width, count=1,
@@ -57,45 +120,16 @@ def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
             compress="LZW", tiled=True, blockxsize=256, blockysize=256,
         )
         profile["BIGTIFF"] = "YES"
-        with rasterio.open(output_path, "w+", **profile) as dst, \
-                rasterio.open(fdr_aligned) as fdr_src, \
-                rasterio.open(dprst_path) as dprst_src, \
-                rasterio.open(onstream_path) as onstream_src, \
-                rasterio.open(hru_id_path) as hru_src, \
-                rasterio.open(landmask_path) as land_src:
-            # dprst/onstream/hru_id/landmask are windowed by vpu_id's grid; a
-            # same-shape but differently-georeferenced raster would be read at
-            # the wrong origin silently. Assert all are on the template grid
-            # (as routing.py does for dprst/onstream).
-            assert_raster_aligned(dprst_src, info, "dprst")
-            assert_raster_aligned(onstream_src, info, "onstream")
-            assert_raster_aligned(hru_src, info, "hru_id")
-            assert_raster_aligned(land_src, info, "landmask")
+        with rasterio.open(output_path, "w+", **profile) as dst:
             n_total = 0
-            for code in codes:
-                bbox = vpu_bbox(vpu_id, code)
-                r0, r1, c0, c1 = bbox
-                window = Window(c0, r0, c1 - c0, r1 - r0)
-                vpu_win = vpu_id[r0:r1, c0:c1]
-                fdr_win = fdr_src.read(1, window=window)
-                dprst_win = dprst_src.read(1, window=window)
-                onstream_win = onstream_src.read(1, window=window)
-                hru_win = hru_src.read(1, window=window)
-                land_win = land_src.read(1, window=window)
-
-                fdr_masked = mask_fdr_to_vpu(fdr_win, vpu_win, code, nodata=255)
-                label = np.where((dprst_win == 1) & (vpu_win == code), hru_win, 0).astype(np.int32)
-                barrier = vpu_pour_points(onstream_win, vpu_win, code)
-                out, n_cycles = drains_to_dprst_labeled_kernel(fdr_masked, label, barrier, fdr_nodata=255)
+            for code, (r0, r1, c0, c1), labels, n_cycles in map_vpu_windows(job, bboxes, workers, tile_dir):
                 if n_cycles:
                     logger.warning("  VPU %d: %d flow cycle(s) — cells non-draining", code, n_cycles)
-
-                # read-modify-write only this VPU's cells (bboxes overlap at corners),
-                # and only where land_mask.tif confirms the cell is land (never use
-                # FDR/hydro-DEM nodata as a land mask — see CLAUDE.md).
+                # read-modify-write only this VPU's cells (bboxes overlap at corners).
+                window = Window(c0, r0, c1 - c0, r1 - r0)
                 existing = dst.read(1, window=window)
-                sel = (vpu_win == code) & (out > 0) & (land_win == 1)
-                existing[sel] = out[sel]
+                sel = labels > 0
+                existing[sel] = labels[sel]
                 dst.write(existing, 1, window=window)
                 n_sel = int(sel.sum())
                 n_total += n_sel
@@ -103,6 +137,7 @@ def build(step_cfg: dict, ctx: BuildContext, logger) -> dict:
     finally:
         if not keep_intermediates and fdr_aligned.exists():
             fdr_aligned.unlink()
+        shutil.rmtree(tile_dir, ignore_errors=True)
 
     if n_total == 0:
         raise RuntimeError(
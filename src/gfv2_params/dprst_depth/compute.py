@@ -27,11 +27,21 @@ Three layers, ordered by how much I/O they touch:
   per polygon (that would defeat the whole point: a fresh
   `rasterio.open` + fresh HTTP range reads for every polygon sharing a
   tile).
+
+`run_batch(prefetch_tiles=N)` overlaps the two halves of that loop: a
+thread pool opens and reads the windows of the next N tiles while the main
+thread runs `_polygon_depth_from_dem` on the current one (GDAL releases the
+GIL during reads), bounded by `prefetch_mb` of windows held in memory — see
+`_ReadBudget`/`_prefetch_tile`.
 """
 from __future__ import annotations
 
 import logging
+import queue
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -44,7 +54,8 @@ from rasterio.errors import RasterioIOError
 from rasterio.vrt import WarpedVRT
 from rasterio.windows import from_bounds
 
-from .tiling import group_by_tile
+from .tile_cache import TileCache, resolve_tile, use_tile_cache
+from .tiling import TIMING_COLUMNS, _tile_resolution, _window_cells, group_by_tile
 from .topo import (
     _interior_mask,
     _native_resolution,
@@ -107,7 +118,12 @@ def _polygon_depth_from_dem(
     otherwise ``dprst_depth_m`` is the V/A mean depth and ``measured_max_m``
     the max cell depth, both over `interior_mask`, both metres.
     """
-    dem = np.asarray(dem, dtype=np.float64)
+    # Keep the window's own dtype (float32 from `_read_tile_window`):
+    # `depth_to_spill` fills it in place and `lake_max_depth` /
+    # `is_hydroflattened` widen only what they need.
+    dem = np.asarray(dem)
+    if not np.issubdtype(dem.dtype, np.floating):
+        dem = dem.astype(np.float32)
     interior_mask = np.asarray(interior_mask, dtype=bool)
 
     hollister_max_m = float(lake_max_depth(dem, interior_mask, transform))
@@ -168,9 +184,10 @@ def _open_tile_vrt(tile_key: str):
     single window and closing: `run_batch` issues one windowed read per
     polygon assigned to this tile against the SAME open VRT, so GDAL's
     per-dataset block cache stays warm across them and the tile's
-    COG header/IFD is only fetched once.
+    COG header/IFD is only fetched once. The key is resolved through the
+    active `tile_cache.TileCache` (local mirror/cache first), if any.
     """
-    with rasterio.open(tile_key) as src:
+    with rasterio.open(resolve_tile(tile_key)) as src:
         resolution = _native_resolution(src, "EPSG:5070")
         with WarpedVRT(
             src, crs="EPSG:5070", resampling=Resampling.nearest, resolution=resolution
@@ -205,7 +222,7 @@ def _read_tile_window(vrt, geom, rim_buffer_m: float = 200.0) -> tuple[np.ndarra
 
 def _resolution_from_tile_key(tile_key: str) -> str:
     """`"1m"`/`"10m"` from a tile key's filename convention (Task 3's `tiling.py`)."""
-    return "1m" if "USGS_1M_" in tile_key else "10m"
+    return _tile_resolution(tile_key)
 
 
 def _project_lookup(dprst_gdf: gpd.GeoDataFrame, wesm_gdf: gpd.GeoDataFrame) -> pd.Series:
@@ -228,6 +245,114 @@ def _project_lookup(dprst_gdf: gpd.GeoDataFrame, wesm_gdf: gpd.GeoDataFrame) ->
     return hit.groupby(level=0)["project"].first()
 
 
+# Marks a tile whose open failed (the exception follows) / a finished tile
+# on a prefetch queue.
+_TILE_FAILED = object()
+_TILE_DONE = object()
+
+
+class _ReadBudget:
+    """Bytes of prefetched windows in flight, and how far ahead readers may run.
+
+    Tile `pos` may read a window only while it is at most `depth` tiles ahead
+    of the tile being computed (`head`) and the window fits under
+    `max_bytes` (an oversized window is let through once nothing else is
+    held). The head tile's reads are never held back, so the tile the main
+    thread waits on always progresses.
+    """
+
+    def __init__(self, max_bytes: float, depth: int) -> None:
+        self._cv = threading.Condition()
+        self.max_bytes = max_bytes
+        self.depth = depth
+        self.used = 0
+        self.head = 0
+        self.closed = False
+
+    def acquire(self, pos: int, nbytes: int) -> bool:
+        with self._cv:
+            self._cv.wait_for(lambda: self.closed or pos <= self.head or (
+                pos <= self.head + self.depth
+                and (self.used == 0 or self.used + nbytes <= self.max_bytes)
+            ))
+            if self.closed:
+                return False
+            self.used += nbytes
+            return True
+
+    def release(self, nbytes: int) -> None:
+        with self._cv:
+            self.used -= nbytes
+            self._cv.notify_all()
+
+    def advance(self, pos: int) -> None:
+        with self._cv:
+            self.head = pos
+            self._cv.notify_all()
+
+    def close(self) -> None:
+        with self._cv:
+            self.closed = True
+            self._cv.notify_all()
+
+
+def _window_bytes(dprst_gdf: gpd.GeoDataFrame, idxs: list, resolution: str) -> list[int]:
+    """Estimated float32 bytes of each polygon's `_read_tile_window` read."""
+    return [int(c * 4) for c in _window_cells(dprst_gdf.loc[idxs], resolution)]
+
+
+def _prefetch_tile(tile_key, pos, idxs, geoms, nbytes, budget: _ReadBudget, out: queue.Queue) -> None:
+    """Pool-side: open `tile_key` and queue ``(idx, (dem, transform) | exception, nbytes,
+    read seconds)`` per polygon, then `_TILE_DONE`; a failed open queues
+    ``(_TILE_FAILED, exc, 0, 0.0)``. The open's time is charged to the first window."""
+    try:
+        t0 = time.perf_counter()
+        with rasterio.Env(**_ENV_OPTS), _open_tile_vrt(tile_key) as vrt:
+            opened = time.perf_counter() - t0
+            for idx, geom, size in zip(idxs, geoms, nbytes):
+                if not budget.acquire(pos, size):
+                    return
+                t0 = time.perf_counter()
+                try:
+                    item = _read_tile_window(vrt, geom)
+                except Exception as exc:  # noqa: BLE001 - classified by the consumer
+                    item = exc
+                out.put((idx, item, size, opened + time.perf_counter() - t0))
+                opened = 0.0
+    except Exception as exc:  # noqa: BLE001 - classified by the consumer
+        out.put((_TILE_FAILED, exc, 0, 0.0))
+    finally:
+        out.put((_TILE_DONE, None, 0, 0.0))
+
+
+def _serial_windows(tile_key, idxs, geoms):
+    """Yield ``(idx, (dem, transform) | exception, read seconds)`` reading `tile_key` inline."""
+    t0 = time.perf_counter()
+    with _open_tile_vrt(tile_key) as vrt:
+        for idx, geom in zip(idxs, geoms):
+            try:
+                item = _read_tile_window(vrt, geom)
+            except Exception as exc:  # noqa: BLE001 - classified by the consumer
+                item = exc
+            yield idx, item, time.perf_counter() - t0
+            t0 = time.perf_counter()
+
+
+def _prefetched_windows(out: queue.Queue, budget: _ReadBudget, pos: int):
+    """`_serial_windows` for a tile read by `_prefetch_tile`; releases each window's budget."""
+    budget.advance(pos)
+    while True:
+        idx, item, size, read_s = out.get()
+        if idx is _TILE_DONE:
+            return
+        if idx is _TILE_FAILED:
+            raise item
+        try:
+            yield idx, item, read_s
+        finally:
+            budget.release(size)
+
+
 def _empty_batch_frame() -> pd.DataFrame:
     return pd.DataFrame(columns=_OUTPUT_COLUMNS)
 
@@ -238,6 +363,10 @@ def run_batch(
     wesm_gdf: gpd.GeoDataFrame,
     out_parquet: str | Path,
     logger: logging.Logger,
+    tile_cache: TileCache | None = None,
+    prefetch_tiles: int = 0,
+    prefetch_mb: float = 2048.0,
+    timings_parquet: str | Path | None = None,
 ) -> pd.DataFrame:
     """Compute `_polygon_depth_from_dem` for every polygon covered by `tile_keys`.
 
@@ -267,6 +396,20 @@ def run_batch(
     `dprst_depth_m`, `measured_max_m`, `hollister_max_m`, `flat`,
     `resolution`, `method`) and returns the same DataFrame.
 
+    `tile_cache` (see `tile_cache.tile_cache_from_config`) serves every tile
+    read of the batch — tile opens and the `compute_polygon` fallback —
+    from the local mirror / shared on-disk cache before the network.
+
+    `prefetch_tiles > 0` reads the next `prefetch_tiles` tiles' windows on a
+    thread pool while the current tile computes, holding at most
+    `prefetch_mb` of prefetched windows (estimated from the polygon bounds);
+    rows, counts and logs are the same as the serial (`0`) loop.
+
+    `timings_parquet`, if given, gets one `tiling.TIMING_COLUMNS` row per
+    tile that opened (read/compute/wall seconds, polygon and flat counts,
+    estimated window cells) plus one `tile_key=None` row per fallback
+    polygon — the records `tiling.fit_cost_model` calibrates the next plan on.
+
     Failures are counted in two SEPARATE buckets so a systematic code bug
     can't hide behind the expected rate of routine tile gaps (#173 PR#177
     review FIX 2):
@@ -305,6 +448,7 @@ def run_batch(
     n_polygons = len(tiles_per_polygon)
 
     rows: list[dict] = []
+    timings: list[dict] = []
     done: set = set()
     n_tile_reads = 0
     n_fallback = 0
@@ -317,22 +461,48 @@ def run_batch(
         rows.append(result)
         done.add(idx)
 
-    with rasterio.Env(**_ENV_OPTS):
-        for tile_key in tile_keys:
-            idxs = batch_groups.get(tile_key, [])
-            single_tile_idxs = [
-                idx for idx in idxs if idx not in done and len(tiles_per_polygon[idx]) == 1
-            ]
-            if not single_tile_idxs:
-                continue
-            try:
-                with _open_tile_vrt(tile_key) as vrt:
-                    n_tile_reads += 1
-                    resolution = _resolution_from_tile_key(tile_key)
-                    for idx in single_tile_idxs:
+    # Each tile's single-tile polygons; a multi-tile polygon waits for the fallback.
+    plan = []
+    for tile_key in dict.fromkeys(tile_keys):
+        idxs = [idx for idx in batch_groups.get(tile_key, []) if len(tiles_per_polygon[idx]) == 1]
+        if idxs:
+            plan.append((tile_key, idxs))
+
+    with rasterio.Env(**_ENV_OPTS), use_tile_cache(tile_cache):
+        pool = budget = queues = None
+        if prefetch_tiles > 0 and plan:
+            pool = ThreadPoolExecutor(max_workers=prefetch_tiles, thread_name_prefix="dprst-prefetch")
+            budget = _ReadBudget(prefetch_mb * 1024**2, prefetch_tiles)
+            queues = []
+            for pos, (tile_key, idxs) in enumerate(plan):
+                q: queue.Queue = queue.Queue()
+                queues.append(q)
+                pool.submit(
+                    _prefetch_tile, tile_key, pos, idxs, list(dprst_gdf.geometry.loc[idxs]),
+                    _window_bytes(dprst_gdf, idxs, _resolution_from_tile_key(tile_key)), budget, q,
+                )
+            logger.info("run_batch: prefetching %d tile(s) ahead (<= %.0f MB of windows)",
+                        prefetch_tiles, prefetch_mb)
+        try:
+            for pos, (tile_key, single_tile_idxs) in enumerate(plan):
+                if budget is not None:
+                    windows = _prefetched_windows(queues[pos], budget, pos)
+                else:
+                    windows = _serial_windows(tile_key, single_tile_idxs,
+                                              list(dprst_gdf.geometry.loc[single_tile_idxs]))
+                resolution = _resolution_from_tile_key(tile_key)
+                tile_t0 = time.perf_counter()
+                read_s = compute_s = 0.0
+                flat_idxs = []
+                try:
+                    for idx, window, window_read_s in windows:
+                        read_s += window_read_s
                         geom = dprst_gdf.geometry.loc[idx]
+                        t0 = time.perf_counter()
                         try:
-                            dem, transform = _read_tile_window(vrt, geom)
+                            if isinstance(window, Exception):
+                                raise window
+                            dem, transform = window
                             interior_mask = _interior_mask(dem, transform, geom)
                             result = _polygon_depth_from_dem(dem, interior_mask, transform)
                         except RasterioIOError as exc:
@@ -357,36 +527,53 @@ def run_batch(
                                 tile_key, idx, type(exc).__name__, exc,
                             )
                             continue
+                        finally:
+                            compute_s += time.perf_counter() - t0
                         result["resolution"] = resolution
                         result["method"] = "flat_pending" if result["flat"] else "measured"
+                        if result["flat"]:
+                            flat_idxs.append(idx)
                         _emit(idx, result)
-            except RasterioIOError as exc:
-                # Expected: the tile key doesn't exist (a routine 404/read
-                # gap) — its polygons still get a chance via the multi-tile
-                # fallback below.
-                n_read_failure += 1
-                logger.warning(
-                    "  tile=%s: read failure opening tile (%s) — its %d single-tile "
-                    "polygon(s) skipped this batch",
-                    tile_key, exc, len(single_tile_idxs),
-                )
-                continue
-            except Exception as exc:  # noqa: BLE001 - log loud, skip the tile, never abort the batch
-                # Unexpected: a corrupt COG, bad CRS, MemoryError, etc — a
-                # real code/data bug distinct from a routine tile-absent
-                # read failure. ERROR so it's loud.
-                n_compute_error += 1
-                logger.error(
-                    "  tile=%s: UNEXPECTED error opening tile (%s: %s) — its %d single-tile "
-                    "polygon(s) skipped this batch",
-                    tile_key, type(exc).__name__, exc, len(single_tile_idxs),
-                )
-                continue
-            if n_tile_reads % 25 == 0:
-                logger.info(
-                    "  [%d polygons / %d tiles read] tile=%s (%d polygons)",
-                    len(rows), n_tile_reads, tile_key, len(single_tile_idxs),
-                )
+                except RasterioIOError as exc:
+                    # Expected: the tile key doesn't exist (a routine 404/read
+                    # gap) — its polygons still get a chance via the multi-tile
+                    # fallback below.
+                    n_read_failure += 1
+                    logger.warning(
+                        "  tile=%s: read failure opening tile (%s) — its %d single-tile "
+                        "polygon(s) skipped this batch",
+                        tile_key, exc, len(single_tile_idxs),
+                    )
+                    continue
+                except Exception as exc:  # noqa: BLE001 - log loud, skip the tile, never abort the batch
+                    # Unexpected: a corrupt COG, bad CRS, MemoryError, etc — a
+                    # real code/data bug distinct from a routine tile-absent
+                    # read failure. ERROR so it's loud.
+                    n_compute_error += 1
+                    logger.error(
+                        "  tile=%s: UNEXPECTED error opening tile (%s: %s) — its %d single-tile "
+                        "polygon(s) skipped this batch",
+                        tile_key, type(exc).__name__, exc, len(single_tile_idxs),
+                    )
+                    continue
+                n_tile_reads += 1
+                cells = _window_cells(dprst_gdf.loc[single_tile_idxs], resolution)
+                timings.append({
+                    "tile_key": tile_key, "resolution": resolution,
+                    "n_polygons": len(single_tile_idxs), "n_flat": len(flat_idxs),
+                    "window_cells": float(cells.sum()), "flat_cells": float(cells.loc[flat_idxs].sum()),
+                    "read_s": read_s, "compute_s": compute_s,
+                    "wall_s": time.perf_counter() - tile_t0,
+                })
+                if n_tile_reads % 25 == 0:
+                    logger.info(
+                        "  [%d polygons / %d tiles read] tile=%s (%d polygons)",
+                        len(rows), n_tile_reads, tile_key, len(single_tile_idxs),
+                    )
+        finally:
+            if pool is not None:
+                budget.close()   # readers blocked on the budget return
+                pool.shutdown(wait=True, cancel_futures=True)   # never open the unread tiles
 
         remaining = [idx for idx in tiles_per_polygon if idx not in done]
         project_lookup = _project_lookup(dprst_gdf, wesm_gdf) if remaining else pd.Series(dtype=object)
@@ -394,6 +581,7 @@ def run_batch(
             row = dprst_gdf.loc[idx]
             project = project_lookup.get(idx)
             wesm_row = {"project": project} if pd.notna(project) else None
+            t0 = time.perf_counter()
             try:
                 result = compute_polygon(row.geometry, row["best_topo"], wesm_row=wesm_row)
             except RasterioIOError as exc:
@@ -411,12 +599,24 @@ def run_batch(
                 )
                 continue
             n_fallback += 1
+            elapsed = time.perf_counter() - t0
+            cells = float(_window_cells(dprst_gdf.loc[[idx]], result["resolution"]).iloc[0])
+            timings.append({
+                "tile_key": None, "resolution": result["resolution"],
+                "n_polygons": 1, "n_flat": int(bool(result["flat"])),
+                "window_cells": cells, "flat_cells": cells if result["flat"] else 0.0,
+                "read_s": 0.0, "compute_s": elapsed, "wall_s": elapsed,
+            })
             _emit(idx, result)
 
     out_df = pd.DataFrame(rows)
     if out_df.empty:
         out_df = _empty_batch_frame()
     out_df.to_parquet(out_parquet, index=False)
+    if timings_parquet is not None:
+        timings_parquet = Path(timings_parquet)
+        timings_parquet.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(timings, columns=TIMING_COLUMNS).to_parquet(timings_parquet, index=False)
 
     success_fraction = len(out_df) / n_polygons if n_polygons else 1.0
     summary_args = (
@@ -431,6 +631,8 @@ def run_batch(
     # firewall regression) or ANY unexpected compute error must not ship
     # silently at INFO — escalate the whole summary line so it's visible in
     # a normal log scan.
+    if tile_cache is not None:
+        logger.info("run_batch: %s", tile_cache.summary())
     if n_compute_error > 0:
         logger.error(summary_fmt, *summary_args)
     elif success_fraction < 0.90:
@@ -0,0 +1,221 @@
+"""Persistent local cache of 3DEP elevation tiles for dprst_depth reads.
+
+`topo.read_window` and `compute._open_tile_vrt` read the 3DEP COGs over
+``/vsicurl/`` (see topo.py's module notes), so every array task — and every
+re-run or retry of one — fetches the same COG blocks from S3 again. A
+`TileCache` resolves a tile's remote path to a local file instead, in order:
+
+1. ``mirror_dir/<object key>`` — a read-only local mirror laid out like the
+   bucket (e.g. an ``aws s3 sync`` of ``StagedProducts/Elevation/13/TIFF``);
+2. ``cache_dir/<h[:2]>/<h>.tif`` — the shared cache, addressed by ``h``, the
+   SHA-256 of the tile's object key, so every worker on the shared
+   filesystem agrees on where a tile lives;
+3. the remote tile, downloaded whole into the cache (temp name + rename, so
+   concurrent workers never see a partial file) when ``remote=True``.
+
+With ``remote=False`` a tile found in neither place raises
+`RasterioIOError`, the same "tile absent" signal a 404 gives, so callers'
+existing failure accounting is unchanged. A download that 404s (a 1 m
+candidate tile that was never published, say) raises it too, and leaves an
+empty ``<h>.missing`` marker beside where the tile would live, so later
+probes of that key, in this run or a re-run, skip the network entirely.
+Delete the markers (``cache_dir/*/*.missing``) after a 3DEP release that
+publishes new tiles. Any other failed download (timeout, 5xx, ...) falls
+back to the remote path itself and lets GDAL retry it as before.
+
+The cache is capped at ``max_bytes``: a hit touches the file's mtime and an
+insert evicts least-recently-used files (oldest mtime first, never the one
+just written) under an advisory lock, so concurrent workers do not both
+evict. An evicted tile that another worker already has open stays readable
+(POSIX unlink semantics).
+
+`use_tile_cache` activates a cache for a block of code; `resolve_tile` is
+the identity outside it, so the read paths work unchanged without one.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+from rasterio.errors import RasterioIOError
+
+logger = logging.getLogger(__name__)
+
+_VSICURL = "/vsicurl/"
+_VSIS3 = "/vsis3/"
+_LOCK_NAME = ".evict.lock"
+_FETCH_TIMEOUT_S = 120
+_COPY_BUFSIZE = 8 * 1024**2
+
+# The cache in effect for `resolve_tile` (set by `use_tile_cache`). A plain
+# module global, not a contextvar, so prefetch threads see it too.
+_ACTIVE: TileCache | None = None
+
+
+def _object_key(path: str) -> str | None:
+    """Bucket-relative key of a ``/vsicurl/`` or ``/vsis3/`` tile path; None for a local path."""
+    if path.startswith(_VSICURL):
+        return urlparse(path[len(_VSICURL):]).path.lstrip("/") or None
+    if path.startswith(_VSIS3):
+        _bucket, _, key = path[len(_VSIS3):].partition("/")
+        return key or None
+    return None
+
+
+def _remote_url(path: str) -> str:
+    if path.startswith(_VSICURL):
+        return path[len(_VSICURL):]
+    bucket, _, key = path[len(_VSIS3):].partition("/")
+    return f"https://{bucket}.s3.amazonaws.com/{key}"
+
+
+class TileCache:
+    """Local mirror + size-capped LRU download cache in front of remote tiles."""
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None,
+        max_bytes: int,
+        mirror_dir: str | Path | None = None,
+        remote: bool = True,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_bytes = int(max_bytes)
+        self.mirror_dir = Path(mirror_dir) if mirror_dir else None
+        self.remote = remote
+        self.hits = self.mirror_hits = self.fetches = self.known_missing = 0
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def cached_path(self, key: str) -> Path:
+        h = hashlib.sha256(key.encode()).hexdigest()
+        return self.cache_dir / h[:2] / f"{h}.tif"
+
+    def missing_marker(self, key: str) -> Path:
+        return self.cached_path(key).with_suffix(".missing")
+
+    def resolve(self, path: str) -> str:
+        """Local path serving `path` (see module docstring for the lookup order)."""
+        key = _object_key(path)
+        if key is None:
+            return path
+        if self.mirror_dir is not None:
+            mirrored = self.mirror_dir / key
+            if mirrored.exists():
+                self.mirror_hits += 1
+                return str(mirrored)
+        if self.cache_dir is not None:
+            cached = self.cached_path(key)
+            if cached.exists():
+                try:
+                    os.utime(cached)
+                except FileNotFoundError:   # evicted by another worker just now
+                    pass
+                else:
+                    self.hits += 1
+                    return str(cached)
+            if self.missing_marker(key).exists():
+                self.known_missing += 1
+                raise RasterioIOError(f"{path}: not published (cached 404)")
+        if not self.remote:
+            raise RasterioIOError(f"{path}: not in the tile mirror/cache and remote reads are disabled")
+        if self.cache_dir is None:
+            return path
+        try:
+            self._fetch(path, cached)
+        except (urllib.error.URLError, OSError) as exc:
+            if isinstance(exc, urllib.error.HTTPError) and exc.code == 404:
+                self.missing_marker(key).touch()
+                raise RasterioIOError(f"{path}: not published (HTTP 404)") from exc
+            logger.debug("tile cache: fetch of %s failed (%s); reading remotely", path, exc)
+            return path
+        self.fetches += 1
+        self._evict(keep=cached)
+        return str(cached)
+
+    def _fetch(self, path: str, dest: Path) -> None:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = None
+        try:
+            # A unique temp name per call, not per process: prefetch threads
+            # share the pid.
+            with urllib.request.urlopen(_remote_url(path), timeout=_FETCH_TIMEOUT_S) as resp, \
+                    tempfile.NamedTemporaryFile(dir=dest.parent, prefix=f"{dest.stem}.", suffix=".tmp",
+                                                delete=False) as fh:
+                tmp = Path(fh.name)
+                shutil.copyfileobj(resp, fh, _COPY_BUFSIZE)
+            tmp.replace(dest)
+        finally:
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        return sum(f.stat().st_size for f in self.cache_dir.glob("*/*.tif"))
+
+    def _evict(self, keep: Path) -> None:
+        """Drop least-recently-used tiles until the cache fits `max_bytes`."""
+        with open(self.cache_dir / _LOCK_NAME, "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return   # another worker is evicting
+            entries = []
+            for f in self.cache_dir.glob("*/*.tif"):
+                try:
+                    st = f.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, f))
+            total = sum(size for _, size, _ in entries)
+            for _mtime, size, f in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                if f == keep:
+                    continue
+                f.unlink(missing_ok=True)
+                total -= size
+                logger.debug("tile cache: evicted %s (%d bytes)", f.name, size)
+
+    def summary(self) -> str:
+        return (f"tile cache: {self.mirror_hits} mirror hit(s), {self.hits} cache hit(s), "
+                f"{self.fetches} download(s), {self.known_missing} known-missing")
+
+
+def tile_cache_from_config(config: dict) -> TileCache | None:
+    """`TileCache` from the ``dprst_tile_*`` config keys; None if neither a
+    cache dir nor a mirror dir is configured (read remotely, as before)."""
+    cache_dir = config.get("dprst_tile_cache_dir")
+    mirror_dir = config.get("dprst_tile_mirror_dir")
+    if not cache_dir and not mirror_dir:
+        return None
+    return TileCache(
+        cache_dir,
+        max_bytes=int(float(config.get("dprst_tile_cache_gb", 200)) * 1024**3),
+        mirror_dir=mirror_dir,
+        remote=bool(config.get("dprst_tile_remote", True)),
+    )
+
+
+@contextmanager
+def use_tile_cache(cache: TileCache | None):
+    """Route `resolve_tile` through `cache` for the duration of the block."""
+    global _ACTIVE
+    previous, _ACTIVE = _ACTIVE, cache
+    try:
+        yield cache
+    finally:
+        _ACTIVE = previous
+
+
+def resolve_tile(path: str) -> str:
+    """`path` resolved through the active `TileCache` (identity when none is active)."""
+    return path if _ACTIVE is None else _ACTIVE.resolve(path)
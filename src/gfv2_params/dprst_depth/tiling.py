@@ -28,16 +28,20 @@ DAG this feeds.
 """
 from __future__ import annotations
 
+import heapq
+import math
 from collections import defaultdict
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-from rasterio.warp import transform_bounds, transform_geom
+from rasterio.warp import transform as warp_transform
 
 from .topo import (
+    TILE1M_HTTPS_TEMPLATE,
     TILE13_HTTPS_TEMPLATE,
-    _1m_candidate_tiles,
     _tile13_name,
     _utm_zone_epsg,
 )
@@ -48,42 +52,117 @@ __all__ = [
     "component_tile_batches",
     "guard_oversized_windows",
     "polygon_window_cost",
+    "CostModel",
+    "fit_cost_model",
+    "calibrated_tile_costs",
+    "batches_for_target",
     "MAX_1M_WINDOW_CELLS",
     "BASE_POLYGON_OVERHEAD_CELLS",
 ]
 
 
-def _tile13_key(geom, src_crs) -> str:
-    """10 m tile key (full `/vsicurl/` read path) for `geom`'s centroid.
+def _centroid_lonlat(geoms: gpd.GeoSeries, src_crs) -> tuple[np.ndarray, np.ndarray]:
+    """EPSG:4326 lon/lat of every geometry's centroid, in one transform call."""
+    centroids = geoms.centroid
+    lon, lat = warp_transform(
+        src_crs, "EPSG:4326", centroids.x.to_numpy(), centroids.y.to_numpy()
+    )
+    return np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)
+
+
+def _tile13_keys(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """10 m tile keys (full `/vsicurl/` read paths) for arrays of centroid lon/lat.
+
+    Mirrors `topo.read_window`'s 10 m branch exactly: `_tile13_name` of the
+    centroid reprojected to EPSG:4326. The seamless 1/3 arc-second product
+    has no footprint gaps, so a single centroid-based tile key is always
+    correct — no candidate enumeration or probe needed. Each distinct tile
+    is named once (via its integer NW corner, which `_tile13_name` maps to
+    itself) and broadcast back.
+    """
+    corners = np.column_stack([np.ceil(lat), np.ceil(-lon)]).astype(np.int64)
+    uniq, inverse = np.unique(corners, axis=0, return_inverse=True)
+    names = np.array(
+        [TILE13_HTTPS_TEMPLATE.format(tile=_tile13_name(-float(w), float(n))) for n, w in uniq],
+        dtype=object,
+    )
+    return names[inverse.reshape(-1)]
+
+
+# Windows reprojected per `rasterio.warp.transform` call in `_utm_bounds`
+# (88 densified edge points each at the default densify_pts=21).
+_UTM_CHUNK = 50_000
 
-    Mirrors `topo.read_window`'s 10 m branch exactly: reproject the centroid
-    to EPSG:4326 and name the 1x1 deg tile via `_tile13_name`. The seamless
-    1/3 arc-second product has no footprint gaps, so a single centroid-based
-    tile key is always correct — no candidate enumeration or probe needed.
+
+def _utm_bounds(
+    bounds: np.ndarray, lon: np.ndarray, src_crs, densify_pts: int = 21
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row UTM bbox + zone: `transform_bounds(src_crs, utm_crs, *row, densify_pts)`.
+
+    The zone is `_utm_zone_epsg` of `lon` (the polygon centroid's). Samples
+    each bbox edge exactly as GDAL's ``OCTTransformBounds`` (which backs
+    `rasterio.warp.transform_bounds`) does — `densify_pts + 1` points per
+    side starting at a corner — and reprojects a whole zone's points per
+    transform call, then takes the per-row min/max.
     """
-    centroid = {"type": "Point", "coordinates": (geom.centroid.x, geom.centroid.y)}
-    lon, lat = transform_geom(src_crs, "EPSG:4326", centroid)["coordinates"]
-    return TILE13_HTTPS_TEMPLATE.format(tile=_tile13_name(lon, lat))
-
-
-def _1m_tile_keys(
-    geom, project: str, bounds_buffered: tuple[float, float, float, float], src_crs
-) -> list[str]:
-    """Candidate 3DEP 1 m tile keys (full `/vsicurl/` read paths) for a rim-buffered bbox.
-
-    Reuses `_utm_zone_epsg`/`_1m_candidate_tiles` (Task 1) to enumerate the
-    10 km UTM grid candidates a polygon's buffered window overlaps —
-    deliberately WITHOUT `topo._existing_paths`'s per-candidate probe (see
-    module docstring): existence is resolved at read time in Task 4, not
-    here. `bounds_buffered` is the already rim-buffered window (in
-    `src_crs`); `geom`'s centroid (unbuffered) picks the UTM zone, matching
-    `topo.read_window`/`topo._resolve_1m_paths`.
+    zones = np.floor((lon + 180.0) / 6.0).astype(np.int64) + 1
+    side = densify_pts + 1
+    step = np.arange(side, dtype=float)
+    ones = np.ones_like(step)
+    out = np.empty(bounds.shape, dtype=float)
+    for zone in np.unique(zones):
+        rows = np.flatnonzero(zones == zone)
+        _zone, utm_crs = _utm_zone_epsg(float(lon[rows[0]]))
+        for lo in range(0, rows.size, _UTM_CHUNK):
+            sel = rows[lo:lo + _UTM_CHUNK]
+            xmin, ymin, xmax, ymax = (bounds[sel, k][:, None] for k in range(4))
+            dx = (xmax - xmin) / side
+            dy = (ymax - ymin) / side
+            xs = np.hstack([xmin * ones, xmin + step * dx, xmax * ones, xmax - step * dx])
+            ys = np.hstack([ymax - step * dy, ymin * ones, ymin + step * dy, ymax * ones])
+            ux, uy = warp_transform(src_crs, utm_crs, xs.ravel(), ys.ravel())
+            ux = np.asarray(ux, dtype=float).reshape(xs.shape)
+            uy = np.asarray(uy, dtype=float).reshape(ys.shape)
+            out[sel] = np.column_stack([ux.min(1), uy.min(1), ux.max(1), uy.max(1)])
+    return out, zones
+
+
+def _1m_tile_pairs(
+    hits: pd.DataFrame, utm_bounds: pd.DataFrame, zones: pd.Series
+) -> pd.DataFrame:
+    """``(tile_key, dprst_idx)`` rows for every WESM hit's candidate 1 m tiles.
+
+    The array form of `topo._1m_candidate_tiles` — deliberately WITHOUT
+    `topo._existing_paths`'s per-candidate probe (see module docstring):
+    existence is resolved at read time in Task 4, not here. `hits` holds one
+    ``(dprst_idx, project)`` row per polygon/WESM-project intersection;
+    `utm_bounds`/`zones` are indexed by dprst_idx. Each hit expands to its
+    UTM 10 km grid cells (rows outer, columns inner, the same order
+    `_1m_candidate_tiles` enumerates), and each distinct
+    ``(project, zone, x, y)`` is formatted once.
     """
-    centroid = {"type": "Point", "coordinates": (geom.centroid.x, geom.centroid.y)}
-    lon, lat = transform_geom(src_crs, "EPSG:4326", centroid)["coordinates"]
-    zone, utm_crs = _utm_zone_epsg(lon)
-    bounds_utm = transform_bounds(src_crs, utm_crs, *bounds_buffered, densify_pts=21)
-    return _1m_candidate_tiles(project, bounds_utm, zone)
+    idx = hits["dprst_idx"].to_numpy()
+    b = utm_bounds.loc[idx]
+    x_lo = np.floor(b["minx"].to_numpy() / 10_000).astype(np.int64)
+    x_hi = np.floor(b["maxx"].to_numpy() / 10_000).astype(np.int64)
+    y_lo = np.ceil(b["miny"].to_numpy() / 10_000).astype(np.int64)
+    y_hi = np.ceil(b["maxy"].to_numpy() / 10_000).astype(np.int64)
+    nx = x_hi - x_lo + 1
+    n = nx * (y_hi - y_lo + 1)
+    row = np.repeat(np.arange(len(idx)), n)
+    k = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    cells = pd.DataFrame({
+        "project": hits["project"].astype(str).to_numpy()[row],
+        "zone": zones.loc[idx].to_numpy()[row],
+        "x": x_lo[row] + k % nx[row],
+        "y": y_lo[row] + k // nx[row],
+    })
+    codes, uniq = pd.MultiIndex.from_frame(cells).factorize()
+    names = np.array(
+        [TILE1M_HTTPS_TEMPLATE.format(project=p, zone=z, x=x, y=y) for p, z, x, y in uniq],
+        dtype=object,
+    )
+    return pd.DataFrame({"tile_key": names[codes], "dprst_idx": idx[row]})
 
 
 def group_by_tile(
@@ -114,32 +193,37 @@ def group_by_tile(
 
     No raster reads and no `/vsicurl` existence probes (see module
     docstring) — pure geometry against `dprst_gdf`/`wesm_gdf` in memory.
+    Vectorized: all centroids go to EPSG:4326 in one transform call, each
+    UTM zone's windows in one more (`_utm_bounds`), and the tile-key lists
+    come from a grouped frame of ``(tile_key, dprst_idx)`` pairs rather
+    than per-row Python (CONUS `--plan`: minutes -> seconds).
 
     Returns `{tile_key: [dprst_gdf index labels]}`; `tile_key` is the exact
-    `/vsicurl/` path `topo.read_window` would open for that tile.
+    `/vsicurl/` path `topo.read_window` would open for that tile. Keys are
+    ordered by first appearance — 10 m polygons, then WESM hits in
+    `sjoin` order, then unresolved 1 m polygons — which `tile_batches`'
+    stable sort relies on for a reproducible `batch_manifest.json`.
     """
     if "best_topo" not in dprst_gdf.columns:
         raise KeyError(
             "dprst_gdf must be tagged by topo.resolution_class() first (missing 'best_topo')"
         )
 
-    groups: dict[str, set] = defaultdict(set)
     if len(dprst_gdf) == 0:
         return {}
 
     src_crs = dprst_gdf.crs
+    index = dprst_gdf.index.to_numpy()
+    lon, lat = _centroid_lonlat(dprst_gdf.geometry, src_crs)
+    tile13 = _tile13_keys(lon, lat)
 
-    is_1m = dprst_gdf["best_topo"] == "1m"
-    for idx, geom in dprst_gdf.loc[~is_1m, "geometry"].items():
-        groups[_tile13_key(geom, src_crs)].add(idx)
-
-    df_1m = dprst_gdf.loc[is_1m]
-    if len(df_1m) == 0:
-        return {k: sorted(v) for k, v in groups.items()}
+    is_1m = (dprst_gdf["best_topo"] == "1m").to_numpy()
+    pairs = [pd.DataFrame({"tile_key": tile13[~is_1m], "dprst_idx": index[~is_1m]})]
 
+    resolved = np.zeros(len(dprst_gdf), dtype=bool)
     has_wesm = wesm_gdf is not None and len(wesm_gdf) > 0 and "project" in wesm_gdf.columns
-    resolved: set = set()
-    if has_wesm:
+    if is_1m.any() and has_wesm:
+        df_1m = dprst_gdf.loc[is_1m]
         wesm = wesm_gdf.to_crs(src_crs)[["project", "geometry"]]
         windows = gpd.GeoDataFrame(
             {"dprst_idx": df_1m.index},
@@ -147,33 +231,35 @@ def group_by_tile(
             crs=src_crs,
         )
         hits = gpd.sjoin(windows, wesm, how="left", predicate="intersects")
-        for _, hit in hits.iterrows():
-            project = hit["project"]
-            if pd.isna(project):
-                continue
-            idx = hit["dprst_idx"]
-            geom = df_1m.geometry.loc[idx]
-            # hit.geometry here is the LEFT frame's (`windows`) rim-buffered
-            # envelope geometry, i.e. the polygon's search WINDOW -- not the
-            # WESM project footprint geometry (that was consumed by the sjoin
-            # predicate and dropped from the right side's output columns).
-            for key in _1m_tile_keys(geom, str(project), hit.geometry.bounds, src_crs):
-                groups[key].add(idx)
-            resolved.add(idx)
+        hits = hits.loc[hits["project"].notna(), ["dprst_idx", "project"]]
+        if len(hits):
+            # The UTM zone comes from the (unbuffered) polygon centroid, the
+            # window bounds from its rim-buffered envelope, matching
+            # `topo.read_window`/`topo._resolve_1m_paths`.
+            bounds_utm, zones = _utm_bounds(
+                windows.geometry.bounds.to_numpy(), lon[is_1m], src_crs
+            )
+            utm_bounds = pd.DataFrame(
+                bounds_utm, index=df_1m.index, columns=["minx", "miny", "maxx", "maxy"]
+            )
+            pairs.append(_1m_tile_pairs(hits, utm_bounds, pd.Series(zones, index=df_1m.index)))
+            resolved = dprst_gdf.index.isin(hits["dprst_idx"])
 
     # 1m-tagged polygons that never resolved a covering WESM project fall
     # back to their 10m tile so every polygon is placed in >=1 group.
-    for idx, geom in df_1m.geometry.items():
-        if idx not in resolved:
-            groups[_tile13_key(geom, src_crs)].add(idx)
+    fallback = is_1m & ~resolved
+    pairs.append(pd.DataFrame({"tile_key": tile13[fallback], "dprst_idx": index[fallback]}))
 
-    return {k: sorted(v) for k, v in groups.items()}
+    all_pairs = pd.concat([p for p in pairs if len(p)], ignore_index=True)
+    grouped = all_pairs.groupby("tile_key", sort=False)["dprst_idx"]
+    return {key: sorted(set(idxs.tolist())) for key, idxs in grouped}
 
 
 def tile_batches(
     groups: dict[str, list[int]],
     n_batches: int,
     costs: dict[int, float] | None = None,
+    tile_costs: dict[str, float] | None = None,
 ) -> list[list[str]]:
     """Greedy bin-pack tile keys into `n_batches` roughly-equal-work SLURM batches.
 
@@ -185,9 +271,12 @@ def tile_batches(
     giant-lake polygons (huge windows) dominate one batch's wall-clock and
     memory footprint even though every batch carries a similar polygon
     COUNT (issue #173 CONUS run: batches 0-2 lagged badly and OOM'd at 24G).
+    `tile_costs` (`{tile_key: seconds}`, `calibrated_tile_costs`' output)
+    overrides both with a per-tile load directly.
     Either way, tile keys are visited in descending load order and each is
     assigned to whichever batch currently carries the least summed load
-    (greedy longest-processing-time-first bin-packing) — keeps the
+    (greedy longest-processing-time-first bin-packing; the least-loaded
+    batch comes off a heap, ties to the lowest batch index) — keeps the
     `n_batches` SLURM array tasks finishing around the same time. Every tile
     key lands in exactly one batch. Always returns exactly `n_batches` lists
     (some may be empty if there are fewer tile keys than batches), matching
@@ -196,17 +285,20 @@ def tile_batches(
     if n_batches <= 0:
         raise ValueError(f"n_batches must be positive, got {n_batches}")
 
-    def _load(members: list[int]) -> float:
+    def _load(tile_key: str, members: list[int]) -> float:
+        if tile_costs is not None:
+            return tile_costs.get(tile_key, 0.0)
         if costs is None:
             return len(members)
         return sum(costs.get(idx, 1.0) for idx in members)
 
     batches: list[list[str]] = [[] for _ in range(n_batches)]
-    loads = [0.0] * n_batches
-    for tile_key, members in sorted(groups.items(), key=lambda kv: _load(kv[1]), reverse=True):
-        i = min(range(n_batches), key=lambda b: loads[b])
+    heap = [(0.0, i) for i in range(n_batches)]
+    loads = sorted(((_load(k, m), k) for k, m in groups.items()), key=lambda kv: kv[0], reverse=True)
+    for load, tile_key in loads:
+        total, i = heapq.heappop(heap)
         batches[i].append(tile_key)
-        loads[i] += _load(members)
+        heapq.heappush(heap, (total + load, i))
     return batches
 
 
@@ -260,6 +352,7 @@ def component_tile_batches(
     groups: dict[str, list[int]],
     n_batches: int,
     costs: dict[int, float] | None = None,
+    tile_costs: dict[str, float] | None = None,
 ) -> list[list[str]]:
     """`tile_batches`, but a multi-tile polygon's covering tiles never split across batches.
 
@@ -270,7 +363,8 @@ def component_tile_batches(
     `polygon_window_cost`'s output) so a component's load is its polygons'
     summed estimated window-read cost rather than raw polygon count -- see
     `tile_batches`' docstring for why count-based balancing is insufficient
-    (issue #173).
+    (issue #173). `tile_costs` (`{tile_key: seconds}`) instead loads a
+    component with the sum of its tiles' calibrated costs.
 
     Measured on the real full-CONUS dprst polygon set (`--plan`, 2026-07-11,
     the ~321k-polygon `gfv2`-scale set): componentisation is NOT a rare edge
@@ -301,7 +395,15 @@ def component_tile_batches(
         component_members[comp_id] = sorted(members)
         component_tiles[comp_id] = comp
 
-    component_batches = tile_batches(component_members, n_batches, costs=costs)
+    component_costs = None
+    if tile_costs is not None:
+        component_costs = {
+            comp_id: sum(tile_costs.get(tk, 0.0) for tk in tiles)
+            for comp_id, tiles in component_tiles.items()
+        }
+    component_batches = tile_batches(
+        component_members, n_batches, costs=costs, tile_costs=component_costs
+    )
     return [
         [tile_key for comp_id in batch for tile_key in component_tiles[comp_id]]
         for batch in component_batches
@@ -314,10 +416,18 @@ def component_tile_batches(
 # m^2 (1 m x 1 m cells), i.e. width_m * height_m. `topo.read_window`
 # materializes several same-shape buffers per window -- the float32 DEM
 # (`vrt.read`), `_normalize_nodata`'s float32 copy, and `depth_to_spill`'s
-# float64 richdem working copy + its float64 `filled` result (via
-# `rd.FillDepressions`) -- roughly 4 + 4 + 8 + 8 = 24 bytes/cell measured
-# generously; budgeting 20 bytes/cell as a slightly-conservative working
-# estimate against a 4 GiB per-window target gives:
+# fill -- originally a float64 richdem working copy + its float64 `filled`
+# result (4 + 4 + 8 + 8 = 24 bytes/cell, not counting richdem's own
+# queues). The native fill (`priority_flood.depth_to_spill_array`) stays in
+# float32: float32 depth + bool closed + an int32 pit queue and a
+# float32/int32 open heap. Each cell enters one of the two queues once, so
+# they commit at most 8 bytes/cell together. That is 4 + 1 + 8 = 13
+# bytes/cell, or 4 + 4 + 13 = 21 bytes/cell for the window at worst.
+# `topo.lake_max_depth` also widens the window to float64 for its slope
+# gradient and shore-distance transform. The native fill therefore does not
+# lower the per-window peak, and the budget below is unchanged. Budgeting
+# 20 bytes/cell as a typical working estimate against a 4 GiB per-window
+# target (the 21 bytes/cell worst case is ~4.2 GB at the cap) gives:
 #
 #     4 GiB / 20 bytes/cell = 4 * 2**30 / 20 ~= 2.15e8 cells
 #
@@ -326,9 +436,9 @@ def component_tile_batches(
 # any dprst polygon that legitimately warrants 1 m detail (a project's
 # actual water-surface footprint is typically far smaller than its bbox),
 # while reliably catching a truly giant lake, whose window at that point is
-# well past what a single SLURM array task's 24 GB budget can hold (richdem
-# alone needs a float64 copy at 8 bytes/cell -- 200M cells is already 1.6
-# GB just for that one buffer). A giant lake's MEAN depth (`dprst_depth_avg`
+# well past what a single SLURM array task's 24 GB budget can hold (one
+# float64 window copy at 8 bytes/cell -- 200M cells is already 1.6 GB just
+# for that one buffer). A giant lake's MEAN depth (`dprst_depth_avg`
 # is a volume-weighted mean, not a per-cell product) does not need 1 m
 # resolution to compute correctly -- only its spatial DETAIL would benefit,
 # which this builder discards anyway (see `topo.volume_mean_depth`) -- so
@@ -339,7 +449,7 @@ MAX_1M_WINDOW_CELLS = 200_000_000
 
 # Fixed per-polygon overhead folded into `polygon_window_cost`'s estimate so
 # a swarm of tiny polygons isn't modeled as free next to one huge one --
-# every polygon pays a raster-open + mask-rasterize + richdem-setup cost
+# every polygon pays a raster-open + mask-rasterize + fill-setup cost
 # roughly independent of its window size. The value is a deliberately
 # nonzero, order-of-magnitude floor (not calibrated against a wall-clock
 # profile); see `--plan`'s logged per-batch cost balance for the empirical
@@ -355,6 +465,18 @@ def _window_bounds(dprst_gdf: gpd.GeoDataFrame, rim_m: float) -> tuple[pd.Series
     return width, height
 
 
+def _tile_resolution(tile_key: str) -> str:
+    """`"1m"`/`"10m"` from a tile key's filename convention (`TILE1M_HTTPS_TEMPLATE`)."""
+    return "1m" if "USGS_1M_" in tile_key else "10m"
+
+
+def _window_cells(dprst_gdf: gpd.GeoDataFrame, resolution: str, rim_m: float = 200.0) -> pd.Series:
+    """Estimated rim-buffered window cells per polygon when read at `resolution`."""
+    width, height = _window_bounds(dprst_gdf, rim_m)
+    cells = width * height
+    return cells if resolution == "1m" else cells / 100.0
+
+
 def guard_oversized_windows(
     dprst_gdf: gpd.GeoDataFrame,
     max_1m_cells: int = MAX_1M_WINDOW_CELLS,
@@ -457,6 +579,245 @@ def polygon_window_cost(
     return cost.to_dict()
 
 
+# --- Runtime-calibrated cost model --------------------------------------------
+#
+# `polygon_window_cost` is a static read-volume proxy. Once an array run has
+# happened, `compute.run_batch(timings_parquet=...)` has recorded what every
+# tile actually cost (`TIMING_COLUMNS`, one row per tile under
+# `dprst_depth_batches/_timings/`), and `--plan` fits the per-tile wall
+# seconds to the same geometry it can compute up front.
+
+# Columns of `run_batch`'s per-tile timing records. `window_cells` /
+# `flat_cells` are `_window_cells` estimates (not the cells actually read)
+# so the fit and the planner's prediction use the same features. A tile row
+# covers only the tile's SINGLE-tile polygons (the ones read through its
+# open VRT); each multi-tile polygon gets its own `tile_key=None` row from
+# the `compute_polygon` fallback.
+TIMING_COLUMNS = [
+    "tile_key", "resolution", "n_polygons", "n_flat",
+    "window_cells", "flat_cells", "read_s", "compute_s", "wall_s",
+]
+
+# Fewer successful tile records than this and `fit_cost_model` refuses.
+MIN_TIMING_ROWS = 20
+
+# Fewer fallback records than this and the fallback term is borrowed from
+# the tile term (a one-polygon tile) instead of fitted.
+MIN_FALLBACK_ROWS = 10
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """Non-negative linear model of `run_batch` wall seconds.
+
+    Tile term, for a tile's single-tile polygons:
+    ``tile_{res}_s + polygon_s * n_polygons + cell_s * non-flat window cells
+    + flat_cell_s * flat window cells``. Flat (hydro-flattened) polygons skip
+    the fill, so their cells are cheap; the per-resolution intercept absorbs
+    a tile's open/first-read latency (remote vs cached shows up there).
+
+    Fallback term, per multi-tile polygon (its own `read_window` mosaic):
+    ``fallback_{res}_s + fallback_cell_s * non-flat cells
+    + fallback_flat_cell_s * flat cells``, fitted to the `tile_key=None`
+    rows (`n_fallback` of them; 0 means borrowed from the tile term).
+
+    `flat_fraction` is the observed share of flat polygons, used for
+    polygons with no earlier result.
+    """
+
+    tile_1m_s: float
+    tile_10m_s: float
+    polygon_s: float
+    cell_s: float
+    flat_cell_s: float
+    fallback_1m_s: float
+    fallback_10m_s: float
+    fallback_cell_s: float
+    fallback_flat_cell_s: float
+    flat_fraction: float
+    n_tiles: int
+    n_fallback: int
+    r2: float
+
+
+def _cost_features(is_1m, n_polygons, cells, flat_cells) -> np.ndarray:
+    is_1m = np.asarray(is_1m, dtype=float)
+    cells = np.asarray(cells, dtype=float)
+    flat_cells = np.asarray(flat_cells, dtype=float)
+    return np.column_stack([
+        is_1m, 1.0 - is_1m, np.asarray(n_polygons, dtype=float), cells - flat_cells, flat_cells,
+    ])
+
+
+def _fallback_features(is_1m, cells, flat_cells) -> np.ndarray:
+    is_1m = np.asarray(is_1m, dtype=float)
+    cells = np.asarray(cells, dtype=float)
+    flat_cells = np.asarray(flat_cells, dtype=float)
+    return np.column_stack([is_1m, 1.0 - is_1m, cells - flat_cells, flat_cells])
+
+
+def _nnls(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, float]:
+    """Non-negative least squares of ``a @ coef ~= b`` -> ``(coef, R^2)``."""
+    from scipy.optimize import nnls
+
+    # Columns span ~1 .. ~1e8 (cells); scale them so NNLS is well conditioned.
+    scale = np.where(a.max(axis=0) > 0, a.max(axis=0), 1.0)
+    coef, _ = nnls(a / scale, b)
+    coef = coef / scale
+    resid = b - a @ coef
+    ss_tot = float(((b - b.mean()) ** 2).sum())
+    return coef, (1.0 - float((resid**2).sum()) / ss_tot if ss_tot > 0 else 0.0)
+
+
+def fit_cost_model(timings: pd.DataFrame) -> CostModel:
+    """Fit `CostModel` (non-negative least squares) to `run_batch` timing records.
+
+    The tile term is fitted to the per-tile rows, the fallback term to the
+    `tile_key=None` rows (borrowed from the tile term below
+    `MIN_FALLBACK_ROWS`). Raises ValueError below `MIN_TIMING_ROWS` tile
+    rows. `r2` is the tile term's.
+    """
+    is_tile = timings["tile_key"].notna()
+    tiles, fallback = timings.loc[is_tile], timings.loc[~is_tile]
+    if len(tiles) < MIN_TIMING_ROWS:
+        raise ValueError(
+            f"fit_cost_model: {len(tiles)} tile timing record(s), need >= {MIN_TIMING_ROWS}"
+        )
+    coef, r2 = _nnls(
+        _cost_features(tiles["resolution"] == "1m", tiles["n_polygons"], tiles["window_cells"],
+                       tiles["flat_cells"]),
+        tiles["wall_s"].to_numpy(dtype=float),
+    )
+    if len(fallback) >= MIN_FALLBACK_ROWS:
+        fb, _ = _nnls(
+            _fallback_features(fallback["resolution"] == "1m", fallback["window_cells"],
+                               fallback["flat_cells"]),
+            fallback["wall_s"].to_numpy(dtype=float),
+        )
+        n_fallback = len(fallback)
+    else:
+        fb = np.array([coef[0] + coef[2], coef[1] + coef[2], coef[3], coef[4]])
+        n_fallback = 0
+    n_poly = float(tiles["n_polygons"].sum())
+    return CostModel(
+        tile_1m_s=float(coef[0]), tile_10m_s=float(coef[1]), polygon_s=float(coef[2]),
+        cell_s=float(coef[3]), flat_cell_s=float(coef[4]),
+        fallback_1m_s=float(fb[0]), fallback_10m_s=float(fb[1]),
+        fallback_cell_s=float(fb[2]), fallback_flat_cell_s=float(fb[3]),
+        flat_fraction=float(tiles["n_flat"].sum()) / n_poly if n_poly else 0.0,
+        n_tiles=len(tiles), n_fallback=n_fallback, r2=r2,
+    )
+
+
+def calibrated_tile_costs(
+    groups: dict[str, list[int]],
+    dprst_gdf: gpd.GeoDataFrame,
+    model: CostModel,
+    flat: pd.Series | None = None,
+    rim_m: float = 200.0,
+) -> dict[str, float]:
+    """Predicted `run_batch` wall seconds per tile key, `{tile_key: seconds}`.
+
+    Mirrors `run_batch`: a tile's term counts only its single-tile polygons
+    (a tile with none is never opened and costs 0), and each multi-tile
+    polygon costs one fallback term at its `best_topo` resolution, charged
+    to the first of its tiles in `groups` order (its covering tiles always
+    share a batch, see `_tile_components`, so batch sums are unaffected).
+
+    `flat` (float 1/0, indexed like `dprst_gdf`, NaN where unknown) is each
+    polygon's flat verdict from an earlier run; unknown polygons count as
+    `model.flat_fraction` flat.
+    """
+    keys = list(groups)
+    counts = [len(groups[k]) for k in keys]
+    pairs = pd.DataFrame({
+        "tile_key": np.repeat(np.array(keys, dtype=object), counts),
+        "dprst_idx": [idx for k in keys for idx in groups[k]],
+    })
+    costs = dict.fromkeys(keys, 0.0)
+    if pairs.empty:
+        return costs
+    members = dprst_gdf.loc[pairs["dprst_idx"]]
+    pairs["cells_1m"] = _window_cells(members, "1m", rim_m).to_numpy()
+    p_flat = np.full(len(pairs), model.flat_fraction)
+    if flat is not None:
+        known = flat.reindex(pairs["dprst_idx"]).to_numpy(dtype=float)
+        p_flat = np.where(np.isnan(known), p_flat, known)
+    pairs["p_flat"] = p_flat
+    n_covering = pairs["dprst_idx"].map(pairs["dprst_idx"].value_counts()).to_numpy()
+
+    single = pairs.loc[n_covering == 1].copy()
+    single["is_1m"] = single["tile_key"].map(_tile_resolution).eq("1m").to_numpy()
+    single["cells"] = np.where(single["is_1m"], single["cells_1m"], single["cells_1m"] / 100.0)
+    single["flat_cells"] = single["cells"] * single["p_flat"]
+    per_tile = single.groupby("tile_key", sort=False).agg(
+        is_1m=("is_1m", "first"), n_polygons=("dprst_idx", "size"),
+        cells=("cells", "sum"), flat_cells=("flat_cells", "sum"),
+    )
+    coef = np.array([model.tile_1m_s, model.tile_10m_s, model.polygon_s, model.cell_s, model.flat_cell_s])
+    seconds = _cost_features(
+        per_tile["is_1m"], per_tile["n_polygons"], per_tile["cells"], per_tile["flat_cells"]
+    ) @ coef
+    for tile_key, sec in zip(per_tile.index, seconds.tolist()):
+        costs[tile_key] += sec
+
+    multi = pairs.loc[n_covering > 1].drop_duplicates("dprst_idx", keep="first")
+    if not multi.empty:
+        is_1m = dprst_gdf.loc[multi["dprst_idx"], "best_topo"].eq("1m").to_numpy()
+        cells = np.where(is_1m, multi["cells_1m"], multi["cells_1m"] / 100.0)
+        fb = np.array([model.fallback_1m_s, model.fallback_10m_s,
+                       model.fallback_cell_s, model.fallback_flat_cell_s])
+        seconds = _fallback_features(is_1m, cells, cells * multi["p_flat"].to_numpy()) @ fb
+        for tile_key, sec in pd.Series(seconds, index=multi["tile_key"].to_numpy()).groupby(
+                level=0, sort=False).sum().items():
+            costs[tile_key] += sec
+    return costs
+
+
+def _lpt_makespan(loads: list[float], n_batches: int) -> float:
+    """Largest batch load of `tile_batches`' LPT packing of `loads` (sorted descending)."""
+    heap = [0.0] * n_batches
+    for load in loads:
+        heapq.heapreplace(heap, heap[0] + load)
+    return max(heap)
+
+
+def batches_for_target(
+    groups: dict[str, list[int]],
+    tile_costs: dict[str, float],
+    target_s: float,
+    max_batches: int = 10_000,
+) -> int | None:
+    """Fewest `component_tile_batches` batches whose predicted makespan is <= `target_s`.
+
+    None if no count up to `max_batches` gets there — the largest connected
+    component alone (never split) is over the target.
+    """
+    loads = sorted(
+        (sum(tile_costs.get(tk, 0.0) for tk in comp) for comp in _tile_components(groups)),
+        reverse=True,
+    )
+    if not loads:
+        return 1
+    if loads[0] > target_s:
+        return None
+    lo = max(1, math.ceil(sum(loads) / target_s))
+    if _lpt_makespan(loads, lo) <= target_s:
+        return lo
+    hi = lo
+    while _lpt_makespan(loads, hi) > target_s:
+        if hi >= max_batches:
+            return None
+        lo, hi = hi, min(2 * hi, max_batches)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if _lpt_makespan(loads, mid) <= target_s:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
 # --- SLURM array plan/dry-run hook (Task 9, issue #173) --------------------
 #
 # Everything below is only imported/executed when this module is run as a
@@ -579,6 +940,49 @@ def _load_and_tag_for_plan(config: dict, logger) -> tuple[gpd.GeoDataFrame, gpd.
     return dprst, wesm_gdf
 
 
+def _load_calibration(batches_dir: Path, dprst: gpd.GeoDataFrame, logger):
+    """`(CostModel, flat)` from an earlier array run under `batches_dir`, or `(None, None)`.
+
+    The model is fitted to `_timings/*.parquet` (`run_batch`'s per-tile
+    records); `flat` is each polygon's earlier flat verdict (1.0/0.0, NaN
+    where it has none) read from the per-batch result parquets by COMID.
+    """
+    timing_files = sorted((batches_dir / "_timings").glob("*.parquet"))
+    if not timing_files:
+        logger.info("  cost model    : no run_batch timings under %s -- static window-cell costs",
+                    batches_dir / "_timings")
+        return None, None
+    timings = pd.concat([pd.read_parquet(f) for f in timing_files], ignore_index=True)
+    try:
+        model = fit_cost_model(timings)
+    except ValueError as exc:
+        logger.warning("  cost model    : %s -- static window-cell costs", exc)
+        return None, None
+    logger.info(
+        "  cost model    : fitted to %d tile(s) from %d timing file(s), R^2=%.2f: "
+        "tile 1m %.2fs / 10m %.2fs, %.3fs/polygon, %.3g s/cell, %.3g s/flat cell, "
+        "flat fraction %.2f",
+        model.n_tiles, len(timing_files), model.r2, model.tile_1m_s, model.tile_10m_s,
+        model.polygon_s, model.cell_s, model.flat_cell_s, model.flat_fraction,
+    )
+    logger.info(
+        "  fallback    : %s: 1m %.2fs / 10m %.2fs per polygon, %.3g s/cell, %.3g s/flat cell",
+        f"fitted to {model.n_fallback} multi-tile polygon(s)" if model.n_fallback
+        else f"< {MIN_FALLBACK_ROWS} records, borrowed from the tile term",
+        model.fallback_1m_s, model.fallback_10m_s, model.fallback_cell_s, model.fallback_flat_cell_s,
+    )
+    flat = None
+    batch_files = sorted(batches_dir.glob("*.parquet"))
+    if batch_files and "COMID" in dprst.columns:
+        earlier = pd.concat(
+            [pd.read_parquet(f, columns=["COMID", "flat"]) for f in batch_files], ignore_index=True
+        ).drop_duplicates("COMID", keep="last")
+        flat = dprst["COMID"].map(earlier.set_index("COMID")["flat"].astype(float))
+        logger.info("  flat verdicts : %d/%d polygon(s) known from an earlier run",
+                    int(flat.notna().sum()), len(dprst))
+    return model, flat
+
+
 def _plan(args) -> None:
     """Build + persist the CONUS SLURM array work-list; print the sizing projection.
 
@@ -598,7 +1002,10 @@ def _plan(args) -> None:
         "tile_batches": [[tile_key, ...], ...]}`, one entry per SLURM array
         index, from `component_tile_batches`, COST-weighted via
         `polygon_window_cost` (never splits a multi-tile polygon's covering
-        tiles across batches -- see `_tile_components`).
+        tiles across batches -- see `_tile_components`) -- or, once an
+        earlier array run left `_timings/` records, via the fitted
+        `CostModel`'s `calibrated_tile_costs` (predicted seconds per tile).
+      - `cost_model.json` -- that fitted `CostModel`, when one was used.
 
     Pure geometry + local vector reads only -- no live S3/vsicurl (see
     `_load_and_tag_for_plan`).
@@ -630,7 +1037,9 @@ def _plan(args) -> None:
 
     groups = group_by_tile(dprst, wesm_gdf)
     costs = polygon_window_cost(dprst)
-    batches = component_tile_batches(groups, args.n_batches, costs=costs)
+    model, flat = (None, None) if args.no_calibrate else _load_calibration(batches_dir, dprst, logger)
+    tile_costs = calibrated_tile_costs(groups, dprst, model, flat) if model is not None else None
+    batches = component_tile_batches(groups, args.n_batches, costs=costs, tile_costs=tile_costs)
 
     n_polygons = len(dprst)
     n_tiles = len(groups)
@@ -667,8 +1076,8 @@ def _plan(args) -> None:
         )
         # A/B: what the SAME cost would look like under the OLD count-based
         # packing (`costs=None`) — shows how much cost-weighting tightened the
-        # COST balance (bin-packing is cheap; the 6-min `group_by_tile` step
-        # above already ran once and is reused). Any residual COST imbalance
+        # COST balance (bin-packing is cheap; `group_by_tile` above already
+        # ran once and is reused). Any residual COST imbalance
         # under either packing is bounded below by the single largest
         # un-splittable connected component (logged above) — cost-weighting
         # cannot beat that structural atomicity, only balance around it.
@@ -684,6 +1093,26 @@ def _plan(args) -> None:
             (max(count_cost_loads) / mean_cc) if mean_cc else 0.0,
         )
 
+    target_s = args.target_hours * 3600.0
+    if tile_costs is not None:
+        batch_hours = [sum(tile_costs.get(tk, 0.0) for tk in b) / 3600.0 for b in batches]
+        needed = batches_for_target(groups, tile_costs, target_s)
+        logger.info(
+            "  calibrated: %.1f predicted core-hours; per-batch wall-clock min=%.2f max=%.2f "
+            "mean=%.2f hr (target <=%.1f hr: %s)",
+            sum(tile_costs.values()) / 3600.0, min(batch_hours), max(batch_hours),
+            sum(batch_hours) / len(batch_hours), args.target_hours,
+            "OK" if max(batch_hours) <= args.target_hours else "OVER TARGET",
+        )
+        if needed is None:
+            logger.warning(
+                "  calibrated: the largest tile component alone is predicted over %.1f hr -- "
+                "no batch count meets the target", args.target_hours,
+            )
+        else:
+            logger.info("  calibrated: >= %d batch(es) meet the %.1f hr target (planned %d)",
+                        needed, args.target_hours, args.n_batches)
+
     # The 250-500 core-hour figure is the CONUS-scale estimate (~286k
     # polygons); scale it by THIS fabric's actual (fabric-clipped) polygon
     # count so the projection is meaningful for a regional fabric too (Oregon
@@ -693,15 +1122,24 @@ def _plan(args) -> None:
     scale = n_polygons / args.conus_ref_polygons if args.conus_ref_polygons else 1.0
     lo, hi = args.core_hours_low * scale, args.core_hours_high * scale
     wc_lo, wc_hi = lo / args.n_batches, hi / args.n_batches
-    verdict = "OK" if wc_hi <= 5.0 else "OVER 5 hr TARGET -- increase --n-batches"
+    verdict = (
+        "OK" if wc_hi <= args.target_hours
+        else f"OVER {args.target_hours:g} hr TARGET -- increase --n-batches"
+    )
     logger.info(
         "  projected: %.1f-%.1f core-hours (%d polygons, scaled from %.0f-%.0f "
-        "CONUS-ref for %d) / %d batches -> %.2f-%.2f hr wall-clock (target <=5 hr: %s)",
+        "CONUS-ref for %d) / %d batches -> %.2f-%.2f hr wall-clock (target <=%g hr: %s)",
         lo, hi, n_polygons, args.core_hours_low, args.core_hours_high,
-        args.conus_ref_polygons, args.n_batches, wc_lo, wc_hi, verdict,
+        args.conus_ref_polygons, args.n_batches, wc_lo, wc_hi, args.target_hours, verdict,
     )
 
     plan_dir.mkdir(parents=True, exist_ok=True)
+    model_path = plan_dir / "cost_model.json"
+    if model is not None:
+        model_path.write_text(json.dumps(asdict(model), indent=2))
+        logger.info("  wrote cost model -> %s", model_path)
+    else:
+        model_path.unlink(missing_ok=True)
     tagged_path = plan_dir / "dprst_polygons_tagged.parquet"
     tagged_cols = ["COMID", "FTYPE", "best_topo", "ecoregion", "oversized_1m", "geometry"]
     dprst[tagged_cols].to_parquet(tagged_path)
@@ -741,6 +1179,8 @@ if __name__ == "__main__":
     _parser.add_argument("--batches-dir", default=None, help="Override {output_dir}/dprst_depth_batches")
     _parser.add_argument("--core-hours-low", type=float, default=250.0, help="CONUS-ref core-hour estimate, low end (scaled by polygon count)")
     _parser.add_argument("--core-hours-high", type=float, default=500.0, help="CONUS-ref core-hour estimate, high end (scaled by polygon count)")
+    _parser.add_argument("--target-hours", type=float, default=5.0, help="Per-array-task wall-clock target the projections are checked against (default 5)")
+    _parser.add_argument("--no-calibrate", action="store_true", help="Ignore _timings/ from an earlier run; pack by static window-cell cost")
     _parser.add_argument("--conus-ref-polygons", type=int, default=286000, help="Polygon count the core-hour estimate is calibrated at (for scaling)")
     _args = _parser.parse_args()
 
@@ -26,6 +26,7 @@ from scipy import ndimage
 
 from ..depstor import select_connected_waterbodies
 from ..nhd_ftypes import EXCLUDE_WATERBODY_FTYPES, FORCE_DPRST_FTYPES
+from .tile_cache import resolve_tile
 
 gdal.UseExceptions()
 
@@ -234,20 +235,28 @@ def _normalize_nodata(
     return out
 
 
-def depth_to_spill(dem: np.ndarray, nodata: float | None = None) -> np.ndarray:
-    """filled - raw over a RAW dem. float64 fill per the DEM-derivatives gotcha.
+# "native" = numba Priority-Flood in the window's own dtype
+# (`priority_flood.depth_to_spill_array`); "richdem" = the original float64
+# `rd.FillDepressions`, kept as the reference.
+FILL_BACKENDS = ("native", "richdem")
 
-    Never route through WhiteboxTools here (LZW+predictor=2 corruption gotcha
-    is a non-issue for richdem, which works on in-memory arrays, but the
-    convention of "float64 fill, richdem not WBT" is kept for consistency
-    with compute_dem_derivatives.py). Returned depth is float32, clipped to
-    be non-negative, and zeroed at nodata cells.
+
+def depth_to_spill(dem: np.ndarray, nodata: float | None = None, backend: str = "native") -> np.ndarray:
+    """filled - raw over a RAW dem.
+
+    Never route through WhiteboxTools here (LZW+predictor=2 corruption
+    gotcha). The default ``native`` backend fills the window in place in
+    its own dtype (a float32 `read_window` window is never widened to
+    float64 — the copies that made large 1 m windows need many GB);
+    ``richdem`` is the original float64 ``FillDepressions`` path, kept as
+    the reference the native fill is tested against. Returned depth is
+    float32, clipped to be non-negative, and zeroed at nodata cells.
 
     ``nodata`` defaults to the ``-9999.0`` sentinel that `read_window` now
     normalizes every source's real nodata to (issue #173 review fix — see
     `read_window` docstring). The effective sentinel (explicit ``nodata`` if
-    given, else -9999.0) is used BOTH to tell richdem which cells to exclude
-    from the fill AND to zero those cells in the returned depth — previously
+    given, else -9999.0) is used BOTH to tell the fill which cells to exclude
+    AND to zero those cells in the returned depth — previously
     the zeroing only ran when a caller passed `nodata` explicitly, so the
     realistic `read_window` -> `depth_to_spill(dem)` call (no explicit
     `nodata` arg) left the zeroing dead code: a raw nodata void (e.g. a
@@ -255,8 +264,15 @@ def depth_to_spill(dem: np.ndarray, nodata: float | None = None) -> np.ndarray:
     no_data gets treated as an extremely low real elevation and filled up to
     the surrounding rim, producing a huge spurious depth at every void cell.
     """
-    a = np.asarray(dem, dtype=np.float64)
+    if backend not in FILL_BACKENDS:
+        raise ValueError(f"depth_to_spill: backend must be one of {FILL_BACKENDS}, got {backend!r}")
     nd = -9999.0 if nodata is None else float(nodata)
+    if backend == "native":
+        # numba stays out of this widely-imported module until a fill runs.
+        from ..priority_flood import depth_to_spill_array
+
+        return depth_to_spill_array(dem, nd).astype(np.float32, copy=False)
+    a = np.asarray(dem, dtype=np.float64)
     rda = rd.rdarray(a, no_data=nd)
     filled = np.asarray(rd.FillDepressions(rda, in_place=False), dtype=np.float64)
     depth = filled - a
@@ -412,12 +428,14 @@ def _existing_paths(candidates: list[str]) -> list[str]:
     are dropped rather than aborting the read. Candidates MUST be
     `/vsicurl/https://...` paths, not `/vsis3/...` — see the module-level
     note above TILE13_HTTPS_TEMPLATE for why a nonexistent `/vsis3/` key
-    hangs instead of erroring on this HPC's network.
+    hangs instead of erroring on this HPC's network. Probes go through the
+    active `tile_cache` (a mirrored or cached tile, or a cached 404, never
+    touches the network).
     """
     found = []
     for path in candidates:
         try:
-            with rasterio.open(path):
+            with rasterio.open(resolve_tile(path)):
                 found.append(path)
         except RasterioIOError:
             continue
@@ -524,6 +542,10 @@ def read_window(geom, best_topo: str, wesm_row=None, rim_buffer_m: float = 200.0
     producing a huge spurious depth at every void cell (tile edge / data gap
     inside the window). Normalizing here makes `depth_to_spill`'s default
     correct for the realistic `read_window` -> `depth_to_spill` call path.
+
+    Source paths are opened through the active `tile_cache.TileCache`, if
+    any (local mirror / shared cache before the network); `source["paths"]`
+    still names the remote tiles.
     """
     minx, miny, maxx, maxy = geom.bounds
     minx -= rim_buffer_m
@@ -556,12 +578,13 @@ def read_window(geom, best_topo: str, wesm_row=None, rim_buffer_m: float = 200.0
 
         vsimem_vrt = None
         try:
-            if len(paths) > 1:
+            local = [resolve_tile(p) for p in paths]
+            if len(local) > 1:
                 vsimem_vrt = f"/vsimem/dprst_depth_probe_{uuid.uuid4().hex}.vrt"
-                gdal.BuildVRT(vsimem_vrt, paths)
+                gdal.BuildVRT(vsimem_vrt, local)
                 open_path = vsimem_vrt
             else:
-                open_path = paths[0]
+                open_path = local[0]
 
             with rasterio.open(open_path) as src:
                 resolution = _native_resolution(src, "EPSG:5070")
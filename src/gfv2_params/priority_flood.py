@@ -0,0 +1,684 @@
+"""Tiled, out-of-core Priority-Flood+Epsilon depression fill.
+
+An alternative to richdem's in-memory ``FillDepressions(epsilon=True)``
+(Barnes 2014) for the fill step of compute_dem_derivatives and
+compute_breached_fdr. richdem holds the whole float64 DEM plus its queues in
+RAM and indexes cells with int32, so VPUs 03/10 (2.3B / 3.6B cells) either
+overflow or need a >120 GB node. `fill_depressions_tiled` processes the DEM in
+``tile_size`` x ``tile_size`` tiles, following the three-stage scheme of Barnes
+(2016), *Parallel priority-flood depression filling for trillion cell digital
+elevation models*:
+
+1. **Per-tile flood** (`_flood_tile`). Each tile is priority-flooded from its
+   own perimeter. Every perimeter cell seeds its own watershed label (label 1,
+   the "ocean", for cells on the DEM edge or next to nodata). Then the tile is
+   filled locally, and the lowest spill elevation between each pair of touching
+   labels is recorded.
+2. **Spill graph** (`_graph_levels`). The labels of all tiles become nodes of one
+   graph. The edges are the intra-tile spills plus the spills between 8-adjacent
+   cells on either side of every tile seam. A priority-flood over this graph from
+   the ocean gives each label the elevation it must be raised to. The graph is
+   O(perimeter), not O(cells).
+3. **Apply** — each cell becomes ``max(locally filled, level[label])``. This is
+   exactly the Priority-Flood fill level of the whole DEM.
+
+The epsilon gradient is then imprinted as richdem does it. Each cell on a flat
+(or filled) surface is raised one float64 ULP per step of its 8-connected
+distance, measured across the flat, from the flat's outlet. An outlet is a flat
+cell with a lower neighbour, on the DEM edge, or next to nodata. Those distances
+cross tile seams, so each tile is re-solved with a one-cell overlap (halo) read
+from its neighbours' current distances. Tiles whose seam distances change
+re-queue their neighbours until nothing changes. That is the tile-boundary
+reconciliation step.
+
+On DEMs without exact elevation ties, the result is bit-identical to richdem's
+Priority-Flood+Epsilon, whatever the tile size. Where ties exist, richdem's
+output depends on its queue order. It BFS-raises a flat from whichever outlet
+cell pops first, and it raises a tied cell by 1 ULP even when that cell has its
+own lower neighbour. Here a flat is raised from all of its outlets at once,
+i.e. by its shortest distance to any outlet. Every cell richdem leaves
+unraised is such an outlet, so a tied cell is never above richdem's value
+and falls short of it by the extra steps richdem's BFS takes from the outlet
+it popped first. For a flat that drains through one spill point, that is at
+most the spread of the spill point's tied outlet cells, a ULP or two (the
+tests assert this). The fill level itself never differs, and the result is
+still independent of the tile size.
+Interior nodata holes count as outlets (richdem treats a hole as an outlet only
+for the cells still unvisited when its flood reaches it).
+
+Peak RAM is bounded by the tile, not the DEM: about 40 B/cell of one tile
+(float64 elevations, int32 labels, heap and queue). The full-grid intermediates
+(float64 fill level, int32 labels, reused as int32 distances, so 12 B/cell) live
+in memory-mapped ``.npy`` files in a scratch directory beside the output.
+
+`depth_to_spill_array` is the small-window sibling used by
+``dprst_depth.topo.depth_to_spill``. It runs a plain in-memory Priority-Flood
+(Barnes 2014, no epsilon) on one DEM window in its own dtype, so a float32
+window stays float32, and returns ``filled - dem`` directly. For a float32
+window that is at most 13 B/cell beyond the input: the float32 result, bool
+closed flags, and two queues with room for every cell, an int32 pit FIFO and
+a float32/int32 array heap. A cell enters one queue, once, and only touched
+pages are committed, so the queues hold at most 8 B/cell together. richdem
+needs float64 copies of the window and its fill, plus its own queues.
+
+Like `d8_routing.py` and `d8_flow.py`, this module keeps numba out of the
+widely-imported modules.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from numba import njit, types
+from numba.typed import Dict
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+# 3.6B-cell VPU 10 at 4096 is ~220 tiles; 4096^2 float64 + int32 + queues is
+# ~0.7 GB per tile.
+DEFAULT_TILE_SIZE = 4096
+
+_OCEAN = 1
+_UNREACHED = np.iinfo(np.int32).max
+
+# 8-neighbourhood; the order only affects heap insertion, never the result.
+_DR = np.array([0, -1, -1, -1, 0, 1, 1, 1], dtype=np.int64)
+_DC = np.array([-1, -1, 0, 1, 1, 1, 0, -1], dtype=np.int64)
+
+
+@njit(cache=True)
+def _flood_tile(z, nodata, edge_top, edge_bottom, edge_left, edge_right, labels):
+    """Barnes (2016) stage 1 on one tile, in place.
+
+    `z` (float64) is filled to the tile-local spill level and `labels` (int32)
+    receives the watershed label of every cell. Returns ``(n_labels, eu, ev,
+    ee)``: labels run 1..n_labels, and the edge arrays hold the minimum spill
+    elevation between each touching label pair.
+    """
+    ny, nx = z.shape
+    heap = [(0.0, np.int64(0), np.int64(0))]
+    heap.pop()
+    pit = np.empty(ny * nx, dtype=np.int64)
+    head = 0
+    tail = 0
+    seq = np.int64(0)
+    next_label = 2
+    for r in range(ny):
+        for c in range(nx):
+            zc = z[r, c]
+            if zc == nodata or math.isnan(zc):
+                labels[r, c] = _OCEAN
+                continue
+            on_perimeter = r == 0 or r == ny - 1 or c == 0 or c == nx - 1
+            ocean = ((r == 0 and edge_top) or (r == ny - 1 and edge_bottom)
+                     or (c == 0 and edge_left) or (c == nx - 1 and edge_right))
+            if not ocean:
+                for k in range(8):
+                    rn = r + _DR[k]
+                    cn = c + _DC[k]
+                    if 0 <= rn < ny and 0 <= cn < nx:
+                        zn = z[rn, cn]
+                        if zn == nodata or math.isnan(zn):
+                            ocean = True
+                            break
+            if ocean:
+                labels[r, c] = _OCEAN
+            elif on_perimeter:
+                labels[r, c] = next_label
+                next_label += 1
+            else:
+                labels[r, c] = 0
+                continue
+            heapq.heappush(heap, (zc, seq, np.int64(r * nx + c)))
+            seq += 1
+
+    spill = Dict.empty(key_type=types.int64, value_type=types.float64)
+    while len(heap) > 0 or head < tail:
+        # Raised cells (the pit queue) go first: they are never higher than
+        # the heap top, and a FIFO is cheaper than the heap.
+        if head < tail:
+            idx = pit[head]
+            head += 1
+        else:
+            idx = heapq.heappop(heap)[2]
+        r = idx // nx
+        c = idx - r * nx
+        zc = z[r, c]
+        lc = labels[r, c]
+        for k in range(8):
+            rn = r + _DR[k]
+            cn = c + _DC[k]
+            if rn < 0 or rn >= ny or cn < 0 or cn >= nx:
+                continue
+            ln = labels[rn, cn]
+            if ln != 0:
+                zn = z[rn, cn]
+                if ln != lc and zn != nodata and not math.isnan(zn):
+                    a = min(lc, ln)
+                    b = max(lc, ln)
+                    key = (np.int64(a) << 32) | np.int64(b)
+                    e = max(zc, zn)
+                    if key not in spill or e < spill[key]:
+                        spill[key] = e
+                continue
+            labels[rn, cn] = lc
+            if z[rn, cn] <= zc:
+                z[rn, cn] = zc
+                pit[tail] = rn * nx + cn
+                tail += 1
+            else:
+                heapq.heappush(heap, (z[rn, cn], seq, np.int64(rn * nx + cn)))
+                seq += 1
+
+    n = len(spill)
+    eu = np.empty(n, dtype=np.int64)
+    ev = np.empty(n, dtype=np.int64)
+    ee = np.empty(n, dtype=np.float64)
+    i = 0
+    for key, e in spill.items():
+        eu[i] = key >> 32
+        ev[i] = key & 0xFFFFFFFF
+        ee[i] = e
+        i += 1
+    return next_label - 1, eu, ev, ee
+
+
+@njit(cache=True)
+def _graph_levels(n_nodes, eu, ev, ee):
+    """Barnes (2016) stage 2: fill level of every node, flooding from node 0 (ocean).
+
+    A node's level is the lowest achievable maximum spill elevation over all
+    paths to the ocean (-inf for the ocean itself, +inf if unreachable).
+    """
+    deg = np.zeros(n_nodes + 1, dtype=np.int64)
+    for i in range(eu.size):
+        deg[eu[i] + 1] += 1
+        deg[ev[i] + 1] += 1
+    for i in range(n_nodes):
+        deg[i + 1] += deg[i]
+    nbr = np.empty(deg[n_nodes], dtype=np.int64)
+    elev = np.empty(deg[n_nodes], dtype=np.float64)
+    fill = deg[:n_nodes].copy()
+    for i in range(eu.size):
+        u = eu[i]
+        v = ev[i]
+        nbr[fill[u]] = v
+        elev[fill[u]] = ee[i]
+        fill[u] += 1
+        nbr[fill[v]] = u
+        elev[fill[v]] = ee[i]
+        fill[v] += 1
+
+    level = np.full(n_nodes, np.inf)
+    level[0] = -np.inf
+    heap = [(-np.inf, np.int64(0))]
+    while len(heap) > 0:
+        lu, u = heapq.heappop(heap)
+        if lu > level[u]:
+            continue
+        for j in range(deg[u], deg[u + 1]):
+            v = nbr[j]
+            cand = max(lu, elev[j])
+            if cand < level[v]:
+                level[v] = cand
+                heapq.heappush(heap, (cand, v))
+    return level
+
+
+@njit(cache=True)
+def _apply_levels(local, labels, gid, level, nodata):
+    """Barnes (2016) stage 3 on one tile, in place: ``max(local, level[label])``."""
+    ny, nx = local.shape
+    for r in range(ny):
+        for c in range(nx):
+            z = local[r, c]
+            if z == nodata or math.isnan(z):
+                continue
+            lv = level[gid[labels[r, c]]]
+            if lv > z and lv != np.inf:
+                local[r, c] = lv
+
+
+@njit(cache=True)
+def _flat_distance_tile(lp, outside, dp, nodata, dist):
+    """Distance (in cells) of every flat cell in the core of `lp` from its flat's outlets.
+
+    `lp` is the filled tile with a one-cell halo. `outside` flags the halo cells
+    that lie beyond the DEM. `dp` carries the neighbouring tiles' current
+    distances in the halo. `dist` (int32, core-sized) is overwritten. Cells off
+    any flat get 0. Flat cells with no known route out get `_UNREACHED`.
+    """
+    hp, wp = lp.shape
+    h = hp - 2
+    w = wp - 2
+    heap = [(np.int64(0), np.int64(0))]
+    heap.pop()
+    for i in range(1, h + 1):
+        for j in range(1, w + 1):
+            z = lp[i, j]
+            dist[i - 1, j - 1] = 0
+            if z == nodata or math.isnan(z):
+                continue
+            flat = False
+            outlet = False
+            best = np.int64(_UNREACHED)
+            for k in range(8):
+                a = i + _DR[k]
+                b = j + _DC[k]
+                if outside[a, b]:
+                    outlet = True
+                    continue
+                zn = lp[a, b]
+                if zn == nodata or math.isnan(zn) or zn < z:
+                    outlet = True
+                elif zn == z:
+                    flat = True
+                    in_halo = a == 0 or a == h + 1 or b == 0 or b == w + 1
+                    if in_halo and dp[a, b] != _UNREACHED:
+                        best = min(best, np.int64(dp[a, b]) + 1)
+            if not flat:
+                continue
+            if outlet:
+                best = 0
+            dist[i - 1, j - 1] = best
+            if best != _UNREACHED:
+                heapq.heappush(heap, (best, np.int64((i - 1) * w + (j - 1))))
+
+    # Unit-weight Dijkstra from the outlets and the halo-seeded cells.
+    while len(heap) > 0:
+        d, idx = heapq.heappop(heap)
+        r = idx // w
+        c = idx - r * w
+        if d > dist[r, c]:
+            continue
+        z = lp[r + 1, c + 1]
+        for k in range(8):
+            rn = r + _DR[k]
+            cn = c + _DC[k]
+            if rn < 0 or rn >= h or cn < 0 or cn >= w:
+                continue
+            if lp[rn + 1, cn + 1] == z and dist[rn, cn] > d + 1:
+                dist[rn, cn] = d + 1
+                heapq.heappush(heap, (d + 1, np.int64(rn * w + cn)))
+
+
+@njit(cache=True)
+def _apply_epsilon(filled, dist):
+    """Raise each flat cell `dist` float64 ULPs (richdem's repeated nextafter), in place."""
+    ny, nx = filled.shape
+    bits = filled.view(np.int64)
+    n_unreached = 0
+    for r in range(ny):
+        for c in range(nx):
+            d = dist[r, c]
+            if d == 0:
+                continue
+            if d == _UNREACHED:
+                n_unreached += 1
+                continue
+            z = filled[r, c]
+            if z > 0.0:
+                # Positive finite doubles are ordered like their bit patterns.
+                bits[r, c] += d
+            else:
+                for _ in range(d):
+                    z = np.nextafter(z, np.inf)
+                filled[r, c] = z
+    return n_unreached
+
+
+@njit(cache=True)
+def _heap_push(hkey, hidx, n, key, idx):
+    """Push ``(key, idx)`` onto the binary min-heap ``hkey[:n]``/``hidx[:n]``; returns the new size."""
+    i = n
+    while i > 0:
+        parent = (i - 1) >> 1
+        if hkey[parent] <= key:
+            break
+        hkey[i] = hkey[parent]
+        hidx[i] = hidx[parent]
+        i = parent
+    hkey[i] = key
+    hidx[i] = idx
+    return n + 1
+
+
+@njit(cache=True)
+def _heap_pop(hkey, hidx, n):
+    """Pop the lowest-key entry of ``hkey[:n]``/``hidx[:n]``; returns ``(idx, new size)``."""
+    top = np.int64(hidx[0])
+    n -= 1
+    key = hkey[n]
+    idx = hidx[n]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= n:
+            break
+        if child + 1 < n and hkey[child + 1] < hkey[child]:
+            child += 1
+        if hkey[child] >= key:
+            break
+        hkey[i] = hkey[child]
+        hidx[i] = hidx[child]
+        i = child
+    hkey[i] = key
+    hidx[i] = idx
+    return top, n
+
+
+@njit(cache=True)
+def _spill_depth(z, depth, closed, pit, hkey, hidx, nodata):
+    """Priority-Flood fill of window `z`, written as depth-to-spill into `depth`.
+
+    `depth` must arrive as a copy of `z`; it holds the fill level during the
+    flood and ``level - z`` afterwards (0 at nodata/NaN cells). Seeds are the
+    window edge and every cell 8-adjacent to nodata, so a void drains like
+    the window edge does, as in `_flood_tile`. `closed` (bool), `pit` (an
+    index FIFO) and the open heap `hkey`/`hidx` (`depth`'s dtype / `pit`'s
+    dtype) are scratch with room for every cell: a cell is queued at most
+    once, when it is closed. The fill level does not depend on the order
+    tied cells pop in, so the heap needs no insertion counter.
+    """
+    ny, nx = z.shape
+    n_open = 0
+    for r in range(ny):
+        for c in range(nx):
+            zc = z[r, c]
+            if zc == nodata or math.isnan(zc):
+                closed[r, c] = True
+                continue
+            seed = r == 0 or r == ny - 1 or c == 0 or c == nx - 1
+            if not seed:
+                for k in range(8):
+                    zn = z[r + _DR[k], c + _DC[k]]
+                    if zn == nodata or math.isnan(zn):
+                        seed = True
+                        break
+            if seed:
+                closed[r, c] = True
+                n_open = _heap_push(hkey, hidx, n_open, zc, r * nx + c)
+
+    head = 0
+    tail = 0
+    while n_open > 0 or head < tail:
+        # Raised cells (the pit queue) go first, as in `_flood_tile`.
+        if head < tail:
+            idx = np.int64(pit[head])
+            head += 1
+        else:
+            idx, n_open = _heap_pop(hkey, hidx, n_open)
+        r = idx // nx
+        c = idx - r * nx
+        level = depth[r, c]
+        for k in range(8):
+            rn = r + _DR[k]
+            cn = c + _DC[k]
+            if rn < 0 or rn >= ny or cn < 0 or cn >= nx or closed[rn, cn]:
+                continue
+            closed[rn, cn] = True
+            if depth[rn, cn] <= level:
+                depth[rn, cn] = level
+                pit[tail] = rn * nx + cn
+                tail += 1
+            else:
+                n_open = _heap_push(hkey, hidx, n_open, depth[rn, cn], rn * nx + cn)
+
+    for r in range(ny):
+        for c in range(nx):
+            zc = z[r, c]
+            if zc == nodata or math.isnan(zc):
+                depth[r, c] = 0.0
+            else:
+                depth[r, c] = depth[r, c] - zc
+
+
+def depth_to_spill_array(dem: np.ndarray, nodata: float = -9999.0) -> np.ndarray:
+    """Depth to spill (``filled - dem``, >= 0, 0 at nodata) of one in-memory window.
+
+    float32 and float64 windows are filled in their own dtype; anything else
+    is read as float32. Every filled cell takes the elevation of a real cell
+    on its spill path, so on windows whose nodata touches the window edge
+    (the tile-edge case) depths agree with richdem's
+    ``FillDepressions(epsilon=False)`` to float rounding. A nodata hole inside
+    the window is always an outlet here, as in `fill_depressions_tiled`.
+    """
+    z = np.ascontiguousarray(dem)
+    if z.dtype != np.float32 and z.dtype != np.float64:
+        z = z.astype(np.float32)
+    depth = z.copy()
+    if z.size:
+        index_dtype = np.int32 if z.size < np.iinfo(np.int32).max else np.int64
+        # np.empty pages are committed only as the queues actually grow.
+        pit = np.empty(z.size, dtype=index_dtype)
+        hkey = np.empty(z.size, dtype=z.dtype)
+        hidx = np.empty(z.size, dtype=index_dtype)
+        _spill_depth(z, depth, np.zeros(z.shape, dtype=np.bool_), pit, hkey, hidx, np.float64(nodata))
+    return depth
+
+
+def _tiles(height: int, width: int, tile_size: int):
+    """Row-major ``(r0, r1, c0, c1)`` tile bounds."""
+    return [
+        (r0, min(r0 + tile_size, height), c0, min(c0 + tile_size, width))
+        for r0 in range(0, height, tile_size)
+        for c0 in range(0, width, tile_size)
+    ]
+
+
+def _seam_edges(lab_a, z_a, lab_b, z_b, nodata):
+    """Spill edges between two adjacent 1-D seam lines (global node ids).
+
+    Cell i of line `a` touches cells i-1, i and i+1 of line `b`. A nodata cell
+    is the ocean, so a land cell facing one across the seam spills to node 0
+    at its own elevation.
+    """
+    eu, ev, ee = [], [], []
+    n = lab_a.size
+    for off in (-1, 0, 1):
+        ia = np.arange(max(0, -off), min(n, n - off))
+        ib = ia + off
+        za, zb = z_a[ia], z_b[ib]
+        land_a = (za != nodata) & ~np.isnan(za)
+        land_b = (zb != nodata) & ~np.isnan(zb)
+        ua = np.where(land_a, lab_a[ia], 0)
+        ub = np.where(land_b, lab_b[ib], 0)
+        keep = (ua != ub) & (land_a | land_b)
+        eu.append(ua[keep])
+        ev.append(ub[keep])
+        ee.append(np.fmax(np.where(land_a, za, np.nan), np.where(land_b, zb, np.nan))[keep])
+    return np.concatenate(eu), np.concatenate(ev), np.concatenate(ee)
+
+
+def _padded(arr, r0, r1, c0, c1, fill):
+    """``arr[r0-1:r1+1, c0-1:c1+1]`` with cells beyond the grid set to `fill`."""
+    height, width = arr.shape
+    out = np.full((r1 - r0 + 2, c1 - c0 + 2), fill, dtype=arr.dtype)
+    rr0, rr1 = max(r0 - 1, 0), min(r1 + 1, height)
+    cc0, cc1 = max(c0 - 1, 0), min(c1 + 1, width)
+    out[rr0 - (r0 - 1):rr1 - (r0 - 1), cc0 - (c0 - 1):cc1 - (c0 - 1)] = arr[rr0:rr1, cc0:cc1]
+    return out
+
+
+def fill_depressions_array(dem: np.ndarray, nodata: float, *, tile_size: int = DEFAULT_TILE_SIZE,
+                           scratch_dir: Path | None = None, logger=None) -> np.ndarray:
+    """In-memory convenience wrapper around the tiled fill (float64 copy of `dem`).
+
+    Intended for tests and small windows; the tiling still applies, so this is
+    also how tile-size independence is checked.
+    """
+    dem = np.asarray(dem, dtype=np.float64)
+    with tempfile.TemporaryDirectory(dir=scratch_dir) as tmp:
+        src = Path(tmp) / "dem.tif"
+        dst = Path(tmp) / "filled.tif"
+        profile = {
+            "driver": "GTiff", "dtype": "float64", "nodata": nodata,
+            "width": dem.shape[1], "height": dem.shape[0], "count": 1,
+            "transform": from_origin(0.0, float(dem.shape[0]), 1.0, 1.0),
+        }
+        with rasterio.open(src, "w", **profile) as f:
+            f.write(dem, 1)
+        fill_depressions_tiled(src, dst, nodata, tile_size=tile_size, logger=logger)
+        with rasterio.open(dst) as f:
+            return f.read(1)
+
+
+def fill_depressions_tiled(src_path: Path, dst_path: Path, nodata: float, *,
+                           tile_size: int = DEFAULT_TILE_SIZE, logger=None) -> dict:
+    """Priority-Flood+Epsilon fill of the DEM at `src_path`, tile by tile.
+
+    Writes a float64 GeoTIFF to `dst_path` (LZW without predictor, tiled 512,
+    BIGTIFF, as `_fill_depressions_richdem` writes). Nodata cells stay
+    `nodata`. Returns counts for the caller's log: tiles, graph nodes and
+    edges, and epsilon reconciliation passes.
+    """
+    src_path, dst_path = Path(src_path), Path(dst_path)
+    if tile_size < 2:
+        raise ValueError(f"tile_size must be >= 2, got {tile_size}")
+    with rasterio.open(src_path) as src:
+        height, width = src.height, src.width
+        profile = src.profile.copy()
+    profile.update({
+        "dtype": "float64", "nodata": nodata, "compress": "lzw", "tiled": True,
+        "blockxsize": 512, "blockysize": 512, "BIGTIFF": "YES",
+    })
+    profile.pop("predictor", None)
+    nodata = np.float64(nodata)
+    tiles = _tiles(height, width, tile_size)
+
+    scratch = dst_path.parent / f"{dst_path.stem}_fill_scratch"
+    scratch.mkdir(parents=True, exist_ok=True)
+    try:
+        local = np.lib.format.open_memmap(scratch / "filled.npy", mode="w+", dtype=np.float64,
+                                          shape=(height, width))
+        labels = np.lib.format.open_memmap(scratch / "labels.npy", mode="w+", dtype=np.int32,
+                                           shape=(height, width))
+
+        # Stage 1: flood every tile from its own perimeter.
+        eu, ev, ee = [], [], []
+        base = np.zeros(len(tiles) + 1, dtype=np.int64)
+        with rasterio.open(src_path) as src:
+            for t, (r0, r1, c0, c1) in enumerate(tiles):
+                z = src.read(1, window=Window(c0, r0, c1 - c0, r1 - r0)).astype(np.float64)
+                lab = np.empty(z.shape, dtype=np.int32)
+                n_lab, u, v, e = _flood_tile(z, nodata, r0 == 0, r1 == height, c0 == 0, c1 == width, lab)
+                # Global node ids: the ocean is node 0 in every tile, label
+                # l >= 2 of tile t is node base[t] + l - 1.
+                base[t + 1] = base[t] + n_lab - 1
+                gid = np.arange(n_lab + 1, dtype=np.int64) + base[t] - 1
+                gid[_OCEAN] = 0
+                eu.append(gid[u])
+                ev.append(gid[v])
+                ee.append(e)
+                local[r0:r1, c0:c1] = z
+                labels[r0:r1, c0:c1] = lab
+                if logger is not None:
+                    logger.info("  fill stage 1: tile %d/%d rows %d-%d cols %d-%d, %d labels",
+                                t + 1, len(tiles), r0, r1, c0, c1, n_lab)
+        n_nodes = int(base[-1]) + 1
+
+        def _gid_line(lab_line, tile_ids):
+            out = lab_line.astype(np.int64) + base[tile_ids] - 1
+            out[lab_line == _OCEAN] = 0
+            return out
+
+        # Stage 2: seam edges, then the global spill graph.
+        n_tc = -(-width // tile_size)
+        cols_tile = np.arange(width) // tile_size
+        for r in range(tile_size, height, tile_size):
+            band_a, band_b = (r - 1) // tile_size, r // tile_size
+            u, v, e = _seam_edges(_gid_line(labels[r - 1], band_a * n_tc + cols_tile), local[r - 1],
+                                  _gid_line(labels[r], band_b * n_tc + cols_tile), local[r], nodata)
+            eu.append(u)
+            ev.append(v)
+            ee.append(e)
+        rows_tile = (np.arange(height) // tile_size) * n_tc
+        for c in range(tile_size, width, tile_size):
+            u, v, e = _seam_edges(_gid_line(labels[:, c - 1], rows_tile + (c - 1) // tile_size), local[:, c - 1],
+                                  _gid_line(labels[:, c], rows_tile + c // tile_size), local[:, c], nodata)
+            eu.append(u)
+            ev.append(v)
+            ee.append(e)
+        eu, ev, ee = np.concatenate(eu), np.concatenate(ev), np.concatenate(ee)
+        level = _graph_levels(n_nodes, eu, ev, ee)
+        if logger is not None:
+            logger.info("  fill stage 2: spill graph %d nodes, %d edges", n_nodes, eu.size)
+
+        # Stage 3: raise every label to its level.
+        for t, (r0, r1, c0, c1) in enumerate(tiles):
+            lab = np.asarray(labels[r0:r1, c0:c1])
+            z = np.array(local[r0:r1, c0:c1])
+            gid = np.arange(int(lab.max()) + 1, dtype=np.int64) + base[t] - 1
+            gid[_OCEAN] = 0
+            _apply_levels(z, lab, gid, level, nodata)
+            local[r0:r1, c0:c1] = z
+        local.flush()
+
+        # Epsilon: flat distances, reconciled across tile seams until stable.
+        # The labels are no longer needed, so their buffer holds the distances.
+        dist = labels
+        dist[:] = _UNREACHED
+        dirty = set(range(len(tiles)))
+        n_tr = -(-height // tile_size)
+        n_passes = 0
+        while dirty:
+            n_passes += 1
+            queue, dirty = sorted(dirty), set()
+            for t in queue:
+                r0, r1, c0, c1 = tiles[t]
+                lp = _padded(local, r0, r1, c0, c1, np.nan)
+                outside = _outside_mask(height, width, r0, r1, c0, c1)
+                dp = _padded(dist, r0, r1, c0, c1, _UNREACHED)
+                d = np.empty((r1 - r0, c1 - c0), dtype=np.int32)
+                _flat_distance_tile(lp, outside, dp, nodata, d)
+                old = np.asarray(dist[r0:r1, c0:c1])
+                seam_changed = (
+                    not np.array_equal(d[0], old[0]) or not np.array_equal(d[-1], old[-1])
+                    or not np.array_equal(d[:, 0], old[:, 0]) or not np.array_equal(d[:, -1], old[:, -1])
+                )
+                dist[r0:r1, c0:c1] = d
+                if seam_changed:
+                    tr, tc = divmod(t, n_tc)
+                    for dr in (-1, 0, 1):
+                        for dc in (-1, 0, 1):
+                            nr, nc = tr + dr, tc + dc
+                            if (dr or dc) and 0 <= nr < n_tr and 0 <= nc < n_tc:
+                                dirty.add(nr * n_tc + nc)
+            if logger is not None:
+                logger.info("  fill epsilon pass %d: %d tiles re-solved, %d re-queued",
+                            n_passes, len(queue), len(dirty))
+
+        n_unreached = 0
+        with rasterio.open(dst_path, "w", **profile) as dst:
+            for r0, r1, c0, c1 in tiles:
+                z = np.array(local[r0:r1, c0:c1])
+                n_unreached += _apply_epsilon(z, np.asarray(dist[r0:r1, c0:c1]))
+                dst.write(z, 1, window=Window(c0, r0, c1 - c0, r1 - r0))
+        if n_unreached and logger is not None:
+            logger.warning("  fill: %d flat cells found no outlet; left at their fill level", n_unreached)
+        del local, labels, dist
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return {"tiles": len(tiles), "graph_nodes": n_nodes, "graph_edges": int(eu.size),
+            "epsilon_passes": n_passes}
+
+
+def _outside_mask(height: int, width: int, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+    """Halo-padded bool mask of the cells around tile ``[r0:r1, c0:c1]`` beyond the DEM."""
+    out = np.zeros((r1 - r0 + 2, c1 - c0 + 2), dtype=np.bool_)
+    if r0 == 0:
+        out[0, :] = True
+    if r1 == height:
+        out[-1, :] = True
+    if c0 == 0:
+        out[:, 0] = True
+    if c1 == width:
+        out[:, -1] = True
+    return out
@@ -14,6 +14,12 @@ Single-purpose (FDR only): no FAC/slope/aspect/TWI — those are TWI-side
 derivatives produced by compute_dem_derivatives, irrelevant to depression
 routing. Reuses that module's nodata-fix and WBT-runner helpers.
 
+The fill half of breach-or-fill is the ``fill_backend`` step key: ``wbt``
+(default) passes ``--fill`` to BreachDepressionsLeastCost; ``tiled`` breaches
+without it and fills the breached DEM with the out-of-core
+`gfv2_params.priority_flood` Priority-Flood+epsilon (the same fill as
+compute_dem_derivatives' ``fill_backend: tiled``) before D8Pointer.
+
 Registered in BUILDERS/STEP_ORDER but NOT in the default ``steps:`` list of
 configs/shared_rasters/shared_rasters.yml — users opt in explicitly.
 
@@ -26,11 +32,17 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from gfv2_params.priority_flood import DEFAULT_TILE_SIZE
 from gfv2_params.wbt import find_whitebox_tools_binary
 
 # DEM_NODATA is re-exported here so callers/tests can import it from this module
 # without reaching into compute_dem_derivatives directly.
-from .compute_dem_derivatives import DEM_NODATA, _fix_dem_nodata, _run_wbt  # noqa: F401
+from .compute_dem_derivatives import (  # noqa: F401
+    DEM_NODATA,
+    _fill_depressions_tiled,
+    _fix_dem_nodata,
+    _run_wbt,
+)
 from .context import SharedRastersContext
 
 # BreachDepressionsLeastCost search radius (cells). Too small -> pits that can't
@@ -54,19 +66,36 @@ BREACH_DIST = 100
 # threshold) would be a different raster with a different purpose.
 BREACH_FILL = True
 
+# Who fills the pits the breach leaves (only when fill is on): "wbt" = the
+# --fill flag of BreachDepressionsLeastCost; "tiled" = priority_flood.
+FILL_BACKENDS = ("wbt", "tiled")
+
 
 def _breach_and_d8(dem_fixed: Path, dem_breached: Path, fdr_out: Path,
                    runner: str, logger, *, dist: int = BREACH_DIST,
-                   fill: bool = BREACH_FILL) -> None:
-    """WBT BreachDepressionsLeastCost on the fixed DEM, then D8Pointer."""
+                   fill: bool = BREACH_FILL, fill_backend: str = "wbt",
+                   fill_tile_size: int = DEFAULT_TILE_SIZE) -> None:
+    """WBT BreachDepressionsLeastCost on the fixed DEM, then D8Pointer.
+
+    With ``fill_backend="tiled"`` the breach runs without ``--fill`` into a
+    scratch raster, which `_fill_depressions_tiled` then fills into
+    `dem_breached`.
+    """
+    tiled_fill = fill and fill_backend == "tiled"
+    breach_out = dem_breached.with_name(f"{dem_breached.stem}_unfilled.tif") if tiled_fill else dem_breached
     breach_args = [
         f"--dem={dem_fixed}",
-        f"--output={dem_breached}",
+        f"--output={breach_out}",
         f"--dist={dist}",
     ]
-    if fill:
+    if fill and not tiled_fill:
         breach_args.append("--fill")
     _run_wbt(runner, "BreachDepressionsLeastCost", breach_args, logger)
+    if tiled_fill:
+        try:
+            _fill_depressions_tiled(breach_out, dem_breached, logger, tile_size=fill_tile_size)
+        finally:
+            breach_out.unlink(missing_ok=True)   # VPU-sized scratch; never leave it behind
     _run_wbt(
         runner, "D8Pointer",
         [f"--dem={dem_breached}", f"--output={fdr_out}", "--esri_pntr"],
@@ -76,7 +105,8 @@ def _breach_and_d8(dem_fixed: Path, dem_breached: Path, fdr_out: Path,
 
 def _process_vpu(vpu: str, input_dir: Path, output_dir: Path, runner: str,
                  force: bool, logger, *, dist: int = BREACH_DIST,
-                 fill: bool = BREACH_FILL) -> None:
+                 fill: bool = BREACH_FILL, fill_backend: str = "wbt",
+                 fill_tile_size: int = DEFAULT_TILE_SIZE) -> None:
     vpu_dir = output_dir / vpu
     vpu_dir.mkdir(parents=True, exist_ok=True)
 
@@ -103,14 +133,19 @@ def _process_vpu(vpu: str, input_dir: Path, output_dir: Path, runner: str,
     else:
         logger.info("[VPU %s] reusing staged fixed DEM: %s", vpu, dem_fixed)
 
-    logger.info("[VPU %s] --- WBT BreachDepressionsLeastCost (dist=%d, fill=%s) ---",
-                vpu, dist, fill)
-    _breach_and_d8(dem_fixed, dem_breached, fdr_out, runner, logger, dist=dist, fill=fill)
+    logger.info("[VPU %s] --- WBT BreachDepressionsLeastCost (dist=%d, fill=%s, fill_backend=%s) ---",
+                vpu, dist, fill, fill_backend)
+    _breach_and_d8(dem_fixed, dem_breached, fdr_out, runner, logger, dist=dist, fill=fill,
+                   fill_backend=fill_backend, fill_tile_size=fill_tile_size)
     logger.info("[VPU %s] wrote breached FDR: %s", vpu, fdr_out)
 
 
 def build(step_cfg: dict, ctx: SharedRastersContext, logger) -> dict:
-    """Breach + D8 every VPU in ``ctx.vpus``. Opt-in; returns {} (per-VPU)."""
+    """Breach + D8 every VPU in ``ctx.vpus``. Opt-in; returns {} (per-VPU).
+
+    step_cfg keys: ``breach_dist``, ``breach_fill``, ``fill_backend`` (``wbt``
+    default, or ``tiled``) and ``fill_tile_size`` (tiled backend only).
+    """
     input_dir = Path(step_cfg.get("input_dir", ctx.per_vpu_dir))
     output_dir = Path(step_cfg.get("output_dir", ctx.per_vpu_dir))
 
@@ -120,10 +155,17 @@ def build(step_cfg: dict, ctx: SharedRastersContext, logger) -> dict:
 
     dist = int(step_cfg.get("breach_dist", BREACH_DIST))
     fill = bool(step_cfg.get("breach_fill", BREACH_FILL))
+    fill_backend = str(step_cfg.get("fill_backend", "wbt"))
+    if fill_backend not in FILL_BACKENDS:
+        raise ValueError(
+            f"compute_breached_fdr: fill_backend must be one of {FILL_BACKENDS}, got {fill_backend!r}"
+        )
+    fill_tile_size = int(step_cfg.get("fill_tile_size", DEFAULT_TILE_SIZE))
 
     runner = find_whitebox_tools_binary()
     logger.info("WhiteboxTools binary: %s", runner)
     for vpu in ctx.vpus:
         _process_vpu(vpu, input_dir, output_dir, runner, ctx.force, logger,
-                     dist=dist, fill=fill)
+                     dist=dist, fill=fill, fill_backend=fill_backend,
+                     fill_tile_size=fill_tile_size)
     return {}
@@ -16,10 +16,10 @@ cross-border work, #53; future PRMS-threshold recalibration, etc.). It is
 intentionally **not** in the default ``steps:`` list of
 configs/shared_rasters/shared_rasters.yml; users add it explicitly to opt in.
 
-Pipeline (hybrid richdem + WhiteboxTools):
+Pipeline (richdem fill + in-process D8):
   Hydrodem nodata fix -> richdem FillDepressions+epsilon (Barnes 2014
-  priority-flood) -> WhiteboxTools D8Pointer (Esri encoding) -> WhiteboxTools
-  D8FlowAccumulation (cells, exclusive of the cell itself) -> richdem
+  priority-flood) -> D8 pointer (Esri encoding) -> D8 flow accumulation
+  (cells, exclusive of the cell itself) -> richdem
   slope_degrees/slope_percentage/aspect on the FIXED (pre-fill) DEM -> TWI
   = log((fac + 1) * 10 / (tan(min(slope, 60deg)) + 0.01)) -> mask against the
   per-VPU HRU land mask (``land_mask_<vpu>.tif``, built by the
@@ -28,6 +28,23 @@ Pipeline (hybrid richdem + WhiteboxTools):
   this VPU's HRU boundary into adjacent VPUs; only the per-VPU mask clips
   the TWI to just this VPU's HRUs.
 
+The D8 pointer/accumulation engine is the ``d8_engine`` step key. ``numba``
+(default) is `gfv2_params.d8_flow`: the filled DEM is read once and FDR, FAC
+and TWI are computed in memory with int64 cell indices, with the FDR/FAC
+GeoTIFFs written as outputs only. ``wbt`` keeps the WhiteboxTools
+D8Pointer -> D8FlowAccumulation subprocesses, which round-trip the multi-GB
+pointer and FAC through GeoTIFF; both produce the same ESRI encoding and the
+same exclusive-of-self FAC (`scripts/diagnose/bench_d8_flow.py` times and
+diffs the two).
+
+The fill backend is the ``fill_backend`` step key. ``richdem`` (default) is the
+in-memory ``FillDepressions(epsilon=True)`` below. ``tiled`` is
+`gfv2_params.priority_flood`, an out-of-core Barnes (2016) tiled
+Priority-Flood+Epsilon whose peak RAM is set by ``fill_tile_size`` rather than
+by the VPU. It produces the same fill levels and the same 1-ULP-per-cell
+epsilon gradient, bit-identical to richdem wherever the DEM has no exact
+elevation ties.
+
 Why cap slope at 60deg: the NHDPlus Hydrodem carries occasional spurious
 high-elevation cells (5530 m points in the Adirondacks, etc. — uncleaned
 stream-burn sentinels or bridge artefacts). Adjacent to those, computed
@@ -38,15 +55,16 @@ keeps every valid cell and guarantees TWI >= log(10/(tan(60deg)+0.01))
 approx 1.75 for fac=0 cells, eliminating negative TWI as a numerical
 artefact of the formula at near-vertical slopes.
 
-Why hybrid (richdem fill + WBT D8): a previous all-richdem revision used
+Why hybrid (richdem fill + non-richdem D8): a previous all-richdem revision used
 ``rd.FlowAccumulation(method='D8')`` for routing. That worked on small/mid
 VPUs but segfaulted on the giants — VPU 03 (2.31B cells) at "Creating
 dependencies array" with 122 GB RAM allocated, and VPU 10 (3.60B cells)
 never made it past 1% fill. richdem's internal C++ uses int32 for cell
 linear indices, which overflows at 2^31 - 1 = 2.147B cells. WhiteboxTools'
 D8FlowAccumulation uses ``size_t`` and routes over arbitrarily large grids
-— slower per cell but stable. We still use richdem for the *fill* step
-because WBT's ``FillDepressions --fix_flats`` doesn't terminate on
+— slower per cell but stable (`d8_flow`, which now replaces it by default,
+indexes cells with int64 for the same reason). We still use richdem for the
+*fill* step because WBT's ``FillDepressions --fix_flats`` doesn't terminate on
 continent-scale flats (VPU 18, California's Central Valley + Mojave, didn't
 finish in 4 hours), where richdem's Barnes 2014 priority-flood finishes in
 ~6 minutes. FAC convention reverts to WBT's: headwater = 0 (exclusive of
@@ -58,14 +76,15 @@ per cell. At 1000 m elevation, ULP_float32 ~ 6e-5 m while ULP_float64 ~
 1e-13 m — the float64 increment is small enough to be invisibly thin, but
 float32 ULPs accumulate fast enough to push deep closed basins above their
 bounding rim on continent-scale flats. So we fill in float64 and save in
-float64 so WBT D8Pointer / D8FlowAccumulation see the same per-cell ULP
+float64 so the D8 pointer (either engine) sees the same per-cell ULP
 gradient that broke under float32 in earlier revisions.
 
 Outputs (per VPU, written to {data_root}/shared/per_vpu/<vpu>/):
 - Hydrodem_merged_fixed_<vpu>.tif  (intermediate, nodata=-9999)
-- Hydrodem_filled_<vpu>.tif        (richdem FillDepressions+epsilon, float64)
-- Fdr_hydrodem_<vpu>.tif           (WBT D8 pointer, Esri encoding)
-- Fac_hydrodem_<vpu>.tif           (WBT D8 flow accumulation, cells)
+- Hydrodem_filled_<vpu>.tif        (Priority-Flood+epsilon fill, float64)
+- Fdr_hydrodem_<vpu>.tif           (D8 pointer, Esri encoding; uint8 nodata 255
+                                    from numba, int16 from WBT)
+- Fac_hydrodem_<vpu>.tif           (D8 flow accumulation, cells, float32)
 - Slope_hydrodem_<vpu>.tif         (richdem slope_degrees, on FIXED DEM)
 - Slope_pct_hydrodem_<vpu>.tif     (richdem slope_percentage, on FIXED DEM)
 - Aspect_hydrodem_<vpu>.tif        (richdem aspect, on FIXED DEM)
@@ -83,7 +102,9 @@ import rasterio
 import richdem as rd
 import rioxarray  # noqa: F401  (registers .rio accessor)
 
+from gfv2_params.d8_flow import FDR_NODATA, d8_fdr_fac_twi, twi_from_fac
 from gfv2_params.depstor import read_land_mask
+from gfv2_params.priority_flood import DEFAULT_TILE_SIZE, fill_depressions_tiled
 from gfv2_params.wbt import find_whitebox_tools_binary, run_streamed
 
 from .cog import cog_temp, to_cog
@@ -109,6 +130,14 @@ DEM_NODATA = -9999.0
 # but tractable.
 SLOPE_CAP_DEG = 60.0
 
+# FDR/FAC engines: "numba" = in-process d8_flow (FDR, FAC and TWI fused in
+# memory); "wbt" = the WhiteboxTools D8Pointer/D8FlowAccumulation subprocesses.
+D8_ENGINES = ("numba", "wbt")
+
+# Depression-fill backends: "richdem" = in-memory FillDepressions+epsilon;
+# "tiled" = out-of-core tiled Priority-Flood+Epsilon (priority_flood).
+FILL_BACKENDS = ("richdem", "tiled")
+
 
 def _run_wbt(runner: str, tool: str, args: list[str], logger) -> None:
     cmd = [runner, f"--wd={os.getcwd()}", "--max_procs=-1", f"-r={tool}", *args, "-v"]
@@ -151,10 +180,10 @@ def _fill_depressions_richdem(dem_fixed: Path, dem_filled: Path, logger) -> None
     while ULP_float64 ~ 1e-13 m — the float64 increment is small enough to be
     invisibly thin, but float32 ULPs accumulate fast enough to push deep
     closed basins above their bounding rim on continent-scale flats. So we
-    fill in float64 and save in float64 so the downstream WBT D8 step sees
+    fill in float64 and save in float64 so the downstream D8 step sees
     the same per-cell ULP gradient (a float32 cast collapses adjacent ULP
-    values to identical float32 and WBT then assigns FDR = 0 across filled
-    flats, breaking flow accumulation through every filled depression).
+    values to identical float32 and the pointer then assigns FDR = 0 across
+    filled flats, breaking flow accumulation through every filled depression).
     """
     logger.info("Loading fixed DEM into richdem (no_data=%s)...", DEM_NODATA)
     dem_in = rd.LoadGDAL(str(dem_fixed), no_data=DEM_NODATA)
@@ -184,6 +213,62 @@ def _fill_depressions_richdem(dem_fixed: Path, dem_filled: Path, logger) -> None
         dst.write(np.asarray(dem64, dtype=np.float64), 1)
 
 
+def _fill_depressions_tiled(dem_fixed: Path, dem_filled: Path, logger, *,
+                            tile_size: int = DEFAULT_TILE_SIZE) -> None:
+    """Fill depressions tile by tile (`priority_flood`), same output as the richdem path.
+
+    Float64 LZW without predictor, like `_fill_depressions_richdem`; peak RAM
+    is a few tiles' worth, with the full-grid intermediates memory-mapped in a
+    scratch directory beside `dem_filled`.
+    """
+    logger.info("Running tiled Priority-Flood+epsilon (tile_size=%d)...", tile_size)
+    stats = fill_depressions_tiled(dem_fixed, dem_filled, DEM_NODATA, tile_size=tile_size, logger=logger)
+    logger.info("  %d tiles, spill graph %d nodes / %d edges, %d epsilon passes -> %s",
+                stats["tiles"], stats["graph_nodes"], stats["graph_edges"],
+                stats["epsilon_passes"], dem_filled)
+
+
+def _twi_profile(width: int, height: int, crs, transform) -> dict:
+    return {
+        "driver": "GTiff",
+        "dtype": "float32",
+        "nodata": DEM_NODATA,
+        "width": width,
+        "height": height,
+        "count": 1,
+        "crs": crs,
+        "transform": transform,
+        "compress": "lzw",
+        "tiled": True,
+        "blockxsize": 512,
+        "blockysize": 512,
+        "BIGTIFF": "YES",
+    }
+
+
+def _slope_nodata(slope_deg) -> float:
+    slope_nd_raw = getattr(slope_deg, "no_data", None)
+    return float(DEM_NODATA if slope_nd_raw is None else slope_nd_raw)
+
+
+def _write_twi(twi: np.ndarray, twi_profile: dict, twi_out: Path, n_valid: int,
+               n_capped: int, land_valid: np.ndarray, logger) -> None:
+    # Twi_hydrodem is the twi_hydrodem.vrt source, consumed only by GDAL tools
+    # (carea_map, marimo, QGIS) — never WBT — so write it as a COG (tiled 512 +
+    # overviews + ZSTD/pred3). Write the plain temp first, then reorganize.
+    twi_out.parent.mkdir(parents=True, exist_ok=True)
+    with cog_temp(twi_out) as twi_tmp:
+        with rasterio.open(twi_tmp, "w", **twi_profile) as dst:
+            dst.write(twi, 1)
+        to_cog(twi_tmp, twi_out, overview_resampling="BILINEAR", predictor=3)
+    logger.info(
+        "Wrote: %s (%d valid pixels of %d; %d cells dropped by land mask; "
+        "%d cells slope-capped at %.0fdeg)",
+        twi_out, n_valid, twi.size, int((~land_valid).sum()),
+        n_capped, SLOPE_CAP_DEG,
+    )
+
+
 def _compute_twi(
     fac_path: Path,
     slope_deg: rd.rdarray,
@@ -203,70 +288,80 @@ def _compute_twi(
     slopes; cap eliminates negative TWI as a numerical artefact).
 
     ``land_valid`` is the boolean per-VPU HRU mask aligned to the FAC grid
-    (True = inside the fabric). Off-land cells write nodata.
+    (True = inside the fabric). Off-land cells write nodata. The formula is
+    `d8_flow.twi_from_fac`, shared with the fused in-process engine.
     """
     with rasterio.open(fac_path) as fac_ds:
-        fac = fac_ds.read(1).astype(np.float64)
+        fac = fac_ds.read(1)
         fac_nd = fac_ds.nodata
-        twi_profile = {
-            "driver": "GTiff",
-            "dtype": "float32",
-            "nodata": DEM_NODATA,
-            "width": fac_ds.width,
-            "height": fac_ds.height,
-            "count": 1,
-            "crs": fac_ds.crs,
-            "transform": fac_ds.transform,
-            "compress": "lzw",
-            "tiled": True,
-            "blockxsize": 512,
-            "blockysize": 512,
-            "BIGTIFF": "YES",
-        }
-
-    slope_arr = np.asarray(slope_deg, dtype=np.float64)
-    slope_nd_raw = getattr(slope_deg, "no_data", None)
-    slope_nd = float(DEM_NODATA if slope_nd_raw is None else slope_nd_raw)
+        twi_profile = _twi_profile(fac_ds.width, fac_ds.height, fac_ds.crs, fac_ds.transform)
 
-    valid = np.isfinite(fac) & np.isfinite(slope_arr)
-    if fac_nd is not None and np.isfinite(fac_nd):
-        valid &= fac != fac_nd
-    valid &= slope_arr != slope_nd
-    valid &= land_valid
+    twi, n_valid, n_capped = twi_from_fac(
+        fac, slope_deg, land_valid,
+        fac_nodata=np.nan if fac_nd is None else fac_nd,
+        slope_nodata=_slope_nodata(slope_deg),
+        slope_cap_deg=SLOPE_CAP_DEG, twi_nodata=DEM_NODATA,
+    )
+    _write_twi(twi, twi_profile, twi_out, n_valid, n_capped, land_valid, logger)
 
-    # Cap slope at SLOPE_CAP_DEG before the tan() — see module-level constant
-    # for rationale. Counts the cap-clipping for the log.
-    n_capped = int((valid & (slope_arr > SLOPE_CAP_DEG)).sum())
-    slope_capped = np.minimum(slope_arr, SLOPE_CAP_DEG)
 
-    twi = np.full(fac.shape, DEM_NODATA, dtype=np.float32)
-    slope_rad = np.deg2rad(slope_capped[valid])
-    twi_valid = np.log(((fac[valid] + 1.0) * 10.0) / (np.tan(slope_rad) + 0.01))
-    twi[valid] = twi_valid.astype(np.float32)
+def _write_fdr_fac(fdr: np.ndarray, fac: np.ndarray, dem_profile: dict,
+                   fdr_out: Path, fac_out: Path, logger) -> None:
+    """Write the in-process FDR (uint8, nodata 255) and FAC (float32, cells).
 
-    # Twi_hydrodem is the twi_hydrodem.vrt source, consumed only by GDAL tools
-    # (carea_map, marimo, QGIS) — never WBT — so write it as a COG (tiled 512 +
-    # overviews + ZSTD/pred3). Write the plain temp first, then reorganize.
-    twi_out.parent.mkdir(parents=True, exist_ok=True)
-    with cog_temp(twi_out) as twi_tmp:
-        with rasterio.open(twi_tmp, "w", **twi_profile) as dst:
-            dst.write(twi, 1)
-        to_cog(twi_tmp, twi_out, overview_resampling="BILINEAR", predictor=3)
-    logger.info(
-        "Wrote: %s (%d valid pixels of %d; %d cells dropped by land mask; "
-        "%d cells slope-capped at %.0fdeg)",
-        twi_out, int(valid.sum()), valid.size, int((~land_valid).sum()),
-        n_capped, SLOPE_CAP_DEG,
-    )
+    LZW without predictor, like every other raster WBT may be pointed at (see
+    `_fix_dem_nodata`). FAC is float32, as WBT's ``D8FlowAccumulation`` wrote
+    it; the exact int64 counts only live in memory for the fused TWI.
+    """
+    base = {k: dem_profile[k] for k in ("driver", "width", "height", "crs", "transform")}
+    base.update({"count": 1, "compress": "lzw", "tiled": True,
+                 "blockxsize": 512, "blockysize": 512, "BIGTIFF": "YES"})
+    with rasterio.open(fdr_out, "w", **base, dtype="uint8", nodata=FDR_NODATA) as dst:
+        dst.write(fdr, 1)
+    logger.info("Wrote: %s", fdr_out)
+    fac32 = fac.astype(np.float32)
+    fac32[fac < 0] = DEM_NODATA
+    with rasterio.open(fac_out, "w", **base, dtype="float32", nodata=DEM_NODATA) as dst:
+        dst.write(fac32, 1)
+    logger.info("Wrote: %s", fac_out)
+
+
+def _wbt_fdr_fac(vpu: str, dem_filled: Path, fdr_out: Path, fac_out: Path,
+                 runner: str, force: bool, logger) -> None:
+    """The ``d8_engine: wbt`` path: D8Pointer -> D8FlowAccumulation via GeoTIFF."""
+    if force or not fdr_out.exists():
+        logger.info("[VPU %s] --- WBT D8Pointer (Esri encoding) ---", vpu)
+        _run_wbt(
+            runner, "D8Pointer",
+            [f"--dem={dem_filled}", f"--output={fdr_out}", "--esri_pntr"],
+            logger,
+        )
+    else:
+        logger.info("[VPU %s] reusing FDR (exists): %s", vpu, fdr_out)
+
+    if force or not fac_out.exists():
+        logger.info("[VPU %s] --- WBT D8FlowAccumulation (cells, esri_pntr) ---", vpu)
+        _run_wbt(
+            runner, "D8FlowAccumulation",
+            [f"--input={fdr_out}", f"--output={fac_out}",
+             "--pntr", "--esri_pntr", "--out_type=cells"],
+            logger,
+        )
+    else:
+        logger.info("[VPU %s] reusing FAC (exists): %s", vpu, fac_out)
 
 
 def _process_vpu(
     vpu: str,
     input_dir: Path,
     output_dir: Path,
-    runner: str,
+    runner: str | None,
     force: bool,
     logger,
+    *,
+    d8_engine: str = "numba",
+    fill_backend: str = "richdem",
+    fill_tile_size: int = DEFAULT_TILE_SIZE,
 ) -> None:
     vpu_dir = output_dir / vpu
     vpu_dir.mkdir(parents=True, exist_ok=True)
@@ -304,31 +399,23 @@ def _process_vpu(
         logger.info("[VPU %s] reusing fixed DEM (exists): %s", vpu, dem_fixed)
 
     if force or not dem_filled.exists():
-        logger.info("[VPU %s] --- richdem FillDepressions+epsilon (float64) ---", vpu)
-        _fill_depressions_richdem(dem_fixed, dem_filled, logger)
+        if fill_backend == "tiled":
+            logger.info("[VPU %s] --- tiled Priority-Flood+epsilon (float64) ---", vpu)
+            _fill_depressions_tiled(dem_fixed, dem_filled, logger, tile_size=fill_tile_size)
+        else:
+            logger.info("[VPU %s] --- richdem FillDepressions+epsilon (float64) ---", vpu)
+            _fill_depressions_richdem(dem_fixed, dem_filled, logger)
     else:
         logger.info("[VPU %s] reusing filled DEM (exists): %s", vpu, dem_filled)
 
-    if force or not fdr_out.exists():
-        logger.info("[VPU %s] --- WBT D8Pointer (Esri encoding) ---", vpu)
-        _run_wbt(
-            runner, "D8Pointer",
-            [f"--dem={dem_filled}", f"--output={fdr_out}", "--esri_pntr"],
-            logger,
-        )
-    else:
-        logger.info("[VPU %s] reusing FDR (exists): %s", vpu, fdr_out)
-
-    if force or not fac_out.exists():
-        logger.info("[VPU %s] --- WBT D8FlowAccumulation (cells, esri_pntr) ---", vpu)
-        _run_wbt(
-            runner, "D8FlowAccumulation",
-            [f"--input={fdr_out}", f"--output={fac_out}",
-             "--pntr", "--esri_pntr", "--out_type=cells"],
-            logger,
-        )
-    else:
-        logger.info("[VPU %s] reusing FAC (exists): %s", vpu, fac_out)
+    # The in-process engine computes FDR, FAC and TWI together once slope is
+    # known (below). Existing FDR + FAC are reused as on the WBT path, and TWI
+    # then reads FAC back from disk.
+    fused = d8_engine == "numba" and (force or not (fdr_out.exists() and fac_out.exists()))
+    if d8_engine == "wbt":
+        _wbt_fdr_fac(vpu, dem_filled, fdr_out, fac_out, runner, force, logger)
+    elif not fused:
+        logger.info("[VPU %s] reusing FDR/FAC (exist): %s, %s", vpu, fdr_out, fac_out)
 
     # Compute slope/aspect from the FIXED (pre-fill) DEM, not the filled DEM.
     # richdem's epsilon=True fill imprints a per-cell ULP increment (~6e-5 m at
@@ -361,13 +448,31 @@ def _process_vpu(
 
     # Per-VPU mask and Hydrodem share the same grid by construction (the
     # mask was rasterised onto Hydrodem_merged_<vpu>.tif), so a direct
-    # full-array read is correct and avoids a windowed lookup. The WBT FAC
-    # output also lives on this grid, so the mask aligns to it too.
+    # full-array read is correct and avoids a windowed lookup. FDR/FAC (either
+    # engine) are computed on the filled DEM of this grid, so the mask aligns.
     logger.info("[VPU %s] reading per-VPU HRU land mask: %s", vpu, vpu_landmask_path)
     land_valid = read_land_mask(vpu_landmask_path)
 
-    logger.info("[VPU %s] --- TWI = log((fac+1)*10 / (tan(slope_rad) + 0.01)), land-masked ---", vpu)
-    _compute_twi(fac_out, slope_deg, land_valid, twi_out, logger)
+    if fused:
+        logger.info("[VPU %s] --- in-process D8 pointer + flow accumulation + TWI (fused) ---", vpu)
+        with rasterio.open(dem_filled) as src:
+            dem = src.read(1).astype(np.float64, copy=False)
+            dem_profile = src.profile
+            cell_x, cell_y = abs(src.transform.a), abs(src.transform.e)
+        fdr, fac, twi, n_valid, n_capped = d8_fdr_fac_twi(
+            dem, DEM_NODATA, cell_x, cell_y, slope_deg, land_valid,
+            slope_nodata=_slope_nodata(slope_deg), slope_cap_deg=SLOPE_CAP_DEG,
+            twi_nodata=DEM_NODATA,
+        )
+        del dem
+        _write_fdr_fac(fdr, fac, dem_profile, fdr_out, fac_out, logger)
+        del fdr, fac
+        twi_profile = _twi_profile(dem_profile["width"], dem_profile["height"],
+                                   dem_profile["crs"], dem_profile["transform"])
+        _write_twi(twi, twi_profile, twi_out, n_valid, n_capped, land_valid, logger)
+    else:
+        logger.info("[VPU %s] --- TWI = log((fac+1)*10 / (tan(slope_rad) + 0.01)), land-masked ---", vpu)
+        _compute_twi(fac_out, slope_deg, land_valid, twi_out, logger)
 
     logger.info("[VPU %s] compute_dem_derivatives complete", vpu)
 
@@ -379,9 +484,16 @@ def build(step_cfg: dict, ctx: SharedRastersContext, logger) -> dict:
     configs/shared_rasters/shared_rasters.yml. Users add it explicitly when they want the
     open-source TWI alongside the canonical ArcPy-derived one.
 
-    step_cfg keys (both optional; default to ``ctx.per_vpu_dir``):
+    step_cfg keys (all optional; the dirs default to ``ctx.per_vpu_dir``):
       input_dir  — per-VPU Hydrodem source directory
       output_dir — per-VPU derived raster output directory
+      d8_engine  — ``numba`` (default: in-process FDR/FAC/TWI, `d8_flow`) or
+                   ``wbt`` (WhiteboxTools D8Pointer + D8FlowAccumulation)
+      fill_backend — ``richdem`` (default: in-memory FillDepressions+epsilon)
+                   or ``tiled`` (out-of-core Priority-Flood+epsilon,
+                   `priority_flood`)
+      fill_tile_size — tile side in cells for ``fill_backend: tiled``
+                   (default 4096, ~0.7 GB per tile)
 
     Depends on the per-VPU HRU land mask at
     ``{output_dir}/<vpu>/land_mask_<vpu>.tif`` (build_vpu_landmask step).
@@ -395,10 +507,24 @@ def build(step_cfg: dict, ctx: SharedRastersContext, logger) -> dict:
         logger.warning("compute_dem_derivatives: ctx.vpus is empty, nothing to do")
         return {}
 
-    runner = find_whitebox_tools_binary()
-    logger.info("WhiteboxTools binary: %s", runner)
+    d8_engine = str(step_cfg.get("d8_engine", "numba"))
+    if d8_engine not in D8_ENGINES:
+        raise ValueError(f"compute_dem_derivatives: d8_engine must be one of {D8_ENGINES}, got {d8_engine!r}")
+
+    fill_backend = str(step_cfg.get("fill_backend", "richdem"))
+    if fill_backend not in FILL_BACKENDS:
+        raise ValueError(
+            f"compute_dem_derivatives: fill_backend must be one of {FILL_BACKENDS}, got {fill_backend!r}"
+        )
+    fill_tile_size = int(step_cfg.get("fill_tile_size", DEFAULT_TILE_SIZE))
+
+    runner = None
+    if d8_engine == "wbt":
+        runner = find_whitebox_tools_binary()
+        logger.info("WhiteboxTools binary: %s", runner)
 
     for vpu in ctx.vpus:
-        _process_vpu(vpu, input_dir, output_dir, runner, ctx.force, logger)
+        _process_vpu(vpu, input_dir, output_dir, runner, ctx.force, logger, d8_engine=d8_engine,
+                     fill_backend=fill_backend, fill_tile_size=fill_tile_size)
 
     return {}
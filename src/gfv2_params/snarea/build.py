@@ -9,12 +9,16 @@ a single named constant so the swap is one edit + config override.
 from __future__ import annotations
 
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 
 import numpy as np
 import pandas as pd
 
 from .representative import median_sdc, select_representative, similarity
 from .season import annual_sdc
+from .season_batch import seasons_batch
 from .selection import SelectionParams, classify, passes_selection
 from .subgrid import representative_peak_stats
 
@@ -23,6 +27,13 @@ DEFAULT_SNAREA_CURVE = np.round(np.linspace(1.0, 0.0, 11), 4)
 
 _CURVE_COLS = [f"snarea_curve_{i}" for i in range(11)]
 
+# SCA within this of the record maximum counts as "at the maximum" (_constant_frac).
+_CONSTANT_TOL = 1e-9
+
+# Shards per worker in build_snarea_curve(workers>1): a few per worker evens out
+# HRUs whose records cost more (many usable seasons) without per-task overhead.
+_SHARDS_PER_WORKER = 4
+
 
 def validate_default_curve(arr: np.ndarray) -> None:
     """Validate a `default_curve` override: shape, value range, non-increasing.
@@ -71,7 +82,7 @@ def _constant_frac(daily: pd.DataFrame) -> float:
     snow = daily[daily["swe"] > 0]
     if len(snow) == 0:
         return 1.0
-    return float((snow["sca"] >= snow["sca"].max() - 1e-9).mean())
+    return float((snow["sca"] >= snow["sca"].max() - _CONSTANT_TOL).mean())
 
 
 def build_hru_record(
@@ -81,9 +92,46 @@ def build_hru_record(
     water_frac: float,
     params: SelectionParams,
     default_curve: np.ndarray,
+    seasons: list[np.ndarray] | None = None,
 ) -> dict:
-    seasons = _seasons(daily)
-    has_snow = daily["swe"].max() > 0
+    """One HRU's output row. `seasons` takes precomputed annual SDCs (what
+    `_seasons(daily)` would return, e.g. from `season_batch.seasons_batch`)."""
+    if seasons is None:
+        seasons = _seasons(daily)
+    stats = (
+        representative_peak_stats(daily)
+        if "swe_std" in daily.columns
+        else {"cv_subgrid": float("nan"), "peak_swe_mm": float("nan"), "n_peak_years": 0}
+    )
+    return assemble_record(
+        hru_id, seasons,
+        has_snow=daily["swe"].max() > 0,
+        seasonal_sca_max=float(daily["sca"].max()) if len(daily) else 0.0,
+        constant_frac=_constant_frac(daily),
+        peak_stats=stats,
+        n_cells=n_cells, water_frac=water_frac, params=params, default_curve=default_curve,
+    )
+
+
+def assemble_record(
+    hru_id: int,
+    seasons: list[np.ndarray],
+    *,
+    has_snow: bool,
+    seasonal_sca_max: float,
+    constant_frac: float,
+    peak_stats: dict,
+    n_cells: int,
+    water_frac: float,
+    params: SelectionParams,
+    default_curve: np.ndarray,
+) -> dict:
+    """Selection + representative curve from an HRU's whole-record summaries.
+
+    `build_hru_record` computes the summaries from the daily frame;
+    `season_cache.build_from_summaries` merges them from cached per-water-year
+    pieces. Both land here, so the selection logic exists once.
+    """
     sim = float("nan")
     rep = default_curve
     n_seasons = len(seasons)
@@ -100,8 +148,8 @@ def build_hru_record(
         has_snow=has_snow,
         n_cells=n_cells,
         water_frac=water_frac,
-        seasonal_sca_max=float(daily["sca"].max()) if len(daily) else 0.0,
-        constant_frac=_constant_frac(daily),
+        seasonal_sca_max=seasonal_sca_max,
+        constant_frac=constant_frac,
         similarity_value=sim if not np.isnan(sim) else float("inf"),
         params=params,
     )
@@ -119,16 +167,121 @@ def build_hru_record(
         "n_seasons": n_seasons,
     }
     record.update({c: float(rep[i]) for i, c in enumerate(_CURVE_COLS)})
-
-    stats = (
-        representative_peak_stats(daily)
-        if "swe_std" in daily.columns
-        else {"cv_subgrid": float("nan"), "peak_swe_mm": float("nan"), "n_peak_years": 0}
-    )
-    record.update(stats)
+    record.update(peak_stats)
     return record
 
 
+def _shared_index(items: list) -> pd.DatetimeIndex | None:
+    """The daily index every frame in `items` shares, or None."""
+    if not items:
+        return None
+    index = items[0][1].index
+    if not isinstance(index, pd.DatetimeIndex) or not all(
+        d.index is index or d.index.equals(index) for _, d in items
+    ):
+        return None
+    return index
+
+
+def _batch_seasons(items: list) -> list[list[np.ndarray]] | None:
+    """Per-HRU season lists for `items` via `seasons_batch`, or None if the
+    frames do not share one daily index (fall back to per-HRU `_seasons`)."""
+    index = _shared_index(items)
+    if index is None:
+        return None
+    swe = np.stack([d["swe"].to_numpy(dtype="float64") for _, d in items])
+    sca = np.stack([d["sca"].to_numpy(dtype="float64") for _, d in items])
+    curves, ok = seasons_batch(swe, sca, index)
+    return [list(curves[i][ok[i]]) for i in range(len(items))]
+
+
+def _build_records(items, cells_by_hru, water_by_hru, params, default_curve, progress=None):
+    """`build_hru_record` for every ``(hru_id, daily)`` in `items`, in order."""
+    batched = _batch_seasons(items)
+    rows = []
+    for i, (hru_id, daily) in enumerate(items):
+        rows.append(build_hru_record(
+            hru_id, daily, cells_by_hru.get(hru_id, 0),
+            water_by_hru.get(hru_id, 0.0), params, default_curve,
+            seasons=None if batched is None else batched[i],
+        ))
+        if progress is not None:
+            progress(i + 1)
+    return rows
+
+
+def _build_shard(blocks, index, lo, hi, ids, cells_by_hru, water_by_hru, params, default_curve):
+    """Pool-side: records for HRU positions [lo, hi) of the shared daily blocks.
+
+    `blocks` is ``[(column, shm_name, dtype, shape)]``; each shared block is
+    ``(n_hru, n_days)``. The shard's rows are copied out before the segment is
+    detached, so no view outlives it.
+    """
+    part = {}
+    for col, name, dtype, shape in blocks:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            part[col] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)[lo:hi].copy()
+        finally:
+            shm.close()
+    items = [
+        (hru_id, pd.DataFrame({col: arr[j] for col, arr in part.items()}, index=index))
+        for j, hru_id in enumerate(ids)
+    ]
+    return _build_records(items, cells_by_hru, water_by_hru, params, default_curve)
+
+
+def _build_parallel(items, index, cells_by_hru, water_by_hru, params, default_curve,
+                    workers, logger, log_every):
+    """Shard `items` over a spawn ProcessPoolExecutor; rows come back in `items` order."""
+    n = len(items)
+    columns = list(items[0][1].columns)
+    n_shards = min(n, workers * _SHARDS_PER_WORKER)
+    bounds = np.linspace(0, n, n_shards + 1).astype(int)
+    segments, blocks = [], []
+    try:
+        for col in columns:
+            dtype = np.result_type(*(d[col].dtype for _, d in items))
+            shape = (n, len(index))
+            shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+            segments.append(shm)
+            arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            for j, (_, d) in enumerate(items):
+                arr[j] = d[col].to_numpy()
+            del arr
+            blocks.append((col, shm.name, dtype, shape))
+
+        ctx = multiprocessing.get_context("spawn")
+        results = [None] * n_shards
+        done = 0
+        with ProcessPoolExecutor(max_workers=min(workers, n_shards), mp_context=ctx) as pool:
+            futures = {}
+            for k in range(n_shards):
+                lo, hi = int(bounds[k]), int(bounds[k + 1])
+                ids = [hru_id for hru_id, _ in items[lo:hi]]
+                futures[pool.submit(
+                    _build_shard, blocks, index, lo, hi, ids,
+                    {h: cells_by_hru[h] for h in ids if h in cells_by_hru},
+                    {h: water_by_hru[h] for h in ids if h in water_by_hru},
+                    params, default_curve,
+                )] = k
+            try:
+                for fut in as_completed(futures):
+                    k = futures[fut]
+                    results[k] = fut.result()
+                    before, done = done, done + len(results[k])
+                    if logger is not None and (done // log_every > before // log_every or done == n):
+                        logger.info("  derived %d/%d HRUs (%.0f%%)", done, n, 100 * done / n)
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return [row for shard in results for row in shard]
+
+
 def build_snarea_curve(
     daily_by_hru: dict,
     cells_by_hru: dict,
@@ -138,19 +291,37 @@ def build_snarea_curve(
     default_curve: np.ndarray,
     logger: logging.Logger | None = None,
     log_every: int = 25_000,
+    workers: int = 1,
 ) -> pd.DataFrame:
     """Per-HRU derivation loop. Pass ``logger`` to emit progress every
     ``log_every`` HRUs — the loop is silent otherwise, which reads as a hang at
-    CONUS scale (361k HRUs take minutes)."""
+    CONUS scale (361k HRUs take minutes).
+
+    When every frame shares one daily index (always true for the Stage 2
+    chunks from ``iter_daily_chunks``), the annual SDCs of all HRUs are
+    extracted up front by `season_batch.seasons_batch` instead of per-HRU
+    `_seasons` calls; the records are identical either way.
+
+    ``workers > 1`` shards the sorted HRUs over a ProcessPoolExecutor (spawn,
+    as in `depstor.map_vpu_windows`). The daily columns are copied once into
+    shared-memory ``(n_hru, n_days)`` blocks that workers slice, so no
+    DataFrame is pickled, and shards are reassembled in HRU order: the table
+    is identical to the serial one. Needs the shared daily index; otherwise
+    it runs serially.
+    """
     items = sorted(daily_by_hru.items())
     n = len(items)
-    rows = []
-    for i, (hru_id, daily) in enumerate(items, start=1):
-        rows.append(build_hru_record(
-            hru_id, daily, cells_by_hru.get(hru_id, 0),
-            water_by_hru.get(hru_id, 0.0), params, default_curve,
-        ))
-        if logger is not None and (i % log_every == 0 or i == n):
-            logger.info("  derived %d/%d HRUs (%.0f%%)", i, n, 100 * i / n)
+    index = _shared_index(items)
+    if workers > 1 and n > 1 and index is not None and all(
+        list(d.columns) == list(items[0][1].columns) for _, d in items
+    ):
+        rows = _build_parallel(items, index, cells_by_hru, water_by_hru, params,
+                               default_curve, workers, logger, log_every)
+    else:
+        def progress(i):
+            if logger is not None and (i % log_every == 0 or i == n):
+                logger.info("  derived %d/%d HRUs (%.0f%%)", i, n, 100 * i / n)
+
+        rows = _build_records(items, cells_by_hru, water_by_hru, params, default_curve, progress)
     df = pd.DataFrame(rows).rename(columns={"hru_id": id_feature})
     return df
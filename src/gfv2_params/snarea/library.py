@@ -29,6 +29,11 @@ CURVE_COLS = [f"snarea_curve_{i}" for i in range(11)]
 CV_GRID = np.round(np.arange(0.05, 3.0001, 0.05), 2)
 _INTERIOR = slice(1, 10)  # endpoints (0, 10) are fixed 1.0/0.0 for every cv
 
+# Rows per vectorized block: sdc_from_cv_many holds a few (block, 4001) float64
+# temporaries, fit_cv_many a (block, len(grid), 9) one.
+_SDC_BLOCK = 256
+_FIT_BLOCK = 16_384
+
 
 def sdc_from_cv(cv: float, mu: float = 1.0, n: int = 4000) -> np.ndarray:
     """11-point dimensionless SDC for a lognormal SWE pdf with coeff-of-var ``cv``.
@@ -37,38 +42,99 @@ def sdc_from_cv(cv: float, mu: float = 1.0, n: int = 4000) -> np.ndarray:
     dimensionless curve (SCA vs SWE/peak) depends only on cv. Returns SCA at
     SWE_LEVELS (descending), clipped to [0,1], anchored (1.0 @ SWE=1, 0.0 @ SWE=0).
     """
-    cv = max(float(cv), 1e-4)   # cv->0 is a degenerate step curve; floor keeps z>0 (else /0 -> all-NaN into the PRMS file)
-    z = np.sqrt(np.log(1 + cv * cv))          # ζ² = ln(1+CV²)
-    lam = np.log(mu) - 0.5 * z * z            # λ  = ln(μ) − ζ²/2
-    M = np.concatenate([[0.0], np.exp(np.linspace(np.log(mu) - 6 * z, np.log(mu) + 6 * z, n))])
-    lnM = np.log(np.where(M > 0, M, 1e-300))
-    sca = norm.cdf((lam - lnM) / z)           # SCA(M) = Φ((λ−lnM)/ζ)
-    swe = mu * norm.cdf((lam + z * z - lnM) / z) - M * sca
-    sca[0], swe[0] = 1.0, mu
-    o = np.argsort(swe / swe[0])
-    x = (swe / swe[0])[o]
-    y = sca[o]
-    # Ensure the curve spans from (0, 0) to (1, 1) for proper interpolation
-    if x[0] > 0:
-        x = np.concatenate([[0], x])
-        y = np.concatenate([[0], y])
-    if x[-1] < 1:
-        x = np.concatenate([x, [1]])
-        y = np.concatenate([y, [1]])
-    return np.clip(np.interp(SWE_LEVELS, x, y, left=1.0, right=0.0), 0, 1)
-
-
-def _library_matrix(cv_grid: np.ndarray) -> np.ndarray:
-    """(len(cv_grid), 11) matrix of analytic curves — built once, reused."""
-    return np.vstack([sdc_from_cv(c) for c in cv_grid])
+    return sdc_from_cv_many([cv], mu=mu, n=n)[0]
+
+
+def sdc_from_cv_many(cvs, mu: float = 1.0, n: int = 4000) -> np.ndarray:
+    """`sdc_from_cv` for every value of `cvs` -> ``(len(cvs), 11)``.
+
+    The lognormal evaluations run as one array op per block of
+    ``_SDC_BLOCK`` CVs; only the final 11-level interpolation is per curve.
+    """
+    # cv->0 is a degenerate step curve; floor keeps z>0 (else /0 -> all-NaN into the PRMS file)
+    cvs = np.maximum(np.asarray(cvs, dtype=float).ravel(), 1e-4)
+    out = np.empty((cvs.size, SWE_LEVELS.size))
+    for lo in range(0, cvs.size, _SDC_BLOCK):
+        cv = cvs[lo:lo + _SDC_BLOCK, None]
+        z = np.sqrt(np.log(1 + cv * cv))          # ζ² = ln(1+CV²)
+        lam = np.log(mu) - 0.5 * z * z            # λ  = ln(μ) − ζ²/2
+        grid = np.exp(np.linspace(np.log(mu) - 6 * z[:, 0], np.log(mu) + 6 * z[:, 0], n, axis=1))
+        M = np.concatenate([np.zeros((cv.shape[0], 1)), grid], axis=1)
+        lnM = np.log(np.where(M > 0, M, 1e-300))
+        sca = norm.cdf((lam - lnM) / z)           # SCA(M) = Φ((λ−lnM)/ζ)
+        swe = mu * norm.cdf((lam + z * z - lnM) / z) - M * sca
+        sca[:, 0], swe[:, 0] = 1.0, mu
+        xs = swe / swe[:, :1]
+        order = np.argsort(xs, axis=1)
+        xs = np.take_along_axis(xs, order, axis=1)
+        ys = np.take_along_axis(sca, order, axis=1)
+        for k in range(cv.shape[0]):
+            x, y = xs[k], ys[k]
+            # Ensure the curve spans from (0, 0) to (1, 1) for proper interpolation
+            if x[0] > 0:
+                x = np.concatenate([[0], x])
+                y = np.concatenate([[0], y])
+            if x[-1] < 1:
+                x = np.concatenate([x, [1]])
+                y = np.concatenate([y, [1]])
+            out[lo + k] = np.clip(np.interp(SWE_LEVELS, x, y, left=1.0, right=0.0), 0, 1)
+    return out
+
+
+# In-process memo of _library_matrix, keyed by the grid's float64 bytes.
+_LIBRARY_CACHE: dict[bytes, np.ndarray] = {}
+
+
+def _library_matrix(cv_grid: np.ndarray, cache_file=None) -> np.ndarray:
+    """(len(cv_grid), 11) matrix of analytic curves — built once per grid, reused.
+
+    Memoized per process; with `cache_file` the matrix is also read from / saved
+    to that ``.npz`` (``cv_grid`` + ``curves``), rebuilt when the stored grid
+    differs. The returned array is read-only (it is shared).
+    """
+    grid = np.asarray(cv_grid, dtype=float)
+    key = grid.tobytes()
+    lib = _LIBRARY_CACHE.get(key)
+    stored = False
+    if cache_file is not None and Path(cache_file).exists():
+        with np.load(cache_file) as z:
+            stored = np.array_equal(z["cv_grid"], grid)
+            if lib is None and stored:
+                lib = z["curves"]
+    if lib is None:
+        lib = sdc_from_cv_many(grid)
+    if cache_file is not None and not stored:
+        Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cache_file, cv_grid=grid, curves=lib)
+    lib.setflags(write=False)
+    _LIBRARY_CACHE[key] = lib
+    return lib
 
 
 def fit_cv(curve: np.ndarray, cv_grid: np.ndarray | None = None) -> float:
-    """Best-fit lognormal CV for an empirical 11-pt curve (min L2 over interior)."""
-    grid = CV_GRID if cv_grid is None else cv_grid
-    lib = _library_matrix(grid)
-    d = np.linalg.norm(lib[:, _INTERIOR] - np.asarray(curve)[_INTERIOR], axis=1)
-    return float(grid[int(d.argmin())])
+    """Best-fit lognormal CV for an empirical 11-pt curve (min L2 over interior).
+
+    NaN if the curve's interior is not all finite (it used to be ``grid[0]``,
+    the argmin of an all-NaN distance)."""
+    return float(fit_cv_many(np.asarray(curve)[None, :], cv_grid)[0])
+
+
+def fit_cv_many(curves: np.ndarray, cv_grid: np.ndarray | None = None, cache_file=None) -> np.ndarray:
+    """`fit_cv` for every row of ``(n, 11)`` `curves`; NaN where the interior is non-finite.
+
+    One batched (rows x grid) distance computation, blocked by ``_FIT_BLOCK``
+    rows to bound the (rows, grid, 9) temporary.
+    """
+    grid = CV_GRID if cv_grid is None else np.asarray(cv_grid, dtype=float)
+    lib = _library_matrix(grid, cache_file)[:, _INTERIOR]
+    curves = np.asarray(curves, dtype=float)[:, _INTERIOR]
+    out = np.full(curves.shape[0], np.nan)
+    ok = np.flatnonzero(np.isfinite(curves).all(axis=1))
+    for lo in range(0, ok.size, _FIT_BLOCK):
+        rows = ok[lo:lo + _FIT_BLOCK]
+        d = np.linalg.norm(lib[None, :, :] - curves[rows, None, :], axis=2)  # (rows, ngrid)
+        out[rows] = grid[d.argmin(axis=1)]
+    return out
 
 
 def build_library(
@@ -156,7 +222,9 @@ def _recon_error(cv: np.ndarray, emp_curves: np.ndarray) -> tuple[float, float]:
     ok = np.isfinite(cv) & np.isfinite(emp_curves).all(axis=1)
     if not ok.any():
         return float("nan"), float("nan")
-    approx = np.vstack([sdc_from_cv(c) for c in cv[ok]])
+    # Many HRUs share a CV (grid-snapped empirical fits): evaluate each once.
+    uniq, inverse = np.unique(cv[ok], return_inverse=True)
+    approx = sdc_from_cv_many(uniq)[inverse]
     err = np.abs(approx - emp_curves[ok])
     return float(err.mean()), float(np.percentile(err.max(axis=1), 95))
 
@@ -232,12 +300,22 @@ _PARAM_DIAG_COLS = ["sdc_status", "sca_class", "similarity", "n_seasons", "n_pea
 def assemble_params(derived, id_feature, cv_assign, cv_source, deplcrv, library):
     """One row per HRU: index + snarea_thresh + CVs + diagnostics + the ASSIGNED
     library curve (descending, for QA / per-HRU detail — no separate 1:1 mode)."""
-    curve_by_id = {int(r.deplcrv_id): r[CURVE_COLS].to_numpy(float) for _, r in library.iterrows()}
-    assigned = np.vstack([curve_by_id[int(d)] for d in deplcrv])
+    lib_ids = library["deplcrv_id"].to_numpy(dtype=np.int64)
+    order = np.argsort(lib_ids, kind="stable")
+    deplcrv = np.asarray(deplcrv, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(lib_ids[order], deplcrv), lib_ids.size - 1)
+    missing = lib_ids[order][pos] != deplcrv
+    if missing.any():
+        raise KeyError(f"deplcrv ids {sorted(set(deplcrv[missing].tolist()))} not in library")
+    assigned = library[CURVE_COLS].to_numpy(float)[order[pos]]
+    peak = derived["peak_swe_mm"].to_numpy(float)
+    # snarea_thresh_inches, vectorized: 0.0 for no-snow / undefined peaks
+    with np.errstate(invalid="ignore"):
+        thresh = np.where(np.isfinite(peak) & (peak > 0.0), peak / _MM_PER_INCH, 0.0)
     out = pd.DataFrame({
         id_feature: derived[id_feature].to_numpy(),
-        "hru_deplcrv": np.asarray(deplcrv, dtype=np.int32),
-        "snarea_thresh": [snarea_thresh_inches(v) for v in derived["peak_swe_mm"].to_numpy()],
+        "hru_deplcrv": deplcrv.astype(np.int32),
+        "snarea_thresh": thresh,
         "cv_assign": np.asarray(cv_assign, dtype=float),
         "cv_subgrid": derived["cv_subgrid"].to_numpy(float),
         "cv_empirical": derived["cv_empirical"].to_numpy(float),
@@ -250,11 +328,13 @@ def assemble_params(derived, id_feature, cv_assign, cv_source, deplcrv, library)
     return out
 
 
-def build_from_derived(derived, id_feature, ndepl_cv, default_curve, calibrate="auto", bias_tol=0.1):
+def build_from_derived(derived, id_feature, ndepl_cv, default_curve, calibrate="auto", bias_tol=0.1,
+                       library_matrix_file=None):
     """Estimable = finite cv_assign (calibrated subgrid, subgrid, or empirical fallback).
-    cv_empirical is fitted from each DERIVED HRU's empirical curve (vectorized: library
-    matrix built once). Calibrate cv_subgrid vs cv_empirical on the derived overlap,
-    bin, assign, assemble."""
+    cv_empirical is fitted from each DERIVED HRU's empirical curve (`fit_cv_many`:
+    library matrix built once, optionally persisted to `library_matrix_file`).
+    Calibrate cv_subgrid vs cv_empirical on the derived overlap, bin, assign,
+    assemble."""
     derived = derived.reset_index(drop=True).copy()
     n = len(derived)
     cv_sub = derived["cv_subgrid"].to_numpy(float)
@@ -263,10 +343,7 @@ def build_from_derived(derived, id_feature, ndepl_cv, default_curve, calibrate="
     is_derived = derived["sdc_status"].to_numpy() == "derived"
     cv_emp = np.full(n, np.nan)
     if is_derived.any():
-        lib = _library_matrix(CV_GRID)  # (ngrid, 11), built ONCE
-        dc = emp_curves[is_derived][:, _INTERIOR]  # (n_der, 9)
-        dists = np.linalg.norm(lib[None, :, _INTERIOR] - dc[:, None, :], axis=2)  # (n_der, ngrid)
-        cv_emp[is_derived] = CV_GRID[dists.argmin(axis=1)]
+        cv_emp[is_derived] = fit_cv_many(emp_curves[is_derived], cache_file=library_matrix_file)
     derived["cv_empirical"] = cv_emp
     emp_for_cal = np.where(is_derived[:, None], emp_curves, np.nan)
 
@@ -315,9 +392,7 @@ def write_prms_netcdf(library: pd.DataFrame, params: pd.DataFrame, id_feature: s
     """
     lib_sorted = library.sort_values("deplcrv_id")
     ndepl = len(lib_sorted)
-    flat = np.concatenate(
-        [_to_prms_order(r[CURVE_COLS].to_numpy(float)) for _, r in lib_sorted.iterrows()]
-    )
+    flat = _to_prms_order(lib_sorted[CURVE_COLS].to_numpy(float).T).T.ravel()
     ids = lib_sorted["deplcrv_id"].to_numpy()
     if not np.array_equal(ids, np.arange(1, ndepl + 1)):
         raise ValueError(f"library deplcrv_id must be contiguous 1..{ndepl}, got {ids.tolist()}")
@@ -76,8 +76,9 @@ def annual_sdc(swe: pd.Series, sca: pd.Series):
         return None
     swe_n, sca_n = normalize_curve(swe_w, sca_w)
     # np.interp needs ascending x; remove_reversals filters on SCA only, so
-    # swe_n may be non-monotonic — sort explicitly.
-    order = np.argsort(swe_n)
+    # swe_n may be non-monotonic — sort explicitly. Stable, so tied SWE levels
+    # keep time order (and season_batch reproduces the result exactly).
+    order = np.argsort(swe_n, kind="stable")
     xs, ys = swe_n[order], sca_n[order]
     curve = np.interp(SWE_LEVELS, xs, ys, left=ys[0], right=ys[-1])
     # Enforce monotonic non-increasing across descending SWE levels (numerical guard).
@@ -0,0 +1,171 @@
+"""Batched snow-depletion-curve extraction over every HRU of a water year.
+
+`season.annual_sdc` handles one pandas Series per HRU-year. At CONUS scale
+(361k HRUs x ~20 water years) the per-series Python overhead, plus the pure-
+Python running-min loop in `remove_reversals`, dominates Stage 2. This module
+takes dense ``(n_hru, n_days)`` SWE/SCA arrays for one water year and
+extracts every HRU's curve in one numba kernel (``prange`` over HRUs):
+
+1. peak position: first NaN-skipping maximum of SWE (no snow, all-NaN, or a
+   peak on day 0 -> unusable);
+2. melt-out index: first day at/after the peak with SWE <= 0 (none -> unusable);
+3. running-min envelope of SCA over [peak, melt-out];
+4. normalization by the first kept SWE/SCA;
+5. interpolation at the 11 `SWE_LEVELS`, non-increasing guard, clip to [0, 1].
+
+Every step mirrors `season.annual_sdc` exactly, NaN handling included (see
+tests/test_snarea_season_batch.py for the equivalence property test), so
+`build._seasons` stays the reference implementation.
+
+numba is isolated here so `season.py` and the rest of the package stay
+numba-free.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+from .season import SWE_LEVELS
+
+
+def water_year(index: pd.DatetimeIndex) -> np.ndarray:
+    """USGS water-year label (ending calendar year) of each date, as in `build._seasons`."""
+    return np.asarray(index.year + (index.month >= 10).astype(int))
+
+
+@njit(cache=True)
+def _before(xs, ix, a, b):
+    """Stable NaN-last ascending order on (xs[a], a) vs (xs[b], b), as np.argsort(kind="stable")."""
+    va, vb = xs[a], xs[b]
+    if np.isnan(va):
+        return np.isnan(vb) and ix[a] < ix[b]
+    if np.isnan(vb) or va < vb:
+        return True
+    return va == vb and ix[a] < ix[b]
+
+
+@njit(cache=True)
+def _row_sdc(swe, sca, levels, out):
+    """One HRU-year: write the 11-point SDC into `out`; return False if unusable."""
+    n = swe.shape[0]
+    peak = -1
+    best = 0.0
+    for j in range(n):
+        v = swe[j]
+        if not np.isnan(v) and (peak < 0 or v > best):
+            best = v
+            peak = j
+    if peak < 0 or best <= 0 or peak == 0:
+        return False
+    end = -1
+    for j in range(peak, n):
+        if swe[j] <= 0:
+            end = j
+            break
+    if end < 0:
+        return False
+
+    # Running-min envelope: a day survives if its SCA is <= every SCA kept so far.
+    m = end - peak + 1
+    keep_swe = np.empty(m)
+    keep_sca = np.empty(m)
+    k = 0
+    running_min = np.inf
+    for j in range(peak, end + 1):
+        v = sca[j]
+        if v <= running_min:
+            keep_swe[k] = swe[j]
+            keep_sca[k] = v
+            running_min = v
+            k += 1
+    if k < 2 or keep_sca[0] <= 0:
+        return False
+
+    peak_swe = keep_swe[0]
+    sca0 = keep_sca[0]
+    xs = np.empty(k)
+    ys = np.empty(k)
+    for j in range(k):
+        xs[j] = keep_swe[j] / peak_swe if peak_swe > 0 else 0.0
+        ys[j] = keep_sca[j] / sca0
+
+    # Stable argsort of xs by insertion, walking backwards in time: melt makes
+    # xs mostly decreasing, so this is near-linear.
+    order = np.empty(k, dtype=np.int64)
+    ix = np.arange(k)
+    for t in range(k):
+        cur = k - 1 - t
+        p = t
+        while p > 0 and _before(xs, ix, cur, order[p - 1]):
+            order[p] = order[p - 1]
+            p -= 1
+        order[p] = cur
+    xp = np.empty(k)
+    fp = np.empty(k)
+    for j in range(k):
+        xp[j] = xs[order[j]]
+        fp[j] = ys[order[j]]
+
+    curve = np.interp(levels, xp, fp)
+    acc = curve[0]
+    for i in range(curve.shape[0]):
+        c = curve[i]
+        if np.isnan(acc) or np.isnan(c):
+            acc = np.nan
+        elif c < acc:
+            acc = c
+        if acc < 0.0:
+            out[i] = 0.0
+        elif acc > 1.0:
+            out[i] = 1.0
+        else:
+            out[i] = acc
+    return True
+
+
+@njit(cache=True, parallel=True)
+def _sdc_kernel(swe, sca, levels, curves, ok):
+    for i in prange(swe.shape[0]):
+        ok[i] = _row_sdc(swe[i], sca[i], levels, curves[i])
+
+
+def annual_sdc_batch(swe: np.ndarray, sca: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """`annual_sdc` for every row of ``(n_hru, n_days)`` SWE/SCA arrays of one water year.
+
+    Returns ``(curves, ok)``: ``curves`` is ``(n_hru, 11)`` (NaN where unusable)
+    and ``ok`` is the boolean mask of rows for which `annual_sdc` would not
+    return None.
+    """
+    swe = np.ascontiguousarray(swe, dtype=np.float64)
+    sca = np.ascontiguousarray(sca, dtype=np.float64)
+    if swe.shape != sca.shape or swe.ndim != 2:
+        raise ValueError(f"swe and sca must be matching 2-D arrays, got {swe.shape} and {sca.shape}")
+    curves = np.full((swe.shape[0], SWE_LEVELS.size), np.nan)
+    ok = np.zeros(swe.shape[0], dtype=np.bool_)
+    _sdc_kernel(swe, sca, SWE_LEVELS.astype(np.float64), curves, ok)
+    curves[~ok] = np.nan
+    return curves, ok
+
+
+def seasons_batch(
+    swe: np.ndarray, sca: np.ndarray, index: pd.DatetimeIndex,
+) -> tuple[np.ndarray, np.ndarray]:
+    """`build._seasons` for every row of ``(n_hru, n_days)`` arrays on a shared daily `index`.
+
+    Returns ``(curves, ok)`` of shapes ``(n_hru, n_wy, 11)`` and
+    ``(n_hru, n_wy)``, water years ascending. An HRU's usable seasons, in the
+    order `_seasons` returns them, are ``curves[i][ok[i]]``.
+    """
+    if swe.shape[1] != len(index):
+        raise ValueError(f"arrays have {swe.shape[1]} days but index has {len(index)}")
+    wy = water_year(index)
+    # groupby(water_year) in _seasons sorts the labels and keeps row order within each.
+    labels = np.unique(wy)
+    curves = np.full((swe.shape[0], labels.size, SWE_LEVELS.size), np.nan)
+    ok = np.zeros((swe.shape[0], labels.size), dtype=bool)
+    for k, label in enumerate(labels):
+        cols = np.flatnonzero(wy == label)
+        curves[:, k], ok[:, k] = annual_sdc_batch(swe[:, cols], sca[:, cols])
+    return curves, ok
@@ -0,0 +1,248 @@
+"""Per-water-year season summaries, cached so Stage 2 refreshes incrementally.
+
+Everything `build.build_hru_record` derives from an HRU's daily record
+decomposes by water year: the annual SDCs are per water year already, the
+record-wide SWE/SCA maxima are maxima of per-year maxima, the sub-grid CV and
+peak SWE are medians of per-year peak values, and the constant-SCA fraction is
+a ratio of day counts. `summarize_water_years` reduces every HRU of a daily
+block to those per-year pieces; `build_from_summaries` merges them and hands
+them to `build.assemble_record`, the same selection code the daily path runs,
+so the derived table is identical to `build_snarea_curve`'s.
+
+Summaries are saved one file per water year (``wy_<YYYY>.npz`` under the
+configured ``season_cache_dir``) with a key naming the aggregated NetCDFs and
+the days that water year was built from. When a new SNODAS year is added,
+only the water years whose key changed — the new one and the one it completes
+— are read back from the NetCDFs and summarized; selection then re-runs over
+all cached years. Selection parameters are not part of the key: they apply
+at merge time.
+
+The constant-SCA fraction counts snow days within 1e-9 of the record-wide
+maximum SCA. Per year the cache keeps the count of days within 1e-9 of that
+year's own maximum and the smallest such value, which is exact unless two
+years' maxima differ by less than 1e-9 and the lower year has distinct values
+straddling the record-wide threshold; such HRUs are counted with all of that
+year's near-maximum days and reported in a warning.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .build import _CONSTANT_TOL, assemble_record
+from .season_batch import annual_sdc_batch, water_year
+from .selection import SelectionParams
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = (
+    "curve", "ok", "swe_max", "sca_max", "n_snow", "snow_sca_max", "n_near", "near_min",
+    "peak_cv", "peak_swe",
+)
+
+
+def _row_nanmax(a: np.ndarray) -> np.ndarray:
+    """Row-wise NaN-skipping max; NaN for an all-NaN (or empty) row, without warnings."""
+    out = np.full(a.shape[0], np.nan)
+    has = ~np.isnan(a).all(axis=1) if a.shape[1] else np.zeros(a.shape[0], dtype=bool)
+    if has.any():
+        out[has] = np.nanmax(a[has], axis=1)
+    return out
+
+
+def _row_nanmin(a: np.ndarray) -> np.ndarray:
+    return -_row_nanmax(-a)
+
+
+def summarize_block(swe: np.ndarray, sca: np.ndarray, swe_std: np.ndarray) -> dict:
+    """Per-HRU summary of ONE water year of ``(n_hru, n_days)`` arrays.
+
+    Mirrors, row by row: `annual_sdc` (``curve``/``ok``), the SWE and SCA
+    maxima, `build._constant_frac`'s snow-day counts and
+    `subgrid.representative_peak_stats`' per-year peak (``peak_cv``/``peak_swe``,
+    NaN where that function skips the year).
+    """
+    swe = np.asarray(swe, dtype="float64")
+    sca = np.asarray(sca, dtype="float64")
+    swe_std = np.asarray(swe_std, dtype="float64")
+    curve, ok = annual_sdc_batch(swe, sca)
+    n = swe.shape[0]
+
+    snow = swe > 0
+    snow_sca = np.where(snow, sca, np.nan)
+    snow_sca_max = _row_nanmax(snow_sca)
+    with np.errstate(invalid="ignore"):
+        near = snow_sca >= (snow_sca_max - _CONSTANT_TOL)[:, None]
+
+    swe_max = _row_nanmax(swe)
+    peak_cv = np.full(n, np.nan)
+    peak_swe = np.full(n, np.nan)
+    with np.errstate(invalid="ignore"):
+        year_ok = np.isfinite(swe).any(axis=1) & (swe_max > 0)
+    if year_ok.any():
+        rows = np.flatnonzero(year_ok)
+        day = np.argmax(np.where(np.isnan(swe[rows]), -np.inf, swe[rows]), axis=1)
+        peak = swe[rows, day]
+        s = swe_std[rows, day]
+        good = np.isfinite(peak) & (peak > 0) & np.isfinite(s)
+        peak_cv[rows[good]] = s[good] / peak[good]
+        peak_swe[rows[good]] = peak[good]
+
+    return {
+        "curve": curve,
+        "ok": ok,
+        "swe_max": swe_max,
+        "sca_max": _row_nanmax(sca),
+        "n_snow": snow.sum(axis=1).astype("int64"),
+        "snow_sca_max": snow_sca_max,
+        "n_near": near.sum(axis=1).astype("int64"),
+        "near_min": _row_nanmin(np.where(near, sca, np.nan)),
+        "peak_cv": peak_cv,
+        "peak_swe": peak_swe,
+    }
+
+
+def summarize_water_years(
+    swe: np.ndarray, sca: np.ndarray, swe_std: np.ndarray, index: pd.DatetimeIndex,
+    years=None,
+) -> dict[int, dict]:
+    """`summarize_block` of each water year (all, or those in `years`) of
+    ``(n_hru, n_days)`` arrays on the shared daily `index`."""
+    wy = water_year(index)
+    out = {}
+    for label in np.unique(wy):
+        if years is not None and int(label) not in years:
+            continue
+        cols = np.flatnonzero(wy == label)
+        out[int(label)] = summarize_block(swe[:, cols], sca[:, cols], swe_std[:, cols])
+    return out
+
+
+def concat_summaries(parts: list[dict]) -> dict:
+    """Stack per-chunk summaries of one water year along the HRU axis."""
+    return {f: np.concatenate([p[f] for p in parts]) for f in SUMMARY_FIELDS}
+
+
+def source_id(path) -> str:
+    """``name|size|mtime_ns`` of an aggregated NetCDF (changes whenever it is rewritten)."""
+    st = Path(path).stat()
+    return f"{Path(path).name}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def water_year_keys(file_days: dict) -> dict[int, str]:
+    """Cache key of every water year from ``{source_id: DatetimeIndex}``.
+
+    A key names the files contributing days to the water year and its first
+    day, last day and day count, so both a re-aggregated input file and a
+    newly completed year invalidate it.
+    """
+    spans: dict[int, dict] = {}
+    for fp, days in sorted(file_days.items()):
+        wy = water_year(days)
+        for label in np.unique(wy):
+            d = days[wy == label]
+            span = spans.setdefault(int(label), {"sources": [], "first": d.min(), "last": d.max(), "n_days": 0})
+            span["sources"].append(fp)
+            span["first"], span["last"] = min(span["first"], d.min()), max(span["last"], d.max())
+            span["n_days"] += int(d.size)
+    return {
+        label: json.dumps({**span, "first": str(span["first"].date()), "last": str(span["last"].date())},
+                          sort_keys=True)
+        for label, span in spans.items()
+    }
+
+
+def summary_path(cache_dir, wy: int) -> Path:
+    return Path(cache_dir) / f"wy_{wy}.npz"
+
+
+def save_summary(cache_dir, wy: int, key: str, ids: np.ndarray, summary: dict) -> Path:
+    """Write one water year's summary (atomically, as `cell_weights.build_cell_weights`)."""
+    path = summary_path(cache_dir, wy)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.stem + ".tmp.npz")
+    np.savez(tmp, key=np.array(key), ids=np.asarray(ids), **{f: summary[f] for f in SUMMARY_FIELDS})
+    tmp.replace(path)
+    return path
+
+
+def load_summary(cache_dir, wy: int, key: str, ids: np.ndarray) -> dict | None:
+    """The cached summary of `wy` if it was built from `key` over exactly `ids`, else None."""
+    path = summary_path(cache_dir, wy)
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        if str(z["key"]) != key or not np.array_equal(z["ids"], ids):
+            return None
+        return {f: z[f] for f in SUMMARY_FIELDS}
+
+
+def _constant_frac(n_snow, snow_sca_max, n_near, near_min) -> tuple[float, bool]:
+    """`build._constant_frac` from per-year pieces -> (fraction, exact)."""
+    total = int(n_snow.sum())
+    if total == 0:
+        return 1.0, True
+    if np.isnan(snow_sca_max).all():
+        return 0.0, True
+    threshold = np.nanmax(snow_sca_max) - _CONSTANT_TOL
+    with np.errstate(invalid="ignore"):
+        counted = snow_sca_max >= threshold
+        exact = bool(np.all(near_min[counted] >= threshold))
+    return float(n_near[counted].sum() / total), exact
+
+
+def build_from_summaries(
+    ids: np.ndarray,
+    summaries: dict[int, dict],
+    cells_by_hru: dict,
+    water_by_hru: dict,
+    id_feature: str,
+    params: SelectionParams,
+    default_curve: np.ndarray,
+    log: logging.Logger | None = None,
+    log_every: int = 25_000,
+) -> pd.DataFrame:
+    """The `build_snarea_curve` table for `ids` (ascending) from per-water-year summaries."""
+    years = sorted(summaries)
+    stack = {f: np.stack([summaries[y][f] for y in years], axis=1) for f in SUMMARY_FIELDS}
+    with np.errstate(invalid="ignore"):
+        has_snow = _row_nanmax(stack["swe_max"]) > 0
+    sca_max = _row_nanmax(stack["sca_max"])
+    rows, inexact = [], 0
+    n = len(ids)
+    for h, hru_id in enumerate(ids):
+        hru_id = int(hru_id)
+        seasons = list(stack["curve"][h][stack["ok"][h]])
+        frac, exact = _constant_frac(stack["n_snow"][h], stack["snow_sca_max"][h],
+                                     stack["n_near"][h], stack["near_min"][h])
+        inexact += not exact
+        valid = ~np.isnan(stack["peak_cv"][h])
+        if valid.any():
+            peak_stats = {
+                "cv_subgrid": float(np.median(stack["peak_cv"][h][valid])),
+                "peak_swe_mm": float(np.median(stack["peak_swe"][h][valid])),
+                "n_peak_years": int(valid.sum()),
+            }
+        else:
+            peak_stats = {"cv_subgrid": float("nan"), "peak_swe_mm": float("nan"), "n_peak_years": 0}
+        rows.append(assemble_record(
+            hru_id, seasons,
+            has_snow=bool(has_snow[h]), seasonal_sca_max=float(sca_max[h]),
+            constant_frac=frac, peak_stats=peak_stats,
+            n_cells=cells_by_hru.get(hru_id, 0), water_frac=water_by_hru.get(hru_id, 0.0),
+            params=params, default_curve=default_curve,
+        ))
+        if log is not None and ((h + 1) % log_every == 0 or h + 1 == n):
+            log.info("  derived %d/%d HRUs (%.0f%%)", h + 1, n, 100 * (h + 1) / n)
+    if inexact:
+        logger.warning(
+            "%d HRU(s) have water-year SCA maxima within %g of each other; their "
+            "constant-SCA fraction counts all near-maximum days of those years",
+            inexact, _CONSTANT_TOL,
+        )
+    return pd.DataFrame(rows).rename(columns={"hru_id": id_feature})
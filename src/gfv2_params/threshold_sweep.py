@@ -15,7 +15,7 @@ from __future__ import annotations
 
 import logging
 from contextlib import ExitStack
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import geopandas as gpd
@@ -26,6 +26,7 @@ from rasterio.enums import Resampling
 from rasterio.features import rasterize
 from rasterio.vrt import WarpedVRT
 from rasterio.windows import Window
+from rasterio.windows import bounds as window_bounds
 
 from .depstor import RasterInfo
 
@@ -42,6 +43,8 @@ class CareaTwiArtifact:
     ref_value: np.ndarray        # (n_grid,) valid-land TWI value at each percentile
     fabric: str
     twi_source: str
+    # Lazily built by `above_counts`; treat `hist` as read-only once evaluated.
+    _above: np.ndarray | None = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         n = len(self.ids)
@@ -61,6 +64,20 @@ class CareaTwiArtifact:
                 f"CareaTwiArtifact ref_pctl ({len(self.ref_pctl)}) != ref_value ({len(self.ref_value)})"
             )
 
+    @property
+    def above_counts(self) -> np.ndarray:
+        """(n_hru, n_bins + 1) reverse cumulative histogram: column k = sum of bins k..end.
+
+        The last column is all zero (nothing above the top bin). Built once per
+        artifact so a threshold evaluation is a single column gather.
+        """
+        if self._above is None:
+            n_hru = self.hist.shape[0]
+            above = np.zeros((n_hru, self.hist.shape[1] + 1), dtype="int64")
+            above[:, :-1] = np.cumsum(self.hist[:, ::-1], axis=1)[:, ::-1]
+            self._above = above
+        return self._above
+
     def save(self, path) -> None:
         np.savez_compressed(
             path, ids=self.ids, vpu=self.vpu.astype(str),
@@ -92,10 +109,20 @@ def evaluate_threshold(artifact: CareaTwiArtifact, t: float) -> np.ndarray:
     Bins are left-closed (np.digitize); a swept value matches production's strict
     `twi > t` within one bin. Snap `t` to a lower bin edge for exactness.
     """
-    centers = _bin_centers(artifact.bin_edges)
-    above = artifact.hist[:, centers > t].sum(axis=1)
-    num = artifact.n_perv_onstream + above
-    denom = artifact.n_perv
+    return evaluate_thresholds(artifact, np.array([t], dtype="float64"))[0]
+
+
+def evaluate_thresholds(artifact: CareaTwiArtifact, t_grid: np.ndarray) -> np.ndarray:
+    """(n_thresholds, n_hru) matrix of `evaluate_threshold` for every `t` in `t_grid`.
+
+    Each threshold is one column of `artifact.above_counts`: the bins counted
+    are those whose center is > t, i.e. from ``searchsorted(centers, t, "right")``
+    up.
+    """
+    t_grid = np.atleast_1d(np.asarray(t_grid, dtype="float64"))
+    first = np.searchsorted(_bin_centers(artifact.bin_edges), t_grid, side="right")
+    num = artifact.n_perv_onstream[None, :] + artifact.above_counts[:, first].T
+    denom = artifact.n_perv[None, :]
     with np.errstate(divide="ignore", invalid="ignore"):
         param = np.where(denom > 0, num / denom, 0.0)
     return np.clip(param, 0.0, 1.0)
@@ -111,19 +138,32 @@ def percentile_to_value(artifact: CareaTwiArtifact, p: float) -> float:
     return float(np.interp(p, artifact.ref_pctl, artifact.ref_value))
 
 
+# Thresholds per `evaluate_thresholds` block in `sweep`: 64 x 361k HRUs (gfv2)
+# is ~185 MB of float64.
+_SWEEP_CHUNK = 64
+
+
 def sweep(artifact: CareaTwiArtifact, t_grid: np.ndarray) -> pd.DataFrame:
-    """Per-threshold summary stats of the per-HRU parameter (sensitivity curve)."""
-    rows = []
-    for t in np.asarray(t_grid, dtype="float64"):
-        p = evaluate_threshold(artifact, float(t))
-        rows.append({
-            "threshold": float(t),
-            "mean": float(p.mean()),
-            "median": float(np.median(p)),
-            "frac_zero": float((p == 0.0).mean()),
-            "frac_one": float((p >= 1.0).mean()),
-        })
-    return pd.DataFrame(rows)
+    """Per-threshold summary stats of the per-HRU parameter (sensitivity curve).
+
+    Vectorized over thresholds in `_SWEEP_CHUNK` blocks of `evaluate_thresholds`;
+    use that function directly for the full threshold x HRU matrix.
+    """
+    t_grid = np.atleast_1d(np.asarray(t_grid, dtype="float64"))
+    parts = []
+    for i in range(0, len(t_grid), _SWEEP_CHUNK):
+        t = t_grid[i:i + _SWEEP_CHUNK]
+        p = evaluate_thresholds(artifact, t)
+        parts.append(pd.DataFrame({
+            "threshold": t,
+            "mean": p.mean(axis=1),
+            "median": np.median(p, axis=1),
+            "frac_zero": (p == 0.0).mean(axis=1),
+            "frac_one": (p >= 1.0).mean(axis=1),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=["threshold", "mean", "median", "frac_zero", "frac_one"])
+    return pd.concat(parts, ignore_index=True)
 
 
 def accumulate_strip(
@@ -190,6 +230,25 @@ def reference_grid(land_twi_hist: np.ndarray, bin_edges: np.ndarray, pctls: np.n
 _STRIP_ROWS = 1024
 
 
+def hru_idx_strip(hru: gpd.GeoDataFrame, idxvals: np.ndarray, window: Window, transform) -> np.ndarray:
+    """Per-cell HRU row-index (int32, -1 = none) for one template window.
+
+    Only the HRUs whose bounds meet the window (spatial index, an STRtree) are
+    burned, in their layer order, so overlaps resolve exactly as a single
+    full-grid `rasterize` would; `all_touched` is cell-local, so the strips
+    tile that full raster bit for bit.
+    """
+    out_shape = (int(window.height), int(window.width))
+    cand_pos = np.sort(hru.sindex.intersection(window_bounds(window, transform)))
+    if not len(cand_pos):
+        return np.full(out_shape, -1, dtype="int32")
+    return rasterize(
+        ((g, int(i)) for g, i in zip(hru.geometry.values[cand_pos], idxvals[cand_pos])),
+        out_shape=out_shape, transform=rasterio.windows.transform(window, transform),
+        fill=-1, dtype="int32", all_touched=True,
+    )
+
+
 def build_artifact(
     *, fabric: str, twi_raster: Path, template_raster: Path, hru_gpkg: Path,
     hru_layer: str, id_feature: str, perv_path: Path, onstream_path: Path,
@@ -201,6 +260,8 @@ def build_artifact(
 
     Mirrors compute_carea_map_binary (land & perv & (twi>t | onstream)) so a swept
     threshold reproduces a production carea_map run within bin resolution.
+    Streams `_STRIP_ROWS`-row strips, so memory is bounded by the strip width
+    and the HRU layer, not the template grid.
     """
     log = logger or logging.getLogger("build_carea_twi_artifact")
     info = RasterInfo.from_path(template_raster)
@@ -226,14 +287,9 @@ def build_artifact(
     log.info("build_artifact: fabric=%s n_hru=%d grid=%dx%d bins=%d",
              fabric, n_hru, info.width, info.height, n_bins)
 
-    # Per-cell HRU row-index raster (full template; oregon-scale OK). int32 -1=none.
-    geoms = hru.geometry.values
+    # Per-cell HRU row-index, rasterized strip by strip (a full CONUS template
+    # would be a ~68 GB int32 array). int32 -1=none.
     idxvals = np.array([id_to_idx[int(v)] for v in hru[id_feature].to_numpy()], dtype="int32")
-    hru_idx_full = rasterize(
-        ((g, int(i)) for g, i in zip(geoms, idxvals)),
-        out_shape=(info.height, info.width), transform=info.transform,
-        fill=-1, dtype="int32", all_touched=True,
-    )
 
     n_perv = np.zeros(n_hru, "int64")
     n_perv_onstream = np.zeros(n_hru, "int64")
@@ -273,7 +329,7 @@ def build_artifact(
             land_s = land_src.read(1, window=win) == 1
             n_over_max += int(((twi_s > bin_max) & land_s).sum())
             accumulate_strip(
-                hru_idx_full[row_off:row_off + h, :],
+                hru_idx_strip(hru, idxvals, win, info.transform),
                 perv_s, onstream_s, twi_s, land_s,
                 twi_nodata, bin_edges,
                 n_perv, n_perv_onstream, hist, land_twi_hist,
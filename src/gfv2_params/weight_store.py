@@ -0,0 +1,144 @@
+"""Persisted grid/polygon -> HRU weight tables as id-sorted parquet.
+
+Both weight producers (``aggregate.driver.compute_or_load_weights`` for the
+gridded sources, ``zonal_runners.weights.run_build_weights`` for the ssflux
+lithology P2P matrix) used to cache their gdptools weight table as CSV, and
+every consumer re-parsed the whole file: each ssflux array task read the
+CONUS-wide ``lith_weights_<fabric>.csv`` only to keep its own batch's rows.
+
+``write_weights`` stores the table as parquet sorted by the HRU id column, in
+``ROW_GROUP_ROWS``-row row groups with min/max statistics. Sorted ids make each
+row group cover a narrow, disjoint id range, so ``read_weights(..., ids=...)``
+pushes the id predicate down and decodes only the row groups overlapping the
+batch; the file is memory-mapped rather than read whole. A CSV path (``.csv``
+suffix) is still accepted on both sides, and ``export_weights_csv`` writes a
+CSV copy for inspection or external tools.
+
+Ids are stored as they read back from CSV: gdptools hands the target id column
+back as strings, and an all-numeric string column is written as int64 (what
+``pd.read_csv`` would have produced) so existing ``isin``/merge code keeps
+comparing like with like.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_SUFFIX = ".parquet"
+
+# ~65k rows per row group: a few MB decoded, and at CONUS scale (tens of
+# millions of weight rows) fine enough that a batch touches a handful of groups.
+ROW_GROUP_ROWS = 65_536
+
+
+def _is_csv(path: Path) -> bool:
+    return Path(path).suffix.lower() == ".csv"
+
+
+def _normalize_ids(weights: pd.DataFrame, id_col: str) -> pd.DataFrame:
+    """Cast an all-numeric string id column to int64, as a CSV round-trip would."""
+    ids = weights[id_col]
+    if pd.api.types.is_integer_dtype(ids) or not (
+        pd.api.types.is_object_dtype(ids) or pd.api.types.is_string_dtype(ids)
+    ):
+        return weights
+    try:
+        as_int = pd.to_numeric(ids)
+    except (ValueError, TypeError):
+        return weights
+    if not pd.api.types.is_integer_dtype(as_int):
+        return weights
+    return weights.assign(**{id_col: as_int.astype("int64")})
+
+
+def write_weights(weights: pd.DataFrame, path, id_col: str) -> Path:
+    """Write `weights` to `path`: id-sorted parquet, or CSV for a ``.csv`` path.
+
+    The parquet file is written to a temp name and renamed, so an interrupted
+    write never leaves a truncated cache behind for the next run to load.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    weights = _normalize_ids(weights, id_col)
+    if _is_csv(path):
+        weights.to_csv(path, index=False)
+        return path
+    ordered = weights.sort_values(id_col, kind="stable").reset_index(drop=True)
+    tmp = path.with_name(path.stem + ".tmp" + path.suffix)
+    pq.write_table(
+        pa.Table.from_pandas(ordered, preserve_index=False), tmp,
+        row_group_size=ROW_GROUP_ROWS, write_statistics=True,
+    )
+    tmp.replace(path)
+    return path
+
+
+def _id_filters(path: Path, id_col: str, ids) -> list[tuple]:
+    """pyarrow filters selecting `ids`, typed to the stored id column.
+
+    The explicit min/max bounds let row-group statistics prune every group
+    outside the batch's id range before the ``in`` test is applied. `ids`
+    must be non-empty.
+    """
+    stored = pq.read_schema(path).field(id_col).type
+    values = np.unique(np.asarray(list(ids)))
+    if pa.types.is_integer(stored):
+        values = values.astype("int64")
+    else:
+        values = values.astype(str)
+    lo, hi = values[0].item(), values[-1].item()
+    return [(id_col, ">=", lo), (id_col, "<=", hi), (id_col, "in", values.tolist())]
+
+
+def read_weights(path, id_col: str, ids=None, columns: list[str] | None = None) -> pd.DataFrame:
+    """Load a weight table, optionally only the rows whose `id_col` is in `ids`.
+
+    Parquet is memory-mapped and filtered by row-group statistics, so the cost
+    scales with the rows kept, not the file size. A ``.csv`` path is parsed in
+    full and filtered afterwards (legacy caches and exports).
+    """
+    path = Path(path)
+    if _is_csv(path):
+        df = pd.read_csv(path, usecols=columns)
+        if ids is not None:
+            df = df[df[id_col].isin(set(ids))].reset_index(drop=True)
+        return df
+    if ids is not None and len(ids) == 0:
+        schema = pq.read_schema(path)
+        return (schema if columns is None else pa.schema([schema.field(c) for c in columns])
+                ).empty_table().to_pandas()
+    filters = None if ids is None else _id_filters(path, id_col, ids)
+    table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    return table.to_pandas()
+
+
+def weights_exist(path, id_col: str) -> bool:
+    """True if `path` exists, converting a legacy CSV sibling to parquet first.
+
+    Weight tables are expensive to regenerate, so a ``<stem>.csv`` cache left by
+    an earlier run is converted in place instead of being recomputed.
+    """
+    path = Path(path)
+    if path.exists():
+        return True
+    legacy = path.with_suffix(".csv")
+    if _is_csv(path) or not legacy.exists():
+        return False
+    logger.info("Converting legacy CSV weights %s -> %s", legacy, path.name)
+    write_weights(pd.read_csv(legacy), path, id_col)
+    return True
+
+
+def export_weights_csv(path, id_col: str, csv_path=None) -> Path:
+    """Write a CSV copy of the weight table at `path` (default: same stem, ``.csv``)."""
+    path = Path(path)
+    csv_path = Path(csv_path) if csv_path is not None else path.with_suffix(".csv")
+    return write_weights(read_weights(path, id_col), csv_path, id_col)
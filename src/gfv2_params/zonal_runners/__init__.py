@@ -74,6 +74,7 @@ osr.UseExceptions()
 from .lulc import run_lulc_batch
 from .lulc_prederived import run_lulc_prederived_batch
 from .merge import run_merge
+from .raster_cache import clear_raster_cache, set_raster_cache_size
 from .soils import run_soils_batch
 from .ssflux import run_ssflux_batch
 from .weights import run_build_weights
@@ -81,6 +82,7 @@ from .zonal import run_zonal_batch
 
 __all__ = [
     "BATCH_RUNNERS",
+    "clear_raster_cache",
     "run_build_weights",
     "run_lulc_batch",
     "run_lulc_prederived_batch",
@@ -88,6 +90,7 @@ __all__ = [
     "run_soils_batch",
     "run_ssflux_batch",
     "run_zonal_batch",
+    "set_raster_cache_size",
 ]
 
 
@@ -0,0 +1,162 @@
+"""Persisted HRU x cell coverage-fraction weights for ``script: zonal`` params.
+
+Every continuous zonal param on one raster lattice (same CRS, transform and
+shape — the elevation/slope/aspect VRTs, the fdr/twi family) intersects the
+same HRU polygons with the same cells. ``build_cell_weights`` runs exactextract
+once per HRU batch and lattice and saves the result as a CSR matrix; after
+that, ``zonal_stats_from_weights`` aggregates any raster on that lattice with
+one windowed read and a sparse mat-vec, no polygon clipping.
+
+Layout: ``{cell_weight_dir}/<lattice_key>/batch_<NNNN>.npz`` holding
+``ids`` (HRU ids, row order), ``indptr``/``indices``/``data`` (CSR over the
+batch's bounding window, cell index ``row * win_width + col``, float32
+coverage fraction) and ``window`` (row_off, col_off, height, width). Coverage
+is recorded for every cell the polygon touches, nodata or not, so one matrix
+serves rasters with different nodata footprints. A file is only used for a
+batch whose HRU id set equals its stored ``ids`` (`weights_match_ids`), so
+weights left over from a different batch split are rebuilt, not reused.
+
+Statistics match the exactextract columns the gdptools path writes (count,
+mean, std, min, 25%, 50%, 75%, max, sum): coverage-weighted over valid cells,
+population std, exactextract's weighted-quantile interpolation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import rasterio
+from exactextract import exact_extract
+from rasterio.windows import Window
+from scipy import sparse
+
+STAT_COLUMNS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max", "sum"]
+_QUANTILES = {"25%": 0.25, "50%": 0.5, "75%": 0.75}
+
+
+def lattice_key(ds) -> str:
+    """Short stable id of an open raster's grid (CRS, transform, shape)."""
+    text = f"{ds.crs.to_wkt() if ds.crs else ''}|{tuple(ds.transform)[:6]}|{ds.width}x{ds.height}"
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def weights_path(cell_weight_dir, key: str, batch_id: int) -> Path:
+    return Path(cell_weight_dir) / key / f"batch_{batch_id:04d}.npz"
+
+
+def weights_match_ids(weights_file, ids) -> bool:
+    """True if `weights_file` was built for exactly the HRU ids `ids` (any order)."""
+    with np.load(weights_file, allow_pickle=False) as z:
+        stored = z["ids"]
+    ids = np.asarray(ids)
+    return stored.size == ids.size and set(stored.tolist()) == set(ids.tolist())
+
+
+def build_cell_weights(raster_path, nhru_gdf, id_feature: str, out_path) -> int:
+    """Coverage fractions of every HRU in `nhru_gdf` on `raster_path`'s lattice -> `out_path`.
+
+    Returns the number of stored (HRU, cell) pairs.
+    """
+    with rasterio.open(raster_path) as ds:
+        width, crs = ds.width, ds.crs
+        # default_value keeps nodata cells: the weights describe the lattice,
+        # not this raster's nodata footprint.
+        table = exact_extract(
+            ds, nhru_gdf[[id_feature, "geometry"]].to_crs(crs),
+            ["cell_id(default_value=0)", "coverage(default_value=0)"],
+            include_cols=[id_feature], output="pandas",
+        )
+    cell_ids = [np.asarray(c, dtype="int64") for c in table["cell_id"]]
+    coverage = [np.asarray(c, dtype="float32") for c in table["coverage"]]
+    counts = np.array([c.size for c in cell_ids], dtype="int64")
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    flat = np.concatenate(cell_ids) if counts.sum() else np.zeros(0, dtype="int64")
+    data = np.concatenate(coverage) if counts.sum() else np.zeros(0, dtype="float32")
+
+    rows, cols = np.divmod(flat, width)
+    if flat.size:
+        row_off, col_off = int(rows.min()), int(cols.min())
+        height, win_width = int(rows.max()) - row_off + 1, int(cols.max()) - col_off + 1
+    else:
+        row_off = col_off = 0
+        height = win_width = 0
+    indices = (rows - row_off) * win_width + (cols - col_off)
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.stem + ".tmp.npz")
+    np.savez_compressed(
+        tmp, ids=table[id_feature].to_numpy(), indptr=indptr,
+        indices=indices.astype("int64" if height * win_width > np.iinfo(np.int32).max else "int32"),
+        data=data, window=np.array([row_off, col_off, height, win_width], dtype="int64"),
+    )
+    tmp.replace(out_path)
+    return int(flat.size)
+
+
+def _weighted_quantile(x: np.ndarray, w: np.ndarray, q: float) -> float:
+    """exactextract's WeightedQuantiles: type-7 interpolation generalised to weights."""
+    order = np.argsort(x, kind="stable")
+    x, w = x[order], w[order].astype("float64")
+    n = x.size
+    if n == 1:
+        return float(x[0])
+    cum = np.arange(n) * w + (n - 1) * np.concatenate([[0.0], np.cumsum(w)[:-1]])
+    h = q * cum[-1]
+    i = int(np.searchsorted(cum, h, side="right")) - 1
+    if i >= n - 1:
+        return float(x[-1])
+    return float(x[i] + (x[i + 1] - x[i]) * (h - cum[i]) / (cum[i + 1] - cum[i]))
+
+
+def zonal_stats_from_weights(raster_path, weights_file, id_feature: str) -> pd.DataFrame:
+    """Per-HRU `STAT_COLUMNS` of `raster_path` from a `build_cell_weights` file (index `id_feature`)."""
+    z = np.load(weights_file, allow_pickle=False)
+    ids, indptr, indices, data = z["ids"], z["indptr"], z["indices"], z["data"]
+    row_off, col_off, height, width = (int(v) for v in z["window"])
+    n = ids.size
+
+    out = pd.DataFrame(np.nan, index=pd.Index(ids, name=id_feature), columns=STAT_COLUMNS)
+    out["count"] = 0.0
+    out["sum"] = 0.0
+    if height == 0 or width == 0:
+        return out
+
+    with rasterio.open(raster_path) as ds:
+        arr = ds.read(1, window=Window(col_off, row_off, width, height), masked=True)
+    valid = ~np.ma.getmaskarray(arr).ravel()
+    if np.issubdtype(arr.dtype, np.floating):
+        valid &= ~np.isnan(arr.filled(0)).ravel()
+    values = np.where(valid, arr.filled(0).ravel().astype("float64"), 0.0)
+
+    w = sparse.csr_matrix((data.astype("float64"), indices, indptr), shape=(n, height * width))
+    count = w @ valid.astype("float64")
+    total = w @ values
+    sq = w @ (values * values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(count > 0, total / count, np.nan)
+        var = np.where(count > 0, sq / count - mean * mean, np.nan)
+    out["count"] = count
+    out["mean"] = mean
+    out["std"] = np.sqrt(np.clip(var, 0.0, None))
+    out["sum"] = total
+
+    lo, hi = np.full(n, np.nan), np.full(n, np.nan)
+    quant = {col: np.full(n, np.nan) for col in _QUANTILES}
+    for i in range(n):
+        cells = indices[indptr[i]:indptr[i + 1]]
+        cov = data[indptr[i]:indptr[i + 1]]
+        keep = valid[cells] & (cov > 0)
+        if not keep.any():
+            continue
+        x = values[cells[keep]]
+        lo[i], hi[i] = x.min(), x.max()
+        for col, q in _QUANTILES.items():
+            quant[col][i] = _weighted_quantile(x, cov[keep], q)
+    out["min"], out["max"] = lo, hi
+    for col in _QUANTILES:
+        out[col] = quant[col]
+    return out
@@ -6,10 +6,10 @@ that this module imports from).
 One ``run_lulc_batch`` covers the crosswalk-driven LULC source types (nalcms,
 nlcd, foresce); nhm_v11 uses the faithful ``lulc_prederived`` runner instead.
 The orchestrator normalises ``source_type`` to ``lulc_<source>``
-so each source writes per-batch CSVs to its own subdir. Pipeline: categorical
-zonal stats on the LULC raster, continuous zonal stats on the canopy raster,
-optional zonal stats on a ``keep`` raster, optional zonal stats on a ``radtrn``
-raster (-> rad_trncf), crosswalk lookup + cov_type assignment,
+so each source writes per-batch CSVs to its own subdir. Pipeline: one
+single-pass zonal run (``multi_zonal``) covering the LULC raster
+(categorical), the canopy raster and the optional ``keep`` and ``radtrn``
+(-> rad_trncf) rasters, then crosswalk lookup + cov_type assignment,
 interception/covden/retention computation.
 """
 
@@ -18,8 +18,6 @@ from __future__ import annotations
 from pathlib import Path
 
 import geopandas as gpd
-import rioxarray
-from gdptools import UserTiffData, ZonalGen
 
 from ..lulc import (
     assign_cov_type,
@@ -30,6 +28,7 @@ from ..lulc import (
     load_crosswalk,
     rad_trncf_from_density,
 )
+from .multi_zonal import zonal_stats_multi
 
 
 def run_lulc_batch(config: dict, batch_id: int, logger) -> None:
@@ -71,121 +70,33 @@ def run_lulc_batch(config: dict, batch_id: int, logger) -> None:
 
     file_prefix = f"base_nhm_{source_type}_{fabric}_batch_{batch_id:04d}_param"
 
-    # --- Step 1: Categorical zonal stats on LULC raster ---
-    lulc_path = Path(config["source_raster"])
-    if not lulc_path.exists():
-        raise FileNotFoundError(f"LULC raster not found: {lulc_path}")
-    lulc_da = rioxarray.open_rasterio(lulc_path, masked=True)
-    logger.info("Loaded LULC raster: shape=%s", lulc_da.shape)
-
-    lulc_data = UserTiffData(
-        var="lulc",
-        ds=lulc_da,
-        proj_ds=lulc_da.rio.crs,
-        x_coord="x",
-        y_coord="y",
-        band=1,
-        bname="band",
-        f_feature=nhru_gdf,
-        id_feature=id_feature,
-    )
-    lulc_zonal = ZonalGen(
-        user_data=lulc_data,
-        zonal_engine="exactextract",
-        zonal_writer="csv",
-        out_path=output_dir,
-        file_prefix=f"{file_prefix}_lulc_temp",
-        jobs=4,
-    )
-    histogram = lulc_zonal.calculate_zonal(categorical=True)
-    logger.info("LULC categorical zonal stats computed")
-
-    temp_csv = output_dir / f"{file_prefix}_lulc_temp.csv"
-    if temp_csv.exists():
-        temp_csv.unlink()
+    # --- Steps 1-3b: one zonal pass over every configured raster ---
+    # LULC (categorical), canopy, and the optional keep / radtrn rasters share
+    # one exactextract pass (multi_zonal): coverage fractions are computed once
+    # per HRU instead of once per raster.
+    layers = {"lulc": config["source_raster"], "canopy": config["canopy_raster"]}
+    keep_raster_str = config.get("keep_raster")
+    if keep_raster_str:
+        layers["keep"] = keep_raster_str
+    radtrn_raster_str = config.get("radtrn_raster")
+    if radtrn_raster_str:
+        layers["radtrn"] = radtrn_raster_str
+    stats = zonal_stats_multi(layers, nhru_gdf, id_feature, categorical={"lulc"})
+    logger.info("Zonal stats computed in one pass: %s", ", ".join(layers))
 
+    # --- Step 1: LULC class percentages ---
+    histogram = stats["lulc"]
     class_perc = class_percentages_from_histogram(histogram)
-    id_name = histogram.index.name or "id"
-    if id_name != id_feature:
-        class_perc = class_perc.rename(columns={id_name: id_feature})
     logger.info("Class percentages computed for %d HRUs", class_perc[id_feature].nunique())
 
-    # --- Step 2: Continuous zonal stats on canopy raster ---
-    cnpy_path = Path(config["canopy_raster"])
-    if not cnpy_path.exists():
-        raise FileNotFoundError(f"Canopy raster not found: {cnpy_path}")
-    cnpy_da = rioxarray.open_rasterio(cnpy_path, masked=True)
-    logger.info("Loaded canopy raster: shape=%s", cnpy_da.shape)
-
-    cnpy_data = UserTiffData(
-        var="canopy",
-        ds=cnpy_da,
-        proj_ds=cnpy_da.rio.crs,
-        x_coord="x",
-        y_coord="y",
-        band=1,
-        bname="band",
-        f_feature=nhru_gdf,
-        id_feature=id_feature,
-    )
-    cnpy_zonal = ZonalGen(
-        user_data=cnpy_data,
-        zonal_engine="exactextract",
-        zonal_writer="csv",
-        out_path=output_dir,
-        file_prefix=f"{file_prefix}_cnpy_temp",
-        jobs=4,
-    )
-    cnpy_stats = cnpy_zonal.calculate_zonal(categorical=False)
-    logger.info("Canopy continuous zonal stats computed")
-
-    temp_csv = output_dir / f"{file_prefix}_cnpy_temp.csv"
-    if temp_csv.exists():
-        temp_csv.unlink()
-
-    canopy_mean_df = cnpy_stats[["mean"]].rename(columns={"mean": "canopy_mean"})
-    canopy_mean_df.index.name = id_feature
-    canopy_mean_df = canopy_mean_df.reset_index()
+    # --- Step 2: canopy_mean per HRU ---
+    canopy_mean_df = stats["canopy"].rename(columns={"mean": "canopy_mean"}).reset_index()
 
     # --- Step 3: Retention (raster-based or crosswalk-based) ---
-    keep_raster_str = config.get("keep_raster")
     if keep_raster_str:
-        keep_path = Path(keep_raster_str)
-        if not keep_path.exists():
-            raise FileNotFoundError(f"Keep raster not found: {keep_path}")
-        keep_da = rioxarray.open_rasterio(keep_path, masked=True)
-        logger.info("Loaded keep raster: shape=%s", keep_da.shape)
-
-        keep_data = UserTiffData(
-            var="keep",
-            ds=keep_da,
-            proj_ds=keep_da.rio.crs,
-            x_coord="x",
-            y_coord="y",
-            band=1,
-            bname="band",
-            f_feature=nhru_gdf,
-            id_feature=id_feature,
-        )
-        keep_zonal = ZonalGen(
-            user_data=keep_data,
-            zonal_engine="exactextract",
-            zonal_writer="csv",
-            out_path=output_dir,
-            file_prefix=f"{file_prefix}_keep_temp",
-            jobs=4,
-        )
-        keep_stats = keep_zonal.calculate_zonal(categorical=False)
-        logger.info("Keep raster zonal stats computed")
-
-        temp_csv = output_dir / f"{file_prefix}_keep_temp.csv"
-        if temp_csv.exists():
-            temp_csv.unlink()
-
         # Keep raster values are 0-100; normalise to 0-1
-        retention_df = keep_stats[["mean"]].rename(columns={"mean": "retention"})
+        retention_df = stats["keep"].rename(columns={"mean": "retention"})
         retention_df["retention"] = retention_df["retention"] * 0.01
-        retention_df.index.name = id_feature
         retention_df = retention_df.reset_index()
         logger.info("Retention computed from keep raster (raster-based)")
     else:
@@ -199,46 +110,12 @@ def run_lulc_batch(config: dict, batch_id: int, logger) -> None:
     # no keep/radtrn raster (NLCD/NALCMS, pending a synthesized keep raster)
     # skip this column.
     rad_trncf_df = None
-    radtrn_raster_str = config.get("radtrn_raster")
     if radtrn_raster_str:
-        radtrn_path = Path(radtrn_raster_str)
-        if not radtrn_path.exists():
-            raise FileNotFoundError(f"radtrn raster not found: {radtrn_path}")
-        radtrn_da = rioxarray.open_rasterio(radtrn_path, masked=True)
-        logger.info("Loaded radtrn raster: shape=%s", radtrn_da.shape)
-
-        radtrn_data = UserTiffData(
-            var="radtrn",
-            ds=radtrn_da,
-            proj_ds=radtrn_da.rio.crs,
-            x_coord="x",
-            y_coord="y",
-            band=1,
-            bname="band",
-            f_feature=nhru_gdf,
-            id_feature=id_feature,
-        )
-        radtrn_zonal = ZonalGen(
-            user_data=radtrn_data,
-            zonal_engine="exactextract",
-            zonal_writer="csv",
-            out_path=output_dir,
-            file_prefix=f"{file_prefix}_radtrn_temp",
-            jobs=4,
-        )
-        radtrn_stats = radtrn_zonal.calculate_zonal(categorical=False)
-        logger.info("radtrn raster zonal stats computed")
-
-        temp_csv = output_dir / f"{file_prefix}_radtrn_temp.csv"
-        if temp_csv.exists():
-            temp_csv.unlink()
-
         # radtrn zonal mean is the per-HRU winter-canopy density (0-100);
         # rad_trncf_from_density handles the no-tree (NaN -> density 0 -> ~0.9917)
         # case so the policy stays shared with the lulc_prederived runner.
-        rad_trncf_df = radtrn_stats[["mean"]].rename(columns={"mean": "rad_trncf"})
+        rad_trncf_df = stats["radtrn"].rename(columns={"mean": "rad_trncf"})
         rad_trncf_df["rad_trncf"] = rad_trncf_from_density(rad_trncf_df["rad_trncf"])
-        rad_trncf_df.index.name = id_feature
         rad_trncf_df = rad_trncf_df.reset_index()
         logger.info("rad_trncf computed from radtrn raster (Beer's-law transform)")
 
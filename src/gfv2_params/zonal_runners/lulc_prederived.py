@@ -26,8 +26,6 @@ from __future__ import annotations
 from pathlib import Path
 
 import geopandas as gpd
-import rioxarray
-from gdptools import UserTiffData, ZonalGen
 
 from ..lulc import (
     assign_cov_type,
@@ -36,61 +34,18 @@ from ..lulc import (
     load_crosswalk,
     rad_trncf_from_density,
 )
+from .multi_zonal import zonal_stats_multi
 
 
-def _zonal(raster_path, nhru_gdf, id_feature, output_dir, prefix, var, *, categorical):
-    """Run one zonal pass over ``raster_path`` and return the result frame.
-
-    Cleans up the temp CSV ZonalGen writes. Returns the raw ZonalGen frame
-    (indexed by HRU id); callers pull ``mean`` (continuous) or the category
-    histogram columns (categorical).
-    """
-    raster_path = Path(raster_path)
-    if not raster_path.exists():
-        raise FileNotFoundError(f"{var} raster not found: {raster_path}")
-    # NB on nodata: masked=True relies on each GeoTIFF's declared nodata tag.
-    # The staged interception/loss rasters carry one (Snow/SRain/WRain=15,
-    # loss/keep Int8=-128), so sentinels are masked. The derived radtrn raster
-    # legitimately has no nodata tag — its non-tree 0s are valid data that must
-    # count in the mean — so we must NOT blanket-require a nodata tag here.
-    da = rioxarray.open_rasterio(raster_path, masked=True)
-    data = UserTiffData(
-        var=var,
-        ds=da,
-        proj_ds=da.rio.crs,
-        x_coord="x",
-        y_coord="y",
-        band=1,
-        bname="band",
-        f_feature=nhru_gdf,
-        id_feature=id_feature,
-    )
-    zonal = ZonalGen(
-        user_data=data,
-        zonal_engine="exactextract",
-        zonal_writer="csv",
-        out_path=output_dir,
-        file_prefix=f"{prefix}_{var}_temp",
-        jobs=4,
-    )
-    result = zonal.calculate_zonal(categorical=categorical)
-    temp_csv = output_dir / f"{prefix}_{var}_temp.csv"
-    if temp_csv.exists():
-        temp_csv.unlink()
-    return result
-
-
-def _zonal_mean_col(raster_path, nhru_gdf, id_feature, output_dir, prefix, var, scale=1.0):
-    """Per-HRU zonal mean of a continuous raster as a 2-col frame [id, var].
+def _mean_col(stats, id_feature, var, scale=1.0):
+    """Per-HRU zonal mean of one continuous layer as a 2-col frame [id, var].
 
     ``scale`` multiplies the mean (e.g. 0.01 to convert hundredths-of-inch
     interception rasters or 0-100 canopy percent to a 0-1 fraction). HRUs with
     no valid (non-nodata) pixels get NaN here; the caller decides fill policy.
     """
-    stats = _zonal(raster_path, nhru_gdf, id_feature, output_dir, prefix, var, categorical=False)
-    out = stats[["mean"]].rename(columns={"mean": var})
+    out = stats[var].rename(columns={"mean": var})
     out[var] = out[var] * scale
-    out.index.name = id_feature
     return out.reset_index()
 
 
@@ -124,19 +79,32 @@ def run_lulc_prederived_batch(config: dict, batch_id: int, logger) -> None:
 
     prefix = f"base_nhm_{source_type}_{fabric}_batch_{batch_id:04d}_param"
 
+    # All seven rasters in one zonal pass (multi_zonal): the HRU coverage
+    # fractions are computed once, not once per raster.
+    # NB on nodata: each GeoTIFF's declared nodata tag is honoured. The staged
+    # interception/loss rasters carry one (Snow/SRain/WRain=15, loss/keep
+    # Int8=-128), so sentinels are masked. The derived radtrn raster
+    # legitimately has no nodata tag — its non-tree 0s are valid data that must
+    # count in the mean — so we must NOT blanket-require a nodata tag here.
+    layers = {
+        "lulc": config["source_raster"],
+        "covden_sum": config["canopy_raster"],
+        "loss": config["loss_raster"],
+        "snow_intcp": config["snow_raster"],
+        "srain_intcp": config["srain_raster"],
+        "wrain_intcp": config["wrain_raster"],
+        "rad_trncf": config["radtrn_raster"],
+    }
+    stats = zonal_stats_multi(layers, nhru_gdf, id_feature, categorical={"lulc"})
+    logger.info("Zonal stats computed in one pass over %d rasters", len(layers))
+
     # --- cov_type: categorical zonal on LULC -> 5-class decision tree ---
-    histogram = _zonal(config["source_raster"], nhru_gdf, id_feature, output_dir, prefix, "lulc", categorical=True)
-    class_perc = class_percentages_from_histogram(histogram)
-    id_name = histogram.index.name or "id"
-    if id_name != id_feature:
-        class_perc = class_perc.rename(columns={id_name: id_feature})
+    class_perc = class_percentages_from_histogram(stats["lulc"])
     cov_type_df = assign_cov_type(class_perc, crosswalk, id_col=id_feature)
     logger.info("cov_type assigned for %d HRUs", len(cov_type_df))
 
     # --- covden_sum: zonal mean of canopy / 100, zeroed where cov_type == 0 ---
-    covden_sum_df = _zonal_mean_col(
-        config["canopy_raster"], nhru_gdf, id_feature, output_dir, prefix, "covden_sum", scale=0.01
-    )
+    covden_sum_df = _mean_col(stats, id_feature, "covden_sum", scale=0.01)
     covden_sum_df = covden_sum_df.merge(cov_type_df, on=id_feature, how="left")
     covden_sum_df.loc[covden_sum_df["cov_type"] == 0, "covden_sum"] = 0.0
     covden_sum_df = covden_sum_df[[id_feature, "covden_sum"]]
@@ -148,7 +116,7 @@ def run_lulc_prederived_batch(config: dict, batch_id: int, logger) -> None:
     # loss mean signals an HRU with no loss-raster overlap (CRS/extent bug, or
     # an edge HRU), so leave covden_win NaN and let the downstream KNN gap-fill
     # (PR #134) handle it, matching the legacy null -> CL_HRU fill.
-    loss_df = _zonal_mean_col(config["loss_raster"], nhru_gdf, id_feature, output_dir, prefix, "loss")
+    loss_df = _mean_col(stats, id_feature, "loss")
     covden_win_df = covden_sum_df.merge(loss_df, on=id_feature, how="left")
     no_loss = covden_win_df["loss"].isna() & (covden_win_df["covden_sum"] > 0)
     if no_loss.any():
@@ -161,14 +129,9 @@ def run_lulc_prederived_batch(config: dict, batch_id: int, logger) -> None:
     logger.info("covden_sum / covden_win computed")
 
     # --- interception: zonal mean / 100 (hundredths of inch -> inch) ---
-    intcp_specs = [
-        ("snow_raster", "snow_intcp"),
-        ("srain_raster", "srain_intcp"),
-        ("wrain_raster", "wrain_intcp"),
-    ]
     intcp_dfs = []
-    for cfg_key, col in intcp_specs:
-        df = _zonal_mean_col(config[cfg_key], nhru_gdf, id_feature, output_dir, prefix, col, scale=0.01)
+    for col in ("snow_intcp", "srain_intcp", "wrain_intcp"):
+        df = _mean_col(stats, id_feature, col, scale=0.01)
         df[col] = df[col].fillna(0.0)  # HRUs with no valid pixels -> 0 (legacy)
         intcp_dfs.append(df)
     logger.info("interception parameters computed")
@@ -176,7 +139,7 @@ def run_lulc_prederived_batch(config: dict, batch_id: int, logger) -> None:
     # --- rad_trncf: Beer's-law transform of the radtrn zonal mean ---
     # rad_trncf_from_density handles the no-tree (NaN -> density 0 -> ~0.9917)
     # case, shared with the run_lulc_batch runner so the policy can't drift.
-    rad_trncf_df = _zonal_mean_col(config["radtrn_raster"], nhru_gdf, id_feature, output_dir, prefix, "rad_trncf")
+    rad_trncf_df = _mean_col(stats, id_feature, "rad_trncf")
     rad_trncf_df["rad_trncf"] = rad_trncf_from_density(rad_trncf_df["rad_trncf"])
     logger.info("rad_trncf computed")
 
@@ -0,0 +1,103 @@
+"""Single-pass, in-memory zonal statistics over several rasters at once.
+
+The gdptools ``ZonalGen`` path runs one exactextract pass per raster: the LULC
+runner paid for four passes over the same HRU batch (LULC, canopy, keep,
+radtrn), each rebuilding the coverage fractions of identical geometries and
+round-tripping a temp CSV. ``zonal_stats_multi`` hands every raster to one
+``exactextract.exact_extract`` call. exactextract computes each HRU's coverage
+fractions once per distinct raster grid and applies them to every operation
+on that grid, so aligned rasters (the LULC stack is built on one grid) share a
+single coverage pass. Results come back as DataFrames, no temp files.
+
+Output frames keep the shape the runners already consumed from gdptools:
+
+- continuous layers: index ``id_feature``, one ``mean`` column (coverage-
+  weighted mean of valid pixels; NaN for an HRU with none).
+- categorical layers: index ``id_feature``, one column per category code (as a
+  string) holding the coverage-weighted pixel count, plus ``count`` (their
+  total). HRUs with no valid pixels are omitted, so an argmax never picks a
+  category for an empty row.
+
+Nodata comes from each raster's declared nodata tag, as with
+``rioxarray.open_rasterio(masked=True)``.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from exactextract import Operation, exact_extract
+from exactextract.raster import RasterioRasterSource
+
+from .raster_cache import open_dataset, release_dataset
+
+_CONTINUOUS_STATS = ("mean",)
+_CATEGORICAL_STATS = ("unique", "frac", "count")
+
+
+def zonal_stats_multi(layers: dict, nhru_gdf, id_feature: str, *, categorical=()) -> dict:
+    """Zonal stats of every raster in `layers` (``{var: path}``) over `nhru_gdf` in one pass.
+
+    `categorical` names the vars that get a category histogram instead of a
+    mean. All rasters must share a CRS (the HRUs are projected into it once).
+    Returns ``{var: DataFrame}`` as described in the module docstring.
+    """
+    categorical = set(categorical)
+    unknown = categorical - set(layers)
+    if unknown:
+        raise ValueError(f"categorical vars {sorted(unknown)} not in layers {sorted(layers)}")
+
+    handles = []
+    try:
+        sources = {}
+        crs = None
+        for var, path in layers.items():
+            path = Path(path)
+            if not path.exists():
+                raise FileNotFoundError(f"{var} raster not found: {path}")
+            ds = open_dataset(path)
+            handles.append(ds)
+            if crs is None:
+                crs = ds.crs
+            elif ds.crs != crs:
+                raise ValueError(f"{var} raster CRS {ds.crs} differs from {crs}; zonal_stats_multi needs one CRS")
+            sources[var] = RasterioRasterSource(ds, 1, name=var)
+
+        ops = [
+            Operation(stat, f"{var}_{stat}", src, None)
+            for var, src in sources.items()
+            for stat in (_CATEGORICAL_STATS if var in categorical else _CONTINUOUS_STATS)
+        ]
+        hrus = nhru_gdf[[id_feature, "geometry"]].to_crs(crs)
+        table = exact_extract(
+            list(sources.values()), hrus, ops,
+            include_cols=[id_feature], output="pandas",
+        ).set_index(id_feature)
+    finally:
+        for ds in handles:
+            release_dataset(ds)
+
+    out = {}
+    for var in layers:
+        if var in categorical:
+            out[var] = _histogram(table, var, id_feature)
+        else:
+            out[var] = table[[f"{var}_mean"]].rename(columns={f"{var}_mean": "mean"})
+    return out
+
+
+def _histogram(table: pd.DataFrame, var: str, id_feature: str) -> pd.DataFrame:
+    """Category-count frame (string code columns + ``count``) from exactextract unique/frac/count."""
+    rows = {}
+    for hru_id, codes, fracs, count in zip(table.index, table[f"{var}_unique"],
+                                           table[f"{var}_frac"], table[f"{var}_count"]):
+        if not count:
+            continue
+        rows[hru_id] = dict(zip((str(int(c)) for c in codes), np.asarray(fracs, dtype="float64") * count))
+    hist = pd.DataFrame.from_dict(rows, orient="index").fillna(0.0)
+    hist = hist[sorted(hist.columns, key=int)]
+    hist["count"] = hist.sum(axis=1)
+    hist.index.name = id_feature
+    return hist
@@ -0,0 +1,79 @@
+"""Process-wide LRU cache of open source rasters for multi-batch workers.
+
+A single-batch array task opens each CONUS VRT once and exits, so caching buys
+nothing there and the cache is off by default (``maxsize`` 0: every
+``open_raster`` call is a plain ``rioxarray.open_rasterio``). The multi-batch
+worker mode of ``scripts/derive_zonal_params.py`` (``--batch_id_end``) turns it
+on with ``set_raster_cache_size`` so consecutive batches of one param reuse the
+same lazily-read DataArray instead of re-opening the VRT per batch.
+``open_dataset`` is the same for plain rasterio handles (the in-memory
+exactextract engine in ``multi_zonal``).
+
+The cache is bounded by count, not bytes: each entry is a lazy handle (GDAL
+dataset + coordinates), not pixel data. Evicted handles are closed.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+
+import rasterio
+import rioxarray
+
+_cache: OrderedDict[tuple[str, str], object] = OrderedDict()
+_maxsize = 0
+
+
+def set_raster_cache_size(maxsize: int) -> None:
+    """Set the number of open rasters to keep (0 disables caching); evicts down to it."""
+    global _maxsize
+    if maxsize < 0:
+        raise ValueError(f"raster cache size must be >= 0, got {maxsize}")
+    _maxsize = maxsize
+    _evict()
+
+
+def clear_raster_cache() -> None:
+    """Close and drop every cached raster."""
+    while _cache:
+        _cache.popitem(last=False)[1].close()
+
+
+def _evict() -> None:
+    while len(_cache) > _maxsize:
+        _cache.popitem(last=False)[1].close()
+
+
+def _cached(path, kind: str, opener):
+    if _maxsize == 0:
+        return opener()
+    key = (str(Path(path).resolve()), kind)
+    handle = _cache.get(key)
+    if handle is None:
+        handle = opener()
+        _cache[key] = handle
+        _evict()
+    else:
+        _cache.move_to_end(key)
+    return handle
+
+
+def open_raster(path, *, masked: bool = True):
+    """``rioxarray.open_rasterio(path, masked=masked)``, served from the LRU cache when enabled."""
+    return _cached(path, f"rioxarray:masked={masked}",
+                   lambda: rioxarray.open_rasterio(path, masked=masked))
+
+
+def open_dataset(path):
+    """``rasterio.open(path)``, served from the LRU cache when enabled.
+
+    Hand it back with `release_dataset` rather than closing it directly.
+    """
+    return _cached(path, "rasterio", lambda: rasterio.open(path))
+
+
+def release_dataset(ds) -> None:
+    """Close a handle from `open_dataset` unless the cache still holds it."""
+    if not any(h is ds for h in _cache.values()):
+        ds.close()
@@ -16,6 +16,7 @@ import numpy as np
 import pandas as pd
 
 from ..raster_ops import deg_to_fraction
+from ..weight_store import read_weights, weights_exist
 
 
 def run_ssflux_batch(config: dict, batch_id: int, logger) -> None:
@@ -42,15 +43,15 @@ def run_ssflux_batch(config: dict, batch_id: int, logger) -> None:
     batch_ids = set(target_gdf[id_feature].values)
     logger.info("Loaded %d features (batch %d)", len(target_gdf), batch_id)
 
-    weight_file = weight_dir / f"lith_weights_{fabric}.csv"
-    if not weight_file.exists():
+    weight_file = weight_dir / f"lith_weights_{fabric}.parquet"
+    if not weights_exist(weight_file, id_feature):
         raise FileNotFoundError(
             f"Weight file not found: {weight_file}\n"
             "Run --mode build_weights first."
         )
-    all_weights = pd.read_csv(weight_file)
-    weights = all_weights[all_weights[id_feature].isin(batch_ids)].copy()
-    logger.info("Loaded weights: %d rows (from %d total)", len(weights), len(all_weights))
+    # Row-group pushdown on the id-sorted file: only this batch's rows are decoded.
+    weights = read_weights(weight_file, id_feature, ids=batch_ids)
+    logger.info("Loaded weights: %d rows for batch %d", len(weights), batch_id)
 
     merged_slope_file = Path(config["merged_slope_file"])
     if not merged_slope_file.exists():
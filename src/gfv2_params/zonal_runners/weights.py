@@ -13,14 +13,18 @@ import geopandas as gpd
 import numpy as np
 from gdptools import WeightGenP2P
 
+from ..weight_store import weights_exist, write_weights
+
 
 def run_build_weights(config: dict, logger, force: bool = False) -> None:
     """Pre-compute the CONUS-wide P2P weight matrix that ssflux consumes.
 
     Originally extracted from the now-retired scripts/build_weights.py
-    (see PR #85). One CSV per fabric, written
-    to ``config['weight_dir']/lith_weights_<fabric>.csv``. Idempotent: skips
-    if the file exists unless force=True.
+    (see PR #85). One id-sorted parquet per fabric, written to
+    ``config['weight_dir']/lith_weights_<fabric>.parquet`` so each ssflux batch
+    reads only its own rows (``gfv2_params.weight_store``). Idempotent: skips
+    if the file (or a legacy ``.csv`` of the same stem) exists unless
+    force=True.
 
     The target fabric is read from ``config['hru_gpkg']``/``hru_layer`` (the
     active base_config.yml profile, threaded in via _build_param_cfg) — the
@@ -33,9 +37,9 @@ def run_build_weights(config: dict, logger, force: bool = False) -> None:
 
     weight_dir = Path(config["weight_dir"])
     weight_dir.mkdir(parents=True, exist_ok=True)
-    weight_file = weight_dir / f"lith_weights_{fabric}.csv"
+    weight_file = weight_dir / f"lith_weights_{fabric}.parquet"
 
-    if weight_file.exists() and not force:
+    if not force and weights_exist(weight_file, id_feature):
         logger.info("Weight file already exists: %s (use --force to overwrite)", weight_file)
         return
 
@@ -56,7 +60,6 @@ def run_build_weights(config: dict, logger, force: bool = False) -> None:
         source_poly_idx="flux_id",
         method="serial",
         weight_gen_crs="5070",
-        output_file=weight_file,
     )
     weights = weight_gen.calculate_weights()
     if weights is None or len(weights) == 0:
@@ -64,6 +67,5 @@ def run_build_weights(config: dict, logger, force: bool = False) -> None:
             "WeightGenP2P returned no weights. Check that target and source "
             "polygons overlap spatially."
         )
-    if not weight_file.exists():
-        raise RuntimeError(f"WeightGenP2P did not write output file: {weight_file}")
+    write_weights(weights, weight_file, id_feature)
     logger.info("Weights computed: %d rows -> %s", len(weights), weight_file)
@@ -9,9 +9,16 @@ from __future__ import annotations
 from pathlib import Path
 
 import geopandas as gpd
-import rioxarray
+import rasterio
 from gdptools import UserTiffData, ZonalGen
 
+from .cell_weights import lattice_key, weights_match_ids, weights_path, zonal_stats_from_weights
+from .raster_cache import open_raster
+
+
+def _batch_ids(batch_gpkg: Path, layer: str, id_feature: str):
+    return gpd.read_file(batch_gpkg, layer=layer, columns=[id_feature], ignore_geometry=True)[id_feature]
+
 
 def run_zonal_batch(config: dict, batch_id: int, logger) -> None:
     """One HRU batch of continuous-zonal stats from a single raster.
@@ -19,6 +26,13 @@ def run_zonal_batch(config: dict, batch_id: int, logger) -> None:
     Drives the elevation/slope/aspect param types. Originally extracted from the now-retired scripts/create_zonal_params.py
     (see PR #85). Uses the gdptools NEW API
     (source_var/source_ds/source_crs/target_gdf/target_id).
+
+    When ``cell_weight_dir`` is configured, the entry is not categorical, and
+    the dir holds this batch's coverage weights for the raster's lattice
+    (``--mode build_cell_weights``), the stats come from those instead: one
+    windowed read and a sparse mat-vec, same CSV.
+    Weights whose stored HRU ids differ from the batch gpkg's (a different
+    batch split) are ignored with a warning.
     """
     source_type = config["source_type"]
     categorical = config.get("categorical", False)
@@ -40,14 +54,30 @@ def run_zonal_batch(config: dict, batch_id: int, logger) -> None:
     logger.info("Raster: %s", raster_path)
     logger.info("Batch GPKG: %s", batch_gpkg)
 
+    file_prefix = f"base_nhm_{source_type}_{fabric}_batch_{batch_id:04d}_param"
+
+    if config.get("cell_weight_dir") and not categorical:
+        with rasterio.open(raster_path) as ds:
+            key = lattice_key(ds)
+        wfile = weights_path(config["cell_weight_dir"], key, batch_id)
+        if not wfile.exists():
+            logger.info("No cell weights for lattice %s batch %d; running exactextract", key, batch_id)
+        elif not weights_match_ids(wfile, _batch_ids(batch_gpkg, target_layer, id_feature)):
+            logger.warning("Cell weights %s were built for a different HRU batch; running exactextract "
+                           "(rebuild with --mode build_cell_weights --force)", wfile)
+        else:
+            logger.info("Using cached cell weights (lattice %s): %s", key, wfile)
+            stats = zonal_stats_from_weights(raster_path, wfile, id_feature)
+            stats.to_csv(output_dir / f"{file_prefix}.csv")
+            logger.info("Zonal statistics complete. Shape: %s", stats.shape)
+            return
+
     nhru_gdf = gpd.read_file(batch_gpkg, layer=target_layer)
     logger.info("Loaded %s layer: %d features (batch %d)", target_layer, len(nhru_gdf), batch_id)
 
-    ned_da = rioxarray.open_rasterio(raster_path, masked=True)
+    ned_da = open_raster(raster_path)
     logger.info("Loaded raster: shape=%s, crs=%s", ned_da.shape, ned_da.rio.crs)
 
-    file_prefix = f"base_nhm_{source_type}_{fabric}_batch_{batch_id:04d}_param"
-
     data = UserTiffData(
         source_var=source_type,
         source_ds=ned_da,
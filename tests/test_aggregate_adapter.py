@@ -29,3 +29,12 @@ def test_std_variables_defaults_empty_and_validates():
     assert a2.std_variables == ("swe",)
     with pytest.raises(ValueError, match="std_variables"):
         SourceAdapter(source_key="s", variables=("swe",), files_glob="*.nc", std_variables=("missing",))
+
+
+def test_agg_backend_validates():
+    assert SourceAdapter(source_key="s", variables=("swe",), files_glob="*.nc").agg_backend == "gdptools"
+    with pytest.raises(ValueError, match="agg_backend"):
+        SourceAdapter(source_key="s", variables=("swe",), files_glob="*.nc", agg_backend="numba")
+    with pytest.raises(ValueError, match="sparse"):
+        SourceAdapter(source_key="s", variables=("swe",), files_glob="*.nc",
+                      stat_method="masked_median", agg_backend="sparse")
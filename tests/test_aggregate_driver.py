@@ -51,7 +51,7 @@ def test_aggregate_source_area_weighted_mean(tmp_path):
     out = aggregate_source(
         adapter, gdf, "hru_id",
         input_dir=tmp_path, output_dir=tmp_path / "out",
-        weight_file=tmp_path / "w.csv", output_prefix="demo",
+        weight_file=tmp_path / "w.parquet", output_prefix="demo",
     )
     assert len(out) == 1
     res = xr.open_dataset(out[0])
@@ -113,7 +113,7 @@ def test_aggregate_source_years_filter_no_match_raises(tmp_path):
     with pytest.raises(FileNotFoundError):
         aggregate_source(
             adapter, gdf, "hru_id", input_dir=tmp_path, output_dir=tmp_path / "out",
-            weight_file=tmp_path / "w.csv", output_prefix="demo", years=[2099],
+            weight_file=tmp_path / "w.parquet", output_prefix="demo", years=[2099],
         )
 
 
@@ -129,10 +129,132 @@ def test_std_sidecar_emits_var_std(tmp_path):
     )
     out = aggregate_source(
         adapter, gdf, "hru_id", input_dir=tmp_path,
-        output_dir=tmp_path / "out", weight_file=tmp_path / "w.csv",
+        output_dir=tmp_path / "out", weight_file=tmp_path / "w.parquet",
         output_prefix="demo"
     )
     res = xr.open_dataset(out[0])
     assert "swe" in res and "swe_std" in res
     # day 0 left poly: cells all 1.0 -> std 0; (see _synthetic_grid values)
     assert float(res["swe_std"].sel(hru_id=1).values[0]) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_plan_workers_caps_by_years_and_memory():
+    from gfv2_params.aggregate.driver import plan_workers
+
+    gb = 1024**3
+    assert plan_workers(8, 3, 2 * gb, None) == 3
+    assert plan_workers(8, 20, 5 * gb, 24.0) == 4
+    assert plan_workers(8, 20, 100 * gb, 24.0) == 1     # never below one
+
+
+def _open_without_history(path) -> xr.Dataset:
+    # gdptools stamps a to-the-second `history` attr; two runs can straddle a second.
+    ds = xr.open_dataset(path)
+    ds.attrs.pop("history", None)
+    return ds
+
+
+def test_aggregate_source_parallel_years_match_serial(tmp_path):
+    src = _synthetic_grid(tmp_path)
+    ds = xr.open_dataset(src).load()
+    ds.assign_coords(time=pd.to_datetime(["2011-01-01", "2011-01-02"])).to_netcdf(
+        tmp_path / "demo_daily_2011.nc")
+    adapter = SourceAdapter(
+        source_key="demo", variables=("swe", "swe2"), files_glob="demo_daily_*.nc",
+        source_crs="EPSG:5070", x_coord="x", y_coord="y", time_coord="time",
+        stat_method="mean", std_variables=("swe",),
+    )
+    kw = dict(input_dir=tmp_path, weight_file=tmp_path / "w.parquet", output_prefix="demo")
+    serial = aggregate_source(adapter, _two_polys(), "hru_id", output_dir=tmp_path / "s", **kw)
+    parallel = aggregate_source(adapter, _two_polys(), "hru_id", output_dir=tmp_path / "p",
+                                workers=2, memory_gb=1.0, **kw)
+    assert [p.name for p in parallel] == [p.name for p in serial] == [
+        "demo_agg_2010.nc", "demo_agg_2011.nc"]
+    for a, b in zip(serial, parallel):
+        xr.testing.assert_identical(_open_without_history(a), _open_without_history(b))
+
+
+def test_aggregate_source_incremental_skips_current_years(tmp_path):
+    import os
+
+    src = _synthetic_grid(tmp_path)
+    ds = xr.open_dataset(src).load()
+    src2011 = tmp_path / "demo_daily_2011.nc"
+    ds.assign_coords(time=pd.to_datetime(["2011-01-01", "2011-01-02"])).to_netcdf(src2011)
+    adapter = SourceAdapter(
+        source_key="demo", variables=("swe",), files_glob="demo_daily_*.nc",
+        source_crs="EPSG:5070", x_coord="x", y_coord="y", time_coord="time",
+        stat_method="mean",
+    )
+    kw = dict(input_dir=tmp_path, output_dir=tmp_path / "out",
+              weight_file=tmp_path / "w.parquet", output_prefix="demo", incremental=True)
+    first = aggregate_source(adapter, _two_polys(), "hru_id", **kw)
+    stamps = [p.stat().st_mtime_ns for p in first]
+
+    again = aggregate_source(adapter, _two_polys(), "hru_id", **kw)
+    assert again == first
+    assert [p.stat().st_mtime_ns for p in again] == stamps      # nothing rewritten
+
+    st = src2011.stat()                                           # re-delivered 2011 file
+    os.utime(src2011, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    aggregate_source(adapter, _two_polys(), "hru_id", **kw)
+    assert first[0].stat().st_mtime_ns == stamps[0]
+    assert first[1].stat().st_mtime_ns != stamps[1]
+
+
+def _second_source(tmp_path: Path, years=(2010,)) -> None:
+    # a second product on the same grid, one file per year
+    base = xr.open_dataset(tmp_path / "demo_daily_2010.nc").load()
+    for year in years:
+        t = pd.to_datetime([f"{year}-01-01", f"{year}-01-02"])
+        xr.Dataset({"tmax": (("time", "y", "x"), base["swe"].values + 5.0)},
+                   coords={"time": t, "y": base["y"], "x": base["x"]}
+                   ).to_netcdf(tmp_path / f"clim_daily_{year}.nc")
+
+
+def test_aggregate_sources_matches_per_source_runs(tmp_path):
+    from gfv2_params.aggregate import SourceRun, aggregate_sources
+
+    src = _synthetic_grid(tmp_path)
+    xr.open_dataset(src).load().assign_coords(time=pd.to_datetime(["2011-01-01", "2011-01-02"])
+                                              ).to_netcdf(tmp_path / "demo_daily_2011.nc")
+    _second_source(tmp_path)                                   # 2010 only
+    demo = SourceAdapter(
+        source_key="demo", variables=("swe", "swe2"), files_glob="demo_daily_*.nc",
+        source_crs="EPSG:5070", stat_method="mean", std_variables=("swe",),
+    )
+    clim = SourceAdapter(source_key="clim", variables=("tmax",), files_glob="clim_daily_*.nc",
+                         source_crs="EPSG:5070", stat_method="mean")
+    runs = [SourceRun(demo, tmp_path, tmp_path / "multi", "demo"),
+            SourceRun(clim, tmp_path, tmp_path / "multi", "clim")]
+    outs = aggregate_sources(runs, _two_polys(), "hru_id", weight_file=tmp_path / "w.parquet")
+    assert [p.name for p in outs["demo"]] == ["demo_agg_2010.nc", "demo_agg_2011.nc"]
+    assert [p.name for p in outs["clim"]] == ["clim_agg_2010.nc"]
+
+    for adapter, got in ((demo, outs["demo"]), (clim, outs["clim"])):
+        ref = aggregate_source(adapter, _two_polys(), "hru_id", input_dir=tmp_path,
+                               output_dir=tmp_path / adapter.source_key,
+                               weight_file=tmp_path / "w.parquet", output_prefix=adapter.source_key)
+        for a, b in zip(got, ref):
+            xr.testing.assert_identical(_open_without_history(a), _open_without_history(b))
+
+
+def test_aggregate_sources_rejects_unshared_grids(tmp_path):
+    import pytest
+
+    from gfv2_params.aggregate import SourceRun, aggregate_sources
+
+    _synthetic_grid(tmp_path)
+    a = SourceAdapter(source_key="demo", variables=("swe",), files_glob="demo_daily_*.nc",
+                      source_crs="EPSG:5070")
+    lonlat = SourceAdapter(source_key="other", variables=("t",), files_glob="demo_daily_*.nc",
+                           source_crs="EPSG:4326", x_coord="lon", y_coord="lat")
+    clash = SourceAdapter(source_key="clash", variables=("swe",), files_glob="demo_daily_*.nc",
+                          source_crs="EPSG:5070")
+    kw = dict(fabric_gdf=_two_polys(), id_col="hru_id", weight_file=tmp_path / "w.parquet")
+    with pytest.raises(ValueError, match="grid definition"):
+        aggregate_sources([SourceRun(a, tmp_path, tmp_path, "a"), SourceRun(lonlat, tmp_path, tmp_path, "o")],
+                          **kw)
+    with pytest.raises(ValueError, match="produced by both"):
+        aggregate_sources([SourceRun(a, tmp_path, tmp_path, "a"), SourceRun(clash, tmp_path, tmp_path, "c")],
+                          **kw)
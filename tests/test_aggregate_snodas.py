@@ -32,6 +32,7 @@ def test_adapter_settings():
     assert SNODAS_ADAPTER.source_crs == "EPSG:5070"
     assert SNODAS_ADAPTER.grid_variable == "swe"
     assert SNODAS_ADAPTER.files_glob == "snodas_daily_*.nc"
+    assert SNODAS_ADAPTER.agg_backend == "gdptools"
 
 
 def test_snodas_adapter_declares_swe_std():
@@ -122,7 +123,7 @@ def test_aggregate_source_masked_mean_excludes_fill(tmp_path):
     out = aggregate_source(
         SNODAS_ADAPTER, gdf, "hru_id",
         input_dir=tmp_path, output_dir=tmp_path / "out",
-        weight_file=tmp_path / "w.csv", output_prefix="snodas",
+        weight_file=tmp_path / "w.parquet", output_prefix="snodas",
     )
     assert len(out) == 1
     res = xr.open_dataset(out[0])
@@ -149,3 +150,34 @@ def test_aggregate_source_masked_mean_excludes_fill(tmp_path):
     # asserted values differ, so a silent revert to fill-as-0 fails this test.
     assert not np.isclose(swe[0], 60.0 / 8)     # 7.5
     assert not np.isclose(scov[0], 3.0 / 8)     # 0.375
+
+
+def test_sparse_backend_matches_gdptools(tmp_path):
+    # Three days over the fill/snow/dry grid, including an all-fill day for the
+    # left interior (gdptools' masked stats return 0.0 there) and HRUs that
+    # straddle cells (unequal weights).
+    import dataclasses
+
+    with xr.open_dataset(_snodas_grid(tmp_path)) as src:
+        base = src.load()
+    swe = np.repeat(base["swe"].values, 3, axis=0)
+    swe[1] = np.where(swe[1] > 0, swe[1] * 1.7, swe[1])
+    swe[2, :, :3] = _FILL
+    base = base.isel(time=[0, 0, 0]).assign_coords(
+        time=pd.to_datetime(["2010-01-01", "2010-01-02", "2010-01-03"]))
+    base["swe"].values[:] = swe
+    base.to_netcdf(tmp_path / "snodas_daily_2010.nc")
+    gdf = gpd.GeoDataFrame(
+        {"hru_id": [1, 2, 3]},
+        geometry=[box(0, 0, 3000, 6000), box(3000, 2200, 6000, 6000), box(3000, 0, 6000, 2200)],
+        crs="EPSG:5070",
+    )
+    kw = {"input_dir": tmp_path, "weight_file": tmp_path / "w.parquet", "output_prefix": "snodas"}
+    sparse = dataclasses.replace(SNODAS_ADAPTER, agg_backend="sparse")
+    a = xr.open_dataset(aggregate_source(SNODAS_ADAPTER, gdf, "hru_id", output_dir=tmp_path / "g", **kw)[0])
+    b = xr.open_dataset(aggregate_source(sparse, gdf, "hru_id", output_dir=tmp_path / "s", **kw)[0])
+    np.testing.assert_array_equal(a["hru_id"].values, b["hru_id"].values)
+    for v in ("swe", "scov", "swe_std"):
+        assert a[v].dims == b[v].dims and a[v].dtype == b[v].dtype
+        assert a[v].attrs == b[v].attrs
+        np.testing.assert_allclose(b[v].values, a[v].values, rtol=1e-5, atol=1e-5)
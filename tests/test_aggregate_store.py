@@ -0,0 +1,63 @@
+import netCDF4
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from gfv2_params.aggregate.driver import SOURCE_FINGERPRINT_ATTR
+from gfv2_params.aggregate.store import hru_chunk, pack_hru_store, store_path
+from scripts.derive_snarea_curve import iter_daily_chunks
+
+
+def _write_years(path, ids, years=(2011, 2010)):
+    rng = np.random.default_rng(3)
+    files = []
+    for year in years:
+        idx = pd.date_range(f"{year}-01-01", periods=40, freq="D")
+        swe = rng.random((idx.size, len(ids))).astype("float32") * 50
+        swe[3, 1] = np.nan
+        ds = xr.Dataset(
+            {"swe": (("time", "hru_id"), swe, {"units": "mm"}),
+             "scov": (("time", "hru_id"), swe / 50),
+             "swe_std": (("time", "hru_id"), swe * 0.3),
+             "crs": ((), 0, {"grid_mapping_name": "latitude_longitude"})},
+            coords={"time": idx, "hru_id": ids,
+                    "lat": ("hru_id", np.linspace(30, 40, len(ids)))},
+            attrs={SOURCE_FINGERPRINT_ATTR: f"snodas_{year}|1|1"},
+        )
+        files.append(path / f"snodas_agg_{year}.nc")
+        ds.to_netcdf(files[-1])
+    return files
+
+
+def test_pack_roundtrip_and_layout(tmp_path):
+    ids = [5, 3, 9, 1, 7, 2, 8]
+    files = _write_years(tmp_path, ids)
+    out = pack_hru_store(files, store_path(tmp_path, "snodas"), "hru_id", chunk_bytes=80 * 4 * 3)
+    assert out == tmp_path / "snodas_hru_store.nc"
+    assert not list(tmp_path.glob("*.tmp.nc"))
+
+    ref = xr.concat([xr.load_dataset(f) for f in sorted(files)], dim="time")
+    with xr.open_dataset(out) as got:
+        assert list(got["hru_id"].values) == ids
+        assert got["time"].to_index().is_monotonic_increasing
+        for v in ("swe", "scov", "swe_std"):
+            np.testing.assert_array_equal(got[v].values, ref[v].values)
+        assert got["swe"].attrs["units"] == "mm"
+        assert "crs" in got and "lat" in got.coords
+        assert SOURCE_FINGERPRINT_ATTR not in got.attrs
+
+    with netCDF4.Dataset(out) as nc:
+        var = nc["swe"]
+        assert var.chunking() == [80, hru_chunk(80, 4, 80 * 4 * 3)] == [80, 3]
+        assert var.filters()["zlib"] and var.filters()["shuffle"]
+
+
+def test_stage2_reads_store_like_year_files(tmp_path):
+    files = _write_years(tmp_path, [5, 3, 9, 1, 7])
+    store = pack_hru_store(files, store_path(tmp_path, "snodas"), "hru_id")
+    by_year = list(iter_daily_chunks(tmp_path, "hru_id", chunk_size=2))
+    by_store = list(iter_daily_chunks(tmp_path, "hru_id", chunk_size=2, files=[store]))
+    assert [list(c) for c in by_store] == [list(c) for c in by_year]
+    for a, b in zip(by_year, by_store):
+        for hru in a:
+            pd.testing.assert_frame_equal(a[hru], b[hru])
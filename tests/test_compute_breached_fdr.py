@@ -102,3 +102,27 @@ def test_force_reruns_fix_and_wbt(monkeypatch, tmp_path):
 
     assert len(fix_calls) == 1                                   # force re-creates the fixed DEM
     assert wbt_calls == ["BreachDepressionsLeastCost", "D8Pointer"]
+
+
+def test_tiled_fill_failure_removes_the_unfilled_scratch(monkeypatch, tmp_path):
+    vpu = "05"
+    out_dir = tmp_path / "per_vpu"
+    vpu_dir = out_dir / vpu
+    _touch(vpu_dir / f"Hydrodem_merged_fixed_{vpu}.tif")
+
+    def fake_run_wbt(runner, tool, args, logger):
+        for a in args:
+            if a.startswith("--output="):
+                _touch(Path(a.split("=", 1)[1]))
+
+    def failing_fill(src, dst, logger, *, tile_size):
+        raise MemoryError("synthetic fill failure")
+
+    monkeypatch.setattr(cbf, "_run_wbt", fake_run_wbt)
+    monkeypatch.setattr(cbf, "_fill_depressions_tiled", failing_fill)
+
+    with pytest.raises(MemoryError):
+        cbf._process_vpu(vpu, out_dir, out_dir, runner="wbt", force=False, logger=LOGGER,
+                         fill_backend="tiled")
+    assert not (vpu_dir / f"Hydrodem_breached_{vpu}_unfilled.tif").exists()
+    assert not (vpu_dir / f"Fdr_breached_{vpu}.tif").exists()
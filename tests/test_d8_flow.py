@@ -0,0 +1,163 @@
+"""In-process D8 pointer / flow accumulation / TWI (gfv2_params.d8_flow)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from gfv2_params.d8_flow import (
+    FDR_NODATA,
+    d8_fdr_fac_twi,
+    d8_flow_accumulation,
+    d8_pointer,
+    twi_from_fac,
+)
+
+# ESRI D8: 1=E 2=SE 4=S 8=SW 16=W 32=NW 64=N 128=NE
+_STEP = {1: (0, 1), 2: (1, 1), 4: (1, 0), 8: (1, -1), 16: (0, -1), 32: (-1, -1), 64: (-1, 0), 128: (-1, 1)}
+ND = -9999.0
+
+
+def _reference_pointer(dem, nodata, cell_x, cell_y):
+    # Straight transcription of WBT D8Pointer --esri_pntr: scan NE, E, SE, S,
+    # SW, W, NW, N; keep the first strictly-steepest positive drop.
+    order = [(-1, 1, 128), (0, 1, 1), (1, 1, 2), (1, 0, 4), (1, -1, 8), (0, -1, 16), (-1, -1, 32), (-1, 0, 64)]
+    diag = np.hypot(cell_x, cell_y)
+    ny, nx = dem.shape
+    out = np.zeros((ny, nx), dtype=np.uint8)
+    for r in range(ny):
+        for c in range(nx):
+            if dem[r, c] == nodata:
+                out[r, c] = FDR_NODATA
+                continue
+            best = -np.inf
+            for dr, dc, code in order:
+                rn, cn = r + dr, c + dc
+                if 0 <= rn < ny and 0 <= cn < nx and dem[rn, cn] != nodata:
+                    length = diag if dr and dc else (cell_x if dc else cell_y)
+                    slope = (dem[r, c] - dem[rn, cn]) / length
+                    if slope > best and slope > 0:
+                        best = slope
+                        out[r, c] = code
+    return out
+
+
+def _reference_fac(fdr):
+    # Walk every cell to its terminus, counting it into each cell it passes.
+    ny, nx = fdr.shape
+    fac = np.zeros((ny, nx), dtype=np.int64)
+    for r in range(ny):
+        for c in range(nx):
+            if fdr[r, c] == FDR_NODATA:
+                continue
+            cr, cc = r, c
+            while int(fdr[cr, cc]) in _STEP:
+                dr, dc = _STEP[int(fdr[cr, cc])]
+                tr, tc = cr + dr, cc + dc
+                if not (0 <= tr < ny and 0 <= tc < nx) or fdr[tr, tc] == FDR_NODATA:
+                    break
+                fac[tr, tc] += 1
+                cr, cc = tr, tc
+    fac[fdr == FDR_NODATA] = -1
+    return fac
+
+
+def test_pointer_encodes_each_direction_to_a_central_low():
+    dem = np.full((3, 3), 10.0)
+    dem[1, 1] = 0.0
+    fdr = d8_pointer(dem, ND, 30.0, 30.0)
+    assert fdr.tolist() == [[2, 4, 8], [1, 0, 16], [128, 64, 32]]
+
+
+def test_pointer_uses_true_diagonal_length():
+    # A 1 m drop east (30 m away) beats a 1.3 m drop south-east (42.4 m away).
+    dem = np.array([[10.0, 9.0], [10.0, 8.7]])
+    assert d8_pointer(dem, ND, 30.0, 30.0)[0, 0] == 1
+    # Anisotropic 10 x 30 m cells: the diagonal is hypot(10, 30) = 31.6 m, so
+    # a 1 m SE drop (0.032/m) loses to a 0.35 m E drop (0.035/m).
+    dem = np.array([[10.0, 9.65], [9.7, 9.0]])
+    assert d8_pointer(dem, ND, 10.0, 30.0)[0, 0] == 1
+
+
+def test_pointer_ties_go_to_wbt_scan_order_and_flats_are_zero():
+    dem = np.array([[5.0, 4.0], [4.0, 5.0]])
+    # (0,0): E and S drop equally; E precedes S in NE,E,SE,S,... order.
+    assert d8_pointer(dem, ND, 30.0, 30.0)[0, 0] == 1
+    assert not d8_pointer(np.full((2, 2), 3.0), ND, 30.0, 30.0).any()
+
+
+def test_pointer_never_targets_nodata_or_the_edge():
+    dem = np.array([[ND, 1.0, 2.0]])
+    assert d8_pointer(dem, ND, 30.0, 30.0).tolist() == [[FDR_NODATA, 0, 16]]
+
+
+def test_flow_accumulation_is_exclusive_of_self():
+    fdr = np.array([[1, 1, 0]], dtype=np.uint8)  # 0 -> 1 -> 2 (terminus)
+    assert d8_flow_accumulation(fdr).tolist() == [[0, 1, 2]]
+
+
+def test_flow_accumulation_drops_flow_into_nodata():
+    fdr = np.array([[1, 1, FDR_NODATA, 16]], dtype=np.uint8)
+    assert d8_flow_accumulation(fdr).tolist() == [[0, 1, -1, 0]]
+
+
+def test_flow_accumulation_terminates_on_a_cycle():
+    # Not producible by d8_pointer, but must not hang: a feeder into a 2-cycle.
+    fdr = np.array([[1, 1, 16]], dtype=np.uint8)
+    fac = d8_flow_accumulation(fdr)
+    assert fac[0, 0] == 0
+
+
+def test_pointer_and_accumulation_match_reference_on_random_dems():
+    rng = np.random.default_rng(4)
+    for trial in range(120):
+        ny, nx = rng.integers(1, 25, size=2)
+        # Integer elevations force ties and flats; a tilt on odd trials.
+        dem = np.round(rng.random((ny, nx)) * 6.0) + (trial % 2) * 0.1 * np.arange(ny)[:, None]
+        dem[rng.random((ny, nx)) < 0.1] = ND
+        fdr = d8_pointer(dem, ND, 30.0, 25.0)
+        assert np.array_equal(fdr, _reference_pointer(dem, ND, 30.0, 25.0))
+        assert np.array_equal(d8_flow_accumulation(fdr), _reference_fac(fdr))
+
+
+def test_twi_matches_compute_twi_formula():
+    rng = np.random.default_rng(9)
+    fac = rng.integers(0, 10_000, size=(40, 50)).astype(np.int64)
+    fac[0, :5] = -1
+    slope = (rng.random((40, 50)) * 80.0).astype(np.float32)
+    slope[1, :3] = ND
+    land = rng.random((40, 50)) > 0.1
+    twi, n_valid, n_capped = twi_from_fac(
+        fac, slope, land, fac_nodata=-1, slope_nodata=ND, slope_cap_deg=60.0, twi_nodata=ND,
+    )
+    s = slope.astype(np.float64)
+    valid = land & (fac != -1) & (s != ND)
+    expected = np.full(fac.shape, ND, dtype=np.float32)
+    capped = np.minimum(s[valid], 60.0)
+    expected[valid] = np.log((fac[valid] + 1.0) * 10.0 / (np.tan(np.deg2rad(capped)) + 0.01)).astype(np.float32)
+    assert twi.dtype == np.float32
+    np.testing.assert_allclose(twi, expected, rtol=1e-6)
+    assert n_valid == int(valid.sum())
+    assert n_capped == int((valid & (s > 60.0)).sum())
+
+
+def test_fused_pass_equals_the_separate_steps():
+    rng = np.random.default_rng(2)
+    dem = rng.random((30, 40)) * 100.0
+    dem[5, 5] = ND
+    slope = (rng.random((30, 40)) * 30.0).astype(np.float32)
+    land = np.ones((30, 40), dtype=bool)
+    fdr, fac, twi, n_valid, _ = d8_fdr_fac_twi(
+        dem, ND, 30.0, 30.0, slope, land, slope_nodata=ND, slope_cap_deg=60.0, twi_nodata=ND,
+    )
+    assert np.array_equal(fdr, d8_pointer(dem, ND, 30.0, 30.0))
+    assert np.array_equal(fac, d8_flow_accumulation(fdr))
+    assert fac.dtype == np.int64
+    assert twi[5, 5] == ND
+    assert n_valid == dem.size - 1
+
+
+def test_twi_rejects_mismatched_shapes():
+    with pytest.raises(ValueError):
+        twi_from_fac(np.zeros((2, 2)), np.zeros((2, 3)), np.ones((2, 2), bool),
+                     fac_nodata=-1, slope_nodata=ND, slope_cap_deg=60.0, twi_nodata=ND)
@@ -34,6 +34,18 @@ def test_batch_dir_resolves():
     assert "{fabric}" not in cfg["batch_dir"]
 
 
+def test_source_entry_selects_the_agg_backend():
+    import pytest
+
+    from scripts.derive_aggregate import _adapter
+
+    assert _adapter({"name": "snodas"}).agg_backend == "gdptools"
+    sparse = _adapter({"name": "snodas", "agg_backend": "sparse"})
+    assert sparse.agg_backend == "sparse" and sparse.variables == ("swe", "scov")
+    with pytest.raises(ValueError, match="agg_backend"):
+        _adapter({"name": "snodas", "agg_backend": "numba"})
+
+
 def _make_batch_nc(path: Path, hru_ids: list[int]) -> None:
     time = pd.date_range("2010-01-01", periods=3, freq="D")
     ds = xr.Dataset(
@@ -88,24 +100,46 @@ def test_run_merge_raises_on_duplicate_hru(tmp_path):
         run_merge(tmp_path, "snodas", "hru_id", logging.getLogger("t"))
 
 
+def test_run_merge_incremental_keeps_merged_years_newer_than_parts(tmp_path):
+    import os
+
+    from scripts.derive_aggregate import run_merge
+
+    batches_dir = tmp_path / "_batches"
+    batches_dir.mkdir()
+    for year in (2010, 2011):
+        _make_batch_nc(batches_dir / f"snodas_batch0000_agg_{year}.nc", [1, 2])
+    logger = logging.getLogger("test_run_merge")
+    out2010, out2011 = run_merge(tmp_path, "snodas", "hru_id", logger)
+    stamps = {p: p.stat().st_mtime_ns for p in (out2010, out2011)}
+
+    part = batches_dir / "snodas_batch0000_agg_2011.nc"             # 2011 re-aggregated
+    os.utime(part, ns=(stamps[out2011] + 10**9, stamps[out2011] + 10**9))
+    assert run_merge(tmp_path, "snodas", "hru_id", logger, incremental=True) == [out2010, out2011]
+    assert out2010.stat().st_mtime_ns == stamps[out2010]
+    assert out2011.stat().st_mtime_ns != stamps[out2011]
+
+
 def test_consolidate_weights_concats_per_batch(tmp_path):
     import logging
 
     import pandas as pd
 
+    from gfv2_params.weight_store import read_weights, write_weights
     from scripts.derive_aggregate import consolidate_weights
 
     wdir = tmp_path / "weights_agg"
     wdir.mkdir()
     # two disjoint-HRU per-batch weight tables
-    pd.DataFrame({"hru_id": [1, 1, 2], "wght": [0.1, 0.2, 0.9]}).to_csv(
-        wdir / "snodas_weights_oregon_batch0000.csv", index=False)
-    pd.DataFrame({"hru_id": [3, 4, 4], "wght": [0.5, 0.4, 0.6]}).to_csv(
-        wdir / "snodas_weights_oregon_batch0001.csv", index=False)
+    write_weights(pd.DataFrame({"hru_id": [3, 4, 4], "wght": [0.5, 0.4, 0.6]}),
+                  wdir / "snodas_weights_oregon_batch0000.parquet", "hru_id")
+    write_weights(pd.DataFrame({"hru_id": [1, 1, 2], "wght": [0.1, 0.2, 0.9]}),
+                  wdir / "snodas_weights_oregon_batch0001.parquet", "hru_id")
 
     out = consolidate_weights(wdir, "snodas", "oregon", "hru_id", logging.getLogger("t"))
-    assert out == wdir / "snodas_weights_oregon.csv"
-    combined = pd.read_csv(out)
+    assert out == wdir / "snodas_weights_oregon.parquet"
+    combined = read_weights(out, "hru_id")
+    assert combined["hru_id"].is_monotonic_increasing           # id-sorted for pushdown
     assert len(combined) == 6                                  # all rows preserved
     assert sorted(combined["hru_id"].unique()) == [1, 2, 3, 4]  # both batches present
 
@@ -129,13 +163,14 @@ def test_consolidate_weights_raises_on_cross_batch_overlap(tmp_path):
     import pandas as pd
     import pytest
 
+    from gfv2_params.weight_store import write_weights
     from scripts.derive_aggregate import consolidate_weights
 
     wdir = tmp_path / "weights_agg"
     wdir.mkdir()
-    pd.DataFrame({"hru_id": [1, 2], "wght": [0.5, 0.5]}).to_csv(
-        wdir / "snodas_weights_oregon_batch0000.csv", index=False)
-    pd.DataFrame({"hru_id": [2, 3], "wght": [0.5, 0.5]}).to_csv(   # HRU 2 in both batches
-        wdir / "snodas_weights_oregon_batch0001.csv", index=False)
+    write_weights(pd.DataFrame({"hru_id": [1, 2], "wght": [0.5, 0.5]}),
+                  wdir / "snodas_weights_oregon_batch0000.parquet", "hru_id")
+    write_weights(pd.DataFrame({"hru_id": [2, 3], "wght": [0.5, 0.5]}),   # HRU 2 in both batches
+                  wdir / "snodas_weights_oregon_batch0001.parquet", "hru_id")
     with pytest.raises(ValueError, match="appears in both"):
         consolidate_weights(wdir, "snodas", "oregon", "hru_id", logging.getLogger("t"))
@@ -11,9 +11,15 @@ import pandas as pd
 import pytest
 import xarray as xr
 
+from gfv2_params.snarea import DEFAULT_SNAREA_CURVE, build_snarea_curve
+from gfv2_params.snarea.season_cache import build_from_summaries
+from gfv2_params.snarea.selection import SelectionParams
+from scripts import derive_snarea_curve
 from scripts.derive_snarea_curve import (  # noqa: E402
     cells_from_weights,
+    iter_daily_chunks,
     read_daily_by_hru,
+    season_summaries,
     validate_default_curve,
 )
 
@@ -65,6 +71,74 @@ def test_read_daily_by_hru_missing_swe_std_raises(tmp_path):
         read_daily_by_hru(tmp_path, "hru_id")
 
 
+def test_iter_daily_chunks_streams_years_in_hru_chunks(tmp_path):
+    ids = [5, 3, 9, 1, 7]
+    for year in (2011, 2010):
+        idx = pd.date_range(f"{year}-02-01", periods=2, freq="D")
+        swe = np.arange(10, dtype="float64").reshape(2, 5) + 100 * (year - 2010)
+        ds = xr.Dataset(
+            {"swe": (("time", "hru_id"), swe), "scov": (("time", "hru_id"), swe / 1000),
+             "swe_std": (("time", "hru_id"), swe / 10)},
+            coords={"time": idx, "hru_id": ids},
+        )
+        ds.to_netcdf(tmp_path / f"snodas_agg_{year}.nc")
+    chunks = list(iter_daily_chunks(tmp_path, "hru_id", chunk_size=2))
+    assert [list(c) for c in chunks] == [[3, 5], [1, 9], [7]]  # file order, sorted within a chunk
+    s = chunks[0][3]
+    assert list(s.columns) == ["swe", "sca", "swe_std"]
+    assert s.index.is_monotonic_increasing and len(s) == 4    # both years, in date order
+    assert list(s["swe"]) == [1.0, 6.0, 101.0, 106.0]
+
+
+def _write_agg_year(path, year, ids, rng):
+    idx = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+    doy = np.asarray(idx.dayofyear)[:, None]
+    swe = np.clip(50 * np.cos((doy - 45) / 365 * 2 * np.pi) + rng.normal(0, 5, (len(idx), len(ids))), 0, None)
+    scov = np.clip(swe / 30 + rng.normal(0, 0.1, swe.shape), 0, 1)
+    xr.Dataset(
+        {"swe": (("time", "hru_id"), swe), "scov": (("time", "hru_id"), scov),
+         "swe_std": (("time", "hru_id"), swe * 0.4)},
+        coords={"time": idx, "hru_id": ids},
+    ).to_netcdf(path / f"snodas_agg_{year}.nc")
+
+
+def test_season_summaries_caches_and_refreshes_only_new_water_years(tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    nc_dir, cache = tmp_path / "agg", tmp_path / "cache"
+    nc_dir.mkdir()
+    ids = [4, 2, 8, 6, 1]
+    for year in (2010, 2011, 2012):
+        _write_agg_year(nc_dir, year, ids, rng)
+
+    def table(summaries_ids, summaries):
+        return build_from_summaries(summaries_ids, summaries, {}, {}, "hru_id",
+                                    SelectionParams(min_cells=0), DEFAULT_SNAREA_CURVE)
+
+    got_ids, summaries = season_summaries(nc_dir, "hru_id", cache, chunk_size=2)
+    assert list(got_ids) == [1, 2, 4, 6, 8]
+    assert sorted(summaries) == [2010, 2011, 2012, 2013]
+    assert sorted(p.name for p in cache.iterdir()) == [f"wy_{y}.npz" for y in (2010, 2011, 2012, 2013)]
+    ref = build_snarea_curve(read_daily_by_hru(nc_dir, "hru_id"), {}, {}, "hru_id",
+                             SelectionParams(min_cells=0), DEFAULT_SNAREA_CURVE)
+    pd.testing.assert_frame_equal(table(got_ids, summaries), ref)
+
+    # A new calendar year completes WY2013 and starts WY2014; nothing else is re-read.
+    _write_agg_year(nc_dir, 2013, ids, rng)
+    real = derive_snarea_curve.summarize_water_years
+    seen = []
+
+    def spy(*args, years=None, **kw):
+        seen.append(sorted(years))
+        return real(*args, years=years, **kw)
+
+    monkeypatch.setattr(derive_snarea_curve, "summarize_water_years", spy)
+    got_ids, summaries = season_summaries(nc_dir, "hru_id", cache, chunk_size=10)
+    assert seen == [[2013, 2014]]
+    ref = build_snarea_curve(read_daily_by_hru(nc_dir, "hru_id"), {}, {}, "hru_id",
+                             SelectionParams(min_cells=0), DEFAULT_SNAREA_CURVE)
+    pd.testing.assert_frame_equal(table(got_ids, summaries), ref)
+
+
 def test_validate_default_curve_accepts_valid():
     validate_default_curve(np.linspace(1.0, 0.0, 11))
 
@@ -10,6 +10,7 @@ from shapely.geometry import box
 
 import gfv2_params.dprst_depth.compute as compute_mod
 from gfv2_params.dprst_depth.compute import _polygon_depth_from_dem, run_batch
+from gfv2_params.dprst_depth.tiling import TIMING_COLUMNS
 
 
 def _L(name="test_dprst_depth_compute"):
@@ -264,3 +265,94 @@ def test_run_batch_dedupes_multi_tile_polygon(tmp_path, monkeypatch):
 
     written = pd.read_parquet(out_parquet)
     assert (written["COMID"] == 200).sum() == 1
+
+
+def test_run_batch_prefetch_matches_serial(tmp_path, monkeypatch, caplog):
+    """`prefetch_tiles > 0` reads windows on a thread pool ahead of the
+    compute loop; its output and failure counters must match the serial
+    loop's, including a tile that fails to open and a single window that
+    fails to read. A tiny `prefetch_mb` forces every reader through the
+    byte budget, one window in flight at a time."""
+    n = 12
+    dprst_gdf = gpd.GeoDataFrame(
+        {"COMID": [100 + i for i in range(n)], "best_topo": ["10m"] * n},
+        geometry=[box(10 * i, 0, 10 * i + 4, 4) for i in range(n)],
+        crs="EPSG:5070",
+    )
+    groups = {f"tile{t}": [i for i in range(n) if i % 4 == t] for t in range(4)}
+    monkeypatch.setattr(compute_mod, "group_by_tile", lambda dprst, wesm: groups)
+    monkeypatch.setattr(compute_mod, "_open_tile_vrt", _fake_open_tile_vrt_factory(bad_tiles={"tile2"}))
+
+    def _fake_read_tile_window(vrt, geom, rim_buffer_m=200.0):
+        if geom.bounds[0] == 50:       # idx 5 on tile1
+            raise RasterioIOError("synthetic: window outside tile")
+        dem = np.full((9, 9), 10.0, dtype=np.float32)
+        dem[3:6, 3:6] -= 1.0 + geom.bounds[0] / 100.0
+        return dem, Affine.identity()
+
+    monkeypatch.setattr(compute_mod, "_read_tile_window", _fake_read_tile_window)
+
+    def _no_fallback(geom, best_topo, wesm_row=None):
+        raise RasterioIOError("synthetic: no fallback data")
+
+    monkeypatch.setattr(compute_mod, "compute_polygon", _no_fallback)
+
+    caplog.set_level(logging.INFO, logger="prefetch")
+    outs, summaries = [], []
+    for prefetch in (0, 2):
+        caplog.clear()
+        outs.append(run_batch(dprst_gdf, list(groups), wesm_gdf=None,
+                              out_parquet=tmp_path / f"prefetch_{prefetch}.parquet",
+                              logger=_L("prefetch"), prefetch_tiles=prefetch, prefetch_mb=1e-6))
+        summary = [r.getMessage() for r in caplog.records if "n_read_failure" in r.getMessage()][-1]
+        # Drop the trailing "-> <out_parquet>"; only the counters must agree.
+        summaries.append(summary.rsplit(" -> ", 1)[0])
+
+    serial, prefetched = outs
+    assert sorted(serial["COMID"]) == [100 + i for i in range(n) if i % 4 != 2 and i != 5]
+    pd.testing.assert_frame_equal(
+        serial.sort_values("COMID").reset_index(drop=True),
+        prefetched.sort_values("COMID").reset_index(drop=True),
+    )
+    assert "n_read_failure=" in summaries[0] and summaries[0] == summaries[1]
+
+
+def test_run_batch_writes_per_tile_timings(tmp_path, monkeypatch):
+    """`timings_parquet` gets one `TIMING_COLUMNS` row per tile that opened
+    (a tile that fails to open is not a cost sample) and one
+    `tile_key=None` row per fallback polygon — here the multi-tile COMID 200
+    and tileB's polygon, retried after its tile failed to open."""
+    dprst_gdf = gpd.GeoDataFrame(
+        {"COMID": [100, 101, 200], "best_topo": ["10m"] * 3},
+        geometry=[box(0, 0, 4, 4), box(10, 0, 14, 4), box(20, 0, 24, 4)],
+        crs="EPSG:5070",
+    )
+    groups = {"tileA": [0, 2], "tileB": [1, 2], "tileC": []}
+    monkeypatch.setattr(compute_mod, "group_by_tile", lambda dprst, wesm: groups)
+    monkeypatch.setattr(compute_mod, "_open_tile_vrt", _fake_open_tile_vrt_factory(bad_tiles={"tileB"}))
+    monkeypatch.setattr(
+        compute_mod, "_read_tile_window",
+        lambda vrt, geom, rim_buffer_m=200.0: _dummy_dem_transform(),
+    )
+    monkeypatch.setattr(
+        compute_mod, "compute_polygon",
+        lambda geom, best_topo, wesm_row=None: {
+            "dprst_depth_m": 1.0, "measured_max_m": 1.0, "hollister_max_m": 1.0,
+            "flat": True, "resolution": "10m", "method": "flat_pending",
+        },
+    )
+
+    timings_parquet = tmp_path / "_timings" / "batch_0000.parquet"
+    run_batch(dprst_gdf, ["tileA", "tileB"], wesm_gdf=None, out_parquet=tmp_path / "batch.parquet",
+              logger=_L("timings"), timings_parquet=timings_parquet)
+
+    timings = pd.read_parquet(timings_parquet)
+    assert list(timings.columns) == TIMING_COLUMNS
+    tile_rows = timings[timings["tile_key"].notna()]
+    assert tile_rows["tile_key"].tolist() == ["tileA"]
+    assert tile_rows["n_polygons"].tolist() == [1]
+    fallback = timings[timings["tile_key"].isna()]
+    assert len(fallback) == 2 and fallback["n_flat"].tolist() == [1, 1]
+    assert (fallback["flat_cells"] == fallback["window_cells"]).all()
+    assert (timings[["read_s", "compute_s", "wall_s"]] >= 0).all().all()
+    assert (timings["wall_s"] >= timings["compute_s"]).all()
@@ -0,0 +1,132 @@
+"""Offline tests of the dprst_depth DEM tile cache against synthetic COGs."""
+
+import os
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.errors import RasterioIOError
+from rasterio.transform import from_origin
+from rasterio.warp import transform as warp_transform
+from shapely.geometry import box
+
+from gfv2_params.dprst_depth import topo
+from gfv2_params.dprst_depth.tile_cache import (
+    TileCache,
+    _object_key,
+    resolve_tile,
+    tile_cache_from_config,
+    use_tile_cache,
+)
+
+TILE = "n48w104"
+KEY = f"StagedProducts/Elevation/13/TIFF/current/{TILE}/USGS_13_{TILE}.tif"
+
+
+def _write_cog(path, size=120, seed=0):
+    """1x1 deg EPSG:4326 tile over lon [-104, -103], lat [47, 48] (NW corner name n48w104)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    with rasterio.open(
+        path, "w", driver="GTiff", dtype="float32", width=size, height=size, count=1,
+        crs="EPSG:4326", transform=from_origin(-104.0, 48.0, 1 / size, 1 / size),
+        nodata=-999999.0, tiled=True, blockxsize=64, blockysize=64, compress="deflate",
+    ) as dst:
+        dst.write((500 + rng.random((size, size)) * 5).astype("float32"), 1)
+    return path
+
+
+def _remote(tmp_path, name):
+    """A 'remote' tile served over file:// through the /vsicurl/ path form."""
+    src = _write_cog(tmp_path / "remote" / name)
+    return f"/vsicurl/file://{src}"
+
+
+def test_mirror_serves_bucket_key_without_network(tmp_path):
+    mirrored = _write_cog(tmp_path / "mirror" / KEY)
+    cache = TileCache(tmp_path / "cache", max_bytes=10**9, mirror_dir=tmp_path / "mirror", remote=False)
+    assert cache.resolve(topo.TILE13_HTTPS_TEMPLATE.format(tile=TILE)) == str(mirrored)
+    assert cache.resolve(f"/vsis3/prd-tnm/{KEY}") == str(mirrored)
+    assert cache.resolve(str(mirrored)) == str(mirrored)           # local paths pass through
+    with pytest.raises(RasterioIOError, match="remote reads are disabled"):
+        cache.resolve(topo.TILE13_HTTPS_TEMPLATE.format(tile="n40w100"))
+
+
+def test_download_once_then_hit(tmp_path):
+    remote = _remote(tmp_path, "a.tif")
+    cache = TileCache(tmp_path / "cache", max_bytes=10**9)
+    local = cache.resolve(remote)
+    assert local.startswith(str(tmp_path / "cache")) and local.endswith(".tif")
+    assert cache.resolve(remote) == local
+    assert (cache.fetches, cache.hits) == (1, 1)
+    with rasterio.open(local) as a, rasterio.open(remote[len("/vsicurl/file://"):]) as b:
+        np.testing.assert_array_equal(a.read(1), b.read(1))
+    # a download that fails without a 404 falls back to the remote path (GDAL retries it)
+    unreachable = f"/vsicurl/file://{tmp_path}/remote/missing.tif"
+    assert cache.resolve(unreachable) == unreachable
+    assert not list((tmp_path / "cache").glob("*/*.tmp"))
+
+
+def _raise_http(code):
+    def urlopen(url, timeout=None):
+        raise urllib.error.HTTPError(url, code, "synthetic", None, None)
+    return urlopen
+
+
+def test_404_is_cached_as_missing(tmp_path, monkeypatch):
+    path = topo.TILE13_HTTPS_TEMPLATE.format(tile="n40w100")
+    cache = TileCache(tmp_path / "cache", max_bytes=10**9)
+    monkeypatch.setattr(urllib.request, "urlopen", _raise_http(404))
+    with pytest.raises(RasterioIOError, match="HTTP 404"):
+        cache.resolve(path)
+    assert cache.missing_marker(_object_key(path)).exists()
+
+    # a re-run (fresh TileCache on the same dir) never asks the network again
+    monkeypatch.setattr(urllib.request, "urlopen", _raise_http(500))   # would fall back if reached
+    rerun = TileCache(tmp_path / "cache", max_bytes=10**9)
+    with pytest.raises(RasterioIOError, match="cached 404"):
+        rerun.resolve(path)
+    assert rerun.known_missing == 1 and "1 known-missing" in rerun.summary()
+
+
+def test_transient_http_error_falls_back_without_marker(tmp_path, monkeypatch):
+    path = topo.TILE13_HTTPS_TEMPLATE.format(tile="n40w100")
+    cache = TileCache(tmp_path / "cache", max_bytes=10**9)
+    monkeypatch.setattr(urllib.request, "urlopen", _raise_http(503))
+    assert cache.resolve(path) == path
+    assert not cache.missing_marker(_object_key(path)).exists()
+
+
+def test_lru_eviction_keeps_recent_tiles_under_cap(tmp_path):
+    remotes = [_remote(tmp_path, f"t{i}.tif") for i in range(3)]
+    one = os.path.getsize(remotes[0][len("/vsicurl/file://"):])
+    cache = TileCache(tmp_path / "cache", max_bytes=int(2.5 * one))
+    a, b = cache.resolve(remotes[0]), cache.resolve(remotes[1])
+    os.utime(a, ns=(1, 1))                        # a: least recently used
+    os.utime(b, ns=(2, 2))
+    cache.resolve(remotes[0])                     # hit: a becomes most recent
+    c = cache.resolve(remotes[2])                 # insert over the cap -> evict b
+    assert os.path.exists(a) and os.path.exists(c) and not os.path.exists(b)
+    assert cache.size_bytes() <= cache.max_bytes
+
+
+def test_read_window_reads_through_active_cache(tmp_path):
+    _write_cog(tmp_path / "mirror" / KEY, size=600)
+    cache = TileCache(None, max_bytes=0, mirror_dir=tmp_path / "mirror", remote=False)
+    xs, ys = warp_transform("EPSG:4326", "EPSG:5070", [-103.5], [47.5])
+    geom = box(xs[0] - 300, ys[0] - 300, xs[0] + 300, ys[0] + 300)
+    assert resolve_tile("/vsicurl/https://x/y.tif") == "/vsicurl/https://x/y.tif"
+    with use_tile_cache(cache):
+        dem, _transform, _crs, source = topo.read_window(geom, "10m")
+    assert source["paths"] == [topo.TILE13_HTTPS_TEMPLATE.format(tile=TILE)]
+    assert dem.size and (dem > 400).all()
+    assert cache.mirror_hits == 1
+
+
+def test_tile_cache_from_config(tmp_path):
+    assert tile_cache_from_config({}) is None
+    cache = tile_cache_from_config({"dprst_tile_cache_dir": str(tmp_path / "c"), "dprst_tile_cache_gb": 0.5,
+                                    "dprst_tile_mirror_dir": None, "dprst_tile_remote": False})
+    assert cache.max_bytes == 512 * 1024**2 and cache.mirror_dir is None and not cache.remote
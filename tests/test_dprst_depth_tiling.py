@@ -1,17 +1,34 @@
 import logging
+from collections import defaultdict
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
 import pytest
+from rasterio.warp import transform_bounds, transform_geom
 from shapely.geometry import box
 
 from gfv2_params.dprst_depth.tiling import (
+    MIN_FALLBACK_ROWS,
+    MIN_TIMING_ROWS,
+    TIMING_COLUMNS,
+    CostModel,
     _load_and_tag_for_plan,
+    batches_for_target,
+    calibrated_tile_costs,
     component_tile_batches,
+    fit_cost_model,
     group_by_tile,
     guard_oversized_windows,
     polygon_window_cost,
     tile_batches,
 )
+from gfv2_params.dprst_depth.topo import (
+    TILE13_HTTPS_TEMPLATE,
+    _1m_candidate_tiles,
+    _tile13_name,
+    _utm_zone_epsg,
+)
 
 
 def test_group_by_tile_and_batching():
@@ -88,6 +105,78 @@ def test_group_by_tile_1m_falls_back_to_10m_without_wesm_hit():
     assert any("USGS_13_" in k for k in groups)
 
 
+def _group_by_tile_per_row(dprst_gdf, wesm_gdf, rim_buffer_m=200.0):
+    """The original per-polygon `group_by_tile` (one `transform_geom` /
+    `transform_bounds` per polygon, `iterrows` over the sjoin) -- the
+    reference the vectorized planner must reproduce key-for-key."""
+    src_crs = dprst_gdf.crs
+
+    def _lonlat(geom):
+        centroid = {"type": "Point", "coordinates": (geom.centroid.x, geom.centroid.y)}
+        return transform_geom(src_crs, "EPSG:4326", centroid)["coordinates"]
+
+    def _key13(geom):
+        lon, lat = _lonlat(geom)
+        return TILE13_HTTPS_TEMPLATE.format(tile=_tile13_name(lon, lat))
+
+    groups = defaultdict(set)
+    is_1m = dprst_gdf["best_topo"] == "1m"
+    for idx, geom in dprst_gdf.loc[~is_1m, "geometry"].items():
+        groups[_key13(geom)].add(idx)
+    df_1m = dprst_gdf.loc[is_1m]
+    wesm = wesm_gdf.to_crs(src_crs)[["project", "geometry"]]
+    windows = gpd.GeoDataFrame(
+        {"dprst_idx": df_1m.index},
+        geometry=df_1m.geometry.buffer(rim_buffer_m).envelope.values,
+        crs=src_crs,
+    )
+    resolved = set()
+    for _, hit in gpd.sjoin(windows, wesm, how="left", predicate="intersects").iterrows():
+        if pd.isna(hit["project"]):
+            continue
+        idx = hit["dprst_idx"]
+        zone, utm_crs = _utm_zone_epsg(_lonlat(df_1m.geometry.loc[idx])[0])
+        bounds_utm = transform_bounds(src_crs, utm_crs, *hit.geometry.bounds, densify_pts=21)
+        for key in _1m_candidate_tiles(str(hit["project"]), bounds_utm, zone):
+            groups[key].add(idx)
+        resolved.add(idx)
+    for idx, geom in df_1m.geometry.items():
+        if idx not in resolved:
+            groups[_key13(geom)].add(idx)
+    return {k: sorted(v) for k, v in groups.items()}
+
+
+def test_group_by_tile_matches_per_row_planner():
+    # A grid of polygons in EPSG:5070 across western ND: several 1x1 deg 10 m
+    # tiles, the UTM 13/14 zone line (102W), two overlapping WESM projects,
+    # and 1m-tagged polygons outside both (-> 10 m fallback). Some windows
+    # straddle 10 km UTM grid lines (multi-tile 1 m polygons).
+    rng = np.random.default_rng(7)
+    n = 400
+    x0 = rng.uniform(-560_000, -380_000, n)
+    y0 = rng.uniform(2_650_000, 2_830_000, n)
+    size = rng.uniform(50, 6_000, n)
+    dprst = gpd.GeoDataFrame(
+        {"COMID": np.arange(n), "best_topo": np.where(rng.random(n) < 0.6, "1m", "10m")},
+        geometry=[box(x, y, x + s, y + s * 0.7) for x, y, s in zip(x0, y0, size)],
+        crs="EPSG:5070",
+        index=pd.Index(rng.permutation(10 * n)[:n]),
+    )
+    wesm = gpd.GeoDataFrame(
+        {"project": ["ND_West_2019", "ND_3DEPProcessing_D22"]},
+        geometry=[box(-560_000, 2_650_000, -450_000, 2_780_000),
+                  box(-480_000, 2_700_000, -400_000, 2_830_000)],
+        crs="EPSG:5070",
+    ).to_crs("EPSG:4269")
+
+    got = group_by_tile(dprst, wesm)
+    want = _group_by_tile_per_row(dprst, wesm)
+    assert list(got.items()) == list(want.items())
+    assert any("USGS_1M_13_" in k for k in got) and any("USGS_1M_14_" in k for k in got)
+    assert any("USGS_13_" in k for k in got)
+    assert any(len(v) > 1 for v in got.values())
+
+
 def test_tile_batches_balances_by_polygon_count():
     groups = {"a": [1, 2, 3, 4], "b": [5], "c": [6], "d": [7]}
     batches = tile_batches(groups, n_batches=2)
@@ -250,6 +339,116 @@ def test_component_tile_batches_balances_by_cost():
     assert batch_ab != batch_cd  # the two heavy components must not stack
 
 
+def test_tile_batches_tile_costs_override_polygon_loads():
+    # Same polygon counts everywhere; measured tile seconds decide the packing.
+    groups = {"a": [1], "b": [2], "c": [3], "d": [4]}
+    batches = tile_batches(groups, n_batches=2, tile_costs={"a": 9.0, "b": 1.0, "c": 2.0, "d": 8.0})
+    assert sorted(map(sorted, batches)) == [["a", "b"], ["c", "d"]]
+
+
+def _synthetic_timings(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    is_1m = rng.random(n) < 0.5
+    n_poly = rng.integers(1, 40, n)
+    cells = np.where(is_1m, rng.uniform(1e5, 5e7, n), rng.uniform(1e3, 5e5, n))
+    flat = cells * rng.uniform(0, 0.5, n)
+    wall = (np.where(is_1m, 30.0, 4.0) + 0.05 * n_poly
+            + 2e-6 * (cells - flat) + 2e-7 * flat)
+    return pd.DataFrame({
+        "tile_key": [f"USGS_1M_{i}.tif" if m else f"USGS_13_{i}.tif" for i, m in enumerate(is_1m)],
+        "resolution": np.where(is_1m, "1m", "10m"),
+        "n_polygons": n_poly, "n_flat": n_poly // 4,
+        "window_cells": cells, "flat_cells": flat,
+        "read_s": wall / 2, "compute_s": wall / 2, "wall_s": wall,
+    }, columns=TIMING_COLUMNS)
+
+
+def _synthetic_fallback(n=30, seed=1):
+    # One multi-tile polygon per row, its own read_window: 9 s at 1 m, 1.5 s at 10 m.
+    rng = np.random.default_rng(seed)
+    is_1m = rng.random(n) < 0.5
+    cells = np.where(is_1m, rng.uniform(1e5, 5e6, n), rng.uniform(1e3, 5e4, n))
+    flat = np.where(rng.random(n) < 0.3, cells, 0.0)
+    wall = np.where(is_1m, 9.0, 1.5) + 5e-6 * (cells - flat) + 1e-6 * flat
+    return pd.DataFrame({
+        "tile_key": None, "resolution": np.where(is_1m, "1m", "10m"),
+        "n_polygons": 1, "n_flat": (flat > 0).astype(int),
+        "window_cells": cells, "flat_cells": flat,
+        "read_s": 0.0, "compute_s": wall, "wall_s": wall,
+    }, columns=TIMING_COLUMNS)
+
+
+def test_fit_cost_model_recovers_synthetic_coefficients():
+    timings = _synthetic_timings()
+    # fallback rows (tile_key=None) get their own term and leave the tile term alone
+    model = fit_cost_model(pd.concat([timings, _synthetic_fallback()], ignore_index=True))
+    assert (model.n_tiles, model.n_fallback) == (len(timings), 30)
+    assert model.tile_1m_s == pytest.approx(30.0, rel=1e-3)
+    assert model.tile_10m_s == pytest.approx(4.0, rel=1e-3)
+    assert model.polygon_s == pytest.approx(0.05, rel=1e-3)
+    assert model.cell_s == pytest.approx(2e-6, rel=1e-3)
+    assert model.flat_cell_s == pytest.approx(2e-7, rel=1e-2)
+    assert model.r2 == pytest.approx(1.0)
+    assert model.flat_fraction == pytest.approx(
+        timings["n_flat"].sum() / timings["n_polygons"].sum()
+    )
+    assert model.fallback_1m_s == pytest.approx(9.0, rel=1e-3)
+    assert model.fallback_10m_s == pytest.approx(1.5, rel=1e-3)
+    assert model.fallback_cell_s == pytest.approx(5e-6, rel=1e-3)
+    assert model.fallback_flat_cell_s == pytest.approx(1e-6, rel=1e-2)
+    with pytest.raises(ValueError, match="tile timing record"):
+        fit_cost_model(timings.head(MIN_TIMING_ROWS - 1))
+
+    # Too few fallback records: borrow a one-polygon tile's cost.
+    few = fit_cost_model(pd.concat([timings, _synthetic_fallback(MIN_FALLBACK_ROWS - 1)], ignore_index=True))
+    assert few.n_fallback == 0
+    assert few.fallback_1m_s == pytest.approx(few.tile_1m_s + few.polygon_s)
+    assert few.fallback_cell_s == few.cell_s and few.fallback_flat_cell_s == few.flat_cell_s
+
+
+def test_calibrated_tile_costs_uses_known_flat_verdicts():
+    # 10m windows: (800 + 400)^2 / 100 = 14400 cells each; the 1m one is 100x.
+    dprst_gdf = gpd.GeoDataFrame(
+        {"best_topo": ["10m", "10m", "1m"]},
+        geometry=[box(0, 0, 800, 800), box(5000, 0, 5800, 800), box(9000, 0, 9800, 800)],
+        crs="EPSG:5070",
+    )
+    groups = {"USGS_13_n48w104.tif": [0, 1], "USGS_1M_14_x.tif": [2]}
+    model = CostModel(tile_1m_s=20.0, tile_10m_s=2.0, polygon_s=1.0, cell_s=1e-3, flat_cell_s=0.0,
+                      fallback_1m_s=50.0, fallback_10m_s=5.0, fallback_cell_s=2e-3, fallback_flat_cell_s=0.0,
+                      flat_fraction=0.5, n_tiles=100, n_fallback=40, r2=0.9)
+
+    costs = calibrated_tile_costs(groups, dprst_gdf, model)
+    assert costs["USGS_13_n48w104.tif"] == pytest.approx(2.0 + 2 * 1.0 + 2 * 14_400 * 0.5 * 1e-3)
+    assert costs["USGS_1M_14_x.tif"] == pytest.approx(20.0 + 1.0 + 1_440_000 * 0.5 * 1e-3)
+
+    flat = pd.Series([1.0, 0.0, np.nan], index=dprst_gdf.index)
+    known = calibrated_tile_costs(groups, dprst_gdf, model, flat=flat)
+    assert known["USGS_13_n48w104.tif"] == pytest.approx(2.0 + 2 * 1.0 + 14_400 * 1e-3)
+    assert known["USGS_1M_14_x.tif"] == pytest.approx(costs["USGS_1M_14_x.tif"])
+
+    # Polygon 0 now also touches the 1m tile: it leaves both tile terms for one
+    # fallback term (at its best_topo, 10m) on the first tile, as in run_batch.
+    # The 1m tile keeps only polygon 2; a tile with no single-tile polygon costs 0.
+    shared = calibrated_tile_costs(
+        {**groups, "USGS_1M_14_x.tif": [0, 2], "USGS_1M_14_y.tif": [0]}, dprst_gdf, model, flat=flat
+    )
+    assert shared["USGS_13_n48w104.tif"] == pytest.approx((2.0 + 1.0 + 14_400 * 1e-3) + 5.0)
+    assert shared["USGS_1M_14_x.tif"] == pytest.approx(known["USGS_1M_14_x.tif"])
+    assert shared["USGS_1M_14_y.tif"] == 0.0
+
+
+def test_batches_for_target_finds_fewest_batches():
+    groups = {"a": [1, 2], "b": [2], "c": [3], "d": [4], "e": [5]}   # {a,b} is one component
+    tile_costs = {"a": 3.0, "b": 3.0, "c": 4.0, "d": 2.0, "e": 2.0}
+    assert batches_for_target(groups, tile_costs, target_s=14.0) == 1
+    assert batches_for_target(groups, tile_costs, target_s=6.0) == 3
+    assert batches_for_target(groups, tile_costs, target_s=8.0) == 2
+    assert batches_for_target(groups, tile_costs, target_s=7.0) == 3   # LPT gives 8 s on 2
+    assert batches_for_target(groups, tile_costs, target_s=5.0) is None   # {a,b} = 6 s
+    assert batches_for_target({}, {}, target_s=1.0) == 1
+
+
 def test_polygon_window_cost_scales_1m_vs_10m_and_adds_overhead():
     # Same bbox, different best_topo -> 10m cost should be ~100x cheaper
     # than 1m cost (cell size 10x10 vs 1x1), modulo the shared fixed overhead.
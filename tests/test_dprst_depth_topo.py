@@ -1,5 +1,6 @@
 import geopandas as gpd
 import numpy as np
+import pytest
 from shapely.geometry import Point
 
 from gfv2_params.dprst_depth import topo
@@ -209,6 +210,47 @@ def test_depth_to_spill_zeroes_nodata_void_no_spurious_depth():
     assert np.isclose(depth[n - 1, n - 1], 0.0)  # untouched rim cell stays 0
 
 
+def test_depth_to_spill_native_matches_richdem():
+    # Rough float32 terrain with nested pits and flats, filled both ways.
+    rng = np.random.default_rng(11)
+    dem = rng.normal(0, 1, (120, 90)).cumsum(0).cumsum(1).astype(np.float32)
+    dem = (np.round(dem * 4) / 4 + np.float32(300)).astype(np.float32)
+    native = topo.depth_to_spill(dem)
+    reference = topo.depth_to_spill(dem, backend="richdem")
+    assert native.dtype == np.float32 and native.shape == dem.shape
+    assert (native > 0).sum() > 100
+    np.testing.assert_allclose(native, reference, atol=1e-4)
+
+    # A -9999 band along one edge (a window running off its tile) drains
+    # like the window edge: same depths as richdem on the cropped window.
+    banded = dem.copy()
+    banded[:, :7] = -9999.0
+    native = topo.depth_to_spill(banded)
+    assert (native[:, :7] == 0).all()
+    np.testing.assert_allclose(
+        native[:, 7:], topo.depth_to_spill(dem[:, 7:], backend="richdem"), atol=1e-4
+    )
+
+
+def test_depth_to_spill_native_float32_in_place_and_interior_void():
+    dem = np.full((9, 9), 10.0, dtype=np.float32)
+    dem[2:7, 2:7] = 8.0
+    before = dem.copy()
+    depth = topo.depth_to_spill(dem)
+    np.testing.assert_array_equal(dem, before)        # input window untouched
+    assert np.isclose(depth[4, 4], 2.0) and depth[0, 0] == 0.0
+
+    # A void inside the pit drains it like the window edge does; the void
+    # cell itself reads 0, never a fill-to-rim depth.
+    dem[4, 4] = -9999.0
+    depth = topo.depth_to_spill(dem)
+    assert depth[4, 4] == 0.0
+    assert (depth == 0).all()
+
+    with pytest.raises(ValueError, match="backend"):
+        topo.depth_to_spill(dem, backend="wbt")
+
+
 def test_is_hydroflattened_detects_constant_surface():
     flat = np.full((20, 20), 512.30, dtype=np.float32)
     natural = flat + np.linspace(0, 1.5, 400).reshape(20, 20).astype(np.float32)
@@ -4,6 +4,9 @@ import pytest
 from gfv2_params.d8_routing import (
     drains_to_dprst_kernel,
     drains_to_dprst_labeled_kernel,
+    drains_to_dprst_packed_kernel,
+    pack_d8_window,
+    packed_drains,
 )
 
 # ESRI D8 codes used in the fixtures:
@@ -12,69 +15,76 @@ from gfv2_params.d8_routing import (
 # drains_to_dprst_kernel returns (out, n_cycles); tests unpack both.
 
 
-def test_pour_point_itself_drains():
+@pytest.fixture(params=[False, True], ids=["serial", "parallel"])
+def parallel(request):
+    # Every kernel test runs against the serial walk and the parallel
+    # topological kernel (drains_to_dprst_*kernel(..., parallel=True)).
+    return request.param
+
+
+def test_pour_point_itself_drains(parallel):
     # A lone pour point with no inflow still counts as draining.
     fdr = np.array([[255]], dtype=np.uint8)
     pour = np.array([[1]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     assert out.tolist() == [[1]]
     assert n_cycles == 0
 
 
-def test_straight_chain_into_pour_point():
+def test_straight_chain_into_pour_point(parallel):
     # Row of cells all flowing East (code 1) into a pour point at the right end.
     # cells:  ->  ->  ->  [pour]
     fdr = np.array([[1, 1, 1, 255]], dtype=np.uint8)
     pour = np.array([[0, 0, 0, 1]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     # every upstream cell reaches the pour point
     assert out.tolist() == [[1, 1, 1, 1]]
     assert n_cycles == 0
 
 
-def test_chain_draining_away_is_not_marked():
+def test_chain_draining_away_is_not_marked(parallel):
     # Cells flow West (code 16) away from the only pour point on the right.
     # The pour point drains (itself); nothing upstream of it exists.
     fdr = np.array([[16, 16, 16, 255]], dtype=np.uint8)
     pour = np.array([[0, 0, 0, 1]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     # cells 0..2 flow further West off-grid -> do not reach the pour point
     assert out.tolist() == [[0, 0, 0, 1]]
     assert n_cycles == 0
 
 
-def test_two_cell_cycle_with_no_pour_terminates_and_marks_zero():
+def test_two_cell_cycle_with_no_pour_terminates_and_marks_zero(parallel):
     # Regression for the WBT hang: two cells point at each other.
     # left flows East (1) into right; right flows West (16) into left.
     fdr = np.array([[1, 16]], dtype=np.uint8)
     pour = np.array([[0, 0]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))  # must return, not hang
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)  # must return, not hang
     assert out.tolist() == [[0, 0]]
     assert n_cycles >= 1  # the cycle is detected and counted
 
 
-def test_four_cell_cycle_with_no_pour_terminates_and_marks_zero():
+def test_four_cell_cycle_with_no_pour_terminates_and_marks_zero(parallel):
     # 2x2 rotational cycle: (0,0)->E->(0,1)->S->(1,1)->W->(1,0)->N->(0,0)
     fdr = np.array([[1, 4],
                     [64, 16]], dtype=np.uint8)
     pour = np.zeros((2, 2), dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))  # must return, not hang
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)  # must return, not hang
     assert out.tolist() == [[0, 0], [0, 0]]
     assert n_cycles >= 1
 
 
-def test_cell_upstream_of_cycle_not_marked():
+def test_cell_upstream_of_cycle_not_marked(parallel):
     # A feeder cell flows into a closed cycle that never reaches a pour point.
     # layout (1 row, 3 cols): feeder(E) -> A(E) -> B(W back to A)
     #   col0 -> col1 -> col2, col2 -> col1  => cycle between col1 and col2
     fdr = np.array([[1, 1, 16]], dtype=np.uint8)
     pour = np.array([[0, 0, 0]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))  # must return, not hang
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)  # must return, not hang
     assert out.tolist() == [[0, 0, 0]]
     assert n_cycles >= 1
 
 
-def test_cycle_containing_pour_point_marks_drains():
+def test_cycle_containing_pour_point_marks_drains(parallel):
     # A pour point sits inside a 2-cell cycle. Seeding pre-marks pour points
     # _DRAINS, so the traversal exits via the _DRAINS branch when it reaches the
     # pour cell -- NOT via the cycle guard. This pins the seeding-order invariant
@@ -82,22 +92,22 @@ def test_cycle_containing_pour_point_marks_drains():
     # left(E->right) and right(W->left) form a cycle; left is the pour point.
     fdr = np.array([[1, 16]], dtype=np.uint8)
     pour = np.array([[1, 0]], dtype=np.uint8)  # col 0 is the pour point
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     # col 0 is the pour point => drains; col 1 flows into it => drains too
     assert out.tolist() == [[1, 1]]
     assert n_cycles == 0  # the pour point breaks the cycle before it is entered
 
 
-def test_nodata_sink_does_not_drain():
+def test_nodata_sink_does_not_drain(parallel):
     # Single non-pour sink cell.
     fdr = np.array([[255]], dtype=np.uint8)
     pour = np.array([[0]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     assert out.tolist() == [[0]]
     assert n_cycles == 0
 
 
-def test_branching_tributaries_all_reach_pour():
+def test_branching_tributaries_all_reach_pour(parallel):
     # Two tributaries merge then flow into a pour point.
     #   (0,0) SE(2) ->(1,1)
     #   (0,2) SW(8) ->(1,1)
@@ -107,7 +117,7 @@ def test_branching_tributaries_all_reach_pour():
                     [255, 255, 255]], dtype=np.uint8)
     pour = np.zeros((3, 3), dtype=np.uint8)
     pour[2, 1] = 1
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     assert out[0, 0] == 1   # NW tributary
     assert out[0, 2] == 1   # NE tributary
     assert out[1, 1] == 1   # confluence
@@ -116,7 +126,7 @@ def test_branching_tributaries_all_reach_pour():
     assert n_cycles == 0
 
 
-def test_all_eight_directions_decode_into_a_central_pour():
+def test_all_eight_directions_decode_into_a_central_pour(parallel):
     # Each surrounding cell points at the central pour point, exercising every
     # ESRI decode branch on an acyclic draining path. Neighbour -> code that
     # lands on (1,1):
@@ -128,75 +138,75 @@ def test_all_eight_directions_decode_into_a_central_pour():
                     [128, 64, 32]], dtype=np.uint8)
     pour = np.zeros((3, 3), dtype=np.uint8)
     pour[1, 1] = 1
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     assert out.tolist() == [[1, 1, 1], [1, 1, 1], [1, 1, 1]]
     assert n_cycles == 0
 
 
-def test_off_window_flow_does_not_drain():
+def test_off_window_flow_does_not_drain(parallel):
     # A cell flowing North off the top edge terminates as does-not-drain.
     fdr = np.array([[64]], dtype=np.uint8)
     pour = np.array([[0]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour))
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), parallel=parallel)
     assert out.tolist() == [[0]]
     assert n_cycles == 0
 
 
-def test_custom_nodata_value_terminates():
+def test_custom_nodata_value_terminates(parallel):
     # fdr_nodata is configurable; 0 here marks the sink.
     fdr = np.array([[1, 0]], dtype=np.uint8)
     pour = np.array([[0, 0]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), fdr_nodata=0)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, np.zeros_like(pour), fdr_nodata=0, parallel=parallel)
     assert out.tolist() == [[0, 0]]
     assert n_cycles == 0
 
 
-def test_barrier_blocks_upslope_from_pour():
+def test_barrier_blocks_upslope_from_pour(parallel):
     # Row flowing East into a pour point at the right end, with a barrier in
     # the middle:  cell0 ->  cell1 -> [barrier] -> [pour]
     # cell0/cell1 hit the barrier before the pour => not draining.
     fdr = np.array([[1, 1, 1, 255]], dtype=np.uint8)
     pour = np.array([[0, 0, 0, 1]], dtype=np.uint8)
     barrier = np.array([[0, 0, 1, 0]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier, parallel=parallel)
     # cell0, cell1 blocked; barrier itself non-draining; pour drains itself.
     assert out.tolist() == [[0, 0, 0, 1]]
     assert n_cycles == 0
 
 
-def test_barrier_downstream_of_pour_does_not_unmark():
+def test_barrier_downstream_of_pour_does_not_unmark(parallel):
     # Path reaches the pour BEFORE the barrier: first-waterbody-wins => drains.
     # cell0 -> [pour] -> [barrier]
     fdr = np.array([[1, 1, 255]], dtype=np.uint8)
     pour = np.array([[0, 1, 0]], dtype=np.uint8)
     barrier = np.array([[0, 0, 1]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier, parallel=parallel)
     assert out.tolist() == [[1, 1, 0]]
     assert n_cycles == 0
 
 
-def test_no_barrier_is_equivalent_to_old_behavior():
+def test_no_barrier_is_equivalent_to_old_behavior(parallel):
     # An all-zero barrier reproduces the pre-barrier straight-chain result.
     fdr = np.array([[1, 1, 1, 255]], dtype=np.uint8)
     pour = np.array([[0, 0, 0, 1]], dtype=np.uint8)
     barrier = np.zeros_like(pour)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier, parallel=parallel)
     assert out.tolist() == [[1, 1, 1, 1]]
     assert n_cycles == 0
 
 
-def test_pour_wins_when_cell_is_both_pour_and_barrier():
+def test_pour_wins_when_cell_is_both_pour_and_barrier(parallel):
     # Defensive: overlap is impossible by construction, but if a cell is both,
     # dprst (_DRAINS) must win over the barrier seed.
     fdr = np.array([[1, 255]], dtype=np.uint8)
     pour = np.array([[0, 1]], dtype=np.uint8)
     barrier = np.array([[0, 1]], dtype=np.uint8)
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier, parallel=parallel)
     assert out.tolist() == [[1, 1]]
     assert n_cycles == 0
 
 
-def test_barrier_on_two_cell_cycle_breaks_it_without_counting_a_cycle():
+def test_barrier_on_two_cell_cycle_breaks_it_without_counting_a_cycle(parallel):
     # Mirror of test_cycle_containing_pour_point_marks_drains, but the seeded
     # cell is a BARRIER, not a pour. left(E->right) and right(W->left) would
     # form a cycle; right is a barrier. Barriers are seeded _NOT before the
@@ -206,12 +216,12 @@ def test_barrier_on_two_cell_cycle_breaks_it_without_counting_a_cycle():
     fdr = np.array([[1, 16]], dtype=np.uint8)
     pour = np.array([[0, 0]], dtype=np.uint8)
     barrier = np.array([[0, 1]], dtype=np.uint8)  # col 1 is the barrier
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier, parallel=parallel)
     assert out.tolist() == [[0, 0]]
     assert n_cycles == 0  # barrier breaks the cycle before it is entered
 
 
-def test_confluence_into_single_barrier_blocks_both_tributaries():
+def test_confluence_into_single_barrier_blocks_both_tributaries(parallel):
     # Two tributaries merge at a barrier cell that sits directly upstream of a
     # pour. Both branches must be blocked at the shared barrier, the barrier
     # itself is non-draining, and the barrier must NOT let the downstream pour
@@ -225,44 +235,44 @@ def test_confluence_into_single_barrier_blocks_both_tributaries():
     pour[2, 1] = 1
     barrier = np.zeros((3, 3), dtype=np.uint8)
     barrier[1, 1] = 1
-    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier, parallel=parallel)
     assert out.tolist() == [[0, 0, 0],
                             [0, 0, 0],
                             [0, 1, 0]]  # only the pour drains itself
     assert n_cycles == 0
 
 
-def test_mismatched_barrier_shape_raises():
+def test_mismatched_barrier_shape_raises(parallel):
     # numba has no bounds-checking; the plain-Python wrapper must reject a
     # barrier/pour that is not the same shape as fdr (loud, not silent OOB).
     fdr = np.zeros((2, 2), dtype=np.uint8)
     pour = np.zeros((2, 2), dtype=np.uint8)
     barrier = np.zeros((2, 1), dtype=np.uint8)
     with pytest.raises(ValueError):
-        drains_to_dprst_kernel(fdr, pour, barrier)
+        drains_to_dprst_kernel(fdr, pour, barrier, parallel=parallel)
 
 
-def test_labeled_barrier_blocks_upslope():
+def test_labeled_barrier_blocks_upslope(parallel):
     # cell0 -> cell1 -> [barrier] -> [dprst label 7]
     fdr = np.array([[1, 1, 1, 255]], dtype=np.uint8)
     label = np.array([[0, 0, 0, 7]], dtype=np.int32)
     barrier = np.array([[0, 0, 1, 0]], dtype=np.uint8)
-    out, n = drains_to_dprst_labeled_kernel(fdr, label, barrier)
+    out, n = drains_to_dprst_labeled_kernel(fdr, label, barrier, parallel=parallel)
     assert out.tolist() == [[0, 0, 0, 7]]
     assert n == 0
 
 
-def test_labeled_no_barrier_matches_unbarriered():
+def test_labeled_no_barrier_matches_unbarriered(parallel):
     # all-zero barrier reproduces the straight-chain label fill
     fdr = np.array([[1, 1, 1, 255]], dtype=np.uint8)
     label = np.array([[0, 0, 0, 7]], dtype=np.int32)
     barrier = np.zeros_like(label, dtype=np.uint8)
-    out, n = drains_to_dprst_labeled_kernel(fdr, label, barrier)
+    out, n = drains_to_dprst_labeled_kernel(fdr, label, barrier, parallel=parallel)
     assert out.tolist() == [[7, 7, 7, 7]]
     assert n == 0
 
 
-def test_labeled_mismatched_shape_raises():
+def test_labeled_mismatched_shape_raises(parallel):
     # Same guard as drains_to_dprst_kernel, but for the labeled wrapper: a
     # label/barrier that isn't the same shape as fdr must raise, not silently
     # OOB (numba runs bounds-check-off).
@@ -270,14 +280,114 @@ def test_labeled_mismatched_shape_raises():
     label = np.zeros((2, 2), dtype=np.int32)
     barrier = np.zeros((2, 1), dtype=np.uint8)
     with pytest.raises(ValueError):
-        drains_to_dprst_labeled_kernel(fdr, label, barrier)
+        drains_to_dprst_labeled_kernel(fdr, label, barrier, parallel=parallel)
 
 
-def test_labeled_first_waterbody_wins():
+def test_labeled_first_waterbody_wins(parallel):
     # cell0 -> [dprst 5] -> [barrier]: label reached before barrier
     fdr = np.array([[1, 1, 255]], dtype=np.uint8)
     label = np.array([[0, 5, 0]], dtype=np.int32)
     barrier = np.array([[0, 0, 1]], dtype=np.uint8)
-    out, n = drains_to_dprst_labeled_kernel(fdr, label, barrier)
+    out, n = drains_to_dprst_labeled_kernel(fdr, label, barrier, parallel=parallel)
     assert out.tolist() == [[5, 5, 0]]
     assert n == 0
+
+
+def _packed_result(fdr, pour, barrier, fdr_nodata=255):
+    packed = pack_d8_window(fdr, pour, barrier, fdr_nodata=fdr_nodata)
+    n_cycles = drains_to_dprst_packed_kernel(packed)
+    return packed_drains(packed).astype(np.uint8), n_cycles
+
+
+def test_packed_kernel_matches_kernel_on_random_fdr():
+    # The streaming routing mode's packed kernel must be bit-identical to the
+    # in-RAM kernel — same cells AND the same cycle count (same visiting order).
+    # Random codes include nodata, 0, and a non-D8 value (3) as sinks.
+    rng = np.random.default_rng(129)
+    codes = np.array([1, 2, 4, 8, 16, 32, 64, 128, 255, 0, 3], dtype=np.uint8)
+    for trial in range(200):
+        ny, nx = rng.integers(1, 40, size=2)
+        fdr = codes[rng.integers(0, len(codes), size=(ny, nx))]
+        pour = (rng.random((ny, nx)) < 0.05).astype(np.uint8)
+        barrier = (rng.random((ny, nx)) < 0.05).astype(np.uint8)
+        fdr_nodata = 0 if trial % 2 else 255
+        expected, n_expected = drains_to_dprst_kernel(fdr, pour, barrier, fdr_nodata=fdr_nodata)
+        out, n_cycles = _packed_result(fdr, pour, barrier, fdr_nodata=fdr_nodata)
+        assert np.array_equal(out, expected)
+        assert n_cycles == n_expected
+
+
+def test_packed_kernel_seeding_precedence_and_cycles():
+    # pour wins a pour/barrier overlap; a barrier breaks a cycle uncounted;
+    # a bare 2-cell cycle is counted once.
+    fdr = np.array([[1, 255, 1, 16, 1, 16]], dtype=np.uint8)
+    pour = np.array([[0, 1, 0, 0, 0, 0]], dtype=np.uint8)
+    barrier = np.array([[0, 1, 0, 1, 0, 0]], dtype=np.uint8)
+    out, n_cycles = _packed_result(fdr, pour, barrier)
+    assert out.tolist() == [[1, 1, 0, 0, 0, 0]]
+    assert n_cycles == 1
+
+
+def test_packed_window_can_be_filled_strip_by_strip():
+    # pack_d8_window is row-wise independent: packing a window in strips gives
+    # the same bytes as packing it whole.
+    rng = np.random.default_rng(7)
+    fdr = np.array([1, 2, 4, 8, 16, 32, 64, 128, 255], dtype=np.uint8)[rng.integers(0, 9, (9, 5))]
+    pour = (rng.random((9, 5)) < 0.1).astype(np.uint8)
+    barrier = (rng.random((9, 5)) < 0.1).astype(np.uint8)
+    whole = pack_d8_window(fdr, pour, barrier)
+    strips = np.empty_like(whole)
+    for r0 in range(0, 9, 4):
+        strips[r0:r0 + 4] = pack_d8_window(fdr[r0:r0 + 4], pour[r0:r0 + 4], barrier[r0:r0 + 4])
+    assert np.array_equal(strips, whole)
+
+
+def test_packed_kernel_rejects_non_uint8():
+    with pytest.raises(ValueError):
+        drains_to_dprst_packed_kernel(np.zeros((2, 2), dtype=np.int32))
+
+
+def test_parallel_kernel_matches_serial_on_random_fdr():
+    # The topological kernel must reproduce the serial walk exactly: same
+    # cells, same labels, same cycle count. Random codes include nodata, 0 and
+    # a non-D8 value (3) as sinks; every third grid is all-D8 (cycle-heavy).
+    rng = np.random.default_rng(311)
+    codes = np.array([1, 2, 4, 8, 16, 32, 64, 128, 255, 0, 3], dtype=np.uint8)
+    for trial in range(200):
+        ny, nx = rng.integers(1, 50, size=2)
+        n_codes = 8 if trial % 3 == 0 else len(codes)
+        fdr = codes[rng.integers(0, n_codes, size=(ny, nx))]
+        pour = (rng.random((ny, nx)) < 0.03).astype(np.uint8)
+        barrier = (rng.random((ny, nx)) < 0.03).astype(np.uint8)
+        fdr_nodata = 0 if trial % 2 else 255
+        expected, n_expected = drains_to_dprst_kernel(fdr, pour, barrier, fdr_nodata=fdr_nodata)
+        out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier, fdr_nodata=fdr_nodata, parallel=True)
+        assert np.array_equal(out, expected)
+        assert n_cycles == n_expected
+
+        label = np.where(pour == 1, rng.integers(1, 9, size=(ny, nx)), 0).astype(np.int32)
+        expected, n_expected = drains_to_dprst_labeled_kernel(fdr, label, barrier, fdr_nodata=fdr_nodata)
+        out, n_cycles = drains_to_dprst_labeled_kernel(fdr, label, barrier, fdr_nodata=fdr_nodata, parallel=True)
+        assert out.dtype == np.int32
+        assert np.array_equal(out, expected)
+        assert n_cycles == n_expected
+
+
+def test_parallel_kernel_wide_frontier_and_cycle_with_long_feeder():
+    # A 5000-wide front flowing S into a pour row exercises the prange
+    # frontier path. Row 0's first 1000 cells are a 998-cell chain feeding a
+    # 2-cell cycle (998 -> 999 -> 998): one cycle, not 1000. Row 1 below them
+    # is nodata so the rest of the column drains on its own.
+    fdr = np.full((60, 5000), 4, dtype=np.uint8)
+    pour = np.zeros_like(fdr)
+    pour[-1, :] = 1
+    fdr[0, :999] = 1
+    fdr[0, 999] = 16
+    fdr[1, :1000] = 255
+    barrier = np.zeros_like(fdr)
+    out, n_cycles = drains_to_dprst_kernel(fdr, pour, barrier)
+    par, n_par = drains_to_dprst_kernel(fdr, pour, barrier, parallel=True)
+    assert np.array_equal(par, out)
+    assert n_par == n_cycles == 1
+    assert not out[0, :1000].any()
+    assert out[2:, :].all() and out[0, 1000:].all()
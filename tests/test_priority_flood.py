@@ -0,0 +1,137 @@
+"""Tiled Priority-Flood+Epsilon depression fill (gfv2_params.priority_flood)."""
+
+from __future__ import annotations
+
+import heapq
+from collections import deque
+
+import numpy as np
+import pytest
+import rasterio
+
+from gfv2_params.d8_flow import d8_pointer
+from gfv2_params.priority_flood import fill_depressions_array, fill_depressions_tiled
+
+ND = -9999.0
+
+
+def _reference_fill(dem, nodata):
+    # Straight transcription of richdem's PriorityFloodEpsilon (Barnes 2014,
+    # Algorithm 3): DEM-edge seeds, pit queue before the open heap, each
+    # raised cell set to nextafter(parent, +inf).
+    dem = dem.astype(np.float64).copy()
+    ny, nx = dem.shape
+    closed = np.zeros((ny, nx), dtype=bool)
+    open_, pit, seq = [], deque(), 0
+    for r in range(ny):
+        for c in range(nx):
+            if r in (0, ny - 1) or c in (0, nx - 1):
+                heapq.heappush(open_, (dem[r, c], seq, r, c))
+                seq += 1
+                closed[r, c] = True
+    while open_ or pit:
+        if pit and open_ and open_[0][0] == pit[0][0]:
+            z, _, r, c = heapq.heappop(open_)
+        elif pit:
+            z, r, c = pit.popleft()
+        else:
+            z, _, r, c = heapq.heappop(open_)
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                rn, cn = r + dr, c + dc
+                if (not dr and not dc) or not (0 <= rn < ny and 0 <= cn < nx) or closed[rn, cn]:
+                    continue
+                closed[rn, cn] = True
+                if dem[rn, cn] == nodata:
+                    pit.append((nodata, rn, cn))
+                elif dem[rn, cn] <= np.nextafter(z, np.inf):
+                    dem[rn, cn] = np.nextafter(z, np.inf)
+                    pit.append((dem[rn, cn], rn, cn))
+                else:
+                    heapq.heappush(open_, (dem[rn, cn], seq, rn, cn))
+                    seq += 1
+    return dem
+
+
+def test_fills_a_pit_to_its_spill_with_an_epsilon_gradient():
+    dem = np.array([
+        [9.0, 9.0, 9.0, 9.0, 9.0],
+        [9.0, 1.0, 1.0, 1.0, 9.0],
+        [9.0, 1.0, 1.0, 1.0, 5.0],
+        [9.0, 9.0, 9.0, 9.0, 9.0],
+    ])
+    out = fill_depressions_array(dem, ND, tile_size=3)
+    # One ULP per cell of distance from the spill cell (2, 4).
+    assert out[2, 3] == np.nextafter(5.0, np.inf)
+    assert out[2, 2] == np.nextafter(out[2, 3], np.inf)
+    assert out[1, 1] == np.nextafter(out[2, 2], np.inf)
+    assert out[2, 4] == 5.0 and out[0, 0] == 9.0
+    np.testing.assert_allclose(out[1:3, 1:4], 5.0, atol=1e-12)
+
+
+@pytest.mark.parametrize("tile_size", [2, 3, 7, 64])
+def test_matches_richdem_epsilon_bit_for_bit_without_ties(tile_size):
+    rng = np.random.default_rng(0)
+    for trial in range(25):
+        ny, nx = rng.integers(3, 30, size=2)
+        dem = rng.random((ny, nx)) * 10.0 + 0.05 * np.arange(nx)[None, :]
+        if trial % 3 == 0:
+            dem[:, :2] = ND  # nodata along the DEM edge, as outside a VPU footprint
+        out = fill_depressions_array(dem, ND, tile_size=tile_size)
+        assert np.array_equal(out, _reference_fill(dem, ND)), trial
+
+
+def test_flats_and_ties_fill_to_the_same_level_and_always_drain():
+    rng = np.random.default_rng(1)
+    for trial in range(30):
+        ny, nx = rng.integers(3, 25, size=2)
+        dem = np.round(rng.random((ny, nx)) * 5.0) + 100.0
+        dem[:, 0] = ND
+        ref = _reference_fill(dem, ND)
+        for tile_size in (2, 5, 64):
+            out = fill_depressions_array(dem, ND, tile_size=tile_size)
+            # Tie order may shift a cell by a few ULPs, never the fill level.
+            np.testing.assert_allclose(out, ref, rtol=0, atol=1e-9)
+            fdr = d8_pointer(out, ND, 30.0, 30.0)
+            interior = np.zeros(dem.shape, dtype=bool)
+            interior[1:-1, 2:-1] = True
+            assert not (interior & (fdr == 0)).any(), (trial, tile_size)
+
+
+def test_flat_spanning_many_tiles_is_reconciled_across_seams():
+    # A 1-cell-wide outlet at the far east of a 40-cell flat cut into 4x4 tiles:
+    # the distance has to cross nine seams to reach the west end.
+    dem = np.full((6, 42), 20.0)
+    dem[1:5, 1:41] = 3.0
+    dem[3, 41] = 2.0
+    out = fill_depressions_array(dem, ND, tile_size=4)
+    # Seam reconciliation: bit-identical to the same DEM solved as one tile.
+    assert np.array_equal(out, fill_depressions_array(dem, ND, tile_size=64))
+    assert out[3, 1] > out[3, 20] > out[3, 40] == 3.0
+    # The three outlet cells beside the spill are tied, so richdem's BFS from
+    # whichever pops first sits up to 2 ULPs above the nearest-outlet distance
+    # (module docstring); never below it.
+    ulps = _reference_fill(dem, ND).view(np.int64) - out.view(np.int64)
+    assert ulps.min() == 0 and ulps.max() <= 2
+
+
+def test_writes_float64_lzw_without_predictor_and_cleans_scratch(tmp_path):
+    dem = np.random.default_rng(3).random((20, 30)) * 50.0
+    src = tmp_path / "dem.tif"
+    with rasterio.open(src, "w", driver="GTiff", dtype="float64", nodata=ND, width=30, height=20, count=1,
+                       transform=rasterio.transform.from_origin(0, 20, 1, 1), compress="lzw",
+                       predictor=2) as f:
+        f.write(dem, 1)
+    dst = tmp_path / "filled.tif"
+    stats = fill_depressions_tiled(src, dst, ND, tile_size=8)
+    assert stats["tiles"] == 12
+    with rasterio.open(dst) as f:
+        assert f.dtypes[0] == "float64" and f.nodata == ND
+        assert f.profile.get("predictor") in (None, 1)
+        assert np.array_equal(f.read(1), _reference_fill(dem, ND))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dem.tif", "filled.tif"]
+
+
+def test_rejects_degenerate_tile_size(tmp_path):
+    with pytest.raises(ValueError):
+        fill_depressions_tiled(tmp_path / "dem.tif", tmp_path / "out.tif", ND, tile_size=1)
@@ -163,3 +163,42 @@ def test_build_multi_vpu_overlapping_bboxes_do_not_clobber(tmp_path):
     # VPU2's (0,1)->(1,0) trace (HRU 99) must be present too — neither VPU's
     # read-modify-write may zero the other's cells despite the full overlap.
     assert out.tolist() == [[42, 99], [99, 42]]
+
+
+def test_build_process_pool_matches_serial(tmp_path):
+    """`workers: 2` (spawn pool + memory-mapped tiles) and `parallel_kernel`
+    must reproduce the serial windowed mosaic exactly — same overlapping-bbox
+    2-VPU layout as above."""
+    template = tmp_path / "template.tif"
+    _write(template, np.full((2, 2), 100.0), "float32", -9999.0)
+    _write(tmp_path / "fdr.tif", np.array([[2, 8], [255, 255]], dtype=np.uint8), "uint8", 255)
+    _write(tmp_path / "vpu_id.tif", np.array([[1, 2], [2, 1]], dtype=np.uint8), "uint8", 0)
+    _write(tmp_path / "dprst_binary.tif", np.array([[0, 0], [1, 1]], dtype=np.uint8), "uint8", 255)
+    _write(tmp_path / "onstream_binary.tif", np.zeros((2, 2), dtype=np.uint8), "uint8", 255)
+    _write(tmp_path / "hru_id.tif", np.array([[7, 8], [99, 42]], dtype=np.int32), "int32", 0)
+    _write(tmp_path / "land_mask.tif", np.ones((2, 2), dtype=np.uint8), "uint8", 255)
+
+    ctx = BuildContext(
+        fabric="t", template_path=template, output_dir=tmp_path,
+        hru_gpkg=tmp_path / "x.gpkg", hru_layer="nhru",
+        fdr_raster=tmp_path / "fdr.tif",
+    )
+    ctx.paths.update({
+        "landmask": tmp_path / "land_mask.tif",
+        "dprst": tmp_path / "dprst_binary.tif",
+        "onstream": tmp_path / "onstream_binary.tif",
+        "vpu_id": tmp_path / "vpu_id.tif",
+        "hru_id": tmp_path / "hru_id.tif",
+    })
+    log = logging.getLogger("test")
+    serial = routing_hru.build({"output": "serial.tif"}, ctx, log)["drains_to_dprst_hru"]
+    pooled = routing_hru.build({"output": "pooled.tif", "workers": 2}, ctx, log)["drains_to_dprst_hru"]
+    threaded = routing_hru.build(
+        {"output": "threaded.tif", "parallel_kernel": True}, ctx, log,
+    )["drains_to_dprst_hru"]
+
+    with rasterio.open(serial) as a, rasterio.open(pooled) as b, rasterio.open(threaded) as c:
+        expected = a.read(1)
+        assert np.array_equal(b.read(1), expected)
+        assert np.array_equal(c.read(1), expected)
+    assert not (tmp_path / "pooled_vpu_tiles").exists()
@@ -0,0 +1,139 @@
+"""Streaming (out-of-core) and pooled routing must be bit-identical to serial in-RAM."""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from gfv2_params.depstor import (
+    RasterInfo,
+    scan_vpu_bboxes,
+    vpu_bbox,
+    vpu_codes_present,
+    vpus_largest_first,
+)
+from gfv2_params.depstor_builders import routing
+from gfv2_params.depstor_builders.context import BuildContext
+
+_TRANSFORM = from_origin(0, 900, 30, 30)
+
+
+def _write(path: Path, arr: np.ndarray, dtype: str, nodata) -> None:
+    height, width = arr.shape
+    with rasterio.open(
+        path, "w", driver="GTiff", height=height, width=width, count=1, dtype=dtype,
+        crs="EPSG:5070", transform=_TRANSFORM, nodata=nodata,
+    ) as dst:
+        dst.write(arr.astype(dtype), 1)
+
+
+def _synthetic_stack(tmp_path: Path, seed: int = 0) -> BuildContext:
+    """3-VPU 30x23 grid with interleaved (overlapping-bbox) VPUs, random FDR
+    incl. cycles and nodata, sparse dprst/onstream, and an off-land corner."""
+    rng = np.random.default_rng(seed)
+    ny, nx = 30, 23
+    _write(tmp_path / "template.tif", np.full((ny, nx), 100.0), "float32", -9999.0)
+
+    codes = np.array([1, 2, 4, 8, 16, 32, 64, 128, 255], dtype=np.uint8)
+    fdr = codes[rng.integers(0, len(codes) - 1, size=(ny, nx))]
+    fdr[rng.random((ny, nx)) < 0.02] = 255
+    _write(tmp_path / "fdr.tif", fdr, "uint8", 255)
+
+    vpu = np.ones((ny, nx), dtype=np.uint8)
+    vpu[:, 12:] = 2
+    vpu[20:, 5:17] = 3
+    vpu[0:4, 0:3] = 2  # a detached VPU-2 patch makes bboxes 1/2 overlap
+    vpu[0, 22] = 0  # outside every VPU
+    _write(tmp_path / "vpu_id.tif", vpu, "uint8", 0)
+
+    dprst = np.where(rng.random((ny, nx)) < 0.06, 1, 255).astype(np.uint8)
+    onstream = np.where((rng.random((ny, nx)) < 0.04) & (dprst != 1), 1, 255).astype(np.uint8)
+    _write(tmp_path / "dprst_binary.tif", dprst, "uint8", 255)
+    _write(tmp_path / "onstream_binary.tif", onstream, "uint8", 255)
+
+    land = np.ones((ny, nx), dtype=np.uint8)
+    land[25:, 18:] = 255
+    _write(tmp_path / "land_mask.tif", land, "uint8", 255)
+
+    ctx = BuildContext(
+        fabric="t", template_path=tmp_path / "template.tif", output_dir=tmp_path,
+        hru_gpkg=tmp_path / "x.gpkg", hru_layer="nhru", fdr_raster=tmp_path / "fdr.tif",
+        force=True,
+    )
+    ctx.paths.update({
+        "landmask": tmp_path / "land_mask.tif",
+        "dprst": tmp_path / "dprst_binary.tif",
+        "onstream": tmp_path / "onstream_binary.tif",
+        "vpu_id": tmp_path / "vpu_id.tif",
+    })
+    return ctx
+
+
+def _run(ctx: BuildContext, output: str, **step_cfg) -> np.ndarray:
+    produced = routing.build({"output": output, **step_cfg}, ctx, logging.getLogger("test"))
+    with rasterio.open(produced["drains_to_dprst"]) as src:
+        return src.read(1)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_streaming_mode_is_bit_identical_to_in_ram(tmp_path, monkeypatch, seed):
+    ctx = _synthetic_stack(tmp_path, seed)
+    in_ram = _run(ctx, "drains_in_ram.tif")
+    # Tiny strips so every VPU window spans several strips, and a budget no
+    # in-RAM estimate can meet so the streaming mode is forced.
+    monkeypatch.setattr(routing, "STRIP_ROWS", 4)
+    streamed = _run(ctx, "drains_streamed.tif", max_memory_gb=1e-9)
+    assert np.array_equal(streamed, in_ram)
+    assert (streamed == 1).any()
+
+
+@pytest.mark.parametrize("max_memory_gb", [None, 1e-9])
+def test_process_pool_is_bit_identical_to_serial(tmp_path, monkeypatch, max_memory_gb):
+    # workers > 1 routes VPUs in a spawn pool (largest first, memory-mapped
+    # tiles back to the parent) in both the in-RAM and the streaming mode.
+    ctx = _synthetic_stack(tmp_path, seed=3)
+    serial = _run(ctx, "drains_serial.tif")
+    monkeypatch.setattr(routing, "STRIP_ROWS", 4)
+    pooled = _run(ctx, "drains_pooled.tif", workers=2, max_memory_gb=max_memory_gb)
+    assert np.array_equal(pooled, serial)
+    assert not (tmp_path / "drains_pooled_vpu_tiles").exists()
+
+
+def test_parallel_kernel_is_bit_identical_to_serial_kernel(tmp_path):
+    ctx = _synthetic_stack(tmp_path, seed=4)
+    serial = _run(ctx, "drains_serial.tif")
+    threaded = _run(ctx, "drains_threaded.tif", parallel_kernel=True)
+    assert np.array_equal(threaded, serial)
+
+
+def test_generous_budget_keeps_in_ram_mode(tmp_path, caplog):
+    ctx = _synthetic_stack(tmp_path)
+    with caplog.at_level(logging.INFO):
+        _run(ctx, "drains.tif", max_memory_gb=64)
+    assert "Mode   : in_ram" in caplog.text
+
+
+def test_routing_mode_thresholds():
+    assert routing.routing_mode(None, 10**12, 10**11) == "in_ram"
+    # 2 B/grid cell + 14 B/window cell = 1.0e9 + 1.4e9 bytes.
+    assert routing.routing_mode(3, 5 * 10**8, 10**8) == "in_ram"
+    assert routing.routing_mode(2, 5 * 10**8, 10**8) == "streaming"
+
+
+def test_vpus_largest_first_orders_by_bbox_cells():
+    bboxes = {1: (0, 2, 0, 2), 3: (0, 10, 0, 10), 10: (0, 5, 0, 20), 2: (0, 10, 0, 10)}
+    assert vpus_largest_first(bboxes) == [2, 3, 10, 1]
+
+
+def test_scan_vpu_bboxes_matches_whole_array_bbox(tmp_path):
+    ctx = _synthetic_stack(tmp_path)
+    info = RasterInfo.from_path(ctx.template_path)
+    with rasterio.open(ctx.paths["vpu_id"]) as src:
+        vpu = src.read(1)
+    scanned = scan_vpu_bboxes(ctx.paths["vpu_id"], info, strip_rows=7)
+    assert list(scanned) == vpu_codes_present(vpu)
+    for code, bbox in scanned.items():
+        assert bbox == vpu_bbox(vpu, code)
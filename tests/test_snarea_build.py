@@ -94,3 +94,27 @@ def test_build_hru_record_defaults_subgrid_stats_without_swe_std():
     assert rec["n_peak_years"] == 0
     assert np.isnan(rec["cv_subgrid"])
     assert np.isnan(rec["peak_swe_mm"])
+
+
+def test_build_snarea_curve_parallel_csv_matches_serial():
+    from gfv2_params.snarea.build import build_snarea_curve
+
+    rng = np.random.default_rng(11)
+    idx = pd.date_range("2009-10-01", "2011-09-30", freq="D")
+    # one accumulate/melt season per water year (days 0-119 up, 120-239 down)
+    day = np.asarray(idx.dayofyear - 274) % 365
+    season = np.interp(day, [0, 120, 240, 365], [0, 100, 0, 0])
+    daily = {}
+    for hru in rng.permutation(np.arange(1, 41)):
+        swe = season * rng.uniform(0.2, 2.0)
+        sca = np.clip(swe / swe.max() + rng.normal(0, 0.05, len(idx)), 0, 1)
+        daily[int(hru)] = pd.DataFrame(
+            {"swe": swe.astype("float32"), "sca": sca.astype("float32"), "swe_std": swe * 0.4},
+            index=idx,
+        )
+    cells = {hru: int(rng.integers(5, 50)) for hru in daily}
+    args = (daily, cells, {}, "nat_hru_id", SelectionParams(), DEFAULT_SNAREA_CURVE)
+    serial = build_snarea_curve(*args)
+    parallel = build_snarea_curve(*args, workers=2)
+    assert parallel["nat_hru_id"].tolist() == sorted(daily)
+    assert parallel.to_csv(index=False) == serial.to_csv(index=False)
@@ -8,13 +8,16 @@ from gfv2_params.snarea.library import (
     CURVE_COLS,
     CV_GRID,
     SWE_LEVELS,
+    _library_matrix,
     _to_prms_order,
     assemble_params,
     assign_deplcrv,
     build_from_derived,
     build_library,
     fit_cv,
+    fit_cv_many,
     sdc_from_cv,
+    sdc_from_cv_many,
     snarea_thresh_inches,
     validate_and_calibrate,
     write_library_csv,
@@ -81,6 +84,34 @@ def test_fit_cv_is_interior_driven():
     assert fitted_low < fitted_high
 
 
+def test_fit_cv_many_matches_fit_cv_per_row():
+    rng = np.random.default_rng(5)
+    curves = sdc_from_cv_many(rng.uniform(0.05, 2.5, 200))
+    curves = np.clip(curves + rng.normal(0, 0.02, curves.shape), 0, 1)
+    curves[3, 4] = np.nan
+    got = fit_cv_many(curves)
+    assert np.isnan(got[3])
+    for i in np.flatnonzero(np.arange(len(curves)) != 3):
+        assert got[i] == fit_cv(curves[i])
+
+
+def test_sdc_from_cv_many_matches_scalar():
+    cvs = np.array([0.0, 0.05, 0.45, 1.2, 3.0])
+    np.testing.assert_array_equal(sdc_from_cv_many(cvs), np.vstack([sdc_from_cv(c) for c in cvs]))
+
+
+def test_library_matrix_persisted_npz_roundtrip(tmp_path):
+    grid = np.round(np.arange(0.1, 1.0001, 0.3), 2)
+    path = tmp_path / "lib.npz"
+    lib = _library_matrix(grid, path)
+    assert path.exists()
+    with np.load(path) as z:
+        np.testing.assert_array_equal(z["cv_grid"], grid)
+        np.testing.assert_array_equal(z["curves"], lib)
+    assert _library_matrix(grid) is lib            # memoized in process
+    assert not lib.flags.writeable
+
+
 def test_snarea_thresh_mm_to_inches():
     assert snarea_thresh_inches(254.0) == pytest.approx(10.0)
     assert snarea_thresh_inches(0.0) == 0.0
@@ -241,6 +272,17 @@ def test_assemble_params_columns_and_assigned_curve(tmp_path):
     np.testing.assert_allclose(r[CURVE_COLS].to_numpy(float), librow[CURVE_COLS].to_numpy(float))
 
 
+def test_assemble_params_unknown_deplcrv_raises():
+    lib = build_library(np.linspace(0.2, 1.4, 50), ndepl_cv=2, default_curve=np.linspace(1, 0, 11))
+    derived = pd.DataFrame({
+        "nat_hru_id": [1], "sdc_status": ["derived"], "sca_class": ["mid"], "similarity": [0.1],
+        "n_seasons": [3], "cv_subgrid": [0.5], "cv_empirical": [0.5], "peak_swe_mm": [100.0],
+        "n_peak_years": [3],
+    })
+    with pytest.raises(KeyError, match="not in library"):
+        assemble_params(derived, "nat_hru_id", np.array([0.5]), np.array(["subgrid"]), np.array([7]), lib)
+
+
 def test_write_csvs_roundtrip(tmp_path):
     lib = build_library(np.linspace(0.2, 1.4, 500), ndepl_cv=8, default_curve=np.linspace(1, 0, 11))
     p = tmp_path / "lib.csv"
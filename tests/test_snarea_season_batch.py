@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gfv2_params.snarea.build import (
+    DEFAULT_SNAREA_CURVE,
+    _seasons,
+    build_hru_record,
+    build_snarea_curve,
+)
+from gfv2_params.snarea.season import annual_sdc
+from gfv2_params.snarea.season_batch import annual_sdc_batch, seasons_batch
+from gfv2_params.snarea.selection import SelectionParams
+
+
+def _random_year(rng, n_days):
+    """One HRU-year exercising every branch: no snow, NaN gaps, peak on day 0,
+    no melt-out, reversals, zero SCA at peak, tied SWE levels."""
+    kind = rng.integers(6)
+    if kind == 0:
+        swe = np.zeros(n_days)
+    else:
+        peak = rng.integers(0 if kind == 1 else 1, n_days)
+        swe = np.concatenate([
+            np.sort(rng.uniform(0, 50, peak)),
+            np.sort(rng.uniform(0, 50, n_days - peak))[::-1],
+        ])
+        swe = np.round(swe, 0 if kind == 2 else 3)   # kind 2: many ties
+        if kind != 3:                                 # kind 3: never melts out
+            swe[rng.integers(peak, n_days):] = 0.0
+    sca = np.clip(swe / 50 + rng.normal(0, 0.15, n_days), 0, 1)
+    if kind == 4:
+        sca[int(np.nanargmax(swe))] = 0.0
+    gaps = rng.random(n_days) < 0.05
+    swe[gaps & (rng.random(n_days) < 0.5)] = np.nan
+    sca[gaps & (rng.random(n_days) < 0.5)] = np.nan
+    return swe, sca
+
+
+def test_annual_sdc_batch_matches_per_series_property():
+    rng = np.random.default_rng(20260716)
+    for n_days in (2, 5, 40, 365):
+        pairs = [_random_year(rng, n_days) for _ in range(300)]
+        swe = np.vstack([p[0] for p in pairs])
+        sca = np.vstack([p[1] for p in pairs])
+        curves, ok = annual_sdc_batch(swe, sca)
+        idx = pd.date_range("2010-10-01", periods=n_days, freq="D")
+        for i, (s, c) in enumerate(pairs):
+            ref = annual_sdc(pd.Series(s, index=idx), pd.Series(c, index=idx))
+            assert ok[i] == (ref is not None), i
+            if ref is not None:
+                np.testing.assert_array_equal(curves[i], ref)
+            else:
+                assert np.isnan(curves[i]).all()
+
+
+def test_seasons_batch_matches_seasons_across_water_years():
+    rng = np.random.default_rng(7)
+    idx = pd.date_range("2009-10-01", "2012-09-30", freq="D")
+    wy = idx.year + (idx.month >= 10)
+    n_hru = 50
+    swe = np.empty((n_hru, len(idx)))
+    sca = np.empty((n_hru, len(idx)))
+    for label in np.unique(wy):
+        cols = np.flatnonzero(wy == label)
+        for i in range(n_hru):
+            swe[i, cols], sca[i, cols] = _random_year(rng, cols.size)
+    curves, ok = seasons_batch(swe, sca, idx)
+    assert curves.shape == (n_hru, 3, 11)
+    for i in range(n_hru):
+        ref = _seasons(pd.DataFrame({"swe": swe[i], "sca": sca[i]}, index=idx))
+        got = curves[i][ok[i]]
+        assert len(got) == len(ref)
+        for a, b in zip(got, ref):
+            np.testing.assert_array_equal(a, b)
+
+
+def test_build_snarea_curve_batched_equals_per_hru():
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2010-10-01", "2011-09-30", freq="D")
+    daily = {}
+    for hru in range(1, 21):
+        s, c = _random_year(rng, len(idx))
+        daily[hru] = pd.DataFrame({"swe": s, "sca": c, "swe_std": np.abs(s) * 0.3}, index=idx)
+    cells = {h: 100 for h in daily}
+    water = {h: 0.0 for h in daily}
+    got = build_snarea_curve(daily, cells, water, "nat_hru_id", SelectionParams(), DEFAULT_SNAREA_CURVE)
+    ref = pd.DataFrame([
+        build_hru_record(h, daily[h], 100, 0.0, SelectionParams(), DEFAULT_SNAREA_CURVE)
+        for h in sorted(daily)
+    ]).rename(columns={"hru_id": "nat_hru_id"})
+    pd.testing.assert_frame_equal(got, ref)
+
+
+def test_annual_sdc_batch_rejects_mismatched_shapes():
+    with pytest.raises(ValueError, match="matching 2-D"):
+        annual_sdc_batch(np.zeros((2, 5)), np.zeros((2, 4)))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from gfv2_params.snarea.build import DEFAULT_SNAREA_CURVE, build_snarea_curve
+from gfv2_params.snarea.season_cache import (
+    build_from_summaries,
+    load_summary,
+    save_summary,
+    summarize_water_years,
+    water_year_keys,
+)
+from gfv2_params.snarea.selection import SelectionParams
+
+
+def _daily(rng, idx, kind):
+    """Daily swe/sca/swe_std exercising no-snow, NaN gaps, saturated and flat SCA."""
+    n = len(idx)
+    doy = np.asarray(idx.dayofyear)
+    swe = np.clip(60 * np.cos((doy - 45) / 365 * 2 * np.pi) + rng.normal(0, 8, n), 0, None)
+    if kind == 0:
+        swe[:] = 0.0
+    sca = np.clip(swe / 40 + rng.normal(0, 0.1, n), 0, 1)
+    if kind == 1:
+        sca = np.where(swe > 0, 1.0, 0.0)          # saturated: many ties at the max
+    if kind == 2:
+        sca = np.round(sca, 1)                       # coarse levels, ties across years
+    gaps = rng.random(n) < 0.03
+    swe[gaps & (rng.random(n) < 0.5)] = np.nan
+    sca[gaps & (rng.random(n) < 0.5)] = np.nan
+    std = np.abs(swe) * rng.uniform(0.1, 0.6)
+    return pd.DataFrame({"swe": swe, "sca": sca, "swe_std": std}, index=idx)
+
+
+def _record(n_hru=40, seed=11):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2009-10-01", "2013-03-31", freq="D")   # last water year partial
+    return idx, {h: _daily(rng, idx, h % 5) for h in range(1, n_hru + 1)}
+
+
+def _arrays(daily):
+    ids = np.array(sorted(daily))
+    return ids, {c: np.stack([daily[h][c].to_numpy() for h in ids]) for c in ("swe", "sca", "swe_std")}
+
+
+def test_build_from_summaries_matches_build_snarea_curve():
+    idx, daily = _record()
+    ids, a = _arrays(daily)
+    cells = {h: 10 + 3 * h for h in ids}
+    water = {h: 0.6 if h == 7 else 0.0 for h in ids}
+    params = SelectionParams()
+    ref = build_snarea_curve(daily, cells, water, "nat_hru_id", params, DEFAULT_SNAREA_CURVE)
+    summaries = summarize_water_years(a["swe"], a["sca"], a["swe_std"], idx)
+    assert sorted(summaries) == [2010, 2011, 2012, 2013]
+    got = build_from_summaries(ids, summaries, cells, water, "nat_hru_id", params, DEFAULT_SNAREA_CURVE)
+    pd.testing.assert_frame_equal(got, ref)
+
+
+def test_summaries_are_per_water_year():
+    # Summarizing a year from only its own days equals summarizing the whole record.
+    idx, daily = _record(n_hru=10)
+    _, a = _arrays(daily)
+    whole = summarize_water_years(a["swe"], a["sca"], a["swe_std"], idx)
+    sl = (idx >= "2011-10-01") & (idx <= "2012-09-30")
+    part = summarize_water_years(a["swe"][:, sl], a["sca"][:, sl], a["swe_std"][:, sl], idx[sl])
+    assert list(part) == [2012]
+    for field, values in part[2012].items():
+        np.testing.assert_array_equal(values, whole[2012][field], err_msg=field)
+
+
+def test_summary_cache_roundtrip_and_invalidation(tmp_path):
+    idx, daily = _record(n_hru=5)
+    ids, a = _arrays(daily)
+    y1 = idx[idx.year <= 2011]
+    keys = water_year_keys({"a_2010.nc|1|1": y1[y1.year == 2010], "a_2011.nc|1|1": y1[y1.year == 2011]})
+    summ = summarize_water_years(a["swe"], a["sca"], a["swe_std"], idx, years={2011})[2011]
+    save_summary(tmp_path, 2011, keys[2011], ids, summ)
+    got = load_summary(tmp_path, 2011, keys[2011], ids)
+    for field in summ:
+        np.testing.assert_array_equal(got[field], summ[field])
+    # a re-aggregated source file, a longer year or a different HRU set all miss
+    rekeyed = water_year_keys({"a_2010.nc|1|2": y1[y1.year == 2010], "a_2011.nc|1|1": y1[y1.year == 2011]})
+    assert load_summary(tmp_path, 2011, rekeyed[2011], ids) is None
+    longer = water_year_keys({"a_2010.nc|1|1": idx[idx.year == 2010], "a_2011.nc|1|1": idx[idx.year == 2011],
+                              "a_2012.nc|1|1": idx[idx.year == 2012]})
+    assert keys[2011] == longer[2011]                    # complete year: unchanged
+    assert keys[2012] != longer[2012]                    # Oct-Dec only -> now the full year
+    assert load_summary(tmp_path, 2011, keys[2011], ids[:-1]) is None
@@ -7,6 +7,8 @@ from gfv2_params.threshold_sweep import (
     CareaTwiArtifact,
     accumulate_strip,
     evaluate_threshold,
+    evaluate_thresholds,
+    hru_idx_strip,
     percentile_to_value,
     reference_grid,
     sweep,
@@ -69,6 +71,26 @@ def test_evaluate_zero_perv_is_zero():
     assert p[2] == 0.0
 
 
+def test_above_counts_is_reverse_cumulative_hist():
+    a = _toy_artifact()
+    assert a.above_counts.tolist() == [[4, 4, 2, 1, 0], [0, 0, 0, 0, 0], [10, 0, 0, 0, 0]]
+    assert a.above_counts is a.above_counts  # cached
+
+
+def test_evaluate_thresholds_matches_per_threshold_masked_sum():
+    a = _toy_artifact()
+    t_grid = np.array([-1.0, 0.0, 2.5, 5.0, 7.5, 10.0, 12.5, 17.5, 100.0])
+    mat = evaluate_thresholds(a, t_grid)
+    assert mat.shape == (len(t_grid), 3)
+    centers = 0.5 * (a.bin_edges[:-1] + a.bin_edges[1:])
+    for row, t in zip(mat, t_grid):
+        # The pre-cumulative definition: bins whose center is strictly > t.
+        num = a.n_perv_onstream + a.hist[:, centers > t].sum(axis=1)
+        expected = np.clip(np.where(a.n_perv > 0, num / np.maximum(a.n_perv, 1), 0.0), 0.0, 1.0)
+        assert np.allclose(row, expected), t
+        assert np.array_equal(row, evaluate_threshold(a, t))
+
+
 def test_value_percentile_roundtrip():
     a = _toy_artifact()
     assert value_to_percentile(a, 10.0) == pytest.approx(50.0)
@@ -188,3 +210,24 @@ def test_reference_grid_empty_histogram_raises():
     from gfv2_params.threshold_sweep import reference_grid
     with pytest.raises(ValueError, match="empty"):
         reference_grid(np.zeros(4, dtype="int64"), np.linspace(0, 20, 5), np.array([0.0, 50.0, 100.0]))
+
+
+def test_hru_idx_strip_tiles_the_full_grid_rasterize():
+    import geopandas as gpd
+    from rasterio.features import rasterize
+    from rasterio.transform import from_origin
+    from rasterio.windows import Window
+    from shapely.geometry import box
+
+    transform = from_origin(0.0, 20.0, 1.0, 1.0)
+    # Overlapping HRUs (later wins) and one HRU confined to the bottom rows.
+    hru = gpd.GeoDataFrame(geometry=[box(0.5, 5.2, 9.3, 19.5), box(4.1, 0.0, 12.0, 11.0),
+                                     box(1.0, 0.5, 3.0, 2.5)])
+    idxvals = np.array([2, 0, 1], dtype="int32")
+    full = rasterize(zip(hru.geometry, idxvals.tolist()), out_shape=(20, 12), transform=transform,
+                     fill=-1, dtype="int32", all_touched=True)
+    strips = [hru_idx_strip(hru, idxvals, Window(0, r, 12, min(3, 20 - r)), transform)
+              for r in range(0, 20, 3)]
+    assert np.array_equal(np.vstack(strips), full)
+    empty = hru_idx_strip(hru.iloc[:0], idxvals[:0], Window(0, 0, 12, 3), transform)
+    assert empty.shape == (3, 12) and (empty == -1).all()
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from gfv2_params import weight_store
+from gfv2_params.weight_store import (
+    export_weights_csv,
+    read_weights,
+    weights_exist,
+    write_weights,
+)
+
+
+def _weights(n_hru=50, per=4, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.repeat(np.arange(1, n_hru + 1), per)
+    rng.shuffle(ids)
+    # gdptools hands the target id back as strings
+    return pd.DataFrame({"hru_id": ids.astype(str), "i": rng.integers(0, 9, ids.size),
+                         "j": rng.integers(0, 9, ids.size), "wght": rng.random(ids.size)})
+
+
+def test_write_sorts_by_id_and_reads_back_ints(tmp_path):
+    w = _weights()
+    path = write_weights(w, tmp_path / "w.parquet", "hru_id")
+    got = read_weights(path, "hru_id")
+    assert got["hru_id"].dtype == "int64"                  # as a CSV round-trip
+    assert got["hru_id"].is_monotonic_increasing
+    ref = w.assign(hru_id=w["hru_id"].astype("int64")).sort_values("hru_id", kind="stable")
+    pd.testing.assert_frame_equal(got, ref.reset_index(drop=True))
+
+
+def test_read_ids_prunes_row_groups(tmp_path, monkeypatch):
+    monkeypatch.setattr(weight_store, "ROW_GROUP_ROWS", 20)   # 5 HRUs per group
+    path = write_weights(_weights(), tmp_path / "w.parquet", "hru_id")
+    assert pq.ParquetFile(path).metadata.num_row_groups == 10
+    batch = {12, 13, 15}
+    got = read_weights(path, "hru_id", ids=batch)
+    assert set(got["hru_id"]) == batch
+    assert len(got) == 12
+    # string ids (as read from a gpkg with text ids) select the same rows
+    pd.testing.assert_frame_equal(read_weights(path, "hru_id", ids=["12", "13", "15"]), got)
+    assert read_weights(path, "hru_id", ids=[]).empty
+
+
+def test_csv_path_matches_parquet(tmp_path):
+    w = _weights()
+    pq_path = write_weights(w, tmp_path / "w.parquet", "hru_id")
+    csv_path = export_weights_csv(pq_path, "hru_id")
+    assert csv_path == tmp_path / "w.csv"
+    pd.testing.assert_frame_equal(
+        read_weights(csv_path, "hru_id", ids={3, 7}),
+        read_weights(pq_path, "hru_id", ids={3, 7}),
+    )
+
+
+def test_weights_exist_converts_legacy_csv(tmp_path):
+    _weights().to_csv(tmp_path / "w.csv", index=False)
+    path = tmp_path / "w.parquet"
+    assert weights_exist(path, "hru_id")
+    assert path.exists()
+    assert len(read_weights(path, "hru_id")) == 200
+    assert not weights_exist(tmp_path / "missing.parquet", "hru_id")
@@ -0,0 +1,131 @@
+"""Persisted coverage-fraction weights for `script: zonal` params (zonal_runners.cell_weights)."""
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import rasterio
+from exactextract import exact_extract
+from rasterio.transform import from_origin
+from shapely.geometry import Polygon, box
+
+from gfv2_params.zonal_runners.cell_weights import (
+    STAT_COLUMNS,
+    _weighted_quantile,
+    build_cell_weights,
+    lattice_key,
+    weights_match_ids,
+    weights_path,
+    zonal_stats_from_weights,
+)
+
+CRS = "EPSG:5070"
+
+
+def _write(path, arr, nodata):
+    with rasterio.open(path, "w", driver="GTiff", width=arr.shape[1], height=arr.shape[0], count=1,
+                       dtype=arr.dtype, crs=CRS, transform=from_origin(100, 20, 1, 1), nodata=nodata) as f:
+        f.write(arr, 1)
+    return path
+
+
+@pytest.fixture
+def hrus():
+    # Off-grid shapes so coverage fractions are genuinely partial.
+    return gpd.GeoDataFrame(
+        {"hru_id": [4, 9, 2]},
+        geometry=[Polygon([(101.3, 2.2), (108.7, 3.1), (106.2, 11.6), (100.6, 9.4)]),
+                  box(108.25, 4.5, 115.6, 18.9), box(500, 500, 501, 501)],  # last one off the raster
+        crs=CRS,
+    )
+
+
+def test_weights_reproduce_exactextract_for_any_raster_on_the_lattice(tmp_path, hrus):
+    rng = np.random.default_rng(0)
+    elev = _write(tmp_path / "elev.tif", rng.random((20, 16)).astype("float32") * 100, -9999.0)
+    slope_arr = rng.integers(0, 40, size=(20, 16)).astype("int16")
+    slope_arr[5:8, 2:6] = -1  # a nodata patch the weights were not built with
+    slope = _write(tmp_path / "slope.tif", slope_arr, -1)
+    with rasterio.open(elev) as a, rasterio.open(slope) as b:
+        assert lattice_key(a) == lattice_key(b)
+
+    wfile = tmp_path / "w" / "batch_0000.npz"
+    assert build_cell_weights(elev, hrus, "hru_id", wfile) > 0
+
+    for raster in (elev, slope):
+        got = zonal_stats_from_weights(raster, wfile, "hru_id")
+        assert list(got.columns) == STAT_COLUMNS
+        ref = exact_extract(str(raster), hrus, ["count", "mean", "sum", "min", "max", "stdev"],
+                            include_cols=["hru_id"], output="pandas").set_index("hru_id")
+        for hru in (4, 9):
+            assert got.loc[hru, "count"] == pytest.approx(ref.loc[hru, "count"], rel=1e-5)
+            assert got.loc[hru, "mean"] == pytest.approx(ref.loc[hru, "mean"], rel=1e-5)
+            assert got.loc[hru, "sum"] == pytest.approx(ref.loc[hru, "sum"], rel=1e-5)
+            assert got.loc[hru, "std"] == pytest.approx(ref.loc[hru, "stdev"], rel=1e-4)
+            assert got.loc[hru, "min"] == ref.loc[hru, "min"]
+            assert got.loc[hru, "max"] == ref.loc[hru, "max"]
+        assert got.loc[2, "count"] == 0 and np.isnan(got.loc[2, "mean"])
+
+
+def test_weighted_quantile_is_type7_for_equal_weights():
+    x = np.array([3.0, 1.0, 4.0, 1.5, 9.0, 2.6])
+    for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+        assert _weighted_quantile(x, np.ones_like(x), q) == pytest.approx(np.quantile(x, q))
+
+
+def test_weights_are_tied_to_the_batch_id_set(tmp_path, hrus):
+    elev = _write(tmp_path / "elev.tif", np.ones((20, 16), dtype="float32"), -9999.0)
+    wfile = tmp_path / "w" / "batch_0000.npz"
+    build_cell_weights(elev, hrus, "hru_id", wfile)
+    assert weights_match_ids(wfile, [2, 4, 9])
+    assert weights_match_ids(wfile, np.array([9.0, 2.0, 4.0]))     # ids read back as float
+    assert not weights_match_ids(wfile, [4, 9])
+    assert not weights_match_ids(wfile, [4, 9, 7])
+
+
+def test_run_zonal_batch_ignores_weights_from_another_batch_split(tmp_path, hrus, monkeypatch, caplog):
+    import logging
+
+    from gfv2_params.zonal_runners import zonal as zonal_mod
+
+    elev = _write(tmp_path / "elev.tif", np.ones((20, 16), dtype="float32") * 7, -9999.0)
+    batch_dir = tmp_path / "batches"
+    batch_dir.mkdir()
+    hrus.iloc[:2].to_file(batch_dir / "batch_0000.gpkg", layer="nhru")
+    with rasterio.open(elev) as ds:
+        stale = weights_path(tmp_path / "cw", lattice_key(ds), 0)
+    build_cell_weights(elev, hrus, "hru_id", stale)                  # built for 3 HRUs, batch has 2
+
+    def _must_not_use(*args, **kwargs):
+        raise AssertionError("stale cell weights were used")
+
+    monkeypatch.setattr(zonal_mod, "zonal_stats_from_weights", _must_not_use)
+    config = {"source_type": "elevation", "id_feature": "hru_id", "target_layer": "nhru", "fabric": "t",
+              "source_raster": str(elev), "batch_dir": str(batch_dir), "output_dir": str(tmp_path / "out"),
+              "cell_weight_dir": str(tmp_path / "cw")}
+    with caplog.at_level(logging.WARNING):
+        zonal_mod.run_zonal_batch(config, 0, logging.getLogger("zonal-test"))
+    assert "different HRU batch" in caplog.text
+    assert (tmp_path / "out" / "elevation" / "base_nhm_elevation_t_batch_0000_param.csv").exists()
+
+
+def test_run_zonal_batch_never_uses_weights_for_categorical_entries(tmp_path, hrus, monkeypatch):
+    import logging
+
+    from gfv2_params.zonal_runners import zonal as zonal_mod
+
+    classes = _write(tmp_path / "classes.tif", np.arange(320, dtype="int16").reshape(20, 16) % 3, -1)
+    batch_dir = tmp_path / "batches"
+    batch_dir.mkdir()
+    hrus.to_file(batch_dir / "batch_0000.gpkg", layer="nhru")
+    with rasterio.open(classes) as ds:
+        build_cell_weights(classes, hrus, "hru_id", weights_path(tmp_path / "cw", lattice_key(ds), 0))
+
+    def _must_not_use(*args, **kwargs):
+        raise AssertionError("cell weights were used for a categorical entry")
+
+    monkeypatch.setattr(zonal_mod, "zonal_stats_from_weights", _must_not_use)
+    config = {"source_type": "classes", "categorical": True, "id_feature": "hru_id", "target_layer": "nhru",
+              "fabric": "t", "source_raster": str(classes), "batch_dir": str(batch_dir),
+              "output_dir": str(tmp_path / "out"), "cell_weight_dir": str(tmp_path / "cw")}
+    zonal_mod.run_zonal_batch(config, 0, logging.getLogger("zonal-test"))
+    assert (tmp_path / "out" / "classes" / "base_nhm_classes_t_batch_0000_param.csv").exists()
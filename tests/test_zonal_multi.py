@@ -0,0 +1,55 @@
+"""Single-pass multi-raster zonal engine (zonal_runners.multi_zonal)."""
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import box
+
+from gfv2_params.zonal_runners.multi_zonal import zonal_stats_multi
+
+CRS = "EPSG:5070"
+
+
+def _write(path, arr, nodata):
+    with rasterio.open(path, "w", driver="GTiff", width=arr.shape[1], height=arr.shape[0], count=1,
+                       dtype=arr.dtype, crs=CRS, transform=from_origin(0, 4, 1, 1), nodata=nodata) as f:
+        f.write(arr, 1)
+    return path
+
+
+@pytest.fixture
+def hrus():
+    # Cell-aligned boxes on a 4x4 grid of 1 m cells: every coverage fraction is 1.
+    return gpd.GeoDataFrame({"nat_hru_id": [7, 3]}, geometry=[box(0, 2, 2, 4), box(2, 0, 4, 4)], crs=CRS)
+
+
+def test_means_and_histograms_in_one_pass(tmp_path, hrus):
+    lulc = _write(tmp_path / "lulc.tif", np.array([[11, 11, 41, 41],
+                                                   [42, 0, 41, 90],
+                                                   [11, 11, 90, 90],
+                                                   [11, 11, 90, 90]], dtype="uint8"), 0)
+    cnpy = _write(tmp_path / "cnpy.tif", np.array([[10, 20, 0, 0],
+                                                   [30, -1, 50, 50],
+                                                   [0, 0, 0, 0],
+                                                   [0, 0, 100, 100]], dtype="int16"), -1)
+    out = zonal_stats_multi({"lulc": lulc, "canopy": cnpy}, hrus, "nat_hru_id", categorical={"lulc"})
+
+    assert out["canopy"].loc[7, "mean"] == pytest.approx(20.0)   # nodata cell excluded
+    assert out["canopy"].loc[3, "mean"] == pytest.approx(300 / 8)
+    hist = out["lulc"]
+    assert hist.index.name == "nat_hru_id"
+    assert list(hist.columns) == ["11", "41", "42", "90", "count"]
+    assert hist.loc[7].tolist() == pytest.approx([2, 0, 1, 0, 3])
+    assert hist.loc[3].tolist() == pytest.approx([0, 3, 0, 5, 8])
+
+
+def test_reprojects_hrus_and_rejects_missing_or_unknown(tmp_path, hrus):
+    cnpy = _write(tmp_path / "cnpy.tif", np.full((4, 4), 5, dtype="int16"), -1)
+    out = zonal_stats_multi({"canopy": cnpy}, hrus.to_crs("EPSG:4326"), "nat_hru_id")
+    assert out["canopy"]["mean"].to_numpy() == pytest.approx([5.0, 5.0])
+    with pytest.raises(FileNotFoundError):
+        zonal_stats_multi({"canopy": tmp_path / "nope.tif"}, hrus, "nat_hru_id")
+    with pytest.raises(ValueError):
+        zonal_stats_multi({"canopy": cnpy}, hrus, "nat_hru_id", categorical={"lulc"})
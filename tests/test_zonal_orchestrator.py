@@ -222,3 +222,16 @@ def test_orchestrator_rejects_unknown_param(tmp_path):
     combined = result.stdout + result.stderr
     assert "this_param_does_not_exist" in combined
     assert "available" in combined.lower() or "Available" in combined
+
+
+def test_orchestrator_rejects_reversed_batch_range():
+    """--batch_id_end below --batch_id is an argparse error, not an empty run."""
+    result = _run_orchestrator(
+        "--config", str(ZONAL_PARAMS_CONFIG),
+        "--mode", "zonal",
+        "--param", "elevation",
+        "--batch_id", "5",
+        "--batch_id_end", "4",
+    )
+    assert result.returncode != 0
+    assert "--batch_id_end" in result.stdout + result.stderr
@@ -0,0 +1,50 @@
+"""LRU raster-handle cache used by the multi-batch zonal worker."""
+
+import pytest
+
+from gfv2_params.zonal_runners import raster_cache
+
+
+class _FakeDA:
+    def __init__(self, path):
+        self.path = path
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    calls = []
+
+    def _open(path, masked):
+        calls.append(path)
+        return _FakeDA(path)
+
+    monkeypatch.setattr(raster_cache.rioxarray, "open_rasterio", _open)
+    yield calls
+    raster_cache.set_raster_cache_size(0)
+
+
+def test_disabled_by_default_opens_every_call(opened, tmp_path):
+    a = raster_cache.open_raster(tmp_path / "a.tif")
+    b = raster_cache.open_raster(tmp_path / "a.tif")
+    assert a is not b and len(opened) == 2
+
+
+def test_reuses_handles_and_closes_least_recently_used(opened, tmp_path):
+    raster_cache.set_raster_cache_size(2)
+    a = raster_cache.open_raster(tmp_path / "a.tif")
+    b = raster_cache.open_raster(tmp_path / "b.tif")
+    assert raster_cache.open_raster(tmp_path / "a.tif") is a  # a is now most recent
+    raster_cache.open_raster(tmp_path / "c.tif")              # evicts b
+    assert b.closed and not a.closed
+    assert len(opened) == 3
+    raster_cache.clear_raster_cache()
+    assert a.closed
+
+
+def test_rejects_negative_size():
+    with pytest.raises(ValueError):
+        raster_cache.set_raster_cache_size(-1)